@@ -0,0 +1,198 @@
+"""
+🚦 GOAL QUEST - AI Request Scheduler
+Single-flight coalescing, concurrency limits and retry/backoff for AI calls
+
+One scheduler is shared by every session through the cached AIService.
+Identical requests that are already in flight are coalesced onto the same
+future, at most max_concurrency requests reach the API at once, and
+transient failures (429, 5xx, 529 overloaded, connection errors) are retried
+with jittered exponential backoff as long as the latency budget allows.
+"""
+
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError"}
+
+
+def request_key(**request) -> str:
+    """Stable fingerprint of a messages.create request"""
+    encoded = json.dumps(request, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def is_retryable(error: BaseException) -> bool:
+    if type(error).__name__ in RETRYABLE_ERRORS:
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Server-suggested delay from a Retry-After header, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CallOutcome:
+    attempts: int = 0
+    coalesced: bool = False
+    queued_ms: float = 0.0
+
+
+class BudgetExceeded(Exception):
+    """The latency budget ran out before a request could be sent or retried"""
+
+
+class AIRequestScheduler:
+    """Shared gate in front of the upstream AI client"""
+
+    def __init__(self, max_concurrency: int = 4, max_attempts: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 8.0, latency_budget: float = 45.0,
+                 sleep: Callable[[float], None] = time.sleep, jitter: Callable[[], float] = random.random):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.latency_budget = latency_budget
+        self._sleep = sleep
+        self._jitter = jitter
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.stats = {"requests": 0, "coalesced": 0, "upstream_calls": 0, "retries": 0, "failures": 0}
+
+    def submit(self, key: Hashable, call: Callable[[], Any]) -> Tuple[Any, CallOutcome]:
+        """Run call once per key at a time; concurrent callers with the same key share its result"""
+        with self._lock:
+            self.stats["requests"] += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            started = time.monotonic()
+            result = future.result(timeout=self.latency_budget)
+            return result, CallOutcome(coalesced=True, queued_ms=(time.monotonic() - started) * 1000)
+
+        outcome = CallOutcome()
+        try:
+            result = self._run(call, outcome)
+        except BaseException as e:
+            with self._lock:
+                self.stats["failures"] += 1
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+        future.set_result(result)
+        return result, outcome
+
+    def stream(self, open_stream: Callable[[], Any], outcome: CallOutcome) -> Iterator[Tuple[str, Any]]:
+        """Yield ("text", delta) for a streamed call, then ("message", final message).
+
+        A worker thread reads the response while holding one upstream slot and
+        releases it as soon as the response ends, however slowly the caller
+        consumes the deltas or if it stops early. A failure before the first
+        delta arrives is retried with backoff like submit; later failures are
+        raised to the caller with the deltas already read.
+        """
+        events: queue.Queue = queue.Queue()
+        with self._lock:
+            self.stats["requests"] += 1
+
+        def read():
+            try:
+                events.put(("message", self._run_stream(open_stream, outcome, events)))
+            except BaseException as e:
+                with self._lock:
+                    self.stats["failures"] += 1
+                events.put(("error", e))
+
+        threading.Thread(target=read, daemon=True).start()
+        while True:
+            kind, value = events.get()
+            if kind == "error":
+                raise value
+            yield kind, value
+            if kind == "message":
+                return
+
+    def _run_stream(self, open_stream: Callable[[], Any], outcome: CallOutcome, events: queue.Queue) -> Any:
+        deadline = time.monotonic() + self.latency_budget
+        while True:
+            remaining = deadline - time.monotonic()
+            queued = time.monotonic()
+            if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+                raise BudgetExceeded(f"no upstream slot within {self.latency_budget:.0f}s")
+            outcome.queued_ms += (time.monotonic() - queued) * 1000
+            outcome.attempts += 1
+            with self._lock:
+                self.stats["upstream_calls"] += 1
+            started = False
+            try:
+                with open_stream() as stream:
+                    for text in stream.text_stream:
+                        started = True
+                        events.put(("text", text))
+                    return stream.get_final_message()
+            except Exception as e:
+                if started or not is_retryable(e) or outcome.attempts >= self.max_attempts:
+                    raise
+                delay = self._backoff(outcome.attempts, e)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+            finally:
+                self._slots.release()
+            self._sleep(delay)
+
+    def _run(self, call: Callable[[], Any], outcome: CallOutcome) -> Any:
+        deadline = time.monotonic() + self.latency_budget
+        while True:
+            remaining = deadline - time.monotonic()
+            queued = time.monotonic()
+            if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+                raise BudgetExceeded(f"no upstream slot within {self.latency_budget:.0f}s")
+            outcome.queued_ms += (time.monotonic() - queued) * 1000
+            outcome.attempts += 1
+            with self._lock:
+                self.stats["upstream_calls"] += 1
+            try:
+                return call()
+            except Exception as e:
+                if not is_retryable(e) or outcome.attempts >= self.max_attempts:
+                    raise
+                delay = self._backoff(outcome.attempts, e)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+            finally:
+                self._slots.release()
+            self._sleep(delay)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        # Full jitter spreads retries from many sessions instead of synchronizing them
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = ceiling * self._jitter()
+        suggested = retry_after(error)
+        if suggested is not None:
+            delay = max(delay, min(suggested, self.max_delay))
+        return delay
@@ -0,0 +1,565 @@
+"""
+🤖 GOAL QUEST - AI Service
+Claude-powered difficulty assessment, goal planning, document analysis and coaching
+
+Streamlit is not imported here: the app injects its API key and warning sink
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ai_scheduler import AIRequestScheduler, CallOutcome, request_key
+from classifier import DifficultyClassifier, rule_category, rule_difficulty
+from conversation import ConversationMemory
+from game_data import CATEGORIES, DIFFICULTIES, STATS
+from json_stream import IncrementalJSONParser
+from telemetry import AITelemetry
+
+AI_MODEL = "claude-sonnet-4-20250514"
+# Shortest prefix the API caches for AI_MODEL; breakpoints on shorter prefixes are ignored (and billed as input)
+CACHE_MIN_TOKENS = 1024
+# English and JSON run about 3.5-4 characters per token; gating at 5 means a
+# prefix that passes can't tokenize below the minimum
+CACHE_CHARS_PER_TOKEN = 5
+CACHE_MIN_CHARS = CACHE_MIN_TOKENS * CACHE_CHARS_PER_TOKEN
+
+# Every request starts with GAME_REFERENCE, the one static system prefix shared
+# by all methods (persona, game tables and every output format) and long
+# enough to be cached. The short method instructions follow it, and per-call
+# data goes last (in the user message or a later system block), so the cached
+# prefix stays byte-identical across methods and calls.
+GAME_REFERENCE = """You are the AI inside Goal Quest, a gamified habit tracking app inspired by the Solo Leveling anime.
+Users are "Hunters" who level up by completing habits and goal steps. Each completion earns XP and gold and
+raises one of six stats. Your job is to turn real-life habits, goals and documents into fair, motivating quests,
+and to coach Hunters on keeping them. Each request ends with a task; follow it using the reference below.
+
+CATEGORIES (use the key):
+- fitness: exercise, sport, strength and cardio training, mobility and stretching
+- health: sleep, nutrition, hydration, medical care and recovery
+- learning: reading, courses, studying, languages and research
+- career: job skills, networking, job search, promotions and professional projects
+- finance: budgeting, saving, investing, paying down debt and tracking spending
+- creative: writing, music, art, photography, design and making things
+- mindfulness: meditation, breathing, journaling, gratitude and reflection
+- productivity: planning, focus sessions, inbox zero, routines and time management
+- social: friends, community, events, volunteering and conversations
+- personal: self-care, grooming, personal admin and anything that fits nowhere else
+- spiritual: prayer, faith practice, philosophy and contemplation
+- home: cleaning, cooking, repairs, decluttering and organizing
+- environment: recycling, reducing waste, gardening and time in nature
+- relationships: partner, family, dates, calls and quality time
+- life_goals: long-term ambitions, milestones and bucket-list projects
+- skills: practical crafts and abilities such as coding, driving or cooking techniques
+
+STATS (use the key; pick the one the habit trains most):
+- strength (STR): muscle, lifting, physical labour and endurance under load
+- intelligence (INT): learning, problem solving, reading, planning and analysis
+- vitality (VIT): health, sleep, nutrition, hydration and recovery
+- agility (AGI): speed, coordination, cardio, flexibility and quick execution
+- sense (SEN): awareness, creativity, perception, social and emotional insight
+- willpower (WIL): discipline, consistency, resisting temptation and mental toughness
+
+DIFFICULTY SCALE (difficulty, difficulty_name, typical effort, xp_reward range):
+1 = Trivial: <5 min, no prep (drink water, make bed); 25-50 XP
+2 = Easy: 5-15 min, minimal effort (quick stretch, gratitude); 50-100 XP
+3 = Medium: 15-30 min, focus needed (meditation, reading); 100-200 XP
+4 = Hard: 30-60 min, significant effort (workout, study); 200-400 XP
+5 = Expert: 1+ hour, high commitment (deep work, training); 400-600 XP
+6 = Legendary: Major undertaking (marathon training, mastery); 600-1000 XP
+Rate the effort for this user: time needed, mental effort, physical effort, skill required and how much
+consistency it demands. Scale xp_reward within the range by how hard the habit is for them.
+
+OUTPUT FORMATS. When a task names one of these formats, return ONLY valid JSON in that exact structure, with no
+prose and no code fences. Angle brackets describe a value; pipes list the allowed values.
+
+Single habit format:
+{
+    "difficulty": <1-6 integer>,
+    "difficulty_name": "<Trivial|Easy|Medium|Hard|Expert|Legendary>",
+    "xp_reward": <integer 25-1000>,
+    "category": "<category key>",
+    "target_stat": "<stat key>",
+    "time_estimate": "<X minutes|X hours>",
+    "tip": "<helpful personalized tip for building this habit>",
+    "reasoning": {
+        "time_factor": <1-5>,
+        "mental_effort": <1-5>,
+        "physical_effort": <1-5>,
+        "skill_required": <1-5>,
+        "consistency_need": <1-5>
+    }
+}
+
+Habit list format, with one entry per input habit, using its id:
+{
+    "assessments": [
+        {
+            "id": "<id from the input>",
+            "difficulty": <1-6 integer>,
+            "difficulty_name": "<Trivial|Easy|Medium|Hard|Expert|Legendary>",
+            "xp_reward": <integer 25-1000>,
+            "category": "<category key>",
+            "target_stat": "<stat key>",
+            "time_estimate": "<X minutes|X hours>",
+            "tip": "<one short, practical tip for building this habit>"
+        }
+    ]
+}
+
+Quest plan format:
+{
+    "title": "<cleaned up goal title>",
+    "difficulty": <1-6>,
+    "difficulty_name": "<Trivial|Easy|Medium|Hard|Expert|Legendary>",
+    "total_xp": <integer 1000-10000>,
+    "category": "<category key>",
+    "target_stat": "<stat key>",
+    "estimated_weeks": <target timeline in weeks>,
+    "steps": [
+        {
+            "title": "<step title>",
+            "description": "<detailed description>",
+            "estimated_duration": "<e.g., '1 week', '3-5 days'>",
+            "xp_reward": <integer>,
+            "suggested_habit": "<optional daily/weekly habit to support this step>" or null
+        }
+    ],
+    "suggested_habits": [
+        {
+            "title": "<habit title>",
+            "description": "<brief description>",
+            "frequency": "<daily|weekly>",
+            "category": "<category key>"
+        }
+    ]
+}
+
+Reading extract format:
+{
+    "title": "<detected document title or 'Imported Document'>",
+    "summary": "<brief 2-3 sentence summary>",
+    "habits": [
+        {"title": "<habit title>", "description": "<from the text>", "category": "<category key>", "difficulty": <1-6>}
+    ],
+    "goals": [
+        {"title": "<goal title>", "description": "<from the text>", "category": "<category key>",
+         "steps": ["<step 1>", "<step 2>", ...]}
+    ],
+    "quotes": [
+        {"quote": "<the quote>", "author": "<author if known>" or null, "context": "<brief context>"}
+    ],
+    "key_concepts": ["<concept 1>", "<concept 2>", ...]
+}
+
+COACHING VOICE (for conversations with a Hunter, answered in plain text rather than JSON):
+- Motivating but not cheesy
+- Reference their stats and progress naturally
+- Use their name occasionally
+- Give practical, actionable advice
+- Keep responses concise (2-4 paragraphs max)
+- Encourage them to create habits or goals when appropriate"""
+
+HABIT_ASSESSMENT_INSTRUCTIONS = """Analyze this habit and assess its difficulty. Reply in the single habit format.
+The habit and the user's current stats are given in the user message."""
+
+HABIT_BATCH_INSTRUCTIONS = """Assess each habit in the list and rate its difficulty. Reply in the habit list format.
+The habits (each with an id) and the user's current stats are given in the user message."""
+
+GOAL_PLAN_INSTRUCTIONS = """Create a detailed action plan for this goal. Reply in the quest plan format.
+The goal and its target timeline are given in the user message.
+Generate 7-10 steps that are specific, actionable, progressive, and achievable within the timeline.
+Also suggest 2-3 supporting habits."""
+
+DOCUMENT_ANALYSIS_INSTRUCTIONS = """Analyze this document and extract actionable habits, goals, and memorable quotes.
+Reply in the reading extract format. The document text is given in the user message.
+Extract 5-15 habits, 1-5 goals, 5-10 quotes, and 3-7 key concepts."""
+
+COACH_PERSONA = """Act as the Hunter's AI Life Coach in the coaching voice. Their profile and the earlier
+conversation follow."""
+
+
+class AIService:
+    """AI Service using Anthropic Claude API"""
+    
+    def __init__(self, api_key: Optional[str] = None, telemetry: Optional[AITelemetry] = None,
+                 notify: Optional[Callable[[str], None]] = None,
+                 scheduler: Optional[AIRequestScheduler] = None,
+                 classifier: Optional[DifficultyClassifier] = None):
+        self.api_key = api_key if api_key is not None else os.environ.get("ANTHROPIC_API_KEY", "")
+        self.client = None
+        self.model = AI_MODEL
+        self.telemetry = telemetry
+        self.scheduler = scheduler or AIRequestScheduler()
+        self.classifier = classifier
+        self.notify = notify or (lambda message: None)
+        if self.api_key:
+            self._init_client()
+    
+    def _init_client(self):
+        """Initialize Anthropic client"""
+        try:
+            import anthropic
+            # Retries are owned by the shared scheduler, not the SDK
+            self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
+        except ImportError:
+            self.notify("⚠️ Anthropic package not installed. AI features will use fallback logic.")
+        except Exception as e:
+            self.notify(f"⚠️ Could not initialize AI: {e}")
+    
+    def is_available(self) -> bool:
+        return self.client is not None
+    
+    @contextmanager
+    def _track(self, method: str, max_tokens: Optional[int] = None):
+        """Record latency, usage and outcome of one AI call in telemetry.
+        
+        The body stores the API response in the yielded dict. Any exception marks
+        the call as failed (JSON errors as parse failures) and is re-raised for
+        the caller's fallback handling.
+        """
+        call = {"response": None, "attempts": 0, "coalesced": False}
+        status, error = "ok", None
+        started = time.perf_counter()
+        try:
+            yield call
+        except json.JSONDecodeError as e:
+            status, error = "parse_error", str(e)
+            raise
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if self.telemetry:
+                if status == "ok" and call["coalesced"]:
+                    status = "coalesced"  # shared another session's call; its tokens are already counted
+                self.telemetry.record(method, self.model, status, (time.perf_counter() - started) * 1000,
+                                      response=None if call["coalesced"] else call["response"],
+                                      max_tokens=max_tokens, fallback=status not in ("ok", "coalesced"),
+                                      error=error, attempts=call["attempts"])
+    
+    def _create_message(self, call: Dict, **request):
+        """Send a messages.create request through the shared scheduler"""
+        request = {"model": self.model, **request}
+        response, outcome = self.scheduler.submit(
+            request_key(**request), lambda: self.client.messages.create(**request)
+        )
+        call["response"] = response
+        call["attempts"] = outcome.attempts
+        call["coalesced"] = outcome.coalesced
+        return response
+    
+    def _record_offline(self, method: str):
+        if self.telemetry:
+            self.telemetry.record(method, None, "offline", fallback=True)
+    
+    @staticmethod
+    def _cached(text: str) -> Dict:
+        """System block, marked as a prompt-cache breakpoint when it is long enough to be cached"""
+        block = {"type": "text", "text": text}
+        if len(text) >= CACHE_MIN_CHARS:
+            block["cache_control"] = {"type": "ephemeral"}
+        return block
+    
+    def _system(self, instructions: str) -> List[Dict]:
+        """The shared cached reference, then the method's instructions"""
+        return [self._cached(GAME_REFERENCE), {"type": "text", "text": instructions}]
+    
+    @staticmethod
+    def _parse_json(response) -> Dict:
+        result_text = response.content[0].text.strip()
+        if result_text.startswith("```"):
+            result_text = result_text.split("```")[1]
+            if result_text.startswith("json"):
+                result_text = result_text[4:]
+        return json.loads(result_text)
+    
+    def _classify_locally(self, habit_description: str) -> Optional[Dict]:
+        if not self.classifier:
+            return None
+        started = time.perf_counter()
+        assessment = self.classifier.classify(habit_description)
+        if assessment and self.telemetry:
+            self.telemetry.record("assess_habit_difficulty", "local", "local",
+                                  (time.perf_counter() - started) * 1000)
+        return dict(assessment, source="local") if assessment else None
+    
+    def assess_habit_difficulty(self, habit_description: str, user_stats: Dict = None) -> Dict:
+        """Difficulty assessment for habits: local classifier when confident, otherwise the AI"""
+        local = self._classify_locally(habit_description)
+        if local:
+            return local
+        if not self.is_available():
+            self._record_offline("assess_habit_difficulty")
+            return self._fallback_difficulty(habit_description)
+        
+        prompt = f"""Habit: "{habit_description}"
+
+User's current stats: {json.dumps(user_stats) if user_stats else "New user"}"""
+
+        try:
+            with self._track("assess_habit_difficulty", max_tokens=500) as call:
+                self._create_message(
+                    call,
+                    max_tokens=500,
+                    system=self._system(HABIT_ASSESSMENT_INSTRUCTIONS),
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                return dict(self._parse_json(call["response"]), source="ai")
+        except Exception as e:
+            self.notify(f"AI analysis failed: {e}")
+            return self._fallback_difficulty(habit_description)
+    
+    def _fallback_difficulty(self, habit_description: str) -> Dict:
+        """Fallback difficulty assessment from the keyword rules"""
+        return dict(DifficultyClassifier.assessment(rule_difficulty(habit_description),
+                                                    rule_category(habit_description)), source="fallback")
+    
+    def learn_assessment(self, habit_description: str, assessment: Dict):
+        """Feed an accepted AI assessment to the local classifier"""
+        if self.classifier and assessment.get("source") == "ai":
+            self.classifier.learn(habit_description, assessment)
+    
+    @staticmethod
+    def _validate_assessment(item) -> Optional[Dict]:
+        """Normalized assessment, or None if the item is unusable"""
+        if not isinstance(item, dict):
+            return None
+        try:
+            difficulty = int(item["difficulty"])
+            xp_reward = int(item["xp_reward"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if difficulty not in DIFFICULTIES or item.get("category") not in CATEGORIES:
+            return None
+        low, high = DIFFICULTIES[difficulty]["xp_range"]
+        return {
+            "difficulty": difficulty,
+            "difficulty_name": DIFFICULTIES[difficulty]["name"],
+            "xp_reward": min(max(xp_reward, low), high),
+            "category": item["category"],
+            "target_stat": item.get("target_stat") if item.get("target_stat") in STATS else "willpower",
+            "time_estimate": str(item.get("time_estimate") or "15-20 minutes"),
+            "tip": str(item.get("tip") or ""),
+            "source": "ai",
+        }
+    
+    def assess_habits_batch(self, habit_descriptions: List[str], user_stats: Dict = None) -> List[Dict]:
+        """Assess many habits with one AI request; results line up with the input list.
+        
+        Confident local classifications skip the request, and every item that is
+        missing or invalid in the reply falls back on its own.
+        """
+        results: List[Optional[Dict]] = [self._classify_locally(d) for d in habit_descriptions]
+        pending = {f"h{i + 1}": d for i, d in enumerate(habit_descriptions) if results[i] is None}
+        
+        if pending and not self.is_available():
+            self._record_offline("assess_habits_batch")
+        elif pending:
+            prompt = f"""Habits: {json.dumps([{"id": key, "habit": d} for key, d in pending.items()])}
+
+User's current stats: {json.dumps(user_stats) if user_stats else "New user"}"""
+            max_tokens = min(4000, 150 + 180 * len(pending))
+            try:
+                with self._track("assess_habits_batch", max_tokens=max_tokens) as call:
+                    self._create_message(
+                        call,
+                        max_tokens=max_tokens,
+                        system=self._system(HABIT_BATCH_INSTRUCTIONS),
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    reply = self._parse_json(call["response"])
+                items = reply.get("assessments", []) if isinstance(reply, dict) else []
+                for item in items:
+                    key = item.get("id") if isinstance(item, dict) else None
+                    assessment = self._validate_assessment(item)
+                    if key in pending and assessment:
+                        results[int(key[1:]) - 1] = assessment
+            except Exception as e:
+                self.notify(f"AI batch analysis failed: {e}")
+        
+        return [result or self._fallback_difficulty(d) for result, d in zip(results, habit_descriptions)]
+    
+    def generate_goal_steps(self, goal_description: str, target_weeks: int = 12) -> Dict:
+        """Generate 7-10 actionable steps for a goal"""
+        if not self.is_available():
+            self._record_offline("generate_goal_steps")
+            return self._fallback_goal_steps(goal_description, target_weeks)
+        
+        prompt = f"""Goal: "{goal_description}"
+Target timeline: {target_weeks} weeks"""
+
+        try:
+            with self._track("generate_goal_steps", max_tokens=2000) as call:
+                self._create_message(
+                    call,
+                    max_tokens=2000,
+                    system=self._system(GOAL_PLAN_INSTRUCTIONS),
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                return self._parse_json(call["response"])
+        except Exception as e:
+            self.notify(f"AI goal generation failed: {e}")
+            return self._fallback_goal_steps(goal_description, target_weeks)
+    
+    def generate_goal_steps_stream(self, goal_description: str, target_weeks: int = 12) -> Iterator[Tuple[str, Dict]]:
+        """Stream a goal plan: yields ("step", step) as each step closes, then ("plan", plan).
+        
+        The response is read through the shared scheduler, which holds its slot
+        only while the response arrives and retries failures before the first
+        delta. A cut-off or malformed tail keeps the steps already parsed; if
+        nothing usable arrived, the non-streaming path is used instead.
+        """
+        if not self.is_available():
+            self._record_offline("generate_goal_steps_stream")
+            yield "plan", self._fallback_goal_steps(goal_description, target_weeks)
+            return
+        
+        prompt = f"""Goal: "{goal_description}"
+Target timeline: {target_weeks} weeks"""
+        parser = IncrementalJSONParser()
+        
+        try:
+            with self._track("generate_goal_steps_stream", max_tokens=2000) as call:
+                outcome = CallOutcome()
+                request = {"model": self.model, "max_tokens": 2000,
+                           "system": self._system(GOAL_PLAN_INSTRUCTIONS),
+                           "messages": [{"role": "user", "content": prompt}]}
+                try:
+                    for kind, value in self.scheduler.stream(lambda: self.client.messages.stream(**request), outcome):
+                        if kind == "message":
+                            call["response"] = value
+                            continue
+                        for path, step in parser.feed(value):
+                            if len(path) == 2 and path[0] == "steps" and isinstance(step, dict):
+                                yield "step", step
+                finally:
+                    call["attempts"] = outcome.attempts
+                if not parser.complete:
+                    raise json.JSONDecodeError(parser.error or "plan ended early", parser.text, len(parser.text))
+        except Exception as e:
+            self.notify(f"AI goal generation was cut short: {e}")
+        
+        plan = parser.finish()
+        if isinstance(plan, dict) and plan.get("steps"):
+            yield "plan", plan
+        else:
+            yield "plan", self.generate_goal_steps(goal_description, target_weeks)
+    
+    def _fallback_goal_steps(self, goal_description: str, target_weeks: int) -> Dict:
+        """Fallback goal steps"""
+        return {
+            "title": goal_description[:50],
+            "difficulty": 3,
+            "difficulty_name": "Medium",
+            "total_xp": 2500,
+            "category": "personal",
+            "target_stat": "willpower",
+            "estimated_weeks": target_weeks,
+            "steps": [
+                {"title": "Research and plan", "description": "Gather information and create a detailed plan", "estimated_duration": "1 week", "xp_reward": 200, "suggested_habit": None},
+                {"title": "Set up foundation", "description": "Prepare everything you need to get started", "estimated_duration": "1 week", "xp_reward": 250, "suggested_habit": None},
+                {"title": "Begin practice", "description": "Start with basic exercises and activities", "estimated_duration": "2 weeks", "xp_reward": 300, "suggested_habit": "Daily practice - 15 minutes"},
+                {"title": "Build consistency", "description": "Establish a regular routine", "estimated_duration": "2 weeks", "xp_reward": 350, "suggested_habit": None},
+                {"title": "Increase challenge", "description": "Push beyond comfort zone", "estimated_duration": "2 weeks", "xp_reward": 300, "suggested_habit": None},
+                {"title": "Refine technique", "description": "Focus on quality and improvement", "estimated_duration": "2 weeks", "xp_reward": 350, "suggested_habit": None},
+                {"title": "Final push", "description": "Complete the goal with excellence", "estimated_duration": "2 weeks", "xp_reward": 500, "suggested_habit": None},
+            ],
+            "suggested_habits": [
+                {"title": "Daily Progress Review", "description": "Spend 5 minutes reviewing progress", "frequency": "daily", "category": "productivity"},
+                {"title": "Weekly Planning", "description": "Plan the week ahead", "frequency": "weekly", "category": "productivity"},
+            ]
+        }
+    
+    def analyze_document(self, text: str, max_chars: int = 50000) -> Dict:
+        """Analyze document text and extract habits, goals, and quotes"""
+        if not self.is_available():
+            self._record_offline("analyze_document")
+            return self._fallback_document_analysis()
+        
+        if len(text) > max_chars:
+            text = text[:max_chars] + "...[truncated]"
+        
+        prompt = f"""Document text:
+\"\"\"
+{text}
+\"\"\""""
+
+        try:
+            with self._track("analyze_document", max_tokens=3000) as call:
+                self._create_message(
+                    call,
+                    max_tokens=3000,
+                    system=self._system(DOCUMENT_ANALYSIS_INSTRUCTIONS),
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                return self._parse_json(call["response"])
+        except Exception as e:
+            self.notify(f"Document analysis failed: {e}")
+            return self._fallback_document_analysis()
+    
+    def _fallback_document_analysis(self) -> Dict:
+        return {
+            "title": "Imported Document",
+            "summary": "Document imported. AI analysis unavailable.",
+            "habits": [], "goals": [], "quotes": [], "key_concepts": []
+        }
+    
+    def chat(self, message: str, user_data: Dict, chat_history: List[Dict] = None,
+             memory: Optional[ConversationMemory] = None) -> str:
+        """AI coach chat.
+        
+        Pass the session's ConversationMemory to keep per-turn input bounded;
+        a plain chat_history is wrapped in a throwaway memory instead.
+        """
+        if not self.is_available():
+            self._record_offline("chat")
+            return self._fallback_chat()
+        
+        user_context = f"""
+User Profile:
+- Name: {user_data.get('name', 'Hunter')}
+- Level: {user_data.get('level', 1)}
+- Current Streak: {user_data.get('current_streak', 0)} days
+- Stats: STR {user_data.get('strength', 1)}, INT {user_data.get('intelligence', 1)}, VIT {user_data.get('vitality', 1)}, AGI {user_data.get('agility', 1)}, SEN {user_data.get('sense', 1)}, WIL {user_data.get('willpower', 1)}
+"""
+        
+        if memory is None:
+            memory = ConversationMemory.from_history(chat_history or [])
+        summary, messages = memory.prepare(message)
+        if summary:
+            user_context += f"\nEarlier in this conversation:\n{summary}\n"
+        # Shared reference and persona first so the prefix stays stable; the profile and summary change per user
+        system = self._system(COACH_PERSONA) + [{"type": "text", "text": user_context.strip()}]
+        prefix_chars = sum(len(block["text"]) for block in system) + sum(len(m["content"]) for m in messages[:-1])
+        if len(messages) > 1 and prefix_chars >= CACHE_MIN_CHARS:
+            # Cache through the last earlier turn so the next message only pays for the new tail
+            last = messages[-2]
+            messages[-2] = {"role": last["role"], "content": [
+                {"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}
+            ]}
+        
+        try:
+            with self._track("chat", max_tokens=500) as call:
+                self._create_message(
+                    call,
+                    max_tokens=500,
+                    system=system,
+                    messages=messages
+                )
+                reply = call["response"].content[0].text
+            memory.record(message, reply)
+            return reply
+        except Exception as e:
+            return self._fallback_chat()
+    
+    def _fallback_chat(self) -> str:
+        return """I'm currently in offline mode. Here's what you can do:
+• Create a new habit to build your streak
+• Work on your active goals
+• Check your progress in Analytics
+• Browse the Shop for power-ups
+
+When AI is available, I'll give you personalized coaching!"""
@@ -0,0 +1,257 @@
+"""
+📡 GOAL QUEST - JSON API
+A small HTTP API over the storage engine for clients that aren't Streamlit
+
+Ticking a habit through the app costs a whole script rerun; here it is one
+request to a store that stays open. The server is the standard library's
+ThreadingHTTPServer speaking HTTP/1.1, so clients keep one connection alive
+across requests. It uses whatever StorageBackend it is given: run inside the
+app (GOAL_QUEST_API_PORT) it shares the app's store, writer thread and caches,
+and run on its own (python api.py) it opens the database itself.
+
+GET responses are cached per store revision and day: a repeated GET is served
+from the cached bytes, and one sending the ETag back gets 304 Not Modified.
+Any write, through the API or elsewhere, changes the revision.
+
+    GET  /api/stats                        user row, level progress and ranks
+    GET  /api/habits                       active habits with done_today / due_today
+    GET  /api/habits/today                 ids of habits completed today
+    GET  /api/goals                        open goals with their steps
+    GET  /api/shop                         shop items for the user's level
+    POST /api/habits/<id>/complete
+    POST /api/goals/steps/<id>/complete
+    POST /api/shop/<id>/purchase
+
+Every endpoint takes ?user_id= and defaults to the first user; POSTs only act
+on that user's own habits and goal steps. With a token configured, requests
+must send "Authorization: Bearer <token>"; without one the server only binds
+to loopback addresses.
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import leaderboard
+import rows
+from storage import MEMORY_LOCATION, StorageBackend, open_storage
+
+logger = logging.getLogger(__name__)
+
+# Columns that are internal bookkeeping rather than API data
+HIDDEN_COLUMNS = ("history_origin", "history_bits")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _public(row: Dict) -> Dict:
+    return {k: v for k, v in row.items() if k not in HIDDEN_COLUMNS}
+
+
+class GoalQuestApi:
+    """Routes requests to store methods and caches GET responses by store revision"""
+
+    def __init__(self, store: StorageBackend, token: str = "", cache_size: int = 256):
+        self.store = store
+        self.token = token
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()  # path?query -> (etag, body)
+        self._lock = threading.Lock()
+        self.gets = {
+            "/api/stats": self.stats,
+            "/api/habits": self.habits,
+            "/api/habits/today": self.today,
+            "/api/goals": self.goals,
+            "/api/shop": self.shop,
+        }
+        self.posts = [
+            (re.compile(r"/api/habits/(\d+)/complete"), self.complete_habit),
+            (re.compile(r"/api/goals/steps/(\d+)/complete"), self.complete_step),
+            (re.compile(r"/api/shop/(\d+)/purchase"), lambda uid, i: self.store.purchase_item(uid, i)),
+        ]
+
+    def authorized(self, header: Optional[str]) -> bool:
+        return not self.token or hmac.compare_digest(header or "", f"Bearer {self.token}")
+
+    def user_id(self, query: Dict) -> int:
+        if "user_id" in query:
+            try:
+                user_id = int(query["user_id"][0])
+            except ValueError:
+                raise ApiError(400, "user_id must be an integer")
+            if self.store.get_user_by_id(user_id) is None:
+                raise ApiError(404, "User not found")
+            return user_id
+        user = self.store.get_user()
+        if user is None:
+            raise ApiError(404, "No user yet")
+        return user["id"]
+
+    # GET
+    def get(self, target: str, if_none_match: Optional[str]) -> Tuple[int, Optional[str], bytes]:
+        """(status, etag, body) for a GET, served from the cache while the revision is unchanged"""
+        url = urlsplit(target)
+        handler = self.gets.get(url.path.rstrip("/"))
+        if handler is None:
+            raise ApiError(404, "Not found")
+        revision = self.store.revision()
+        etag = f'"{revision}.{date.today().isoformat()}"' if revision is not None else None
+        with self._lock:
+            cached = self._cache.get(target)
+            if cached is not None and cached[0] == etag:
+                self._cache.move_to_end(target)
+        if cached is None or cached[0] != etag:
+            body = json.dumps(handler(self.user_id(parse_qs(url.query))), default=rows.jsonable).encode("utf-8")
+            cached = (etag, body)
+            if etag is not None:
+                with self._lock:
+                    self._cache[target] = cached
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        if etag is not None and if_none_match == etag:
+            return 304, etag, b""
+        return 200, etag, cached[1]
+
+    def stats(self, user_id: int) -> Dict:
+        user = self.store.get_user_by_id(user_id)
+        if user is None:
+            raise ApiError(404, "User not found")
+        ranks = {metric: self.store.get_rank(metric, user_id) for metric in leaderboard.METRICS}
+        return {"user": user, "xp_to_next": self.store.xp_for_level(user["level"]), "ranks": ranks,
+                "completed_today": len(self.store.get_today_completions(user_id))}
+
+    def habits(self, user_id: int) -> list:
+        done = set(self.store.get_today_completions(user_id))
+        due = self.store.get_due_habit_ids(user_id)
+        return [{**_public(h), "done_today": h["id"] in done, "due_today": h["id"] in due}
+                for h in self.store.get_habits(user_id)]
+
+    def today(self, user_id: int) -> list:
+        return self.store.get_today_completions(user_id)
+
+    def goals(self, user_id: int) -> list:
+        return self.store.get_goals(user_id)
+
+    def shop(self, user_id: int) -> list:
+        user = self.store.get_user_by_id(user_id)
+        return self.store.get_shop_items(user["level"] if user else 1)
+
+    # POST
+    def complete_habit(self, user_id: int, habit_id: int) -> Dict:
+        habit = self.store.get_habit(habit_id)
+        if habit is None or habit["user_id"] != user_id:
+            raise ApiError(404, "Habit not found")
+        return self.store.complete_habit(habit_id, user_id)
+
+    def complete_step(self, user_id: int, step_id: int) -> Dict:
+        owned = {s["id"] for g in self.store.get_goals(user_id, include_completed=True) for s in g["steps"]}
+        if step_id not in owned:
+            raise ApiError(404, "Step not found")
+        return self.store.complete_goal_step(step_id, user_id)
+
+    def post(self, target: str) -> Tuple[int, bytes]:
+        url = urlsplit(target)
+        for pattern, action in self.posts:
+            match = pattern.fullmatch(url.path.rstrip("/"))
+            if match:
+                result = action(self.user_id(parse_qs(url.query)), int(match.group(1)))
+                status = 409 if "error" in result else 200
+                return status, json.dumps(result, default=rows.jsonable).encode("utf-8")
+        raise ApiError(404, "Not found")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: one connection per client
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    api: GoalQuestApi
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, respond: Callable[[], None]):
+        try:
+            if not self.api.authorized(self.headers.get("Authorization")):
+                raise ApiError(401, "Unauthorized")
+            respond()
+        except ApiError as e:
+            self._send(e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+        except Exception:
+            logger.exception("API %s %s failed", self.command, self.path)
+            self._send(500, json.dumps({"error": "Internal error"}).encode("utf-8"))
+
+    def do_GET(self):
+        def respond():
+            status, etag, body = self.api.get(self.path, self.headers.get("If-None-Match"))
+            self._send(status, body, etag)
+        self._handle(respond)
+
+    def do_POST(self):
+        def respond():
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))  # bodies are ignored
+            self._send(*self.api.post(self.path))
+        self._handle(respond)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(store: StorageBackend, host: str = "127.0.0.1", port: int = 8600, token: str = "") -> ThreadingHTTPServer:
+    """Start the API on a daemon thread; call shutdown() on the returned server to stop it.
+
+    Without a token only loopback addresses are allowed (ValueError otherwise).
+    """
+    if not token:
+        try:
+            loopback = host == "localhost" or ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            loopback = False
+        if not loopback:
+            raise ValueError(f"refusing to serve the API on {host} without GOAL_QUEST_API_TOKEN")
+        logger.warning("GOAL_QUEST_API_TOKEN is not set: any local process can act for any user")
+    handler = type("Handler", (_Handler,), {"api": GoalQuestApi(store, token)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="goal-quest-api", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Goal Quest JSON API")
+    parser.add_argument("--db", default=os.environ.get("GOAL_QUEST_DB", "goal_quest.db"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("GOAL_QUEST_API_PORT") or 8600))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    store = open_storage(args.db) if args.db == MEMORY_LOCATION else open_storage(args.db, group_commit=True)
+    server = serve(store, args.host, args.port, os.environ.get("GOAL_QUEST_API_TOKEN", ""))
+    logger.info("Goal Quest API on http://%s:%d/api", args.host, server.server_port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,32 @@ Deploy from GitHub to Streamlit Cloud
 """
 
 import streamlit as st
-import sqlite3
+import csv
+import io
 import json
 import hashlib
-from datetime import datetime, date, timedelta
+import functools
+from datetime import datetime, date, time as dtime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import os
 
+import history
+import leaderboard
+import schedule
+import api
+from ai_service import AIService
+from archive import CompletionArchiver
+from backup import SnapshotManager
+from classifier import DifficultyClassifier
+from conversation import ConversationMemory
+from database import Database
+from game_data import CATEGORIES, DIFFICULTIES, STATS, TIERS, RARITIES, PHILOSOPHY_TRADITIONS
+from maintenance import MaintenanceScheduler
+from profiler import QueryProfiler
+from reminders import FileSink, ReminderEngine, ToastSink, WebhookSink
+from storage import MEMORY_LOCATION, StorageBackend, open_storage
+from telemetry import AITelemetry
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION & THEME
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -25,1159 +44,41 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Custom CSS for Solo Leveling dark theme
-CUSTOM_CSS = """
-<style>
-    /* Main background */
-    .stApp {
-        background: linear-gradient(180deg, #0A0A0A 0%, #111111 100%);
-    }
-    
-    /* Sidebar */
-    [data-testid="stSidebar"] {
-        background: #0A0A0A;
-        border-right: 1px solid #1A1A1A;
-    }
-    
-    /* Cards */
-    .quest-card {
-        background: #1A1A1A;
-        border: 1px solid #252525;
-        border-radius: 12px;
-        padding: 16px;
-        margin-bottom: 12px;
-        transition: all 0.3s ease;
-    }
-    .quest-card:hover {
-        border-color: #D4AF37;
-        transform: translateY(-2px);
-    }
-    
-    /* Gold accent text */
-    .gold-text {
-        color: #D4AF37 !important;
-        font-weight: 600;
-    }
-    
-    /* XP Progress bar */
-    .xp-bar {
-        background: #252525;
-        border-radius: 6px;
-        height: 12px;
-        overflow: hidden;
-    }
-    .xp-fill {
-        background: linear-gradient(90deg, #D4AF37 0%, #F4D03F 100%);
-        height: 100%;
-        border-radius: 6px;
-        transition: width 0.5s ease-out;
-    }
-    
-    /* Stat boxes */
-    .stat-box {
-        background: #1A1A1A;
-        border: 1px solid #252525;
-        border-radius: 8px;
-        padding: 12px;
-        text-align: center;
-    }
-    
-    /* Streak fire */
-    .streak-badge {
-        background: linear-gradient(135deg, #F97316 0%, #EF4444 100%);
-        padding: 4px 12px;
-        border-radius: 12px;
-        color: white;
-        font-weight: 600;
-    }
-    
-    /* Difficulty badges */
-    .diff-trivial { background: rgba(156, 163, 175, 0.2); color: #9CA3AF; }
-    .diff-easy { background: rgba(34, 197, 94, 0.2); color: #22C55E; }
-    .diff-medium { background: rgba(59, 130, 246, 0.2); color: #3B82F6; }
-    .diff-hard { background: rgba(245, 158, 11, 0.2); color: #F59E0B; }
-    .diff-expert { background: rgba(239, 68, 68, 0.2); color: #EF4444; }
-    .diff-legendary { background: rgba(168, 85, 247, 0.2); color: #A855F7; }
-    
-    /* Category colors */
-    .cat-fitness { border-left: 4px solid #EF4444; }
-    .cat-health { border-left: 4px solid #22C55E; }
-    .cat-learning { border-left: 4px solid #3B82F6; }
-    .cat-career { border-left: 4px solid #6366F1; }
-    .cat-finance { border-left: 4px solid #F59E0B; }
-    .cat-creative { border-left: 4px solid #EC4899; }
-    .cat-mindfulness { border-left: 4px solid #A855F7; }
-    .cat-productivity { border-left: 4px solid #F97316; }
-    .cat-social { border-left: 4px solid #06B6D4; }
-    .cat-personal { border-left: 4px solid #FBBF24; }
-    .cat-spiritual { border-left: 4px solid #8B5CF6; }
-    .cat-home { border-left: 4px solid #84CC16; }
-    .cat-environment { border-left: 4px solid #10B981; }
-    .cat-relationships { border-left: 4px solid #F472B6; }
-    .cat-life_goals { border-left: 4px solid #D4AF37; }
-    .cat-skills { border-left: 4px solid #64748B; }
-    
-    /* Rarity glows */
-    .rarity-common { border: 1px solid #9CA3AF; }
-    .rarity-uncommon { border: 2px solid #22C55E; box-shadow: 0 0 10px rgba(34, 197, 94, 0.3); }
-    .rarity-rare { border: 2px solid #3B82F6; box-shadow: 0 0 15px rgba(59, 130, 246, 0.4); }
-    .rarity-epic { border: 2px solid #A855F7; box-shadow: 0 0 20px rgba(168, 85, 247, 0.5); }
-    .rarity-legendary { border: 2px solid #F59E0B; box-shadow: 0 0 25px rgba(245, 158, 11, 0.6); }
-    
-    /* Buttons */
-    .stButton > button {
-        background: linear-gradient(135deg, #D4AF37 0%, #B8860B 100%);
-        color: #000000;
-        border: none;
-        font-weight: 600;
-        transition: all 0.2s ease;
-    }
-    .stButton > button:hover {
-        transform: scale(1.02);
-        box-shadow: 0 4px 12px rgba(212, 175, 55, 0.4);
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Metrics styling */
-    [data-testid="stMetricValue"] {
-        color: #D4AF37;
-    }
-</style>
-"""
-
-st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# CONSTANTS & GAME DATA
-# ═══════════════════════════════════════════════════════════════════════════════
-
-CATEGORIES = {
-    "fitness": {"name": "Fitness", "emoji": "💪", "color": "#EF4444"},
-    "health": {"name": "Health", "emoji": "❤️", "color": "#22C55E"},
-    "learning": {"name": "Learning", "emoji": "🧠", "color": "#3B82F6"},
-    "career": {"name": "Career", "emoji": "💼", "color": "#6366F1"},
-    "finance": {"name": "Finance", "emoji": "💰", "color": "#F59E0B"},
-    "creative": {"name": "Creative", "emoji": "🎨", "color": "#EC4899"},
-    "mindfulness": {"name": "Mindfulness", "emoji": "🧘", "color": "#A855F7"},
-    "productivity": {"name": "Productivity", "emoji": "⚡", "color": "#F97316"},
-    "social": {"name": "Social", "emoji": "👥", "color": "#06B6D4"},
-    "personal": {"name": "Personal", "emoji": "🌟", "color": "#FBBF24"},
-    "spiritual": {"name": "Spiritual", "emoji": "🙏", "color": "#8B5CF6"},
-    "home": {"name": "Home", "emoji": "🏠", "color": "#84CC16"},
-    "environment": {"name": "Environment", "emoji": "🌍", "color": "#10B981"},
-    "relationships": {"name": "Relationships", "emoji": "💑", "color": "#F472B6"},
-    "life_goals": {"name": "Life Goals", "emoji": "🎯", "color": "#D4AF37"},
-    "skills": {"name": "Skills", "emoji": "🔧", "color": "#64748B"},
-}
-
-DIFFICULTIES = {
-    1: {"name": "Trivial", "color": "#9CA3AF", "xp_range": (25, 50), "stars": 1},
-    2: {"name": "Easy", "color": "#22C55E", "xp_range": (50, 100), "stars": 2},
-    3: {"name": "Medium", "color": "#3B82F6", "xp_range": (100, 200), "stars": 3},
-    4: {"name": "Hard", "color": "#F59E0B", "xp_range": (200, 400), "stars": 4},
-    5: {"name": "Expert", "color": "#EF4444", "xp_range": (400, 600), "stars": 5},
-    6: {"name": "Legendary", "color": "#A855F7", "xp_range": (600, 1000), "stars": 6},
-}
+# Solo Leveling dark theme lives in static/goal_quest.css and is served by
+# Streamlit's static file server, so each rerun only sends a <link> tag.
+THEME_CSS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "goal_quest.css")
+THEME_CSS_URL = "app/static/goal_quest.css"
 
-STATS = {
-    "strength": {"name": "Strength", "abbr": "STR", "emoji": "⚔️", "color": "#EF4444"},
-    "intelligence": {"name": "Intelligence", "abbr": "INT", "emoji": "🧠", "color": "#3B82F6"},
-    "vitality": {"name": "Vitality", "abbr": "VIT", "emoji": "❤️", "color": "#22C55E"},
-    "agility": {"name": "Agility", "abbr": "AGI", "emoji": "⚡", "color": "#F59E0B"},
-    "sense": {"name": "Sense", "abbr": "SEN", "emoji": "👁️", "color": "#A855F7"},
-    "willpower": {"name": "Willpower", "abbr": "WIL", "emoji": "🔥", "color": "#EC4899"},
-}
-
-TIERS = {
-    1: {"name": "Novice Adventurer", "level_range": (1, 10), "color": "#9CA3AF"},
-    2: {"name": "Skilled Warrior", "level_range": (11, 25), "color": "#22C55E"},
-    3: {"name": "Elite Champion", "level_range": (26, 50), "color": "#3B82F6"},
-    4: {"name": "Master Guardian", "level_range": (51, 75), "color": "#A855F7"},
-    5: {"name": "Legendary Hero", "level_range": (76, 99), "color": "#F59E0B"},
-    6: {"name": "Shadow Monarch", "level_range": (100, 999), "color": "#EF4444"},
-}
 
-RARITIES = {
-    "common": {"name": "Common", "color": "#9CA3AF"},
-    "uncommon": {"name": "Uncommon", "color": "#22C55E"},
-    "rare": {"name": "Rare", "color": "#3B82F6"},
-    "epic": {"name": "Epic", "color": "#A855F7"},
-    "legendary": {"name": "Legendary", "color": "#F59E0B"},
-}
+@st.cache_resource
+def get_theme_markup() -> str:
+    """Build the theme markup once per process"""
+    with open(THEME_CSS_FILE, "rb") as f:
+        css = f.read()
+    if st.get_option("server.enableStaticServing"):
+        # Content hash busts browser caches when the stylesheet changes
+        version = hashlib.md5(css).hexdigest()[:8]
+        return f'<link rel="stylesheet" href="{THEME_CSS_URL}?v={version}">'
+    # Static serving disabled: fall back to inlining the stylesheet
+    return f"<style>\n{css.decode('utf-8')}</style>"
 
-PHILOSOPHY_TRADITIONS = {
-    "stoic": {"name": "Stoicism", "emoji": "🏛️"},
-    "biblical": {"name": "Biblical", "emoji": "✝️"},
-    "eastern": {"name": "Eastern", "emoji": "☯️"},
-    "samurai": {"name": "Samurai", "emoji": "⚔️"},
-    "hermetic": {"name": "Hermetic", "emoji": "🔮"},
-    "quranic": {"name": "Quranic", "emoji": "☪️"},
-}
 
+st.markdown(get_theme_markup(), unsafe_allow_html=True)
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# AI SERVICE
-# ═══════════════════════════════════════════════════════════════════════════════
-
-class AIService:
-    """AI Service using Anthropic Claude API"""
-    
-    def __init__(self):
-        self.api_key = self._get_api_key()
-        self.client = None
-        if self.api_key:
-            self._init_client()
-    
-    def _get_api_key(self) -> Optional[str]:
-        """Get API key from Streamlit secrets or environment"""
-        try:
-            return st.secrets["ANTHROPIC_API_KEY"]
-        except:
-            return os.environ.get("ANTHROPIC_API_KEY", "")
-    
-    def _init_client(self):
-        """Initialize Anthropic client"""
-        try:
-            import anthropic
-            self.client = anthropic.Anthropic(api_key=self.api_key)
-        except ImportError:
-            st.warning("⚠️ Anthropic package not installed. AI features will use fallback logic.")
-        except Exception as e:
-            st.warning(f"⚠️ Could not initialize AI: {e}")
-    
-    def is_available(self) -> bool:
-        return self.client is not None
-    
-    def assess_habit_difficulty(self, habit_description: str, user_stats: Dict = None) -> Dict:
-        """AI-powered difficulty assessment for habits"""
-        if not self.is_available():
-            return self._fallback_difficulty(habit_description)
-        
-        prompt = f"""Analyze this habit and assess its difficulty. Return ONLY valid JSON.
-
-Habit: "{habit_description}"
-
-User's current stats: {json.dumps(user_stats) if user_stats else "New user"}
-
-Return this exact JSON structure:
-{{
-    "difficulty": <1-6 integer>,
-    "difficulty_name": "<Trivial|Easy|Medium|Hard|Expert|Legendary>",
-    "xp_reward": <integer 25-1000>,
-    "category": "<fitness|health|learning|career|finance|creative|mindfulness|productivity|social|personal|spiritual|home|environment|relationships|life_goals|skills>",
-    "target_stat": "<strength|intelligence|vitality|agility|sense|willpower>",
-    "time_estimate": "<X minutes|X hours>",
-    "tip": "<helpful personalized tip for building this habit>",
-    "reasoning": {{
-        "time_factor": <1-5>,
-        "mental_effort": <1-5>,
-        "physical_effort": <1-5>,
-        "skill_required": <1-5>,
-        "consistency_need": <1-5>
-    }}
-}}
-
-Difficulty scale:
-1 = Trivial: <5 min, no prep (drink water, make bed)
-2 = Easy: 5-15 min, minimal effort (quick stretch, gratitude)
-3 = Medium: 15-30 min, focus needed (meditation, reading)
-4 = Hard: 30-60 min, significant effort (workout, study)
-5 = Expert: 1+ hour, high commitment (deep work, training)
-6 = Legendary: Major undertaking (marathon training, mastery)"""
-
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            result_text = response.content[0].text.strip()
-            if result_text.startswith("```"):
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-            return json.loads(result_text)
-        except Exception as e:
-            st.warning(f"AI analysis failed: {e}")
-            return self._fallback_difficulty(habit_description)
-    
-    def _fallback_difficulty(self, habit_description: str) -> Dict:
-        """Fallback difficulty assessment"""
-        desc_lower = habit_description.lower()
-        
-        # Keyword-based assessment
-        if any(kw in desc_lower for kw in ["drink", "water", "make bed", "5 min", "quick"]):
-            difficulty = 2
-        elif any(kw in desc_lower for kw in ["workout", "gym", "hour", "run", "study"]):
-            difficulty = 4
-        elif any(kw in desc_lower for kw in ["marathon", "master", "expert", "intensive"]):
-            difficulty = 5
-        else:
-            difficulty = 3
-        
-        # Category detection
-        category = "personal"
-        if any(w in desc_lower for w in ["workout", "gym", "run", "exercise", "fitness"]):
-            category = "fitness"
-        elif any(w in desc_lower for w in ["read", "learn", "study", "course"]):
-            category = "learning"
-        elif any(w in desc_lower for w in ["meditate", "journal", "gratitude", "mindful"]):
-            category = "mindfulness"
-        elif any(w in desc_lower for w in ["pray", "devotion", "scripture", "spiritual"]):
-            category = "spiritual"
-        elif any(w in desc_lower for w in ["budget", "save", "invest", "money"]):
-            category = "finance"
-        elif any(w in desc_lower for w in ["sleep", "water", "health", "vitamin"]):
-            category = "health"
-        
-        stat_map = {
-            "fitness": "strength", "health": "vitality", "learning": "intelligence",
-            "career": "intelligence", "finance": "sense", "mindfulness": "willpower",
-            "spiritual": "willpower", "productivity": "agility", "personal": "willpower",
-        }
-        
-        diff_info = DIFFICULTIES[difficulty]
-        xp = (diff_info["xp_range"][0] + diff_info["xp_range"][1]) // 2
-        
-        return {
-            "difficulty": difficulty,
-            "difficulty_name": diff_info["name"],
-            "xp_reward": xp,
-            "category": category,
-            "target_stat": stat_map.get(category, "willpower"),
-            "time_estimate": "15-20 minutes",
-            "tip": "Start small and build consistency. You can always increase the challenge later!",
-            "reasoning": {"time_factor": difficulty, "mental_effort": difficulty, 
-                         "physical_effort": 2, "skill_required": difficulty, "consistency_need": 4}
-        }
-    
-    def generate_goal_steps(self, goal_description: str, target_weeks: int = 12) -> Dict:
-        """Generate 7-10 actionable steps for a goal"""
-        if not self.is_available():
-            return self._fallback_goal_steps(goal_description, target_weeks)
-        
-        prompt = f"""Create a detailed action plan for this goal. Return ONLY valid JSON.
-
-Goal: "{goal_description}"
-Target timeline: {target_weeks} weeks
-
-Return this exact JSON structure:
-{{
-    "title": "<cleaned up goal title>",
-    "difficulty": <1-6>,
-    "difficulty_name": "<Trivial|Easy|Medium|Hard|Expert|Legendary>",
-    "total_xp": <integer 1000-10000>,
-    "category": "<category key>",
-    "target_stat": "<stat key>",
-    "estimated_weeks": {target_weeks},
-    "steps": [
-        {{
-            "title": "<step title>",
-            "description": "<detailed description>",
-            "estimated_duration": "<e.g., '1 week', '3-5 days'>",
-            "xp_reward": <integer>,
-            "suggested_habit": "<optional daily/weekly habit to support this step>" or null
-        }}
-    ],
-    "suggested_habits": [
-        {{
-            "title": "<habit title>",
-            "description": "<brief description>",
-            "frequency": "<daily|weekly>",
-            "category": "<category>"
-        }}
-    ]
-}}
-
-Generate 7-10 steps that are specific, actionable, progressive, and achievable within the timeline.
-Also suggest 2-3 supporting habits."""
-
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            result_text = response.content[0].text.strip()
-            if result_text.startswith("```"):
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-            return json.loads(result_text)
-        except Exception as e:
-            st.warning(f"AI goal generation failed: {e}")
-            return self._fallback_goal_steps(goal_description, target_weeks)
-    
-    def _fallback_goal_steps(self, goal_description: str, target_weeks: int) -> Dict:
-        """Fallback goal steps"""
-        return {
-            "title": goal_description[:50],
-            "difficulty": 3,
-            "difficulty_name": "Medium",
-            "total_xp": 2500,
-            "category": "personal",
-            "target_stat": "willpower",
-            "estimated_weeks": target_weeks,
-            "steps": [
-                {"title": "Research and plan", "description": "Gather information and create a detailed plan", "estimated_duration": "1 week", "xp_reward": 200, "suggested_habit": None},
-                {"title": "Set up foundation", "description": "Prepare everything you need to get started", "estimated_duration": "1 week", "xp_reward": 250, "suggested_habit": None},
-                {"title": "Begin practice", "description": "Start with basic exercises and activities", "estimated_duration": "2 weeks", "xp_reward": 300, "suggested_habit": "Daily practice - 15 minutes"},
-                {"title": "Build consistency", "description": "Establish a regular routine", "estimated_duration": "2 weeks", "xp_reward": 350, "suggested_habit": None},
-                {"title": "Increase challenge", "description": "Push beyond comfort zone", "estimated_duration": "2 weeks", "xp_reward": 300, "suggested_habit": None},
-                {"title": "Refine technique", "description": "Focus on quality and improvement", "estimated_duration": "2 weeks", "xp_reward": 350, "suggested_habit": None},
-                {"title": "Final push", "description": "Complete the goal with excellence", "estimated_duration": "2 weeks", "xp_reward": 500, "suggested_habit": None},
-            ],
-            "suggested_habits": [
-                {"title": "Daily Progress Review", "description": "Spend 5 minutes reviewing progress", "frequency": "daily", "category": "productivity"},
-                {"title": "Weekly Planning", "description": "Plan the week ahead", "frequency": "weekly", "category": "productivity"},
-            ]
-        }
-    
-    def analyze_document(self, text: str, max_chars: int = 50000) -> Dict:
-        """Analyze document text and extract habits, goals, and quotes"""
-        if not self.is_available():
-            return self._fallback_document_analysis()
-        
-        if len(text) > max_chars:
-            text = text[:max_chars] + "...[truncated]"
-        
-        prompt = f"""Analyze this document and extract actionable habits, goals, and memorable quotes.
-Return ONLY valid JSON.
-
-Document text:
-\"\"\"
-{text}
-\"\"\"
-
-Return this exact JSON structure:
-{{
-    "title": "<detected document title or 'Imported Document'>",
-    "summary": "<brief 2-3 sentence summary>",
-    "habits": [
-        {{
-            "title": "<habit title>",
-            "description": "<from the text>",
-            "category": "<category key>",
-            "difficulty": <1-6>
-        }}
-    ],
-    "goals": [
-        {{
-            "title": "<goal title>",
-            "description": "<from the text>",
-            "category": "<category key>",
-            "steps": ["<step 1>", "<step 2>", ...]
-        }}
-    ],
-    "quotes": [
-        {{
-            "quote": "<the quote>",
-            "author": "<author if known>" or null,
-            "context": "<brief context>"
-        }}
-    ],
-    "key_concepts": ["<concept 1>", "<concept 2>", ...]
-}}
-
-Extract 5-15 habits, 1-5 goals, 5-10 quotes, and 3-7 key concepts."""
-
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=3000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            result_text = response.content[0].text.strip()
-            if result_text.startswith("```"):
-                result_text = result_text.split("```")[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-            return json.loads(result_text)
-        except Exception as e:
-            st.warning(f"Document analysis failed: {e}")
-            return self._fallback_document_analysis()
-    
-    def _fallback_document_analysis(self) -> Dict:
-        return {
-            "title": "Imported Document",
-            "summary": "Document imported. AI analysis unavailable.",
-            "habits": [], "goals": [], "quotes": [], "key_concepts": []
-        }
-    
-    def chat(self, message: str, user_data: Dict, chat_history: List[Dict] = None) -> str:
-        """AI coach chat"""
-        if not self.is_available():
-            return self._fallback_chat()
-        
-        user_context = f"""
-User Profile:
-- Name: {user_data.get('name', 'Hunter')}
-- Level: {user_data.get('level', 1)}
-- Current Streak: {user_data.get('current_streak', 0)} days
-- Stats: STR {user_data.get('strength', 1)}, INT {user_data.get('intelligence', 1)}, VIT {user_data.get('vitality', 1)}, AGI {user_data.get('agility', 1)}, SEN {user_data.get('sense', 1)}, WIL {user_data.get('willpower', 1)}
-"""
-        
-        system_prompt = f"""You are an AI Life Coach in Goal Quest - a gamified habit tracking app inspired by Solo Leveling anime.
-
-{user_context}
-
-Your personality:
-- Motivating but not cheesy
-- Reference their stats and progress naturally
-- Use their name occasionally
-- Give practical, actionable advice
-- Keep responses concise (2-4 paragraphs max)
-- Encourage them to create habits or goals when appropriate"""
-
-        messages = []
-        if chat_history:
-            for msg in chat_history[-10:]:
-                messages.append({"role": msg.get("role", "user"), "content": msg.get("content", "")})
-        messages.append({"role": "user", "content": message})
-        
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=500,
-                system=system_prompt,
-                messages=messages
-            )
-            return response.content[0].text
-        except Exception as e:
-            return self._fallback_chat()
-    
-    def _fallback_chat(self) -> str:
-        return """I'm currently in offline mode. Here's what you can do:
-• Create a new habit to build your streak
-• Work on your active goals
-• Check your progress in Analytics
-• Browse the Shop for power-ups
-
-When AI is available, I'll give you personalized coaching!"""
-
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# DATABASE
+# CONSTANTS & GAME DATA
 # ═══════════════════════════════════════════════════════════════════════════════
 
-class Database:
-    """SQLite database handler"""
-    
-    def __init__(self, db_path: str = "goal_quest.db"):
-        self.db_path = db_path
-        self.conn = None
-        self._connect()
-        self._create_tables()
-    
-    def _connect(self):
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self.conn.execute("PRAGMA foreign_keys = ON")
-    
-    def _create_tables(self):
-        cursor = self.conn.cursor()
-        
-        # User table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                display_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                level INTEGER DEFAULT 1,
-                current_xp INTEGER DEFAULT 0,
-                total_xp INTEGER DEFAULT 0,
-                gold INTEGER DEFAULT 100,
-                gems INTEGER DEFAULT 10,
-                strength INTEGER DEFAULT 1,
-                intelligence INTEGER DEFAULT 1,
-                vitality INTEGER DEFAULT 1,
-                agility INTEGER DEFAULT 1,
-                sense INTEGER DEFAULT 1,
-                willpower INTEGER DEFAULT 1,
-                current_streak INTEGER DEFAULT 0,
-                best_streak INTEGER DEFAULT 0,
-                last_activity_date DATE,
-                philosophy_traditions TEXT DEFAULT '["stoic"]',
-                onboarding_complete INTEGER DEFAULT 0,
-                dreams_text TEXT
-            )
-        """)
-        
-        # Habits table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS habits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                category TEXT DEFAULT 'personal',
-                difficulty INTEGER DEFAULT 3,
-                xp_reward INTEGER DEFAULT 100,
-                target_stat TEXT DEFAULT 'willpower',
-                frequency TEXT DEFAULT 'daily',
-                streak INTEGER DEFAULT 0,
-                best_streak INTEGER DEFAULT 0,
-                total_completions INTEGER DEFAULT 0,
-                is_priority INTEGER DEFAULT 0,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ai_tip TEXT,
-                FOREIGN KEY (user_id) REFERENCES user(id)
-            )
-        """)
-        
-        # Habit completions
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS habit_completions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                habit_id INTEGER NOT NULL,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completion_date DATE NOT NULL,
-                xp_earned INTEGER DEFAULT 0,
-                streak_bonus INTEGER DEFAULT 0,
-                FOREIGN KEY (habit_id) REFERENCES habits(id),
-                UNIQUE(habit_id, completion_date)
-            )
-        """)
-        
-        # Goals table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS goals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                category TEXT DEFAULT 'personal',
-                difficulty INTEGER DEFAULT 3,
-                xp_reward INTEGER DEFAULT 2000,
-                target_stat TEXT DEFAULT 'intelligence',
-                due_date DATE,
-                estimated_weeks INTEGER,
-                is_completed INTEGER DEFAULT 0,
-                completed_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES user(id)
-            )
-        """)
-        
-        # Goal steps
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS goal_steps (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                goal_id INTEGER NOT NULL,
-                step_number INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                estimated_duration TEXT,
-                xp_reward INTEGER DEFAULT 200,
-                is_completed INTEGER DEFAULT 0,
-                completed_at TIMESTAMP,
-                FOREIGN KEY (goal_id) REFERENCES goals(id)
-            )
-        """)
-        
-        # Shop items
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS shop_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                item_type TEXT,
-                rarity TEXT DEFAULT 'common',
-                gold_cost INTEGER DEFAULT 0,
-                gem_cost INTEGER DEFAULT 0,
-                level_required INTEGER DEFAULT 1,
-                effects TEXT,
-                is_available INTEGER DEFAULT 1
-            )
-        """)
-        
-        # User inventory
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                item_id INTEGER NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES user(id),
-                FOREIGN KEY (item_id) REFERENCES shop_items(id)
-            )
-        """)
-        
-        # Wisdom quotes
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS wisdom_quotes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                quote TEXT NOT NULL,
-                author TEXT,
-                source TEXT,
-                tradition TEXT,
-                is_user_saved INTEGER DEFAULT 0,
-                user_id INTEGER
-            )
-        """)
-        
-        # Notes
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT,
-                is_pinned INTEGER DEFAULT 0,
-                tags TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES user(id)
-            )
-        """)
-        
-        # Achievements
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                key TEXT UNIQUE NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                category TEXT,
-                tier TEXT DEFAULT 'bronze',
-                xp_reward INTEGER DEFAULT 100,
-                requirement_type TEXT,
-                requirement_value INTEGER
-            )
-        """)
-        
-        # User achievements
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                achievement_id INTEGER NOT NULL,
-                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES user(id),
-                FOREIGN KEY (achievement_id) REFERENCES achievements(id),
-                UNIQUE(user_id, achievement_id)
-            )
-        """)
-        
-        self.conn.commit()
-        self._init_default_data()
-    
-    def _init_default_data(self):
-        """Initialize default data"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM shop_items")
-        if cursor.fetchone()[0] == 0:
-            shop_items = [
-                ("XP Boost (Minor)", "Gain 25% more XP for 1 hour", "consumable", "common", 100, 0, 1, '{"xp_multiplier": 1.25, "duration_hours": 1}'),
-                ("XP Boost (Major)", "Gain 50% more XP for 2 hours", "consumable", "uncommon", 250, 0, 5, '{"xp_multiplier": 1.5, "duration_hours": 2}'),
-                ("Streak Shield", "Protect your streak for one missed day", "consumable", "rare", 500, 0, 10, '{"streak_protection": 1}'),
-                ("Motivation Elixir", "Double XP for next habit completion", "consumable", "uncommon", 150, 0, 5, '{"next_habit_multiplier": 2}'),
-                ("XP Boost (Legendary)", "Double XP for 24 hours", "consumable", "legendary", 0, 50, 25, '{"xp_multiplier": 2, "duration_hours": 24}'),
-                ("Strength Elixir", "+5 temporary Strength for 24h", "boost", "rare", 300, 0, 15, '{"stat": "strength", "boost": 5}'),
-                ("Wisdom Scroll", "+5 temporary Intelligence for 24h", "boost", "rare", 300, 0, 15, '{"stat": "intelligence", "boost": 5}'),
-            ]
-            cursor.executemany("""
-                INSERT INTO shop_items (name, description, item_type, rarity, gold_cost, gem_cost, level_required, effects)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, shop_items)
-        
-        cursor.execute("SELECT COUNT(*) FROM wisdom_quotes")
-        if cursor.fetchone()[0] == 0:
-            quotes = [
-                ("The impediment to action advances action. What stands in the way becomes the way.", "Marcus Aurelius", "Meditations", "stoic"),
-                ("We suffer more in imagination than in reality.", "Seneca", "Letters", "stoic"),
-                ("No man is free who is not master of himself.", "Epictetus", "Discourses", "stoic"),
-                ("I can do all things through Christ who strengthens me.", "Philippians 4:13", "Bible", "biblical"),
-                ("Trust in the Lord with all your heart.", "Proverbs 3:5", "Bible", "biblical"),
-                ("The journey of a thousand miles begins with a single step.", "Lao Tzu", "Tao Te Ching", "eastern"),
-                ("The mind is everything. What you think you become.", "Buddha", "Dhammapada", "eastern"),
-                ("Today is victory over yourself of yesterday.", "Miyamoto Musashi", "Book of Five Rings", "samurai"),
-                ("Think lightly of yourself and deeply of the world.", "Miyamoto Musashi", "Book of Five Rings", "samurai"),
-            ]
-            cursor.executemany("""
-                INSERT INTO wisdom_quotes (quote, author, source, tradition)
-                VALUES (?, ?, ?, ?)
-            """, quotes)
-        
-        cursor.execute("SELECT COUNT(*) FROM achievements")
-        if cursor.fetchone()[0] == 0:
-            achievements = [
-                ("first_flame", "First Flame", "Complete your first habit", "streaks", "bronze", 100, "count", 1),
-                ("kindling", "Kindling", "Maintain a 7-day streak", "streaks", "bronze", 200, "streak", 7),
-                ("bonfire", "Bonfire", "Maintain a 14-day streak", "streaks", "silver", 400, "streak", 14),
-                ("inferno", "Inferno", "Maintain a 30-day streak", "streaks", "gold", 800, "streak", 30),
-                ("awakened", "Awakened", "Reach Level 5", "levels", "bronze", 150, "level", 5),
-                ("novice_hunter", "Novice Hunter", "Reach Level 10", "levels", "bronze", 300, "level", 10),
-                ("habit_former", "Habit Former", "Create 5 habits", "habits", "bronze", 100, "count", 5),
-                ("goal_setter", "Goal Setter", "Create your first goal", "goals", "bronze", 100, "count", 1),
-            ]
-            cursor.executemany("""
-                INSERT INTO achievements (key, title, description, category, tier, xp_reward, requirement_type, requirement_value)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, achievements)
-        
-        self.conn.commit()
-    
-    # User methods
-    def get_user(self) -> Optional[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM user LIMIT 1")
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def create_user(self, name: str, **kwargs) -> int:
-        cursor = self.conn.cursor()
-        columns = ["name"] + list(kwargs.keys())
-        placeholders = ["?"] * len(columns)
-        values = [name] + list(kwargs.values())
-        cursor.execute(f"INSERT INTO user ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
-        self.conn.commit()
-        return cursor.lastrowid
-    
-    def update_user(self, user_id: int, **kwargs) -> bool:
-        if not kwargs:
-            return False
-        cursor = self.conn.cursor()
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        values = list(kwargs.values()) + [user_id]
-        cursor.execute(f"UPDATE user SET {set_clause} WHERE id = ?", values)
-        self.conn.commit()
-        return cursor.rowcount > 0
-    
-    def add_xp(self, user_id: int, xp: int) -> Dict:
-        user = self.get_user()
-        if not user:
-            return {"error": "User not found"}
-        
-        new_xp = user["current_xp"] + xp
-        new_total = user["total_xp"] + xp
-        new_level = user["level"]
-        leveled_up = False
-        
-        xp_needed = self.xp_for_level(new_level)
-        while new_xp >= xp_needed:
-            new_xp -= xp_needed
-            new_level += 1
-            leveled_up = True
-            xp_needed = self.xp_for_level(new_level)
-        
-        self.update_user(user_id, current_xp=new_xp, total_xp=new_total, level=new_level)
-        return {"xp_gained": xp, "new_xp": new_xp, "new_level": new_level, "leveled_up": leveled_up, "xp_to_next": xp_needed}
-    
-    @staticmethod
-    def xp_for_level(level: int) -> int:
-        return int(100 * (level ** 1.5))
-    
-    # Habit methods
-    def create_habit(self, user_id: int, title: str, **kwargs) -> int:
-        cursor = self.conn.cursor()
-        columns = ["user_id", "title"] + list(kwargs.keys())
-        placeholders = ["?"] * len(columns)
-        values = [user_id, title] + list(kwargs.values())
-        cursor.execute(f"INSERT INTO habits ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
-        self.conn.commit()
-        return cursor.lastrowid
-    
-    def get_habits(self, user_id: int, active_only: bool = True) -> List[Dict]:
-        cursor = self.conn.cursor()
-        query = "SELECT * FROM habits WHERE user_id = ?"
-        if active_only:
-            query += " AND is_active = 1"
-        query += " ORDER BY is_priority DESC, created_at DESC"
-        cursor.execute(query, (user_id,))
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def get_habit(self, habit_id: int) -> Optional[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM habits WHERE id = ?", (habit_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    def update_habit(self, habit_id: int, **kwargs) -> bool:
-        if not kwargs:
-            return False
-        cursor = self.conn.cursor()
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        values = list(kwargs.values()) + [habit_id]
-        cursor.execute(f"UPDATE habits SET {set_clause} WHERE id = ?", values)
-        self.conn.commit()
-        return cursor.rowcount > 0
-    
-    def delete_habit(self, habit_id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM habit_completions WHERE habit_id = ?", (habit_id,))
-        cursor.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
-        self.conn.commit()
-        return cursor.rowcount > 0
-    
-    def complete_habit(self, habit_id: int, user_id: int) -> Dict:
-        today = date.today().isoformat()
-        cursor = self.conn.cursor()
-        
-        cursor.execute("SELECT id FROM habit_completions WHERE habit_id = ? AND completion_date = ?", (habit_id, today))
-        if cursor.fetchone():
-            return {"error": "Already completed today"}
-        
-        habit = self.get_habit(habit_id)
-        if not habit:
-            return {"error": "Habit not found"}
-        
-        new_streak = habit["streak"] + 1
-        streak_bonus = min(int(habit["xp_reward"] * 0.1 * new_streak), habit["xp_reward"])
-        total_xp = habit["xp_reward"] + streak_bonus
-        
-        cursor.execute("""
-            INSERT INTO habit_completions (habit_id, completion_date, xp_earned, streak_bonus)
-            VALUES (?, ?, ?, ?)
-        """, (habit_id, today, total_xp, streak_bonus))
-        
-        best_streak = max(habit["best_streak"], new_streak)
-        self.update_habit(habit_id, streak=new_streak, best_streak=best_streak, total_completions=habit["total_completions"] + 1)
-        
-        xp_result = self.add_xp(user_id, total_xp)
-        gold_earned = int(habit["xp_reward"] * 0.1)
-        
-        user = self.get_user()
-        self.update_user(user_id, gold=user["gold"] + gold_earned)
-        
-        # Update user streak
-        user_streak = user["current_streak"] + 1
-        user_best = max(user["best_streak"], user_streak)
-        self.update_user(user_id, current_streak=user_streak, best_streak=user_best, last_activity_date=today)
-        
-        # Update target stat
-        stat = habit.get("target_stat", "willpower")
-        current_stat = user.get(stat, 1)
-        self.update_user(user_id, **{stat: current_stat + 1})
-        
-        self.conn.commit()
-        return {"success": True, "xp_earned": total_xp, "streak_bonus": streak_bonus, "gold_earned": gold_earned, "new_streak": new_streak, **xp_result}
-    
-    def is_habit_completed_today(self, habit_id: int) -> bool:
-        today = date.today().isoformat()
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id FROM habit_completions WHERE habit_id = ? AND completion_date = ?", (habit_id, today))
-        return cursor.fetchone() is not None
-    
-    def get_today_completions(self, user_id: int) -> List[int]:
-        today = date.today().isoformat()
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT hc.habit_id FROM habit_completions hc
-            JOIN habits h ON hc.habit_id = h.id
-            WHERE h.user_id = ? AND hc.completion_date = ?
-        """, (user_id, today))
-        return [row[0] for row in cursor.fetchall()]
-    
-    # Goal methods
-    def create_goal(self, user_id: int, title: str, steps: List[Dict] = None, **kwargs) -> int:
-        cursor = self.conn.cursor()
-        columns = ["user_id", "title"] + list(kwargs.keys())
-        placeholders = ["?"] * len(columns)
-        values = [user_id, title] + list(kwargs.values())
-        cursor.execute(f"INSERT INTO goals ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
-        goal_id = cursor.lastrowid
-        
-        if steps:
-            for i, step in enumerate(steps, 1):
-                cursor.execute("""
-                    INSERT INTO goal_steps (goal_id, step_number, title, description, estimated_duration, xp_reward)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (goal_id, i, step.get("title", f"Step {i}"), step.get("description", ""), step.get("estimated_duration", "1 week"), step.get("xp_reward", 200)))
-        
-        self.conn.commit()
-        return goal_id
-    
-    def get_goals(self, user_id: int, include_completed: bool = False) -> List[Dict]:
-        cursor = self.conn.cursor()
-        query = "SELECT * FROM goals WHERE user_id = ?"
-        if not include_completed:
-            query += " AND is_completed = 0"
-        query += " ORDER BY due_date ASC, created_at DESC"
-        cursor.execute(query, (user_id,))
-        goals = [dict(row) for row in cursor.fetchall()]
-        
-        for goal in goals:
-            goal["steps"] = self.get_goal_steps(goal["id"])
-            goal["progress"] = self.get_goal_progress(goal["id"])
-        return goals
-    
-    def get_goal(self, goal_id: int) -> Optional[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM goals WHERE id = ?", (goal_id,))
-        row = cursor.fetchone()
-        if not row:
-            return None
-        goal = dict(row)
-        goal["steps"] = self.get_goal_steps(goal_id)
-        goal["progress"] = self.get_goal_progress(goal_id)
-        return goal
-    
-    def get_goal_steps(self, goal_id: int) -> List[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM goal_steps WHERE goal_id = ? ORDER BY step_number", (goal_id,))
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def get_goal_progress(self, goal_id: int) -> Dict:
-        steps = self.get_goal_steps(goal_id)
-        if not steps:
-            return {"completed": 0, "total": 0, "percentage": 0}
-        completed = sum(1 for s in steps if s["is_completed"])
-        return {"completed": completed, "total": len(steps), "percentage": int((completed / len(steps)) * 100)}
-    
-    def complete_goal_step(self, step_id: int, user_id: int) -> Dict:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM goal_steps WHERE id = ?", (step_id,))
-        step = cursor.fetchone()
-        if not step:
-            return {"error": "Step not found"}
-        step = dict(step)
-        if step["is_completed"]:
-            return {"error": "Step already completed"}
-        
-        cursor.execute("UPDATE goal_steps SET is_completed = 1, completed_at = ? WHERE id = ?", (datetime.now().isoformat(), step_id))
-        xp_result = self.add_xp(user_id, step["xp_reward"])
-        
-        progress = self.get_goal_progress(step["goal_id"])
-        goal_completed = progress["percentage"] == 100
-        
-        if goal_completed:
-            goal = self.get_goal(step["goal_id"])
-            cursor.execute("UPDATE goals SET is_completed = 1, completed_at = ? WHERE id = ?", (datetime.now().isoformat(), step["goal_id"]))
-            goal_xp = self.add_xp(user_id, goal["xp_reward"])
-            xp_result["goal_xp"] = goal["xp_reward"]
-        
-        self.conn.commit()
-        return {"success": True, "step_xp": step["xp_reward"], "goal_completed": goal_completed, **xp_result}
-    
-    def delete_goal(self, goal_id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM goal_steps WHERE goal_id = ?", (goal_id,))
-        cursor.execute("DELETE FROM goals WHERE id = ?", (goal_id,))
-        self.conn.commit()
-        return cursor.rowcount > 0
-    
-    # Shop methods
-    def get_shop_items(self, user_level: int = 1) -> List[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM shop_items WHERE is_available = 1 ORDER BY level_required, gold_cost")
-        items = []
-        for row in cursor.fetchall():
-            item = dict(row)
-            item["meets_level"] = item["level_required"] <= user_level
-            items.append(item)
-        return items
-    
-    def purchase_item(self, user_id: int, item_id: int) -> Dict:
-        user = self.get_user()
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM shop_items WHERE id = ?", (item_id,))
-        item = cursor.fetchone()
-        if not item:
-            return {"error": "Item not found"}
-        item = dict(item)
-        
-        if user["level"] < item["level_required"]:
-            return {"error": f"Requires level {item['level_required']}"}
-        if item["gold_cost"] > 0 and user["gold"] < item["gold_cost"]:
-            return {"error": "Not enough gold"}
-        if item["gem_cost"] > 0 and user["gems"] < item["gem_cost"]:
-            return {"error": "Not enough gems"}
-        
-        new_gold = user["gold"] - item["gold_cost"]
-        new_gems = user["gems"] - item["gem_cost"]
-        self.update_user(user_id, gold=new_gold, gems=new_gems)
-        
-        cursor.execute("SELECT id, quantity FROM user_inventory WHERE user_id = ? AND item_id = ?", (user_id, item_id))
-        existing = cursor.fetchone()
-        if existing:
-            cursor.execute("UPDATE user_inventory SET quantity = quantity + 1 WHERE id = ?", (existing[0],))
-        else:
-            cursor.execute("INSERT INTO user_inventory (user_id, item_id, quantity) VALUES (?, ?, 1)", (user_id, item_id))
-        
-        self.conn.commit()
-        return {"success": True, "item": item, "new_gold": new_gold, "new_gems": new_gems}
-    
-    def get_inventory(self, user_id: int) -> List[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT ui.*, si.name, si.description, si.item_type, si.rarity, si.effects
-            FROM user_inventory ui
-            JOIN shop_items si ON ui.item_id = si.id
-            WHERE ui.user_id = ?
-        """, (user_id,))
-        return [dict(row) for row in cursor.fetchall()]
-    
-    # Quote methods
-    def get_random_quote(self, traditions: List[str] = None) -> Optional[Dict]:
-        cursor = self.conn.cursor()
-        if traditions:
-            placeholders = ", ".join(["?"] * len(traditions))
-            cursor.execute(f"SELECT * FROM wisdom_quotes WHERE tradition IN ({placeholders}) ORDER BY RANDOM() LIMIT 1", traditions)
-        else:
-            cursor.execute("SELECT * FROM wisdom_quotes ORDER BY RANDOM() LIMIT 1")
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    
-    # Notes methods
-    def create_note(self, user_id: int, title: str, content: str = "", **kwargs) -> int:
-        cursor = self.conn.cursor()
-        columns = ["user_id", "title", "content"] + list(kwargs.keys())
-        placeholders = ["?"] * len(columns)
-        values = [user_id, title, content] + list(kwargs.values())
-        cursor.execute(f"INSERT INTO notes ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
-        self.conn.commit()
-        return cursor.lastrowid
-    
-    def get_notes(self, user_id: int) -> List[Dict]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM notes WHERE user_id = ? ORDER BY is_pinned DESC, updated_at DESC", (user_id,))
-        return [dict(row) for row in cursor.fetchall()]
-    
-    def update_note(self, note_id: int, **kwargs) -> bool:
-        kwargs["updated_at"] = datetime.now().isoformat()
-        cursor = self.conn.cursor()
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
-        cursor.execute(f"UPDATE notes SET {set_clause} WHERE id = ?", list(kwargs.values()) + [note_id])
-        self.conn.commit()
-        return cursor.rowcount > 0
-    
-    def delete_note(self, note_id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
-        self.conn.commit()
-        return cursor.rowcount > 0
-    
-    # Analytics
-    def get_habit_stats(self, user_id: int, days: int = 30) -> Dict:
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT hc.completion_date, COUNT(*) as count, SUM(hc.xp_earned) as xp
-            FROM habit_completions hc
-            JOIN habits h ON hc.habit_id = h.id
-            WHERE h.user_id = ? AND hc.completion_date >= date('now', ?)
-            GROUP BY hc.completion_date
-            ORDER BY hc.completion_date
-        """, (user_id, f"-{days} days"))
-        daily = [dict(row) for row in cursor.fetchall()]
-        
-        cursor.execute("""
-            SELECT h.category, COUNT(*) as count
-            FROM habit_completions hc
-            JOIN habits h ON hc.habit_id = h.id
-            WHERE h.user_id = ? AND hc.completion_date >= date('now', ?)
-            GROUP BY h.category
-        """, (user_id, f"-{days} days"))
-        by_category = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        return {"daily": daily, "by_category": by_category}
+PAGES = {
+    "dashboard": "🏠 Dashboard",
+    "habits": "⚡ Habits",
+    "goals": "🎯 Goals",
+    "shop": "🛒 Shop",
+    "analytics": "📊 Analytics",
+    "notes": "📝 Notes",
+    "coach": "🤖 AI Coach",
+    "settings": "⚙️ Settings",
+}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1205,21 +106,66 @@ def get_greeting(name: str = "") -> str:
 
 
 def get_tier_for_level(level: int) -> Dict:
+    tier_num = _tier_number_for_level(level)
+    return {"tier": tier_num, **TIERS[tier_num]}
+
+
+# Render fragments below are pure functions of small inputs, so they are built
+# once per process and reused across reruns and sessions.
+
+@functools.lru_cache(maxsize=None)
+def _tier_number_for_level(level: int) -> int:
     for tier_num, tier_data in TIERS.items():
         min_lvl, max_lvl = tier_data["level_range"]
         if min_lvl <= level <= max_lvl:
-            return {"tier": tier_num, **tier_data}
-    return {"tier": 6, **TIERS[6]}
+            return tier_num
+    return 6
+
+
+@functools.lru_cache(maxsize=None)
+def render_tier_label(tier_num: int) -> str:
+    tier = TIERS.get(tier_num, TIERS[6])
+    return f"<span style='color: {tier['color']};'>{tier['name']}</span>"
 
 
+@functools.lru_cache(maxsize=None)
+def render_tier_progress_row(tier_num: int, is_current: bool, is_achieved: bool) -> str:
+    tier = TIERS[tier_num]
+    min_lvl, max_lvl = tier["level_range"]
+    status = "✅" if is_achieved else "🔒"
+    style = f"color: {tier['color']}; font-weight: bold;" if is_current else ""
+    return f"{status} <span style='{style}'>{tier['name']}</span> (Level {min_lvl}-{max_lvl})"
+
+
+@functools.lru_cache(maxsize=None)
 def render_difficulty_badge(difficulty: int) -> str:
     diff = DIFFICULTIES.get(difficulty, DIFFICULTIES[3])
-    stars = "⭐" * diff["stars"]
-    return f'<span class="diff-{diff["name"].lower()}" style="padding: 4px 8px; border-radius: 4px; font-size: 12px;">{stars} {diff["name"]}</span>'
+    return f'<span class="diff-{diff["name"].lower()}" style="padding: 4px 8px; border-radius: 4px; font-size: 12px;">{difficulty_label(difficulty)}</span>'
 
 
-def render_xp_bar(current: int, needed: int) -> str:
-    percentage = min((current / needed) * 100, 100) if needed > 0 else 0
+@functools.lru_cache(maxsize=None)
+def difficulty_label(difficulty: int) -> str:
+    diff = DIFFICULTIES.get(difficulty, DIFFICULTIES[3])
+    return f"{'⭐' * diff['stars']} {diff['name']}"
+
+
+@functools.lru_cache(maxsize=None)
+def category_info(category: str) -> Dict:
+    return CATEGORIES.get(category, CATEGORIES["personal"])
+
+
+@functools.lru_cache(maxsize=1024)
+def habit_caption(difficulty: int, xp_reward: int, category: Optional[str] = None, frequency: Optional[str] = None) -> str:
+    caption = f"{difficulty_label(difficulty)} • +{xp_reward} XP"
+    if category is not None:
+        caption += f" • {category_info(category)['name']}"
+    if frequency is not None and frequency != "daily":
+        caption += f" • 📅 {schedule.describe(frequency)}"
+    return caption
+
+
+@functools.lru_cache(maxsize=None)
+def _xp_bar_html(percentage: int) -> str:
     return f'''
     <div class="xp-bar">
         <div class="xp-fill" style="width: {percentage}%;"></div>
@@ -1227,29 +173,144 @@ def render_xp_bar(current: int, needed: int) -> str:
     '''
 
 
+@functools.lru_cache(maxsize=256)
+def _heatmap_html(days: Tuple[int, ...]) -> str:
+    cells = "".join('<span class="done"></span>' if done else "<span></span>" for done in days)
+    return f'<div class="heatmap">{cells}</div>'
+
+
+def render_heatmap(grid: List[List[int]]) -> str:
+    # Column-major (week by week) to match the grid's auto-flow
+    return _heatmap_html(tuple(grid[weekday][week] for week in range(len(grid[0])) for weekday in range(7)))
+
+
+def render_xp_bar(current: int, needed: int) -> str:
+    # Whole-percent buckets keep the fragment cache at 101 entries
+    percentage = min((current / needed) * 100, 100) if needed > 0 else 0
+    return _xp_bar_html(int(percentage))
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # INITIALIZE SESSION STATE
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# GOAL_QUEST_DB lets deployments and benchmark harnesses point at another file,
+# or at "memory://" for a throwaway in-memory store
+DB_PATH = os.environ.get("GOAL_QUEST_DB", "goal_quest.db")
+TELEMETRY_PATH = ":memory:" if DB_PATH == MEMORY_LOCATION else DB_PATH
+
+# Opt-in developer profiling: GOAL_QUEST_PROFILE=1 traces every query
+PROFILE_ENABLED = os.environ.get("GOAL_QUEST_PROFILE", "") not in ("", "0")
+PROFILE_LOG = os.environ.get("GOAL_QUEST_PROFILE_LOG", "query_profile.log")
+
+# Writes from all sessions are group-committed by one writer thread (GOAL_QUEST_GROUP_COMMIT=0 to disable).
+# The profiler traces the main connection, so profiled runs write there directly.
+GROUP_COMMIT = os.environ.get("GOAL_QUEST_GROUP_COMMIT", "1") not in ("", "0") and not PROFILE_ENABLED
+
+@st.cache_resource
+def get_database() -> StorageBackend:
+    if DB_PATH == MEMORY_LOCATION:
+        return open_storage(DB_PATH)
+    return open_storage(DB_PATH, group_commit=GROUP_COMMIT)
+
+# Idle-time ANALYZE, incremental vacuum, WAL checkpoints and integrity checks (GOAL_QUEST_MAINTENANCE=0 to disable)
+MAINTENANCE_ENABLED = os.environ.get("GOAL_QUEST_MAINTENANCE", "1") not in ("", "0")
+# Completions older than this many days move to yearly archive files (0 keeps everything hot)
+ARCHIVE_AFTER_DAYS = int(os.environ.get("GOAL_QUEST_ARCHIVE_DAYS", "365"))
+# Daily snapshots under backups/ next to the database; this many are kept
+BACKUP_KEEP = int(os.environ.get("GOAL_QUEST_BACKUP_KEEP", "7"))
+
+@st.cache_resource
+def get_snapshots() -> Optional[SnapshotManager]:
+    if not isinstance(get_database(), Database):
+        return None  # nothing on disk to back up
+    return SnapshotManager(DB_PATH, keep=BACKUP_KEEP)
+
+@st.cache_resource
+def get_maintenance() -> Optional[MaintenanceScheduler]:
+    db = get_database()
+    if not isinstance(db, Database):
+        return None
+    archiver = CompletionArchiver(DB_PATH, ARCHIVE_AFTER_DAYS) if ARCHIVE_AFTER_DAYS > 0 else None
+    scheduler = MaintenanceScheduler(DB_PATH, last_activity=lambda: db.last_write, archiver=archiver,
+                                     snapshots=get_snapshots() if BACKUP_KEEP > 0 else None)
+    return scheduler.start() if MAINTENANCE_ENABLED else scheduler
+
+# Habit reminders at GOAL_QUEST_REMIND_AT on scheduled days, goal reminders the day before and on the
+# due date (GOAL_QUEST_REMINDERS=0 to disable). Besides the in-app toasts they can be appended to a
+# JSON-lines file (GOAL_QUEST_REMINDER_LOG) and POSTed to a webhook (GOAL_QUEST_REMINDER_WEBHOOK).
+REMINDERS_ENABLED = os.environ.get("GOAL_QUEST_REMINDERS", "1") not in ("", "0")
+REMIND_AT = dtime.fromisoformat(os.environ.get("GOAL_QUEST_REMIND_AT", "20:00"))
+REMINDER_LOG = os.environ.get("GOAL_QUEST_REMINDER_LOG", "")
+REMINDER_WEBHOOK = os.environ.get("GOAL_QUEST_REMINDER_WEBHOOK", "")
+
+@st.cache_resource
+def get_reminders() -> Optional[ReminderEngine]:
+    if not REMINDERS_ENABLED:
+        return None
+    sinks = [ToastSink()]
+    if REMINDER_LOG:
+        sinks.append(FileSink(REMINDER_LOG))
+    if REMINDER_WEBHOOK:
+        sinks.append(WebhookSink(REMINDER_WEBHOOK))
+    return ReminderEngine(get_database(), sinks, habit_time=REMIND_AT).start()
+
+def show_reminders(user_id: int):
+    engine = get_reminders()
+    if engine is None:
+        return
+    for reminder in engine.sinks[0].drain(user_id):
+        st.toast(reminder["message"], icon="⏰")
+
+# JSON API for non-Streamlit clients on this port, sharing this process's store and caches
+# (unset to disable); GOAL_QUEST_API_TOKEN requires a bearer token. See api.py for the endpoints.
+API_PORT = int(os.environ.get("GOAL_QUEST_API_PORT") or 0)
+API_TOKEN = os.environ.get("GOAL_QUEST_API_TOKEN", "")
+
+@st.cache_resource
+def get_api_server():
+    if not API_PORT:
+        return None
+    return api.serve(get_database(), os.environ.get("GOAL_QUEST_API_HOST", "127.0.0.1"), API_PORT, API_TOKEN)
+
 @st.cache_resource
-def get_database():
-    return Database()
+def get_query_profiler() -> Optional[QueryProfiler]:
+    db = get_database()
+    if not PROFILE_ENABLED or not isinstance(db, Database):
+        return None  # only SQLite has statements to trace
+    return QueryProfiler(PROFILE_LOG).attach(db)
+
+def get_api_key() -> str:
+    """Get API key from Streamlit secrets or environment"""
+    try:
+        return st.secrets["ANTHROPIC_API_KEY"]
+    except Exception:
+        return os.environ.get("ANTHROPIC_API_KEY", "")
 
 @st.cache_resource
 def get_ai_service():
-    return AIService()
+    classifier = DifficultyClassifier.from_rows(get_database().get_assessed_habits())
+    return AIService(api_key=get_api_key(), telemetry=AITelemetry(TELEMETRY_PATH), notify=st.warning,
+                     classifier=classifier)
 
 def init_session_state():
+    db = get_database()
+    version = (id(db), getattr(db, "generation", 0))
+    if st.session_state.get("db_version", version) != version:
+        # Another session restored or reset the data: drop everything read from the old contents
+        st.session_state.clear()
+    st.session_state.db_version = version
     if "db" not in st.session_state:
-        st.session_state.db = get_database()
+        st.session_state.db = db
+        get_maintenance()
+        get_reminders()
+        get_api_server()
     if "ai" not in st.session_state:
         st.session_state.ai = get_ai_service()
     if "user" not in st.session_state:
         st.session_state.user = st.session_state.db.get_user()
     if "page" not in st.session_state:
         st.session_state.page = "dashboard"
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
 
 init_session_state()
 
@@ -1332,7 +393,7 @@ def render_sidebar():
         
         # User info
         st.markdown(f"**{user['display_name'] or user['name']}**")
-        st.markdown(f"<span style='color: {tier['color']};'>{tier['name']}</span>", unsafe_allow_html=True)
+        st.markdown(render_tier_label(tier["tier"]), unsafe_allow_html=True)
         
         # Level and XP
         xp_needed = Database.xp_for_level(user["level"])
@@ -1349,18 +410,7 @@ def render_sidebar():
         st.markdown("---")
         
         # Navigation
-        pages = {
-            "dashboard": "🏠 Dashboard",
-            "habits": "⚡ Habits",
-            "goals": "🎯 Goals",
-            "shop": "🛒 Shop",
-            "analytics": "📊 Analytics",
-            "notes": "📝 Notes",
-            "coach": "🤖 AI Coach",
-            "settings": "⚙️ Settings",
-        }
-        
-        for key, label in pages.items():
+        for key, label in PAGES.items():
             if st.button(label, key=f"nav_{key}", use_container_width=True, type="secondary" if st.session_state.page != key else "primary"):
                 st.session_state.page = key
                 st.rerun()
@@ -1391,14 +441,16 @@ def render_dashboard():
     col1, col2, col3, col4 = st.columns(4)
     
     tier = get_tier_for_level(user["level"])
+    habits = db.get_habits(user["id"])
+    due = db.get_due_habit_ids(user["id"])
+    due_habits = [h for h in habits if h["id"] in due]
+    completions = [hid for hid in db.get_today_completions(user["id"]) if hid in due]
     with col1:
         st.metric("Level", user["level"], delta=f"{tier['name']}")
     with col2:
         st.metric("🔥 Streak", f"{user['current_streak']} days", delta=f"Best: {user['best_streak']}")
     with col3:
-        habits = db.get_habits(user["id"])
-        completions = db.get_today_completions(user["id"])
-        st.metric("Today's Habits", f"{len(completions)}/{len(habits)}")
+        st.metric("Today's Habits", f"{len(completions)}/{len(due_habits)}")
     with col4:
         goals = db.get_goals(user["id"])
         st.metric("Active Goals", len(goals))
@@ -1411,24 +463,22 @@ def render_dashboard():
         # Today's habits
         st.markdown("### ⚡ Today's Quests")
         
-        habits = db.get_habits(user["id"])
-        completions = db.get_today_completions(user["id"])
-        
         if not habits:
             st.info("No habits yet! Create your first habit to start your journey.")
             if st.button("➕ Create First Habit", key="dash_create_habit"):
                 st.session_state.page = "habits"
                 st.rerun()
+        elif not due_habits:
+            st.info(f"😌 Rest day: none of your {len(habits)} habits are scheduled today.")
         else:
             # Progress bar
-            progress = len(completions) / len(habits) if habits else 0
+            progress = len(completions) / len(due_habits)
             st.progress(progress)
-            st.caption(f"{len(completions)}/{len(habits)} completed")
+            st.caption(f"{len(completions)}/{len(due_habits)} completed")
             
-            for habit in habits:
+            for habit in due_habits:
                 is_done = habit["id"] in completions
-                cat = CATEGORIES.get(habit["category"], CATEGORIES["personal"])
-                diff = DIFFICULTIES.get(habit["difficulty"], DIFFICULTIES[3])
+                cat = category_info(habit["category"])
                 
                 with st.container():
                     cols = st.columns([0.5, 3, 1, 1])
@@ -1439,7 +489,7 @@ def render_dashboard():
                     with cols[1]:
                         title_style = "text-decoration: line-through; color: #666;" if is_done else ""
                         st.markdown(f"<span style='{title_style}'><b>{habit['title']}</b></span>", unsafe_allow_html=True)
-                        st.caption(f"{'⭐' * diff['stars']} {diff['name']} • +{habit['xp_reward']} XP")
+                        st.caption(habit_caption(habit["difficulty"], habit["xp_reward"]))
                     
                     with cols[2]:
                         if habit["streak"] > 0:
@@ -1491,6 +541,46 @@ def render_dashboard():
 # HABITS PAGE
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def create_assessed_habits(habits: List[Dict]) -> int:
+    """Create several habits with one batched AI assessment instead of one call each"""
+    user = st.session_state.user
+    db = st.session_state.db
+    ai = st.session_state.ai
+    habits = [h for h in habits if (h.get("title") or "").strip()]
+    descriptions = [" - ".join(filter(None, [h["title"].strip(), h.get("description")])) for h in habits]
+    assessments = ai.assess_habits_batch(descriptions, {
+        "level": user["level"],
+        "strength": user["strength"],
+        "willpower": user["willpower"],
+    })
+    for habit, description, analysis in zip(habits, descriptions, assessments):
+        db.create_habit(
+            user_id=user["id"],
+            title=habit["title"].strip(),
+            description=habit.get("description", ""),
+            category=analysis["category"],
+            difficulty=analysis["difficulty"],
+            xp_reward=analysis["xp_reward"],
+            target_stat=analysis["target_stat"],
+            frequency=habit.get("frequency", "daily"),
+            ai_tip=analysis.get("tip", ""),
+            assessed_by=analysis.get("source"),
+        )
+        ai.learn_assessment(description, analysis)
+    return len(habits)
+
+def schedule_picker() -> str:
+    """Schedule inputs for a new habit, as a habits.frequency value"""
+    kind = st.radio("Schedule", ["Daily", "Specific days", "Every few days", "Times per week"], horizontal=True)
+    if kind == "Specific days":
+        days = st.multiselect("On", list(range(7)), default=[0, 2, 4], format_func=lambda d: schedule.WEEKDAY_NAMES[d])
+        return schedule.on_days(days)
+    if kind == "Every few days":
+        return schedule.every(st.number_input("Every N days", min_value=2, max_value=30, value=2))
+    if kind == "Times per week":
+        return schedule.per_week(st.number_input("Times per week", min_value=1, max_value=6, value=3))
+    return "daily"
+
 def render_habits():
     user = st.session_state.user
     db = st.session_state.db
@@ -1501,6 +591,7 @@ def render_habits():
     # Add habit form
     with st.expander("➕ Create New Habit", expanded=False):
         habit_title = st.text_area("What habit do you want to build?", placeholder="e.g., Meditate for 10 minutes every morning")
+        frequency = schedule_picker()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -1519,16 +610,17 @@ def render_habits():
         # Show analysis if available
         if "habit_analysis" in st.session_state:
             analysis = st.session_state.habit_analysis
-            diff = DIFFICULTIES.get(analysis.get("difficulty", 3))
-            cat = CATEGORIES.get(analysis.get("category", "personal"))
+            cat = category_info(analysis.get("category", "personal"))
             
             st.markdown("---")
             st.markdown("#### AI Analysis")
+            if analysis.get("source") == "local":
+                st.caption(f"⚡ Answered instantly from your past assessments ({analysis['confidence']:.0%} confident)")
             
             cols = st.columns(4)
             with cols[0]:
                 st.markdown(f"**Difficulty**")
-                st.markdown(f"{'⭐' * diff['stars']} {diff['name']}")
+                st.markdown(difficulty_label(analysis.get("difficulty", 3)))
             with cols[1]:
                 st.markdown(f"**Category**")
                 st.markdown(f"{cat['emoji']} {cat['name']}")
@@ -1551,8 +643,11 @@ def render_habits():
                         difficulty=analysis.get("difficulty", 3),
                         xp_reward=analysis.get("xp_reward", 100),
                         target_stat=analysis.get("target_stat", "willpower"),
+                        frequency=frequency,
                         ai_tip=analysis.get("tip", ""),
+                        assessed_by=analysis.get("source"),
                     )
+                    ai.learn_assessment(habit_title.strip(), analysis)
                     del st.session_state.habit_analysis
                     st.success("✅ Habit created!")
                     st.rerun()
@@ -1562,21 +657,21 @@ def render_habits():
     # Habit list
     habits = db.get_habits(user["id"])
     completions = db.get_today_completions(user["id"])
+    due = db.get_due_habit_ids(user["id"])
     
     if not habits:
         st.info("No habits yet. Create your first habit above!")
     else:
         # Filter tabs
-        tab1, tab2 = st.tabs(["📋 Active", "✅ Completed Today"])
+        tab1, tab2, tab3 = st.tabs(["📋 Due Today", "✅ Completed Today", "💤 Not Due Today"])
         
         with tab1:
-            active_habits = [h for h in habits if h["id"] not in completions]
+            active_habits = [h for h in habits if h["id"] in due and h["id"] not in completions]
             if not active_habits:
                 st.success("🎉 All habits completed for today!")
             else:
                 for habit in active_habits:
-                    cat = CATEGORIES.get(habit["category"], CATEGORIES["personal"])
-                    diff = DIFFICULTIES.get(habit["difficulty"], DIFFICULTIES[3])
+                    cat = category_info(habit["category"])
                     
                     with st.container():
                         cols = st.columns([0.5, 3, 1, 1, 0.5])
@@ -1586,7 +681,7 @@ def render_habits():
                         
                         with cols[1]:
                             st.markdown(f"**{habit['title']}**")
-                            st.caption(f"{'⭐' * diff['stars']} {diff['name']} • +{habit['xp_reward']} XP • {cat['name']}")
+                            st.caption(habit_caption(habit["difficulty"], habit["xp_reward"], habit["category"], habit["frequency"]))
                             if habit.get("ai_tip"):
                                 st.caption(f"💡 {habit['ai_tip'][:50]}...")
                         
@@ -1615,8 +710,17 @@ def render_habits():
                 st.info("No habits completed yet today.")
             else:
                 for habit in completed_habits:
-                    cat = CATEGORIES.get(habit["category"], CATEGORIES["personal"])
+                    cat = category_info(habit["category"])
                     st.markdown(f"✅ ~~{habit['title']}~~ {cat['emoji']} +{habit['xp_reward']} XP")
+        
+        with tab3:
+            resting_habits = [h for h in habits if h["id"] not in due and h["id"] not in completions]
+            if not resting_habits:
+                st.info("Every habit is scheduled today.")
+            else:
+                for habit in resting_habits:
+                    cat = category_info(habit["category"])
+                    st.markdown(f"{cat['emoji']} **{habit['title']}** · {schedule.describe(habit['frequency'])}")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1637,29 +741,35 @@ def render_goals():
         
         if st.button("🤖 Generate Quest with AI", use_container_width=True):
             if goal_title.strip():
-                with st.spinner("Crafting your quest..."):
-                    result = ai.generate_goal_steps(goal_title, target_weeks)
-                    st.session_state.goal_generation = result
+                # Show each step as soon as it streams in; the full plan renders below once complete
+                preview = st.empty()
+                steps_box = preview.container()
+                steps_box.markdown("#### ⏳ Crafting your quest...")
+                for kind, payload in ai.generate_goal_steps_stream(goal_title, target_weeks):
+                    if kind == "step":
+                        steps_box.markdown(f"**•** {payload.get('title')} • {payload.get('estimated_duration', '1 week')} • +{payload.get('xp_reward', 200)} XP")
+                    else:
+                        st.session_state.goal_generation = payload
+                preview.empty()
             else:
                 st.warning("Please enter a goal description first!")
         
         # Show generated quest
         if "goal_generation" in st.session_state:
             gen = st.session_state.goal_generation
-            diff = DIFFICULTIES.get(gen.get("difficulty", 3))
             
             st.markdown("---")
             st.markdown(f"### 🎯 {gen.get('title', goal_title)}")
             
             cols = st.columns(4)
             with cols[0]:
-                st.markdown(f"**{'⭐' * diff['stars']} {diff['name']}**")
+                st.markdown(f"**{difficulty_label(gen.get('difficulty', 3))}**")
             with cols[1]:
                 st.markdown(f"**{gen.get('estimated_weeks', target_weeks)} weeks**")
             with cols[2]:
                 st.markdown(f"**+{gen.get('total_xp', 2500)} XP**")
             with cols[3]:
-                cat = CATEGORIES.get(gen.get("category", "personal"))
+                cat = category_info(gen.get("category", "personal"))
                 st.markdown(f"**{cat['emoji']} {cat['name']}**")
             
             st.markdown("#### Quest Steps")
@@ -1687,14 +797,7 @@ def render_goals():
                 )
                 
                 # Create suggested habits
-                for habit in gen.get("suggested_habits", []):
-                    db.create_habit(
-                        user_id=user["id"],
-                        title=habit.get("title"),
-                        description=habit.get("description", ""),
-                        category=habit.get("category", "personal"),
-                        frequency=habit.get("frequency", "daily"),
-                    )
+                create_assessed_habits(gen.get("suggested_habits", []))
                 
                 del st.session_state.goal_generation
                 st.success("🎯 Quest started!")
@@ -1712,7 +815,7 @@ def render_goals():
             st.info("No active goals. Create a new goal above!")
         else:
             for goal in goals:
-                cat = CATEGORIES.get(goal["category"], CATEGORIES["personal"])
+                cat = category_info(goal["category"])
                 progress = goal.get("progress", {"completed": 0, "total": 0, "percentage": 0})
                 
                 with st.container():
@@ -1776,7 +879,7 @@ def render_goals():
             st.info("No completed goals yet.")
         else:
             for goal in completed_goals:
-                cat = CATEGORIES.get(goal["category"], CATEGORIES["personal"])
+                cat = category_info(goal["category"])
                 st.markdown(f"✅ **{goal['title']}** {cat['emoji']} +{goal['xp_reward']} XP")
 
 
@@ -1907,28 +1010,77 @@ def render_analytics():
     
     if stats["by_category"]:
         for cat_key, count in stats["by_category"].items():
-            cat = CATEGORIES.get(cat_key, CATEGORIES["personal"])
+            cat = category_info(cat_key)
             st.markdown(f"{cat['emoji']} **{cat['name']}**: {count} completions")
     else:
         st.info("Complete some habits to see your stats!")
     
     st.markdown("---")
     
+    # Per-habit history straight from each habit's day bitmap, no completion queries
+    st.markdown("### 🗓️ Habit History")
+    
+    if habits:
+        today = date.today()
+        bitmaps = {h["id"]: history.of(h) for h in habits}
+        st.dataframe([{
+            "Habit": h["title"],
+            "Streak": history.streaks(h, today)[0],
+            "Last 30 days": f"{history.rate(bitmaps[h['id']], today, 30):.0%}",
+            "Last year": f"{history.rate(bitmaps[h['id']], today, 365):.0%}",
+        } for h in habits], hide_index=True, use_container_width=True)
+        titles = {h["id"]: h["title"] for h in habits}
+        selected = st.selectbox("Calendar", list(titles), format_func=titles.get, key="history_habit")
+        st.markdown(render_heatmap(history.heatmap(bitmaps[selected], today)), unsafe_allow_html=True)
+        st.caption(f"{history.count(bitmaps[selected], today, 365)} of the last 365 days")
+    else:
+        st.info("Create a habit to start its history.")
+    
+    st.markdown("---")
+    
+    # Rankings across everyone sharing this database, from incrementally maintained indexes
+    st.markdown("### 🏅 Leaderboard")
+    
+    metric = st.selectbox("Rank by", leaderboard.METRICS, format_func=leaderboard.LABELS.get, key="leaderboard_metric")
+    rank = db.get_rank(metric, user["id"])
+    ranked = db.get_leaderboard_size(metric)
+    st.caption(f"You are #{rank} of {ranked}" if rank else f"Not ranked yet ({ranked} ranked)")
+    top = db.get_leaderboard(metric, 10)
+    if top:
+        st.dataframe([{"Rank": e["rank"], "Hunter": e["name"], leaderboard.LABELS[metric]: e["score"]} for e in top],
+                     hide_index=True, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # Completion history export (reads archived years only when the range reaches them)
+    st.markdown("### 📥 Export History")
+    ranges = {30: "Last 30 days", 365: "Last year", 0: "All time"}
+    days = st.selectbox("Range", list(ranges), format_func=ranges.get, key="export_range")
+    if st.button("Prepare CSV"):
+        start = (date.today() - timedelta(days=days)).isoformat() if days else None
+        rows = db.export_completions(user["id"], start=start)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["completion_date", "completed_at", "title", "category", "xp_earned", "streak_bonus"])
+        writer.writeheader()
+        writer.writerows(rows)
+        st.session_state.export_csv = (ranges[days], len(rows), buffer.getvalue())
+    if "export_csv" in st.session_state:
+        label, count, data = st.session_state.export_csv
+        st.download_button(f"⬇️ Download {count} completions ({label.lower()})", data,
+                           file_name="goal_quest_completions.csv", mime="text/csv")
+    
+    st.markdown("---")
+    
     # Tier progress
     st.markdown("### 🏆 Tier Progress")
     
     tier = get_tier_for_level(user["level"])
-    st.markdown(f"**Current Tier**: <span style='color: {tier['color']};'>{tier['name']}</span>", unsafe_allow_html=True)
+    st.markdown(f"**Current Tier**: {render_tier_label(tier['tier'])}", unsafe_allow_html=True)
     
     for tier_num, tier_data in TIERS.items():
-        min_lvl, max_lvl = tier_data["level_range"]
         is_current = tier_num == tier["tier"]
-        is_achieved = user["level"] >= min_lvl
-        
-        status = "✅" if is_achieved else "🔒"
-        style = f"color: {tier_data['color']}; font-weight: bold;" if is_current else ""
-        
-        st.markdown(f"{status} <span style='{style}'>{tier_data['name']}</span> (Level {min_lvl}-{max_lvl})", unsafe_allow_html=True)
+        is_achieved = user["level"] >= tier_data["level_range"][0]
+        st.markdown(render_tier_progress_row(tier_num, is_current, is_achieved), unsafe_allow_html=True)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1983,10 +1135,38 @@ def render_notes():
 # AI COACH PAGE
 # ═══════════════════════════════════════════════════════════════════════════════
 
+CHAT_PAGE_SIZE = 20
+
+def load_coach_thread():
+    """Attach the session to the user's latest coach thread, keeping only a small tail in memory"""
+    db = st.session_state.db
+    user = st.session_state.user
+    thread = db.get_latest_chat_thread(user["id"])
+    thread_id = thread["id"] if thread else db.create_chat_thread(user["id"])
+    st.session_state.coach_thread = thread_id
+    st.session_state.coach_oldest_id = None
+    st.session_state.coach_memory = ConversationMemory.from_history(
+        db.get_chat_messages(thread_id, limit=CHAT_PAGE_SIZE)
+    )
+
+def send_coach_message(message: str):
+    db = st.session_state.db
+    thread_id = st.session_state.coach_thread
+    db.add_chat_message(thread_id, "user", message)
+    with st.spinner("Thinking..."):
+        response = st.session_state.ai.chat(message, st.session_state.user, memory=st.session_state.coach_memory)
+    db.add_chat_message(thread_id, "assistant", response)
+    st.rerun()
+
 def render_coach():
     user = st.session_state.user
+    db = st.session_state.db
     ai = st.session_state.ai
     
+    if "coach_thread" not in st.session_state:
+        load_coach_thread()
+    thread_id = st.session_state.coach_thread
+    
     st.markdown("## 🤖 AI Coach")
     st.markdown("Your personal life coach powered by AI")
     
@@ -1995,8 +1175,21 @@ def render_coach():
     
     st.markdown("---")
     
+    # Only the latest page is rendered unless older pages were requested
+    oldest_id = st.session_state.coach_oldest_id
+    if oldest_id is None:
+        messages = db.get_chat_messages(thread_id, limit=CHAT_PAGE_SIZE)
+    else:
+        messages = db.get_chat_messages_since(thread_id, oldest_id)
+    
+    if messages and db.has_chat_messages_before(thread_id, messages[0]["id"]):
+        if st.button("⬆️ Load older messages", key="coach_load_older"):
+            older = db.get_chat_messages(thread_id, before_id=messages[0]["id"], limit=CHAT_PAGE_SIZE)
+            st.session_state.coach_oldest_id = older[0]["id"]
+            st.rerun()
+    
     # Chat history display
-    for msg in st.session_state.chat_history:
+    for msg in messages:
         if msg["role"] == "user":
             st.markdown(f"**You**: {msg['content']}")
         else:
@@ -2010,17 +1203,13 @@ def render_coach():
     with col1:
         if st.button("Send", type="primary", use_container_width=True):
             if user_message.strip():
-                st.session_state.chat_history.append({"role": "user", "content": user_message})
-                
-                with st.spinner("Thinking..."):
-                    response = ai.chat(user_message, user, st.session_state.chat_history)
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                
-                st.rerun()
+                send_coach_message(user_message)
     
     with col2:
-        if st.button("Clear Chat", use_container_width=True):
-            st.session_state.chat_history = []
+        if st.button("New Chat", use_container_width=True):
+            st.session_state.coach_thread = db.create_chat_thread(user["id"])
+            st.session_state.coach_oldest_id = None
+            st.session_state.coach_memory.clear()
             st.rerun()
     
     # Quick prompts
@@ -2037,13 +1226,7 @@ def render_coach():
     for i, prompt in enumerate(quick_prompts):
         with cols[i % 3]:
             if st.button(prompt, key=f"quick_{i}", use_container_width=True):
-                st.session_state.chat_history.append({"role": "user", "content": prompt})
-                
-                with st.spinner("Thinking..."):
-                    response = ai.chat(prompt, user, st.session_state.chat_history)
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                
-                st.rerun()
+                send_coach_message(prompt)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -2121,6 +1304,10 @@ def render_settings():
             st.markdown("**Extracted Habits:**")
             for h in analysis["habits"][:5]:
                 st.markdown(f"• {h.get('title')}")
+            if st.button(f"➕ Add all {len(analysis['habits'])} habits", key="import_doc_habits"):
+                with st.spinner("Assessing habits..."):
+                    created = create_assessed_habits(analysis["habits"])
+                st.success(f"✅ Added {created} habits!")
         
         if analysis.get("goals"):
             st.markdown("**Extracted Goals:**")
@@ -2134,19 +1321,143 @@ def render_settings():
     
     st.markdown("---")
     
+    # AI usage telemetry
+    st.markdown("### 📈 AI Usage")
+    st.markdown("Latency, tokens and cost per AI feature")
+    
+    telemetry = st.session_state.ai.telemetry
+    windows = {1: "Last hour", 24: "Last 24 hours", 168: "Last 7 days", 720: "Last 30 days"}
+    window = st.selectbox("Window", list(windows), index=1, format_func=windows.get, key="ai_usage_window")
+    usage = telemetry.summary(window) if telemetry else []
+    
+    if not usage:
+        st.info("No AI calls recorded in this window.")
+    else:
+        st.dataframe([{
+            "Feature": row["method"] + (" (local)" if row["model"] == "local" else ""),
+            "Calls": row["calls"],
+            "p50 ms": round(row["p50_ms"]),
+            "p90 ms": round(row["p90_ms"]),
+            "p99 ms": round(row["p99_ms"]),
+            "Tokens in": row["input_tokens"],
+            "Tokens out": row["output_tokens"],
+            "Cache read": row["cache_read_tokens"],
+            "Cache write": row["cache_write_tokens"],
+            "Max out / limit": f"{row['max_output_tokens']}/{row['max_tokens_limit']}",
+            "Truncated": row["truncated"],
+            "Retries": row["retries"],
+            "Coalesced": row["coalesced"],
+            "Parse fails": row["parse_failures"],
+            "Fallback %": round(row["fallback_rate"] * 100, 1),
+            "Cost $": round(row["est_cost_usd"], 4),
+        } for row in usage], use_container_width=True, hide_index=True)
+        
+        histogram = telemetry.latency_histogram(window)
+        st.caption("Latency: " + " • ".join(f"{bucket} {count}" for bucket, count in histogram.items()))
+    
+    st.markdown("---")
+    
+    # Database maintenance
+    maintenance = get_maintenance()
+    if maintenance:
+        st.markdown("### 🧹 Database Maintenance")
+        st.markdown("Runs automatically while the app is idle")
+        if st.button("Run all jobs now"):
+            for job in maintenance.intervals:
+                if maintenance.enabled(job):
+                    maintenance.run(job, budget=5.0)
+        if maintenance.history:
+            st.dataframe([{
+                "Job": r["job"],
+                "Status": r["status"],
+                "When": datetime.fromtimestamp(r["started_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+                "ms": round(r["seconds"] * 1000, 1),
+                "KB reclaimed": round(r["bytes_reclaimed"] / 1024, 1),
+                "Detail": r.get("detail", ""),
+            } for r in maintenance.history], use_container_width=True, hide_index=True)
+        else:
+            st.info("No maintenance has run yet.")
+        st.markdown("---")
+    
+    # Backups
+    snapshots = get_snapshots()
+    if snapshots:
+        st.markdown("### 💾 Backups")
+        st.markdown(f"Online snapshots in `{snapshots.directory}` (newest {snapshots.keep} kept)")
+        if st.button("📸 Take snapshot now"):
+            info = snapshots.snapshot()
+            st.success(f"Saved snapshot {info['name']}")
+        available = snapshots.list()
+        if available:
+            st.dataframe([{
+                "Snapshot": s["name"],
+                "Taken": s["taken_at"].strftime("%Y-%m-%d %H:%M:%S"),
+                "Kind": s["label"],
+                "KB": round(s["bytes"] / 1024),
+                "Archives": s["archives"],
+            } for s in available], use_container_width=True, hide_index=True)
+            chosen = st.selectbox("Restore from", [s["name"] for s in available], key="restore_choice")
+            confirm_restore = st.text_input("Type RESTORE to confirm", key="restore_confirm")
+            if st.button("⏪ Restore snapshot", disabled=confirm_restore != "RESTORE"):
+                safety = snapshots.restore(db, chosen)
+                replaced_data_notice(f"Restored {chosen}; the previous state is in snapshot {safety['name']}.")
+        else:
+            st.info("No snapshots yet.")
+        st.markdown("---")
+    
     # Danger zone
     st.markdown("### ⚠️ Danger Zone")
     
-    if st.button("🗑️ Reset All Data", type="secondary"):
-        st.warning("This will delete all your data. Type 'RESET' to confirm.")
-        confirm = st.text_input("Type RESET to confirm", key="reset_confirm")
-        if confirm == "RESET":
-            # Delete database file and recreate
-            import os
-            if os.path.exists("goal_quest.db"):
-                os.remove("goal_quest.db")
-            st.session_state.clear()
-            st.rerun()
+    confirm = st.text_input("Type RESET to confirm", key="reset_confirm")
+    if st.button("🗑️ Reset All Data", type="secondary", disabled=confirm != "RESET"):
+        if snapshots:
+            safety = snapshots.reset(db)
+            replaced_data_notice(f"All data reset; the previous state is in snapshot {safety['name']}.")
+        else:
+            get_database.clear()
+            replaced_data_notice("All data reset.")
+
+
+def replaced_data_notice(message: str):
+    """After a restore or reset: rebuild cached services and this session from the new contents"""
+    get_ai_service.clear()
+    st.session_state.clear()
+    st.session_state.flash = message
+    st.rerun()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DEVELOPER TOOLS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def render_profiler_panel(profile: Optional[Dict]):
+    if not profile:
+        return
+    
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("🛠️ Query Profiler", expanded=bool(profile["n_plus_one"])):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Queries", profile["query_count"])
+            with col2:
+                st.metric("SQL time", f"{profile['sql_ms']:.1f} ms")
+            st.caption(f"Rerun: {profile['rerun_ms']:.0f} ms • page: {profile['label']}")
+            
+            for issue in profile["n_plus_one"]:
+                st.warning(f"N+1: {issue['count']}× in {', '.join(issue['callers'])}")
+                st.code(issue["statement"], language="sql")
+            
+            if profile["slowest"]:
+                st.markdown("**Slowest statements**")
+                for stmt in profile["slowest"]:
+                    st.caption(f"{stmt['ms']:.2f} ms • {stmt['caller']}")
+                    st.code(stmt["statement"][:300], language="sql")
+            
+            if profile["methods"]:
+                st.markdown("**Database methods**")
+                for name, stats in profile["methods"].items():
+                    st.caption(f"`{name}` × {stats['calls']} • {stats['ms']:.2f} ms")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -2154,11 +1465,30 @@ def render_settings():
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def main():
+    profiler = get_query_profiler()
+    if profiler is None:
+        render_app()
+        return
+    
+    profiler.start_rerun(st.session_state.page)
+    try:
+        render_app()
+    finally:
+        profile = profiler.finish_rerun()
+    render_profiler_panel(profile)
+
+
+def render_app():
+    if "flash" in st.session_state:
+        st.success(st.session_state.pop("flash"))
+    
     # Check if user exists
     if st.session_state.user is None:
         show_onboarding()
         return
     
+    show_reminders(st.session_state.user["id"])
+    
     # Render sidebar
     render_sidebar()
     
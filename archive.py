@@ -0,0 +1,233 @@
+"""
+🧊 GOAL QUEST - Completion Archive
+Moves old habit_completions into per-year SQLite files attached on demand
+
+Completions older than the horizon are copied into
+<db>.archive-<year>.db and deleted from the hot table, oldest dates first
+and in bounded chunks. A watermark in completion_archives records the date
+below which every completion lives in an archive. It only advances in the
+transaction that deletes the hot rows, so readers that combine the hot table
+with archived rows below the watermark (per_source) never see a row twice or
+miss one, even if an archive run is interrupted between the two files.
+Deleting a habit purges its archived completions once the delete commits.
+"""
+
+import glob
+import os
+import re
+import sqlite3
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+COMPLETION_COLUMNS = "id, habit_id, completed_at, completion_date, xp_earned, streak_bonus"
+
+
+def archive_path(db_path: str, year: int) -> str:
+    stem, _ = os.path.splitext(db_path)
+    return f"{stem}.archive-{year}.db"
+
+
+def alias(year: int) -> str:
+    return f"archive_{int(year)}"
+
+
+def archive_files(db_path: str) -> Dict[int, str]:
+    """year -> path of every archive file that exists for db_path"""
+    stem, _ = os.path.splitext(db_path)
+    files = {}
+    for path in glob.glob(glob.escape(stem) + ".archive-*.db"):
+        match = re.search(r"\.archive-(\d{4})\.db$", path)
+        if match:
+            files[int(match.group(1))] = path
+    return files
+
+
+def detach_all(conn: sqlite3.Connection):
+    """Detach every archive, e.g. before the files are replaced on disk"""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1].startswith("archive_"):
+            conn.execute(f"DETACH DATABASE {row[1]}")
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS completion_archives (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            archived_before DATE NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def watermark(conn: sqlite3.Connection) -> Optional[str]:
+    """Every completion dated before this lives in an archive (None: nothing archived)"""
+    return conn.execute("SELECT MAX(archived_before) FROM completion_archives").fetchone()[0]
+
+
+def archived_years(conn: sqlite3.Connection, since: Optional[str] = None) -> List[int]:
+    """Archive years holding completions on or after since (all years when since is None)"""
+    rows = conn.execute("SELECT year FROM completion_archives WHERE rows > 0 AND year >= ? ORDER BY year",
+                        (int(since[:4]) if since else 0,))
+    return [row[0] for row in rows]
+
+
+def attach(conn: sqlite3.Connection, db_path: str, years: Iterable[int]):
+    """Attach the archives for years, detaching unused ones to stay under SQLite's attach limit"""
+    years = list(years)
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    wanted = {alias(y) for y in years}
+    spare = [a for a in attached if a.startswith("archive_") and a not in wanted]
+    room = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) - (len(attached) - 2)  # main and temp don't count
+    for year in years:
+        if alias(year) in attached:
+            continue
+        if room <= 0 and spare:
+            conn.execute(f"DETACH DATABASE {spare.pop()}")
+            room += 1
+        conn.execute(f"ATTACH DATABASE ? AS {alias(year)}", (archive_path(db_path, year),))
+        room -= 1
+
+
+def per_source(conn: sqlite3.Connection, db_path: str, since: Optional[str], select: str,
+               params: Sequence = ()) -> Tuple[str, list]:
+    """Run select once per completion source and join the results with UNION ALL.
+
+    select names its table {completions} and ends its WHERE clause with
+    {archived}, which limits archive tables to rows below the watermark. The
+    archives are only included (and attached) when since reaches below the
+    watermark. Aggregating per source keeps each part on its own date index;
+    a join against one big UNION ALL subquery would be materialized first.
+    """
+    parts = [select.format(completions="habit_completions", archived="")]
+    all_params = list(params)
+    mark = watermark(conn)
+    if mark is not None and (since is None or since < mark):
+        years = archived_years(conn, since)
+        attach(conn, db_path, years)
+        for year in years:
+            parts.append(select.format(completions=f"{alias(year)}.habit_completions",
+                                       archived="AND hc.completion_date < ?"))
+            all_params += [*params, mark]
+    return " UNION ALL ".join(parts), all_params
+
+
+def purge_orphans(db_path: str) -> int:
+    """Delete archived completions whose habit no longer exists and take them off each year's row
+    count; returns how many were deleted. Runs on its own connection, as ATTACH is not allowed
+    inside the write transaction that deleted the habit."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        years = archived_years(conn)
+        if not years:
+            return 0
+        attach(conn, db_path, years)
+        deleted = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for year in years:
+                removed = conn.execute(f"""
+                    DELETE FROM {alias(year)}.habit_completions
+                    WHERE habit_id NOT IN (SELECT id FROM main.habits)
+                """).rowcount
+                if removed:
+                    conn.execute("UPDATE completion_archives SET rows = rows - ? WHERE year = ?", (removed, year))
+                    deleted += removed
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return deleted
+    finally:
+        conn.close()
+
+
+class CompletionArchiver:
+    """Moves completions older than horizon_days out of the hot table"""
+
+    def __init__(self, db_path: str, horizon_days: int = 365, chunk_rows: int = 5000):
+        self.db_path = db_path
+        self.horizon_days = horizon_days
+        self.chunk_rows = chunk_rows
+
+    def cutoff(self, today: Optional[date] = None) -> str:
+        return ((today or date.today()) - timedelta(days=self.horizon_days)).isoformat()
+
+    def run(self, conn: Optional[sqlite3.Connection] = None, deadline: Optional[float] = None,
+            today: Optional[date] = None) -> Dict:
+        """Archive in chunks until caught up (or past the deadline); safe to stop and resume anywhere"""
+        own = conn is None
+        if own:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            ensure_schema(conn)
+            cutoff = self.cutoff(today)
+            moved: Dict[int, int] = {}
+            while deadline is None or time.monotonic() < deadline:
+                step = self._next_chunk(conn, cutoff)
+                if step is None:
+                    break
+                year, before = step
+                moved[year] = moved.get(year, 0) + self._move(conn, year, before)
+            return {"archived": sum(moved.values()), "by_year": moved, "watermark": watermark(conn),
+                    "caught_up": self._next_chunk(conn, cutoff) is None}
+        finally:
+            if own:
+                conn.close()
+
+    def _next_chunk(self, conn: sqlite3.Connection, cutoff: str) -> Optional[Tuple[int, str]]:
+        """(year, exclusive end date) of the next chunk, or None when nothing is older than cutoff"""
+        oldest = conn.execute("SELECT MIN(completion_date) FROM habit_completions").fetchone()[0]
+        if oldest is None or oldest >= cutoff:
+            return None
+        year = int(oldest[:4])
+        end = min(cutoff, f"{year + 1}-01-01")
+        row = conn.execute("""
+            SELECT completion_date FROM habit_completions
+            WHERE completion_date < ? ORDER BY completion_date LIMIT 1 OFFSET ?
+        """, (end, self.chunk_rows)).fetchone()
+        if row is not None:
+            # Whole days only, so a chunk never splits one date across the watermark
+            end = row[0] if row[0] > oldest else (date.fromisoformat(oldest) + timedelta(days=1)).isoformat()
+        return year, end
+
+    def _move(self, conn: sqlite3.Connection, year: int, before: str) -> int:
+        path = archive_path(self.db_path, year)
+        name = alias(year)
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if name not in attached:
+            conn.execute(f"ATTACH DATABASE ? AS {name}", (path,))
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name}.habit_completions (
+                id INTEGER PRIMARY KEY,
+                habit_id INTEGER NOT NULL,
+                completed_at TIMESTAMP,
+                completion_date DATE NOT NULL,
+                xp_earned INTEGER DEFAULT 0,
+                streak_bonus INTEGER DEFAULT 0
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name}.idx_archived_completions_date "
+                     f"ON habit_completions(completion_date)")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # OR IGNORE: rows copied by an interrupted earlier run are already there
+            conn.execute(f"""
+                INSERT OR IGNORE INTO {name}.habit_completions ({COMPLETION_COLUMNS})
+                SELECT {COMPLETION_COLUMNS} FROM habit_completions WHERE completion_date < ?
+            """, (before,))
+            moved = conn.execute("DELETE FROM habit_completions WHERE completion_date < ?", (before,)).rowcount
+            conn.execute("""
+                INSERT INTO completion_archives (year, path, rows, archived_before) VALUES (?, ?, ?, ?)
+                ON CONFLICT(year) DO UPDATE SET rows = rows + excluded.rows, path = excluded.path,
+                    archived_before = MAX(archived_before, excluded.archived_before), updated_at = CURRENT_TIMESTAMP
+            """, (year, os.path.basename(path), moved, before))
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:  # an interrupted statement may already have rolled back
+                conn.execute("ROLLBACK")
+            raise
+        return moved
@@ -0,0 +1,162 @@
+"""
+💾 GOAL QUEST - Snapshots, Restore and Reset
+Online backups with the SQLite backup API, rotation, point-in-time restore
+
+A snapshot is a directory holding a copy of the database plus its completion
+archives, made with sqlite3.Connection.backup. In WAL mode (the app's default)
+the copy runs in one step inside a read transaction, which never blocks
+writers; stepping there would only make SQLite restart the copy after every
+concurrent write. With a rollback journal the copy is page-stepped instead, so
+the source's shared lock is released between batches and writers get in.
+Snapshots are written under a temporary name and renamed into place, so a
+half-written one is never listed.
+
+Restore and reset never delete the live file under open connections. They
+copy a snapshot (or a freshly initialised database) into the live file in a
+single backup step, which every connection sees atomically, then bump
+Database.generation so the app can drop session state built from the old data.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import archive
+
+logger = logging.getLogger(__name__)
+
+MAIN_FILE = "goal_quest.db"
+
+
+class _Restarted(Exception):
+    pass
+
+
+def copy_database(source: str, target: str, pages: int = -1, sleep: float = 0.0, max_restarts: int = 3):
+    """Copy source into target with the backup API (pages=-1 copies everything in one step).
+
+    A stepped copy starts over whenever another connection writes to the
+    source, so under a steady stream of writes it could run forever; after
+    max_restarts it finishes in a single step instead.
+    """
+    src = sqlite3.connect(source, timeout=30)
+    dst = sqlite3.connect(target, timeout=30)
+    seen = {"remaining": None, "restarts": 0}
+
+    def progress(status, remaining, total):
+        if seen["remaining"] is not None and remaining > seen["remaining"]:
+            seen["restarts"] += 1
+            if seen["restarts"] > max_restarts:
+                raise _Restarted()
+        seen["remaining"] = remaining
+
+    try:
+        try:
+            src.backup(dst, pages=pages, sleep=sleep, progress=progress if pages > 0 else None)
+        except _Restarted:
+            logger.info("stepped backup of %s restarted %d times, copying in one step", source, max_restarts)
+            src.backup(dst, pages=-1, sleep=sleep)
+    finally:
+        dst.close()
+        src.close()
+
+
+class SnapshotManager:
+    """Rotating snapshots of db_path in directory (default: a backups/ folder next to it)"""
+
+    def __init__(self, db_path: str, directory: Optional[str] = None, keep: int = 7,
+                 pages: Optional[int] = None, sleep: float = 0.005):
+        self.db_path = db_path
+        self.directory = directory or os.path.join(os.path.dirname(os.path.abspath(db_path)), "backups")
+        self.keep = keep
+        self.pages = pages  # None: one step for WAL databases, 256-page steps otherwise
+        self.sleep = sleep
+
+    def _pages_for(self, path: str) -> int:
+        if self.pages is not None:
+            return self.pages
+        conn = sqlite3.connect(path)
+        try:
+            wal = conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+        return -1 if wal else 256
+
+    # Snapshots
+    def snapshot(self, label: str = "manual", rotate: bool = True) -> Dict:
+        started = time.perf_counter()
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{label}"
+        final = os.path.join(self.directory, name)
+        staging = final + ".tmp"
+        os.makedirs(staging)
+        try:
+            copy_database(self.db_path, os.path.join(staging, MAIN_FILE), self._pages_for(self.db_path), self.sleep)
+            for year, path in archive.archive_files(self.db_path).items():
+                copy_database(path, os.path.join(staging, os.path.basename(archive.archive_path(MAIN_FILE, year))),
+                              self._pages_for(path), self.sleep)
+            os.replace(staging, final)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        info = self._describe(final)
+        info["seconds"] = time.perf_counter() - started
+        logger.info("snapshot %s: %d bytes in %.1f ms", name, info["bytes"], info["seconds"] * 1000)
+        if rotate:
+            self.rotate()
+        return info
+
+    def list(self) -> List[Dict]:
+        """Complete snapshots, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = [n for n in os.listdir(self.directory)
+                 if not n.endswith(".tmp") and os.path.isfile(os.path.join(self.directory, n, MAIN_FILE))]
+        return [self._describe(os.path.join(self.directory, n)) for n in sorted(names, reverse=True)]
+
+    def rotate(self) -> List[str]:
+        """Delete all but the newest keep snapshots; returns the removed names"""
+        removed = [s["name"] for s in self.list()[self.keep:]]
+        for name in removed:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        return removed
+
+    @staticmethod
+    def _describe(path: str) -> Dict:
+        name = os.path.basename(path)
+        stamp, label = name[:22], name[23:]
+        files = [os.path.join(path, f) for f in os.listdir(path)]
+        return {"name": name, "path": path, "label": label,
+                "taken_at": datetime.strptime(stamp, "%Y%m%d-%H%M%S-%f"),
+                "bytes": sum(os.path.getsize(f) for f in files),
+                "archives": len(archive.archive_files(os.path.join(path, MAIN_FILE)))}
+
+    # Restore and reset
+    def restore(self, db, name: str, safety_snapshot: bool = True) -> Dict:
+        """Replace the live database (and its archives) with a snapshot; returns the safety snapshot"""
+        source = os.path.join(self.directory, name)
+        if not os.path.isfile(os.path.join(source, MAIN_FILE)):
+            raise FileNotFoundError(f"no snapshot named {name}")
+        # Rotation waits until the restore is done, so it can't remove the snapshot being restored
+        safety = self.snapshot("before-restore", rotate=False) if safety_snapshot else None
+        archives = {}
+        for year in archive.archive_files(os.path.join(source, MAIN_FILE)):
+            archives[year] = os.path.join(source, os.path.basename(archive.archive_path(MAIN_FILE, year)))
+        db.replace_contents(os.path.join(source, MAIN_FILE), archives)
+        logger.info("restored snapshot %s", name)
+        self.rotate()
+        return safety
+
+    def reset(self, db) -> Dict:
+        """Swap in a fresh, empty database after taking a safety snapshot"""
+        safety = self.snapshot("before-reset")
+        with tempfile.TemporaryDirectory() as tmp:
+            fresh = os.path.join(tmp, MAIN_FILE)
+            type(db)(fresh).close()  # schema and default data, nothing else
+            db.replace_contents(fresh, {})
+        logger.info("reset database, previous data kept in snapshot %s", safety["name"])
+        return safety
@@ -0,0 +1 @@
+"""Benchmark suites for Goal Quest (run with ``python -m benchmarks.<suite>``)"""
@@ -0,0 +1,119 @@
+"""
+AI request scheduler scenarios against a local fake Messages API
+
+Drives the real AIService (with the shared AIRequestScheduler) against
+benchmarks.fake_anthropic and checks coalescing, the concurrency cap,
+retry/backoff on transient failures, the latency budget and batched
+habit assessment. Exits non-zero if any expectation fails, so it can gate
+changes to the scheduler.
+
+    python -m benchmarks.bench_ai_scheduler
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from ai_scheduler import AIRequestScheduler
+from ai_service import AIService
+from benchmarks.fake_anthropic import FakeAnthropicServer
+from telemetry import AITelemetry
+
+
+def make_service(server: FakeAnthropicServer, telemetry_path: str, **scheduler_options) -> AIService:
+    os.environ["ANTHROPIC_BASE_URL"] = server.url
+    scheduler = AIRequestScheduler(**scheduler_options)
+    return AIService(api_key="sk-ant-fake", telemetry=AITelemetry(telemetry_path), scheduler=scheduler)
+
+
+def fan_out(count: int, call: Callable[[int], object]) -> List[object]:
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(call, range(count)))
+
+
+def scenario_coalesce(tmp: str) -> Dict:
+    with FakeAnthropicServer(latency=0.3) as server:
+        ai = make_service(server, os.path.join(tmp, "coalesce.db"))
+        started = time.perf_counter()
+        results = fan_out(20, lambda _: ai.assess_habit_difficulty("Meditate for 10 minutes"))
+        elapsed = time.perf_counter() - started
+        return {"upstream": server.requests, "wall_s": elapsed, "stats": ai.scheduler.stats,
+                "checks": {"one upstream call": server.requests == 1,
+                           "all callers got the AI result": all(r["xp_reward"] == 150 for r in results)}}
+
+
+def scenario_concurrency_cap(tmp: str) -> Dict:
+    with FakeAnthropicServer(latency=0.2) as server:
+        ai = make_service(server, os.path.join(tmp, "cap.db"), max_concurrency=4)
+        started = time.perf_counter()
+        fan_out(16, lambda i: ai.assess_habit_difficulty(f"Read {i} pages"))
+        elapsed = time.perf_counter() - started
+        return {"upstream": server.requests, "max_in_flight": server.max_in_flight, "wall_s": elapsed,
+                "stats": ai.scheduler.stats,
+                "checks": {"never more than 4 in flight": server.max_in_flight <= 4,
+                           "every request sent": server.requests == 16}}
+
+
+def scenario_transient_retry(tmp: str) -> Dict:
+    with FakeAnthropicServer(fail_first=[529, 429, 529], retry_after=0.05) as server:
+        ai = make_service(server, os.path.join(tmp, "retry.db"), base_delay=0.05)
+        started = time.perf_counter()
+        result = ai.generate_goal_steps("Learn the guitar")
+        elapsed = time.perf_counter() - started
+        summary = ai.telemetry.summary()[0]
+        return {"upstream": server.requests, "wall_s": elapsed, "stats": ai.scheduler.stats,
+                "checks": {"recovered without fallback": result["title"] == "Fake Quest",
+                           "three retries recorded": summary["retries"] == 3}}
+
+
+def scenario_budget(tmp: str) -> Dict:
+    with FakeAnthropicServer(fail_always=529, latency=0.05) as server:
+        ai = make_service(server, os.path.join(tmp, "budget.db"), base_delay=0.2, latency_budget=1.0,
+                          max_attempts=50)
+        started = time.perf_counter()
+        result = ai.assess_habit_difficulty("Run a marathon")
+        elapsed = time.perf_counter() - started
+        return {"upstream": server.requests, "wall_s": elapsed, "stats": ai.scheduler.stats,
+                "checks": {"fell back to local assessment": result["tip"].startswith("Start small"),
+                           "stayed within budget": elapsed < 1.5}}
+
+
+def scenario_batch(tmp: str) -> Dict:
+    with FakeAnthropicServer(latency=0.3) as server:
+        ai = make_service(server, os.path.join(tmp, "batch.db"))
+        habits = [f"Practice skill {i} for 20 minutes" for i in range(12)]
+        started = time.perf_counter()
+        results = ai.assess_habits_batch(habits)
+        elapsed = time.perf_counter() - started
+        return {"upstream": server.requests, "wall_s": elapsed, "stats": ai.scheduler.stats,
+                "checks": {"one upstream call for 12 habits": server.requests == 1,
+                           "every habit assessed by the AI": [r["source"] for r in results] == ["ai"] * 12}}
+
+
+SCENARIOS = {
+    "coalesce": scenario_coalesce,
+    "concurrency_cap": scenario_concurrency_cap,
+    "transient_retry": scenario_transient_retry,
+    "latency_budget": scenario_budget,
+    "batch_assessment": scenario_batch,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, scenario in SCENARIOS.items():
+            report = scenario(tmp)
+            print(f"{name:<18} upstream={report['upstream']:<3} wall={report['wall_s']:.2f}s  "
+                  f"retries={report['stats']['retries']} coalesced={report['stats']['coalesced']}")
+            for check, ok in report["checks"].items():
+                failed += not ok
+                print(f"    [{'ok' if ok else 'FAIL'}] {check}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+JSON API latency over one keep-alive connection
+
+Starts the API on a temporary database (group commit on, as in the app) and
+times, end to end through HTTP: a habit tick, a GET of the habit list after a
+write (cache miss), a repeated GET (cached bytes) and a conditional GET that
+returns 304. Also checks that writes through the API, through the store and
+from another SQLite connection all change the ETag, and that a configured
+token is enforced, that POSTs can't act on another user's habits and that
+the server won't listen beyond loopback without a token. Exits non-zero on any mismatch.
+
+    python -m benchmarks.bench_api --habits 50
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import api
+from database import Database
+
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, headers: Optional[Dict] = None) -> Tuple[int, Dict, bytes]:
+    conn.request(method, path, headers=headers or {})
+    response = conn.getresponse()
+    return response.status, dict(response.getheaders()), response.read()
+
+
+def per_request(conn: http.client.HTTPConnection, calls: List[Tuple[str, str, Optional[Dict]]]) -> float:
+    started = time.perf_counter()
+    for method, path, headers in calls:
+        request(conn, method, path, headers)
+    return (time.perf_counter() - started) / max(len(calls), 1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habits", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200, help="requests per read measurement")
+    args = parser.parse_args(argv)
+
+    failures = []
+    token = "bench-token"
+    auth = {"Authorization": f"Bearer {token}"}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "api.db")
+        db = Database(path, group_commit=True)
+        uid = db.create_user("Hunter", onboarding_complete=1)
+        habit_ids = [db.create_habit(uid, f"Habit {i}", xp_reward=50) for i in range(args.habits)]
+        server = api.serve(db, port=0, token=token)
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+
+        if request(conn, "GET", "/api/habits")[0] != 401:
+            failures.append("request without the token was not rejected")
+
+        # Habit ticks, each followed by a GET that has to rebuild the response
+        tick_s = miss_s = 0.0
+        for habit_id in habit_ids:
+            tick_s += per_request(conn, [("POST", f"/api/habits/{habit_id}/complete", auth)])
+            miss_s += per_request(conn, [("GET", "/api/habits", auth)])
+        tick_s /= len(habit_ids)
+        miss_s /= len(habit_ids)
+        status, _, body = request(conn, "POST", f"/api/habits/{habit_ids[0]}/complete", auth)
+        if status != 409 or json.loads(body) != {"error": "Already completed today"}:
+            failures.append("second tick of a habit was not refused")
+
+        status, headers, body = request(conn, "GET", "/api/habits", auth)
+        etag = headers.get("ETag")
+        if status != 200 or not all(h["done_today"] for h in json.loads(body)):
+            failures.append("ticked habits not reported as done")
+        hit_s = per_request(conn, [("GET", "/api/habits", auth)] * args.repeat)
+        not_modified_s = per_request(conn, [("GET", "/api/habits", {**auth, "If-None-Match": etag})] * args.repeat)
+        if request(conn, "GET", "/api/habits", {**auth, "If-None-Match": etag})[0] != 304:
+            failures.append("unchanged resource did not return 304")
+
+        # Every kind of write invalidates
+        db.update_habit(habit_ids[0], title="Renamed")
+        if request(conn, "GET", "/api/habits", {**auth, "If-None-Match": etag})[0] != 200:
+            failures.append("write through the store kept the old ETag")
+        etag = request(conn, "GET", "/api/habits", auth)[1].get("ETag")
+        other = sqlite3.connect(path)
+        other.execute("UPDATE habits SET title = 'Elsewhere' WHERE id = ?", (habit_ids[1],))
+        other.commit()
+        other.close()
+        status, _, body = request(conn, "GET", "/api/habits", {**auth, "If-None-Match": etag})
+        if status != 200 or "Elsewhere" not in body.decode("utf-8"):
+            failures.append("commit from another connection kept the old ETag")
+
+        status, _, body = request(conn, "GET", "/api/stats", auth)
+        stats = json.loads(body) if status == 200 else {}
+        if stats.get("completed_today") != len(habit_ids) or stats.get("ranks", {}).get("total_xp") != 1:
+            failures.append("stats do not reflect the ticks")
+        if request(conn, "GET", "/api/nowhere", auth)[0] != 404:
+            failures.append("unknown path did not return 404")
+
+        other = db.create_user("Other", onboarding_complete=1)
+        other_habit = db.create_habit(other, "Theirs")
+        goal = db.get_goal(db.create_goal(other, "Theirs", steps=[{"title": "Step"}]))
+        for path in (f"/api/habits/{other_habit}/complete?user_id={uid}",
+                     f"/api/goals/steps/{goal['steps'][0]['id']}/complete?user_id={uid}"):
+            if request(conn, "POST", path, auth)[0] != 404:
+                failures.append(f"POST {path} acted on another user's row")
+        if db.get_today_completions(other) or db.get_user_by_id(uid)["total_xp"] != stats["user"]["total_xp"]:
+            failures.append("cross-user POST changed the database")
+        try:
+            api.serve(db, host="0.0.0.0", port=0).shutdown()
+            failures.append("served beyond loopback without a token")
+        except ValueError:
+            pass
+
+        conn.close()
+        server.shutdown()
+        db.close()
+
+    print(f"JSON API, {args.habits} habits, one keep-alive connection, group commit:")
+    print(f"  {'POST habit tick':<28} {tick_s * 1e3:8.2f} ms")
+    print(f"  {'GET habits after a write':<28} {miss_s * 1e3:8.2f} ms")
+    print(f"  {'GET habits (cached)':<28} {hit_s * 1e3:8.2f} ms")
+    print(f"  {'GET habits (304)':<28} {not_modified_s * 1e3:8.2f} ms")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
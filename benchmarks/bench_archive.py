@@ -0,0 +1,139 @@
+"""
+Hot-table query speed before and after archiving old completions
+
+Copies a synthetic dataset (several years of completions), times the
+completion queries, archives everything older than the horizon into yearly
+files and times them again. Results must be identical before and after, and
+also after a simulated crash between copying rows to an archive and
+deleting them from the hot table. Deleting a habit must also remove its
+archived completions and their row counts. Exits non-zero on any difference.
+
+    python -m benchmarks.bench_archive --scale 100k --horizon 365
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import archive
+from archive import CompletionArchiver
+from benchmarks.bench_database import dataset_path
+from benchmarks.synthetic import SCALES
+from database import Database
+
+
+def timed(fn: Callable, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def queries(db: Database, user_id: int) -> Dict[str, Callable]:
+    return {
+        "get_today_completions": lambda: db.get_today_completions(user_id),
+        "get_habit_stats(30)": lambda: db.get_habit_stats(user_id, 30),
+        "get_habit_stats(3650)": lambda: db.get_habit_stats(user_id, 3650),
+        "export_completions(all)": lambda: db.export_completions(user_id),
+    }
+
+
+def measure(path: str, repeat: int) -> Dict[str, tuple]:
+    db = Database(path)
+    user_id = db.get_user()["id"]
+    results = {name: timed(fn, repeat) for name, fn in queries(db, user_id).items()}
+    db.close()
+    return results
+
+
+def hot_rows(path: str) -> int:
+    db = Database(path)
+    count = db.conn.execute("SELECT COUNT(*) FROM habit_completions").fetchone()[0]
+    db.close()
+    return count
+
+
+def check_delete_habit(path: str) -> List[str]:
+    """Deleting a habit with archived completions removes them and their row counts"""
+    db = Database(path)
+    try:
+        years = archive.archived_years(db.conn)
+        if not years:
+            return []
+        archive.attach(db.conn, path, years)
+        sources = [f"{archive.alias(year)}.habit_completions" for year in years]
+        habit_id = db.conn.execute(f"SELECT habit_id FROM {sources[0]} LIMIT 1").fetchone()[0]
+        db.delete_habit(habit_id)
+        left = sum(db.conn.execute(f"SELECT COUNT(*) FROM {source} WHERE habit_id = ?", (habit_id,)).fetchone()[0]
+                   for source in sources)
+        stored = sum(db.conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0] for source in sources)
+        counted = db.conn.execute("SELECT SUM(rows) FROM completion_archives").fetchone()[0]
+    finally:
+        db.close()
+    failures = []
+    if left:
+        failures.append(f"{left} archived completions left behind by delete_habit")
+    if stored != counted:
+        failures.append(f"completion_archives counts {counted} rows, archives hold {stored}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", choices=list(SCALES))
+    parser.add_argument("--horizon", type=int, default=365, help="days of completions kept hot")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "archive.db")
+        shutil.copy(dataset_path(args.scale), path)
+        before_rows = hot_rows(path)
+        before = measure(path, args.repeat)
+
+        # Crash simulation: rows copied into the archive, hot delete never committed
+        crash = CompletionArchiver(path, args.horizon)
+        conn = Database(path).conn
+        conn.isolation_level = None
+        step = crash._next_chunk(conn, crash.cutoff())
+        if step is None:
+            print(f"{args.scale}: nothing older than {args.horizon} days; skipping the interrupted-run check")
+        else:
+            year, end = step
+            crash._move(conn, year, end)
+            conn.execute(f"INSERT INTO habit_completions SELECT * FROM {archive.alias(year)}.habit_completions")
+            conn.execute("DELETE FROM completion_archives")
+        conn.close()
+        if step and any(result != before[name][1] for name, (_, result) in measure(path, 1).items()):
+            failures.append("results changed after an interrupted archive run")
+
+        started = time.perf_counter()
+        report = CompletionArchiver(path, args.horizon).run()
+        archive_seconds = time.perf_counter() - started
+        after_rows = hot_rows(path)
+        after = measure(path, args.repeat)
+        files = sorted(f for f in os.listdir(tmp) if ".archive-" in f)
+        failures += check_delete_habit(path)
+
+    print(f"{args.scale}: archived {report['archived']:,} completions into {len(files)} yearly files "
+          f"in {archive_seconds:.2f}s; hot table {before_rows:,} -> {after_rows:,} rows")
+    print(f"  {'query':<26} {'before ms':>10} {'after ms':>10}")
+    for name, (seconds, result) in before.items():
+        print(f"  {name:<26} {seconds * 1e3:>10.2f} {after[name][0] * 1e3:>10.2f}")
+        if after[name][1] != result:
+            failures.append(f"{name} differs after archiving")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
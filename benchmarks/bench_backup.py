@@ -0,0 +1,115 @@
+"""
+Writer stalls during online snapshots, and restore/reset correctness
+
+Copies a synthetic dataset, then takes snapshots while a session thread keeps
+writing notes (a couple of milliseconds apart), in a single backup step and page-stepped, with the database in
+WAL mode (group commit, the app's default) and with a rollback journal, and
+reports the writer's worst and p99 write latency during each. Then restores
+the newest snapshot (with archived completions) and resets the database under
+a still-open Database, checking that the open connection sees exactly the
+snapshot's data and then an empty database.
+Exits non-zero if a check fails.
+
+    python -m benchmarks.bench_backup --scale 100k
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from archive import CompletionArchiver
+from backup import SnapshotManager
+from benchmarks.bench_database import dataset_path
+from benchmarks.synthetic import SCALES
+from database import Database
+
+
+def snapshot_under_load(db: Database, manager: SnapshotManager, think: float) -> Dict:
+    uid = db.get_user()["id"]
+    latencies: List[float] = []
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            started = time.perf_counter()
+            db.create_note(uid, "during backup", "x" * 200)
+            latencies.append(time.perf_counter() - started)
+            time.sleep(think)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.05)
+    info = manager.snapshot()
+    stop.set()
+    thread.join()
+    latencies.sort()
+    info.update(writes=len(latencies), worst_ms=latencies[-1] * 1e3,
+                p99_ms=latencies[int(len(latencies) * 0.99)] * 1e3)
+    return info
+
+
+def fingerprint(db: Database) -> Dict:
+    uid = db.get_user()["id"] if db.get_user() else None
+    return {
+        "notes": db.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0],
+        "hot_completions": db.conn.execute("SELECT COUNT(*) FROM habit_completions").fetchone()[0],
+        "exported": len(db.export_completions(uid)) if uid else 0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", choices=list(SCALES))
+    parser.add_argument("--think-ms", type=float, default=2.0, help="pause between the session's writes")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "live.db")
+        shutil.copy(dataset_path(args.scale), path)
+        CompletionArchiver(path, horizon_days=365).run()
+
+        for journal, group_commit in (("rollback", False), ("WAL", True)):
+            db = Database(path, group_commit=group_commit)
+            for label, pages in (("single step", -1), ("page-stepped", 256)):
+                manager = SnapshotManager(path, os.path.join(tmp, "backups"), pages=pages)
+                r = snapshot_under_load(db, manager, args.think_ms / 1000)
+                print(f"{journal:<8} {label:<13} {r['bytes'] / 1e6:5.1f} MB in {r['seconds'] * 1e3:7.1f} ms  "
+                      f"writes={r['writes']:<5} worst={r['worst_ms']:7.1f} ms  p99={r['p99_ms']:6.1f} ms")
+            if not group_commit:
+                db.close()
+        manager = SnapshotManager(path, os.path.join(tmp, "backups"))
+        snapshot = manager.list()[0]
+        expected = fingerprint(Database(os.path.join(snapshot["path"], "goal_quest.db")))
+
+        db.create_note(db.get_user()["id"], "after snapshot")
+        started = time.perf_counter()
+        manager.restore(db, snapshot["name"])
+        print(f"restore       {(time.perf_counter() - started) * 1e3:7.1f} ms (including a safety snapshot)")
+        if fingerprint(db) != expected:
+            failures.append(f"restored data differs: {fingerprint(db)} != {expected}")
+        if db.generation != 1:
+            failures.append("restore did not bump the generation")
+
+        manager.reset(db)
+        if db.get_user() is not None or fingerprint(db)["hot_completions"] or len(db.get_shop_items()) != 7:
+            failures.append("reset did not leave a fresh database")
+        if os.path.exists(path.replace(".db", ".archive-2023.db")) or any(".archive-" in f for f in os.listdir(tmp)):
+            failures.append("reset left archive files behind")
+        uid = db.create_user("After reset")
+        if db.get_user()["id"] != uid:
+            failures.append("database unusable after reset")
+        db.close()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
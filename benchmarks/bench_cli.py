@@ -0,0 +1,102 @@
+"""
+Command-line startup time and import footprint
+
+Runs cli.py commands as fresh processes against a small temporary database
+and reports the fastest wall time of each next to a bare interpreter and an
+interpreter that only imports Streamlit (what any admin task driven through
+the app would pay first). Also checks, in-process, that no command imports
+Streamlit and that only the commands that need them import the AI client or
+numpy. Exits non-zero on a forbidden import or if a command takes more than
+--budget-ms over the bare interpreter (whose own startup depends on the
+environment's site packages).
+
+    python -m benchmarks.bench_cli
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("streamlit", "anthropic", "numpy")
+
+# Report which heavy modules a command pulled in, without its output
+PROBE = """
+import contextlib, io, json, sys
+sys.path.insert(0, {root!r})
+import cli
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    cli.main({argv!r})
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+
+def wall(command: List[str], repeat: int, stdin: bytes = b"") -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False, cwd=ROOT)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="runs per command; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="allowed time over a bare interpreter")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cli.db")
+        subprocess.run([sys.executable, "-c", f"""
+import sys; sys.path.insert(0, {ROOT!r})
+from database import Database
+db = Database({db_path!r}); uid = db.create_user("Hunter", onboarding_complete=1)
+for i in range(20):
+    db.complete_habit(db.create_habit(uid, f"Habit {{i}}"), uid)
+db.close()
+"""], check=True)
+        quotes = "\n".join(json.dumps({"quote": f"Quote {i}", "tradition": "stoic"}) for i in range(500)).encode()
+        cli = [sys.executable, os.path.join(ROOT, "cli.py"), "--db", db_path]
+        commands = {
+            "--help": (["--help"], b""),
+            "stats": (["stats"], b""),
+            "export --days 30": (["export", "--days", "30"], b""),
+            "add-quotes (500 from stdin)": (["add-quotes"], quotes),
+            "recompute-streaks": (["recompute-streaks"], b""),
+        }
+
+        baseline = wall([sys.executable, "-c", "pass"], args.repeat)
+        streamlit = wall([sys.executable, "-c", "import streamlit"], max(args.repeat // 3, 1))
+        print(f"  {'':<32} {'wall ms':>8} {'over bare':>10}")
+        print(f"  {'python -c pass':<32} {baseline * 1e3:8.1f}")
+        print(f"  {'python -c import streamlit':<32} {streamlit * 1e3:8.1f} {(streamlit - baseline) * 1e3:10.1f}")
+        for name, (command, stdin) in commands.items():
+            overhead = (wall(cli + command, args.repeat, stdin) - baseline) * 1e3
+            print(f"  {'cli.py ' + name:<32} {baseline * 1e3 + overhead:8.1f} {overhead:10.1f}")
+            if overhead > args.budget_ms:
+                failures.append(f"cli.py {name} took {overhead:.0f} ms over a bare interpreter (budget {args.budget_ms:.0f} ms)")
+
+            if name == "--help":
+                continue
+            probe = PROBE.format(root=ROOT, argv=["--db", db_path] + command, heavy=HEAVY)
+            result = subprocess.run([sys.executable, "-c", probe], input=stdin, capture_output=True, check=False)
+            loaded = json.loads(result.stdout or b"null") if result.returncode == 0 else None
+            if loaded is None:
+                failures.append(f"cli.py {name} failed: {result.stderr.decode()[-300:]}")
+            elif loaded:
+                failures.append(f"cli.py {name} imported {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Database layer benchmarks at realistic scale
+
+Times every public Database method against synthetic datasets of 1k, 100k
+and 1M habit_completions rows and writes machine-readable JSON results.
+Results can be compared against a stored baseline to catch regressions.
+
+    python -m benchmarks.bench_database --scales 1k,100k --output results.json
+    python -m benchmarks.bench_database --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_database --baseline benchmarks/baseline.json --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.synthetic import SCALES, generate
+from database import Database
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+RESULTS_SCHEMA = 1
+
+
+class Context:
+    """Handles shared by the benchmarks of one scale"""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.user_id = db.get_user()["id"]
+        self.habit_ids = [h["id"] for h in db.get_habits(self.user_id)]
+        self.goal_ids = [g["id"] for g in db.get_goals(self.user_id, include_completed=True)]
+        self.item_ids = [i["id"] for i in db.get_shop_items(999)]
+        self.note_ids = [n["id"] for n in db.get_notes(self.user_id)]
+        self.traditions = json.loads(db.get_user()["philosophy_traditions"])
+        self._cursor = 0
+        # Rich enough to buy anything so purchase_item always exercises the write path
+        db.update_user(self.user_id, gold=10 ** 12, gems=10 ** 9, level=999)
+
+    def next_habit(self) -> int:
+        self._cursor = (self._cursor + 1) % len(self.habit_ids)
+        return self.habit_ids[self._cursor]
+
+    def incomplete_step(self) -> int:
+        cursor = self.db.conn.cursor()
+        goal_id = self.goal_ids[0]
+        cursor.execute("UPDATE goals SET is_completed = 0 WHERE id = ?", (goal_id,))
+        cursor.execute("UPDATE goal_steps SET is_completed = 0 WHERE goal_id = ?", (goal_id,))
+        self.db.conn.commit()
+        return self.db.get_goal_steps(goal_id)[0]["id"]
+
+    def uncompleted_habit(self) -> int:
+        habit_id = self.next_habit()
+        self.db.conn.execute("DELETE FROM habit_completions WHERE habit_id = ? AND completion_date = ?",
+                             (habit_id, date.today().isoformat()))
+        self.db.conn.commit()
+        return habit_id
+
+
+class Bench(NamedTuple):
+    name: str
+    run: Callable[[Context, Any], Any]
+    setup: Optional[Callable[[Context], Any]] = None  # untimed, runs before every iteration
+
+
+BENCHMARKS: List[Bench] = [
+    # User
+    Bench("get_user", lambda c, _: c.db.get_user()),
+    Bench("create_user", lambda c, _: c.db.create_user("Bench User")),
+    Bench("update_user", lambda c, _: c.db.update_user(c.user_id, display_name="Bench")),
+    Bench("add_xp", lambda c, _: c.db.add_xp(c.user_id, 10)),
+    # Habits
+    Bench("create_habit", lambda c, _: c.db.create_habit(c.user_id, "Bench habit", category="fitness")),
+    Bench("get_habits", lambda c, _: c.db.get_habits(c.user_id)),
+    Bench("get_habits_all", lambda c, _: c.db.get_habits(c.user_id, active_only=False)),
+    Bench("get_habit", lambda c, _: c.db.get_habit(c.next_habit())),
+    Bench("update_habit", lambda c, _: c.db.update_habit(c.next_habit(), is_priority=0)),
+    Bench("delete_habit", lambda c, hid: c.db.delete_habit(hid),
+          setup=lambda c: c.db.create_habit(c.user_id, "Doomed habit")),
+    Bench("complete_habit", lambda c, hid: c.db.complete_habit(hid, c.user_id),
+          setup=lambda c: c.uncompleted_habit()),
+    Bench("is_habit_completed_today", lambda c, _: c.db.is_habit_completed_today(c.next_habit())),
+    Bench("get_today_completions", lambda c, _: c.db.get_today_completions(c.user_id)),
+    Bench("get_due_habit_ids", lambda c, _: c.db.get_due_habit_ids(c.user_id)),
+    Bench("get_due_habit_ids_cold", lambda c, _: c.db.get_due_habit_ids(c.user_id),
+          setup=lambda c: c.db.due_today.invalidate()),
+    # Goals
+    Bench("create_goal", lambda c, _: c.db.create_goal(c.user_id, "Bench goal", steps=[{"title": f"Step {i}"} for i in range(8)])),
+    Bench("get_goals", lambda c, _: c.db.get_goals(c.user_id)),
+    Bench("get_goals_all", lambda c, _: c.db.get_goals(c.user_id, include_completed=True)),
+    Bench("get_goal", lambda c, _: c.db.get_goal(c.goal_ids[0])),
+    Bench("get_goal_steps", lambda c, _: c.db.get_goal_steps(c.goal_ids[0])),
+    Bench("get_goal_progress", lambda c, _: c.db.get_goal_progress(c.goal_ids[0])),
+    Bench("complete_goal_step", lambda c, sid: c.db.complete_goal_step(sid, c.user_id),
+          setup=lambda c: c.incomplete_step()),
+    Bench("delete_goal", lambda c, gid: c.db.delete_goal(gid),
+          setup=lambda c: c.db.create_goal(c.user_id, "Doomed goal", steps=[{"title": "Only step"}])),
+    # Shop
+    Bench("get_shop_items", lambda c, _: c.db.get_shop_items(10)),
+    Bench("purchase_item", lambda c, _: c.db.purchase_item(c.user_id, c.item_ids[0])),
+    Bench("get_inventory", lambda c, _: c.db.get_inventory(c.user_id)),
+    # Quotes
+    Bench("get_random_quote", lambda c, _: c.db.get_random_quote(c.traditions)),
+    Bench("get_random_quote_any", lambda c, _: c.db.get_random_quote()),
+    # Notes
+    Bench("create_note", lambda c, _: c.db.create_note(c.user_id, "Bench note", "content")),
+    Bench("get_notes", lambda c, _: c.db.get_notes(c.user_id)),
+    Bench("update_note", lambda c, _: c.db.update_note(c.note_ids[0], is_pinned=0)),
+    Bench("delete_note", lambda c, nid: c.db.delete_note(nid),
+          setup=lambda c: c.db.create_note(c.user_id, "Doomed note")),
+    # Analytics
+    Bench("get_habit_stats_30d", lambda c, _: c.db.get_habit_stats(c.user_id, 30)),
+    Bench("get_habit_stats_365d", lambda c, _: c.db.get_habit_stats(c.user_id, 365)),
+]
+
+
+def dataset_path(scale: str) -> str:
+    """Generate (once) and return the cached dataset for a scale"""
+    config = SCALES[scale]
+    path = os.path.join(DATA_DIR, f"{scale}-{date.today().isoformat()}-{config.fingerprint()}.db")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        for stale in os.listdir(DATA_DIR):
+            if stale.startswith(f"{scale}-"):
+                os.remove(os.path.join(DATA_DIR, stale))
+        started = time.perf_counter()
+        counts = generate(path + ".tmp", config)
+        os.replace(path + ".tmp", path)
+        print(f"  generated {scale}: {counts['habit_completions']:,} completions "
+              f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def run_scale(scale: str, repeat: int, only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    source = dataset_path(scale)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Work on a copy so write benchmarks never pollute the cached dataset
+        work = os.path.join(tmp, "bench.db")
+        shutil.copyfile(source, work)
+        db = Database(work)
+        ctx = Context(db)
+        for bench in BENCHMARKS:
+            if only and bench.name not in only:
+                continue
+            samples = []
+            for i in range(repeat + 1):
+                arg = bench.setup(ctx) if bench.setup else None
+                started = time.perf_counter()
+                bench.run(ctx, arg)
+                elapsed = time.perf_counter() - started
+                if i:  # first iteration warms caches
+                    samples.append(elapsed)
+            results[bench.name] = summarize(samples)
+        db.conn.close()
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "git_revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Median-to-median ratios for every benchmark present in both result sets"""
+    rows = []
+    for scale, benches in results["results"].items():
+        for name, stats in benches.items():
+            base = baseline.get("results", {}).get(scale, {}).get(name)
+            if not base:
+                continue
+            ratio = stats["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+            status = "regressed" if ratio > threshold else "improved" if ratio < 1 / threshold else "same"
+            rows.append({"scale": scale, "benchmark": name, "baseline_ms": base["median_ms"],
+                         "current_ms": stats["median_ms"], "ratio": ratio, "status": status})
+    return rows
+
+
+def print_table(results: Dict, comparison: Optional[List[Dict]]):
+    lookup = {(r["scale"], r["benchmark"]): r for r in comparison or []}
+    for scale, benches in results["results"].items():
+        print(f"\n== {scale} ==")
+        print(f"{'benchmark':<26}{'median ms':>12}{'p95 ms':>12}{'baseline':>12}{'ratio':>8}")
+        for name, stats in benches.items():
+            row = lookup.get((scale, name))
+            extra = f"{row['baseline_ms']:>12.3f}{row['ratio']:>7.2f}x {row['status']}" if row else ""
+            print(f"{name:<26}{stats['median_ms']:>12.3f}{stats['p95_ms']:>12.3f}{extra}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1k,100k,1m", help="comma-separated scales (%s)" % ", ".join(SCALES))
+    parser.add_argument("--repeat", type=int, default=20, help="timed iterations per benchmark")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--output", help="write JSON results to this path")
+    parser.add_argument("--baseline", help="compare against a stored results file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="median ratio counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any benchmark regressed")
+    args = parser.parse_args(argv)
+
+    only = args.only.split(",") if args.only else None
+    results = {"schema": RESULTS_SCHEMA, "suite": "database", "environment": environment(),
+               "repeat": args.repeat, "results": {}}
+    for scale in args.scales.split(","):
+        if scale not in SCALES:
+            parser.error(f"unknown scale {scale!r}")
+        print(f"running {scale}...", file=sys.stderr)
+        results["results"][scale] = run_scale(scale, args.repeat, only)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare(results, json.load(f), args.threshold)
+        results["comparison"] = comparison
+    print_table(results, comparison)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {path}", file=sys.stderr)
+
+    if args.fail_on_regression and comparison and any(r["status"] == "regressed" for r in comparison):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Streamed goal-plan scenarios against a local fake Messages API
+
+Measures time to the first parsed step versus the whole plan for
+AIService.generate_goal_steps_stream, and checks that a malformed or cut-off
+tail keeps the steps that already arrived, that an overloaded reply before
+the first event is retried, and that the scheduler slot is freed once the
+response ends even if the consumer is slow or stops reading. Exits non-zero
+if any expectation fails.
+
+    python -m benchmarks.bench_goal_stream
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from ai_scheduler import AIRequestScheduler
+from ai_service import AIService
+from benchmarks.fake_anthropic import FakeAnthropicServer, default_reply
+
+
+def run_stream(server: FakeAnthropicServer, ai: Optional[AIService] = None) -> Dict:
+    os.environ["ANTHROPIC_BASE_URL"] = server.url
+    ai = ai or AIService(api_key="sk-ant-fake")
+    started = time.perf_counter()
+    first_step, steps, plan = None, 0, None
+    for kind, payload in ai.generate_goal_steps_stream("Learn the guitar"):
+        if kind == "step":
+            steps += 1
+            first_step = first_step or time.perf_counter() - started
+        else:
+            plan = payload
+    return {"first_step_s": first_step or 0.0, "total_s": time.perf_counter() - started, "streamed": steps,
+            "plan": plan, "upstream": server.requests}
+
+
+def scenario_progressive() -> Dict:
+    with FakeAnthropicServer(stream_chunk=24, stream_delay=0.02) as server:
+        report = run_stream(server)
+    report["checks"] = {"first step well before the full plan": report["first_step_s"] < report["total_s"] / 2,
+                        "every step streamed": report["streamed"] == len(report["plan"]["steps"]) == 7}
+    return report
+
+
+def scenario_malformed_tail() -> Dict:
+    def reply(body: Dict) -> str:
+        text = default_reply(body)
+        return text[:text.index('{"title": "Milestone 5"')] + '{"title": "Milestone 5", "descr'
+
+    with FakeAnthropicServer(reply=reply) as server:
+        report = run_stream(server)
+    report["checks"] = {"kept the four complete steps": len(report["plan"]["steps"]) == 4,
+                        "kept top-level fields": report["plan"].get("title") == "Fake Quest",
+                        "no second request": report["upstream"] == 1}
+    return report
+
+
+def scenario_retry() -> Dict:
+    with FakeAnthropicServer(fail_first=[529, 529]) as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.url
+        scheduler = AIRequestScheduler(base_delay=0.05)
+        report = run_stream(server, AIService(api_key="sk-ant-fake", scheduler=scheduler))
+    report["checks"] = {"overloaded replies retried before the first event": report["upstream"] == 3,
+                        "every step streamed": report["streamed"] == len(report["plan"]["steps"]) == 7,
+                        "retries counted": scheduler.stats["retries"] == 2}
+    return report
+
+
+def scenario_slow_consumer() -> Dict:
+    with FakeAnthropicServer(stream_chunk=24) as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.url
+        scheduler = AIRequestScheduler(max_concurrency=1, latency_budget=2.0)
+        ai = AIService(api_key="sk-ant-fake", scheduler=scheduler)
+        started = time.perf_counter()
+        stream = ai.generate_goal_steps_stream("Learn the guitar")
+        next(stream)
+        time.sleep(0.3)  # a slow render; the response has long finished arriving
+        freed = scheduler._slots.acquire(timeout=0)
+        if freed:
+            scheduler._slots.release()
+        del stream  # abandoned mid-plan, as when a Streamlit rerun interrupts the script
+        report = run_stream(server, ai)
+        report["first_step_s"] = report["total_s"] = time.perf_counter() - started
+    report["checks"] = {"slot free while the consumer is still reading": freed,
+                        "next stream runs after an abandoned one": len(report["plan"]["steps"]) == 7}
+    return report
+
+
+SCENARIOS = {
+    "progressive": scenario_progressive,
+    "malformed_tail": scenario_malformed_tail,
+    "retry": scenario_retry,
+    "slow_consumer": scenario_slow_consumer,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    failed = 0
+    for name, scenario in SCENARIOS.items():
+        report = scenario()
+        print(f"{name:<16} first_step={report['first_step_s']:.2f}s total={report['total_s']:.2f}s "
+              f"streamed={report['streamed']}")
+        for check, ok in report["checks"].items():
+            failed += not ok
+            print(f"    [{'ok' if ok else 'FAIL'}] {check}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
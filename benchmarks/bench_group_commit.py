@@ -0,0 +1,88 @@
+"""
+Write throughput under bursty concurrent load, with and without group commit
+
+Simulates a morning check-in spike: many session threads write at once
+(notes, habit completions, profile updates) against one shared Database.
+Reports writes per second and, for the group-commit writer, how many
+commits the burst needed and the largest batch. The shared connection is
+not safe for concurrent writers on its own, so the direct baseline
+serializes each call behind a lock (one commit per write).
+
+    python -m benchmarks.bench_group_commit --sessions 32 --writes 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from database import Database
+
+
+class Serialized:
+    """One call at a time on the shared connection, as direct writes require"""
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self._db, name)
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return method(*args, **kwargs)
+        return call
+
+
+def burst(db, sessions: int, writes: int) -> float:
+    uid = db.create_user("Bench")
+    habits = [db.create_habit(uid, f"Habit {i}") for i in range(sessions)]
+
+    def session(i: int):
+        db.complete_habit(habits[i], uid)
+        for n in range(writes):
+            if n % 2:
+                db.create_note(uid, f"Session {i} note {n}", "check-in")
+            else:
+                db.update_user(uid, last_activity_date=f"2030-01-{1 + n % 28:02d}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    return time.perf_counter() - started
+
+
+def run(mode: str, tmp: str, sessions: int, writes: int) -> Dict:
+    db = Database(os.path.join(tmp, f"{mode}.db"), group_commit=mode == "group")
+    elapsed = burst(db if db.writer else Serialized(db), sessions, writes)
+    total = sessions * (writes + 1)
+    report = {"mode": mode, "writes": total, "seconds": elapsed, "writes_per_s": total / elapsed}
+    if db.writer:
+        report.update(db.writer.stats)
+    db.close()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=32, help="concurrent session threads")
+    parser.add_argument("--writes", type=int, default=50, help="writes per session")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("direct", "group"):
+            r = run(mode, tmp, args.sessions, args.writes)
+            line = f"{mode:<7} {r['writes']} writes in {r['seconds']:.2f}s  ({r['writes_per_s']:,.0f}/s)"
+            if "batches" in r:
+                line += f"  commits={r['batches']} max_batch={r['max_batch']} failed={r['failed_jobs']}"
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Per-habit completion history: SQL aggregation vs day bitmaps
+
+Copies a synthetic dataset and, for every habit of one user, answers the
+questions the Analytics page asks (current streak, completions and rate over
+the last 30 and 365 days, a 53-week calendar heatmap) twice: with SQL over
+habit_completions, and from the habit's day bitmap. Also times rebuilding
+every bitmap from the completion tables (the one-off migration) and reports
+the bitmap size. Exits non-zero if the two answers ever differ.
+
+    python -m benchmarks.bench_history --scale 100k
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import history
+from benchmarks.bench_database import dataset_path
+from benchmarks.synthetic import SCALES
+from database import Database
+
+
+def sql_answers(db: Database, habit_id: int, today: date) -> Dict:
+    conn = db.conn
+    iso = today.isoformat()
+
+    def done_since(days: int) -> int:
+        since = (today - timedelta(days=days - 1)).isoformat()
+        return conn.execute("SELECT COUNT(*) FROM habit_completions WHERE habit_id = ? AND completion_date BETWEEN ? AND ?",
+                            (habit_id, since, iso)).fetchone()[0]
+
+    days = [date.fromisoformat(d) for (d,) in conn.execute(
+        "SELECT completion_date FROM habit_completions WHERE habit_id = ? AND completion_date <= ? ORDER BY completion_date DESC",
+        (habit_id, iso))]
+    streak, expected = 0, today if days[:1] == [today] else today - timedelta(days=1)
+    for day in days:
+        if day != expected:
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+
+    last_sunday = today + timedelta(days=6 - today.weekday())
+    first = last_sunday - timedelta(days=53 * 7 - 1)
+    grid = [[0] * 53 for _ in range(7)]
+    for (day,) in conn.execute("SELECT completion_date FROM habit_completions WHERE habit_id = ? AND completion_date BETWEEN ? AND ?",
+                               (habit_id, first.isoformat(), last_sunday.isoformat())):
+        offset = (date.fromisoformat(day) - first).days
+        grid[offset % 7][offset // 7] = 1
+    return {"streak": streak, "30d": done_since(30), "365d": done_since(365), "heatmap": grid}
+
+
+def bitmap_answers(habit: Dict, today: date) -> Dict:
+    bitmap = history.of(habit)
+    return {"streak": history.streak(bitmap, today), "30d": history.count(bitmap, today, 30),
+            "365d": history.count(bitmap, today, 365), "heatmap": history.heatmap(bitmap, today)}
+
+
+def timed(fn: Callable, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per approach; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    failures = []
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        shutil.copy(dataset_path(args.scale), path)
+        db = Database(path)
+        started = time.perf_counter()
+        rebuilt = history.rebuild(db.conn, db.db_path)
+        db.conn.commit()
+        rebuild_seconds = time.perf_counter() - started
+        sizes = [len(row[0]) for row in db.conn.execute("SELECT history_bits FROM habits WHERE history_bits IS NOT NULL")]
+
+        habits = db.get_habits(db.get_user()["id"])
+        sql_seconds, sql = timed(lambda: [sql_answers(db, h["id"], today) for h in habits], args.repeat)
+        bitmap_seconds, bitmaps = timed(lambda: [bitmap_answers(h, today) for h in habits], args.repeat)
+        summary_seconds, _ = timed(lambda: [(history.streak(history.of(h), today), history.count(history.of(h), today, 365))
+                                            for h in habits], args.repeat)
+        for habit, expected, got in zip(habits, sql, bitmaps):
+            for key in expected:
+                if expected[key] != got[key]:
+                    failures.append(f"habit {habit['id']}: {key} differs")
+
+        # Completing a habit keeps its bitmap in step with the table
+        habit = habits[0]
+        db.conn.execute("DELETE FROM habit_completions WHERE habit_id = ? AND completion_date = ?",
+                        (habit["id"], today.isoformat()))
+        db.complete_habit(habit["id"], db.get_user()["id"])
+        if bitmap_answers(db.get_habit(habit["id"]), today) != sql_answers(db, habit["id"], today):
+            failures.append("bitmap out of step after complete_habit")
+        db.close()
+
+    per_habit = 1e6 / max(len(habits), 1)
+    print(f"{args.scale}: rebuilt {rebuilt:,} habit bitmaps in {rebuild_seconds:.2f}s; "
+          f"{sum(sizes) / max(len(sizes), 1):.0f} bytes per habit on average (max {max(sizes, default=0)})")
+    print(f"  streak + 30/365-day counts + 53-week heatmap, per habit:")
+    print(f"  {'SQL':<8} {sql_seconds * per_habit:10.1f} µs")
+    print(f"  {'bitmap':<8} {bitmap_seconds * per_habit:10.1f} µs  ({sql_seconds / bitmap_seconds:.0f}x)")
+    print(f"  streak + 365-day count alone from the bitmap: {summary_seconds * per_habit:.1f} µs per habit")
+    for failure in failures[:20]:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
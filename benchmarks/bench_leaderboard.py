@@ -0,0 +1,136 @@
+"""
+Leaderboards at team scale: incremental rank indexes vs sorting per render
+
+Fills a database with --users simulated users, loads the leaderboards from
+it and times "my rank" and top-10 queries on every board against what a
+render would otherwise do: sort every user (Python) or scan the user table
+(SQL). Then applies a stream of XP gains, streak changes and completions to
+the indexes, checking the ranks against a full re-sort afterwards, and rolls
+the weekly board over to a new week. Exits non-zero if any rank disagrees.
+
+    python -m benchmarks.bench_leaderboard --users 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import leaderboard
+from database import Database
+
+
+def timed(fn: Callable, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def reference_rank(scores: Dict[int, int], user_id: int) -> Optional[int]:
+    if user_id not in scores:
+        return None
+    return sum(1 for score in scores.values() if score > scores[user_id]) + 1
+
+
+def populate(db: Database, users: int, rng: random.Random):
+    db.conn.executemany("INSERT INTO user (name, total_xp, level, current_streak) VALUES (?, ?, ?, ?)", (
+        (f"Hunter {u}", rng.randint(0, 500_000), rng.randint(1, 60), rng.randint(0, 90)) for u in range(users)
+    ))
+    db.conn.commit()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--updates", type=int, default=50_000, help="score changes applied incrementally")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(7)
+    failures = []
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "team.db"))
+        populate(db, args.users, rng)
+        me = db.get_user()["id"]
+
+        started = time.perf_counter()
+        db.get_rank("total_xp", me)
+        load_seconds = time.perf_counter() - started
+        boards = db.leaderboards
+
+        print(f"{args.users:,} users: boards loaded in {load_seconds * 1e3:.0f} ms")
+        print(f"  {'per render':<28} {'my rank µs':>12} {'top 10 µs':>12}")
+        for metric, column in leaderboard.USER_METRICS.items():
+            rank_s, _ = timed(lambda: db.get_rank(metric, me), args.repeat)
+            top_s, _ = timed(lambda: db.get_leaderboard(metric, 10), args.repeat)
+            print(f"  {metric + ' (index)':<28} {rank_s * 1e6:>12.1f} {top_s * 1e6:>12.1f}")
+        rows = db.get_users()
+        sort_s, _ = timed(lambda: sorted(rows, key=lambda r: (-r["total_xp"], r["id"])), 3)
+        print(f"  {'total_xp (Python sort)':<28} {sort_s * 1e6:>12.1f} {sort_s * 1e6:>12.1f}")
+        sql_rank_s, _ = timed(lambda: db.conn.execute(
+            "SELECT COUNT(*) + 1 FROM user WHERE total_xp > (SELECT total_xp FROM user WHERE id = ?)", (me,)).fetchone(), 3)
+        sql_top_s, _ = timed(lambda: db.conn.execute(
+            "SELECT id, total_xp FROM user ORDER BY total_xp DESC, id LIMIT 10").fetchall(), 3)
+        print(f"  {'total_xp (SQL scan)':<28} {sql_rank_s * 1e6:>12.1f} {sql_top_s * 1e6:>12.1f}")
+
+        # Incremental maintenance: the same events the store reports on writes
+        ids = [row["id"] for row in rows]
+        xp = {row["id"]: row["total_xp"] for row in rows}
+        streaks = {row["id"]: row["current_streak"] for row in rows}
+        weekly: Dict[int, int] = {}
+        events = []
+        for _ in range(args.updates):
+            user_id = rng.choice(ids)
+            kind = rng.random()
+            if kind < 0.6:
+                xp[user_id] += rng.randint(10, 500)
+                events.append(lambda u=user_id, v=xp[user_id]: boards.user_changed(u, {"total_xp": v}))
+            elif kind < 0.8:
+                streaks[user_id] = streaks[user_id] + 1 if rng.random() < 0.8 else 0
+                events.append(lambda u=user_id, v=streaks[user_id]: boards.user_changed(u, {"current_streak": v}))
+            else:
+                weekly[user_id] = weekly.get(user_id, 0) + 1
+                events.append(lambda u=user_id: boards.completion_recorded(u, today))
+        started = time.perf_counter()
+        for event in events:
+            event()
+        update_seconds = time.perf_counter() - started
+        print(f"  {args.updates:,} incremental updates: {update_seconds / args.updates * 1e6:.1f} µs each")
+
+        for user_id in rng.sample(ids, 200) + [me]:
+            for metric, scores in (("total_xp", xp), ("current_streak", streaks), (leaderboard.WEEKLY, weekly)):
+                if db.get_rank(metric, user_id) != reference_rank(scores, user_id):
+                    failures.append(f"{metric} rank of user {user_id} differs from a full sort")
+        expected_top = sorted(xp, key=lambda u: (-xp[u], u))[:10]
+        if [e["user_id"] for e in db.get_leaderboard("total_xp", 10)] != expected_top:
+            failures.append("total_xp top 10 differs from a full sort")
+
+        # Writes through the store update the boards too
+        db.add_xp(me, 10_000_000)
+        if db.get_rank("total_xp", me) != 1:
+            failures.append("add_xp did not move the user to the top")
+
+        next_monday = today + timedelta(days=7 - today.weekday())
+        started = time.perf_counter()
+        rolled = boards.rank(leaderboard.WEEKLY, ids[0], today=next_monday)
+        roll_seconds = time.perf_counter() - started
+        print(f"  weekly board rollover: {roll_seconds * 1e6:.1f} µs")
+        if rolled is not None or boards.size(leaderboard.WEEKLY):
+            failures.append("weekly board not empty after rollover")
+        db.close()
+
+    for failure in failures[:20]:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
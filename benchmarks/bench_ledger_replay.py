@@ -0,0 +1,105 @@
+"""
+Economy ledger replay cost, with and without snapshots
+
+Seeds a ledger of random grant/spend events for one user (plus a crowd of
+other users for the multi-user replay), then times rebuilding the user's
+economy state three ways: a plain Python loop over every event, a numpy
+replay of the whole ledger, and the snapshot-bounded replay the app uses.
+Fails if any method disagrees with the others.
+
+    python -m benchmarks.bench_ledger_replay --events 200000 --users 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+import economy
+from database import Database
+
+
+def seed(db: Database, events: int, users: int, rng: random.Random) -> int:
+    uid = db.create_user("Bench")
+    db.conn.executemany("INSERT INTO user (name) VALUES (?)", [(f"Crowd {i}",) for i in range(users - 1)])
+    columns = economy.LEDGER_COLUMNS
+    rows = []
+    for i in range(events):
+        owner = uid if i % 2 == 0 or users <= 1 else rng.randint(uid + 1, uid + users - 1)
+        deltas = [rng.randint(10, 300), rng.randint(-50, 30), rng.randint(0, 2)] + [rng.randint(0, 1) for _ in columns[3:]]
+        rows.append((owner, "grant", "bench", i, *deltas))
+    db.conn.executemany(f"""
+        INSERT INTO economy_ledger (user_id, kind, source_type, source_id, {", ".join(columns)})
+        VALUES (?, ?, ?, ?, {", ".join("?" * len(columns))})
+    """, rows)
+    db.conn.commit()
+    return uid
+
+
+def python_replay(db: Database, uid: int) -> dict:
+    totals = dict.fromkeys(economy.LEDGER_COLUMNS, 0)
+    for event in db.get_ledger(uid):
+        for column in totals:
+            totals[column] += event[column]
+    state = {economy.USER_COLUMNS[c]: v for c, v in totals.items()}
+    level, xp = 1, state["total_xp"]
+    while xp >= db.xp_for_level(level):
+        xp -= db.xp_for_level(level)
+        level += 1
+    return dict(state, level=level, current_xp=xp)
+
+
+def timed(fn: Callable, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000, help="ledger events across all users")
+    parser.add_argument("--users", type=int, default=1000, help="users sharing the ledger")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per method; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "ledger.db"))
+        uid = seed(db, args.events, args.users, random.Random(args.seed))
+        all_rows = db.get_ledger_rows(uid)
+        # Worst case for the app: the latest snapshot is snapshot_every - 1 events old
+        ids = [row[0] for row in db.conn.execute("SELECT id FROM economy_ledger WHERE user_id = ? ORDER BY id", (uid,))]
+        cut = len(ids) - db.snapshot_every + 1
+        db.save_snapshot(uid, ids[cut - 1], economy.replay(all_rows[:cut]))
+        print(f"{len(all_rows):,} events for the user, {args.events:,} in the ledger")
+
+        results = {}
+        for name, fn in (
+            ("python loop", lambda: python_replay(db, uid)),
+            ("numpy, full ledger", lambda: economy.replay(db.get_ledger_rows(uid))),
+            ("numpy, from snapshot", lambda: db.rebuild_user_state(uid)),
+        ):
+            seconds, results[name] = timed(fn, args.repeat)
+            print(f"  {name:<22} {seconds * 1e3:>9.2f} ms")
+
+        cursor = db.conn.cursor()
+        cursor.row_factory = None
+        with_owner = cursor.execute(f"SELECT user_id, {', '.join(economy.LEDGER_COLUMNS)} FROM economy_ledger").fetchall()
+        seconds, states = timed(lambda: economy.replay_users(range(uid, uid + args.users), with_owner), args.repeat)
+        print(f"  {'numpy, every user':<22} {seconds * 1e3:>9.2f} ms  ({len(states):,} users)")
+        db.close()
+
+    reference = results["python loop"]
+    agree = all(state == reference for state in results.values()) and states[uid] == reference
+    print("states agree" if agree else "MISMATCH between replay methods")
+    return 0 if agree else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Space reclaimed and time taken by each database maintenance job
+
+Builds a database, bloats it with habits, completions and notes, deletes
+most of them (as delete_habit / delete_note do), then runs every
+maintenance job and reports duration and bytes reclaimed. Also checks that
+an older database without incremental auto-vacuum is only reported as
+pending by scheduled runs and gets converted by a manual run, and that a job
+over its time budget (a tenth of an unbounded VACUUM of the same file, built
+with at least TIME_BOX_HABITS whatever --habits says) is aborted without
+damaging the file. Exits non-zero if a job errors, nothing is reclaimed, the
+time box is not enforced or the integrity check fails.
+
+    python -m benchmarks.bench_maintenance --habits 2000
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from database import Database
+from maintenance import MaintenanceScheduler
+
+TIME_BOX_HABITS = 5000
+
+
+def bloat(path: str, habits: int, incremental: bool = True) -> Database:
+    """Left open in WAL mode (as the running app is) for the incremental case"""
+    db = Database(path)
+    if incremental:
+        db.conn.execute("PRAGMA journal_mode = WAL")
+    else:
+        db.conn.execute("PRAGMA auto_vacuum = NONE")
+        db.conn.execute("VACUUM")
+    uid = db.create_user("Bench")
+    cursor = db.conn.cursor()
+    cursor.executemany("INSERT INTO habits (user_id, title, description) VALUES (?, ?, ?)",
+                       [(uid, f"Habit {i}", "x" * 400) for i in range(habits)])
+    cursor.executemany("INSERT INTO notes (user_id, title, content) VALUES (?, ?, ?)",
+                       [(uid, f"Note {i}", "y" * 2000) for i in range(habits)])
+    db.conn.commit()
+    cursor.execute("DELETE FROM habits WHERE id % 10 != 0")
+    cursor.execute("DELETE FROM notes WHERE id % 10 != 0")
+    db.conn.commit()
+    if not incremental:
+        db.close()
+    return db
+
+
+def disk_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def report(result: dict):
+    print(f"  {result['job']:<20} {result['status']:<8} {result['seconds'] * 1e3:>8.1f} ms  "
+          f"{result['bytes_reclaimed'] / 1024:>9.1f} KB  {result.get('detail', '')}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--habits", type=int, default=2000, help="habits and notes inserted before deleting 90%%")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, incremental in (("incremental auto-vacuum", True), ("legacy database", False)):
+            path = os.path.join(tmp, f"{label.split()[0]}.db")
+            db = bloat(path, args.habits, incremental)
+            size = disk_size(path)
+            print(f"{label}: {size / 1024:.0f} KB after deletes (database + WAL)")
+            scheduler = MaintenanceScheduler(path, budget=10.0)
+            if not incremental:
+                result = scheduler.run("incremental_vacuum", manual=False)
+                report(result)
+                if result["status"] != "pending" or not scheduler.needs_conversion():
+                    failures.append("scheduled run tried the full VACUUM conversion")
+            for job in filter(scheduler.enabled, scheduler.intervals):
+                result = scheduler.run(job)
+                report(result)
+                if result["status"] not in ("ok", "busy"):
+                    failures.append(f"{label} {job}: {result['status']}")
+            reclaimed = size - disk_size(path)
+            print(f"  now {disk_size(path) / 1024:.0f} KB ({reclaimed / 1024:.0f} KB reclaimed)")
+            db.close()
+            if reclaimed <= 0:
+                failures.append(f"{label}: nothing reclaimed")
+
+        # At least TIME_BOX_HABITS rows (a small file vacuums before the progress handler first
+        # fires) and a budget relative to an unbounded VACUUM of a copy, so any --habits works
+        path = os.path.join(tmp, "budget.db")
+        bloat(path, max(args.habits, TIME_BOX_HABITS), incremental=False)
+        shutil.copyfile(path, path + ".copy")
+        conn = sqlite3.connect(path + ".copy", isolation_level=None)
+        started = time.monotonic()
+        conn.execute("VACUUM")
+        vacuum = time.monotonic() - started
+        conn.close()
+        budget = vacuum / 10
+        print(f"time box ({budget * 1e3:.2f} ms conversion budget, a tenth of a {vacuum * 1e3:.1f} ms full VACUUM):")
+        scheduler = MaintenanceScheduler(path, conversion_budget=budget)
+        result = scheduler.run("incremental_vacuum")
+        report(result)
+        if result["status"] != "timeout":
+            failures.append("time box not enforced")
+        check = scheduler.run("quick_check")
+        report(check)
+        if check["status"] != "ok":
+            failures.append("database damaged by an aborted job")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Per-page render benchmarks driven through Streamlit's AppTest
+
+Runs app.py headlessly against seeded synthetic databases, navigates to
+every page in the sidebar, reruns each page, and simulates the main clicks
+(Complete, Purchase, Send). For every step it records script run time, SQL
+statement count, element/widget counts and the serialized payload size.
+The JSON report is ordered deterministically so two versions can be diffed.
+
+    python -m benchmarks.bench_pages --scales 1k,100k --output pages.json
+    python -m benchmarks.bench_pages --baseline pages-main.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_database import dataset_path, environment
+from benchmarks.synthetic import SCALES
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+RESULTS_SCHEMA = 1
+
+
+class SQLCounter:
+    """Counts statements executed on the app's shared connection"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, statement: str):
+        self.count += 1
+
+
+class PageHarness:
+    """Wraps one AppTest session against one seeded database"""
+
+    def __init__(self, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        self.counter = SQLCounter()
+        self.at.run()
+        self._raise_on_exception()
+        self.db = self.at.session_state.db
+        self.db.conn.set_trace_callback(self.counter)
+
+    def _raise_on_exception(self):
+        if self.at.exception:
+            raise RuntimeError(f"app raised: {self.at.exception[0].value}")
+
+    def page_keys(self) -> List[str]:
+        return [b.key[len("nav_"):] for b in self.at.sidebar.button if b.key and b.key.startswith("nav_")]
+
+    def measure(self, action: Callable[[], None]) -> Dict[str, float]:
+        """Time one script run triggered by action and describe what it rendered"""
+        self.counter.count = 0
+        started = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - started
+        self._raise_on_exception()
+        elements = widgets = payload = 0
+        from streamlit.testing.v1.element_tree import Block, Widget
+
+        for root in (self.at.main, self.at.sidebar):
+            for node in root:
+                if isinstance(node, Block):
+                    continue
+                elements += 1
+                widgets += isinstance(node, Widget)
+                payload += node.proto.ByteSize() if getattr(node, "proto", None) is not None else 0
+        return {"run_ms": elapsed * 1000, "sql_statements": self.counter.count,
+                "elements": elements, "widgets": widgets, "payload_bytes": payload}
+
+    def navigate(self, page: str):
+        self.at.button(key=f"nav_{page}").click().run()
+
+    def rerun(self):
+        self.at.run()
+
+    def first_button(self, prefix: str, label: Optional[str] = None):
+        for button in self.at.button:
+            if label is not None and button.label != label:
+                continue
+            if (button.key or "").startswith(prefix) and not button.disabled:
+                return button
+        return None
+
+
+def _click(harness: PageHarness, prefix: str, label: Optional[str] = None) -> Optional[Callable[[], None]]:
+    button = harness.first_button(prefix, label)
+    return (lambda: button.click().run()) if button else None
+
+
+def run_scale(scale: str, repeat: int, timeout: float) -> Dict[str, Dict]:
+    import streamlit as st
+
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        work = os.path.join(tmp, "pages.db")
+        shutil.copyfile(dataset_path(scale), work)
+        os.environ["GOAL_QUEST_DB"] = work
+        os.environ["ANTHROPIC_API_KEY"] = ""  # offline fallbacks keep runs deterministic
+        os.environ["GOAL_QUEST_GROUP_COMMIT"] = "0"  # keep writes on the traced connection
+        st.cache_resource.clear()  # drop the previous scale's Database
+        harness = PageHarness(timeout)
+
+        def record(step: str, action: Callable[[], None], times: int = 1):
+            samples = [harness.measure(action) for _ in range(times)]
+            summary = dict(samples[-1])
+            summary["run_ms"] = statistics.median(s["run_ms"] for s in samples)
+            results[step] = summary
+
+        for page in harness.page_keys():
+            record(f"{page}/navigate", lambda: harness.navigate(page))
+            record(f"{page}/rerun", harness.rerun, repeat)
+
+            if page == "dashboard":
+                action = _click(harness, "complete_")
+                if action:
+                    record("dashboard/complete", action)
+            elif page == "shop":
+                action = _click(harness, "buy_")
+                if action:
+                    record("shop/purchase", action)
+            elif page == "coach":
+                harness.at.text_input(key="coach_input").input("How can I stay motivated?")
+                action = _click(harness, "", label="Send")
+                if action:
+                    record("coach/send", action)
+
+        harness.db.conn.set_trace_callback(None)
+        harness.db.conn.close()
+        st.cache_resource.clear()
+    return results
+
+
+def diff(results: Dict, baseline: Dict) -> List[Dict]:
+    rows = []
+    for scale, steps in results["results"].items():
+        for step, current in steps.items():
+            base = baseline.get("results", {}).get(scale, {}).get(step)
+            if base:
+                rows.append({"scale": scale, "step": step,
+                             **{f"{k}_delta": current[k] - base[k] for k in current if k in base}})
+    return rows
+
+
+def print_table(results: Dict, deltas: Optional[List[Dict]]):
+    lookup = {(d["scale"], d["step"]): d for d in deltas or []}
+    for scale, steps in results["results"].items():
+        print(f"\n== {scale} ==")
+        print(f"{'step':<24}{'run ms':>10}{'sql':>7}{'elems':>7}{'widgets':>9}{'bytes':>9}")
+        for step, r in steps.items():
+            d = lookup.get((scale, step))
+            extra = f"   Δ {d['run_ms_delta']:+.1f} ms, {d['sql_statements_delta']:+d} sql" if d else ""
+            print(f"{step:<24}{r['run_ms']:>10.1f}{r['sql_statements']:>7}{r['elements']:>7}"
+                  f"{r['widgets']:>9}{r['payload_bytes']:>9}{extra}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1k,100k", help="comma-separated scales (%s)" % ", ".join(SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="reruns per page (median is reported)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-run AppTest timeout in seconds")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--baseline", help="diff against a previous report")
+    args = parser.parse_args(argv)
+
+    report = {"schema": RESULTS_SCHEMA, "suite": "pages", "environment": environment(),
+              "repeat": args.repeat, "results": {}}
+    for scale in args.scales.split(","):
+        if scale not in SCALES:
+            parser.error(f"unknown scale {scale!r}")
+        print(f"running {scale}...", file=sys.stderr)
+        report["results"][scale] = run_scale(scale, args.repeat, args.timeout)
+
+    deltas = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            deltas = diff(report, json.load(f))
+        report["diff"] = deltas
+    print_table(report, deltas)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nwrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Prompt-prefix caching check against a local fake Messages API
+
+Sends repeated planner, assessment and coach requests through the real
+AIService and reports how many prompt tokens were billed as uncached input,
+cache writes and cache reads. The fake enforces the API's minimum cacheable
+prefix (ai_service.CACHE_MIN_TOKENS), so the numbers are what the real API
+would bill: the shared reference prefix (ai_service.GAME_REFERENCE) is
+written by the first call and read by every later call of every method, and
+a long coach conversation also caches its history for the next turn.
+
+    python -m benchmarks.bench_prompt_cache
+"""
+
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from ai_service import CACHE_MIN_TOKENS, GAME_REFERENCE, AIService
+from benchmarks.fake_anthropic import FakeAnthropicServer, _blocks, estimate_tokens
+from conversation import ConversationMemory
+from telemetry import AITelemetry
+
+USER = {"name": "Jin", "level": 7, "current_streak": 12, "strength": 9, "intelligence": 14,
+        "vitality": 8, "agility": 6, "sense": 10, "willpower": 11}
+HABITS = ["Meditate for 10 minutes", "Read 20 pages", "Run 5k", "Journal before bed", "Drink 2L of water"]
+GOALS = ["Learn the guitar", "Run a half marathon", "Ship a side project"]
+COACH_TURNS = ["How do I keep my streak going?", "I keep skipping workouts on Fridays.",
+               "What should I focus on this week?", "Any tips for reading more?"]
+# Long enough that the conversation prefix passes the cache minimum after a few turns
+LONG_TURN = ("Here is how my week went, day by day, with what I planned, what I actually did, how tired I felt "
+             "and what got in the way of my habits. ") * 6
+
+
+def usage(ai: AIService, method: str) -> Dict:
+    row = next(r for r in ai.telemetry.summary() if r["method"] == method)
+    return {key: row[key] for key in ("calls", "input_tokens", "cache_write_tokens", "cache_read_tokens")}
+
+
+def prefix_tokens(body: Dict, index: int) -> int:
+    return sum(estimate_tokens(block.get("text", "")) for block in _blocks(body)[:index + 1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp, FakeAnthropicServer() as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.url
+        ai = AIService(api_key="sk-ant-fake", telemetry=AITelemetry(os.path.join(tmp, "cache.db")))
+        for habit in HABITS:
+            ai.assess_habit_difficulty(habit, USER)
+        for goal in GOALS:
+            ai.generate_goal_steps(goal)
+        memory = ConversationMemory()
+        for turn in COACH_TURNS:
+            ai.chat(turn, USER, memory=memory)
+        long_memory = ConversationMemory(token_budget=4000)
+        for turn in range(8):
+            ai.chat(f"Week {turn + 1}. {LONG_TURN}", USER, memory=long_memory)
+
+        reference = estimate_tokens(GAME_REFERENCE)
+        print(f"cacheable prefix minimum: {CACHE_MIN_TOKENS} tokens, shared reference: {reference} tokens")
+        for method in ("assess_habit_difficulty", "generate_goal_steps", "chat"):
+            row = usage(ai, method)
+            prompt = row["input_tokens"] + row["cache_write_tokens"] + row["cache_read_tokens"]
+            hit_rate = row["cache_read_tokens"] / prompt if prompt else 0.0
+            print(f"{method:<24} calls={row['calls']:<2} input={row['input_tokens']:<6} "
+                  f"write={row['cache_write_tokens']:<6} read={row['cache_read_tokens']:<6} "
+                  f"hit={hit_rate:5.1%}")
+            if method == "assess_habit_difficulty":
+                checks = {"first call writes the shared reference": row["cache_write_tokens"] == reference,
+                          "later calls read it": row["cache_read_tokens"] == (row["calls"] - 1) * reference}
+            elif method == "generate_goal_steps":
+                checks = {"another method's cached reference is read on every call":
+                          row["cache_write_tokens"] == 0 and row["cache_read_tokens"] == row["calls"] * reference}
+            else:
+                checks = {"long conversations read the cached history": row["cache_read_tokens"] > row["calls"] * reference,
+                          "history written once per turn, not re-read as input": row["cache_write_tokens"] < prompt}
+            for check, ok in checks.items():
+                failed += not ok
+                print(f"    [{'ok' if ok else 'FAIL'}] {check}")
+        ok = all(prefix_tokens(body, index) >= CACHE_MIN_TOKENS for body in server.bodies
+                 for index, block in enumerate(_blocks(body)) if block.get("cache_control"))
+        failed += not ok
+        print(f"    [{'ok' if ok else 'FAIL'}] every breakpoint sits on a prefix the API caches")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
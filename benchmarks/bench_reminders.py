@@ -0,0 +1,163 @@
+"""
+Reminders at scale: a heap of next fire times vs polling every row
+
+Fills a database with --users users, each with habits on mixed schedules and
+goals with upcoming due dates (tens of thousands of reminders in all), loads
+a ReminderEngine and times a tick when nothing is due against re-reading and
+re-evaluating every habit and goal, which is what a poller does each tick.
+Then completes and edits some habits, replays a whole day minute by minute
+and checks that exactly the expected reminders fired, once each, through a
+file sink and a webhook sink pointed at a local HTTP server standing in for
+an email or chat relay. Exits non-zero on any mismatch.
+
+    python -m benchmarks.bench_reminders --users 500
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import reminders
+import schedule
+from database import Database
+
+FREQUENCIES = ("daily", schedule.on_days([0, 2, 4]), schedule.on_days([5, 6]), schedule.every(2), schedule.every(3),
+               schedule.per_week(3), "weekly")
+
+
+class Relay(BaseHTTPRequestHandler):
+    """Local stand-in for an email/chat relay: remembers every POSTed reminder"""
+    received: List[dict] = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append(json.loads(body))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def populate(db: Database, users: int, habits: int, goals: int, today: date, rng: random.Random):
+    db.conn.executemany("INSERT INTO user (name) VALUES (?)", ((f"Hunter {u}",) for u in range(users)))
+    user_ids = [row[0] for row in db.conn.execute("SELECT id FROM user")]
+    db.conn.executemany("INSERT INTO habits (user_id, title, frequency, is_active, created_at) VALUES (?, ?, ?, ?, ?)", (
+        (uid, f"Habit {h}", rng.choice(FREQUENCIES), int(rng.random() > 0.05),
+         f"{(today - timedelta(days=rng.randint(0, 60))).isoformat()} 08:00:00")
+        for uid in user_ids for h in range(habits)))
+    db.conn.executemany("INSERT INTO goals (user_id, title, due_date, is_completed) VALUES (?, ?, ?, ?)", (
+        (uid, f"Goal {g}", (today + timedelta(days=rng.randint(-3, 30))).isoformat() if rng.random() > 0.1 else None,
+         int(rng.random() < 0.1))
+        for uid in user_ids for g in range(goals)))
+    db.conn.commit()
+    return user_ids
+
+
+def poll(db: Database, now: datetime, at: dtime) -> int:
+    """What a poller does every tick: re-read every row and decide what is due"""
+    due = 0
+    for habit in db.conn.execute("SELECT id, frequency, created_at FROM habits WHERE is_active = 1"):
+        due += now.time() >= at and schedule.is_due(habit, now.date())
+    for goal in db.conn.execute("SELECT id, due_date FROM goals WHERE is_completed = 0 AND due_date IS NOT NULL"):
+        due += goal["due_date"] <= (now.date() + timedelta(days=1)).isoformat()
+    return due
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--habits", type=int, default=40, help="habits per user")
+    parser.add_argument("--goals", type=int, default=10, help="goals per user")
+    parser.add_argument("--changes", type=int, default=2000, help="habit edits and completions before the day runs")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(11)
+    failures = []
+    today = date.today()
+    midnight = datetime.combine(today, dtime())
+    relay = ThreadingHTTPServer(("127.0.0.1", 0), Relay)
+    threading.Thread(target=relay.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "reminders.db"))
+        user_ids = populate(db, args.users, args.habits, args.goals, today, rng)
+        log_path = os.path.join(tmp, "reminders.jsonl")
+        sinks = [reminders.FileSink(log_path), reminders.WebhookSink(f"http://127.0.0.1:{relay.server_port}/remind")]
+        engine = reminders.ReminderEngine(db, sinks)
+
+        started = time.perf_counter()
+        engine.tick(midnight)
+        load_seconds = time.perf_counter() - started
+        pending = len(engine)
+
+        quiet = midnight + timedelta(minutes=1)
+        ticks = 2000
+        started = time.perf_counter()
+        for _ in range(ticks):
+            engine.tick(quiet)
+        tick_seconds = (time.perf_counter() - started) / ticks
+        started = time.perf_counter()
+        poll(db, quiet, engine.habit_time)
+        poll_seconds = time.perf_counter() - started
+
+        # Edits and completions reach the engine through the store's listeners
+        habits = [dict(row) for row in db.conn.execute("SELECT * FROM habits WHERE is_active = 1")]
+        completed, paused = set(), set()
+        for habit in rng.sample(habits, min(args.changes, len(habits))):
+            if rng.random() < 0.5:
+                db.complete_habit(habit["id"], habit["user_id"])
+                completed.add(habit["id"])
+            else:
+                db.update_habit(habit["id"], is_active=0)
+                paused.add(habit["id"])
+        started = time.perf_counter()
+        engine.tick(quiet)
+        refresh_seconds = time.perf_counter() - started
+
+        # A whole day, one tick a minute
+        fired = []
+        started = time.perf_counter()
+        for minute in range(2, 24 * 60):
+            fired.extend(engine.tick(midnight + timedelta(minutes=minute)))
+        day_seconds = time.perf_counter() - started
+        relay.shutdown()
+
+        expected_habits = {h["id"] for h in habits if schedule.is_due(h, today)} - completed - paused
+        expected_goals = {row[0] for row in db.conn.execute(
+            "SELECT id FROM goals WHERE is_completed = 0 AND due_date IN (?, ?)",
+            (today.isoformat(), (today + timedelta(days=1)).isoformat()))}
+        got = [(r["kind"], r["id"]) for r in fired]
+        if len(got) != len(set(got)):
+            failures.append("a reminder fired twice")
+        if {i for kind, i in got if kind == "habit"} != expected_habits:
+            failures.append("habit reminders differ from the habits due and not done today")
+        if {i for kind, i in got if kind == "goal"} != expected_goals:
+            failures.append("goal reminders differ from the goals due today or tomorrow")
+        with open(log_path, encoding="utf-8") as f:
+            if sum(1 for _ in f) != len(fired):
+                failures.append("file sink missed reminders")
+        if len(Relay.received) != len(fired):
+            failures.append(f"webhook relay received {len(Relay.received)} of {len(fired)} reminders")
+        db.close()
+
+    print(f"{args.users:,} users: {pending:,} pending reminders loaded in {load_seconds * 1e3:.0f} ms")
+    print(f"  tick with nothing due (heap)  {tick_seconds * 1e6:10.1f} µs")
+    print(f"  re-evaluating every row (poll) {poll_seconds * 1e6:9.1f} µs  ({poll_seconds / tick_seconds:.0f}x)")
+    print(f"  {args.changes:,} edits/completions re-planned in one tick: {refresh_seconds * 1e3:.1f} ms "
+          f"({refresh_seconds / max(args.changes, 1) * 1e6:.0f} µs each)")
+    print(f"  one day at one tick a minute: {len(fired):,} reminders delivered to file + webhook in {day_seconds:.2f}s")
+    for failure in failures[:20]:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
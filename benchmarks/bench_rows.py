@@ -0,0 +1,126 @@
+"""
+Row objects: dict(sqlite3.Row) per row vs slotted rows.Row records
+
+Copies a synthetic dataset and runs the Database read methods the app calls
+most (every completion for the export, a user's habits, notes and goals with
+their steps) twice: once with each row built as sqlite3.Row and copied into a
+dict (the previous behaviour), once with the rows module's generated slotted
+classes. Reports the fastest time and the memory the returned rows hold
+(tracemalloc), plus the peak memory of streaming the export through
+iter_completions instead of building the list. Exits non-zero if the two
+approaches ever return different rows.
+
+    python -m benchmarks.bench_rows --scale 100k
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.bench_database import dataset_path
+from benchmarks.synthetic import SCALES
+from database import Database
+
+
+def as_dict(cursor: sqlite3.Cursor, values: tuple) -> dict:
+    return dict(sqlite3.Row(cursor, values))
+
+
+def dict_rows(db: Database):
+    """Make db build plain dicts the way it used to"""
+    def cursor(kind: str) -> sqlite3.Cursor:
+        c = db.conn.cursor()
+        c.row_factory = as_dict
+        return c
+    db._cursor = cursor
+
+
+def timed(fn: Callable, repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        result = None
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def held(fn: Callable) -> Tuple[int, object]:
+    """Bytes still allocated by fn's result once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+
+
+def peak(fn: Callable) -> int:
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per approach; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rows.db")
+        shutil.copy(dataset_path(args.scale), path)
+        slotted, dicts = Database(path), Database(path)
+        dict_rows(dicts)
+        user_id = slotted.get_user()["id"]
+        reads = {
+            "export_completions (all)": lambda db: db.export_completions(user_id),
+            "get_habits": lambda db: db.get_habits(user_id, active_only=False),
+            "get_notes": lambda db: db.get_notes(user_id),
+            "get_goals (with steps)": lambda db: db.get_goals(user_id, include_completed=True),
+        }
+
+        results = []
+        for name, read in reads.items():
+            dict_s, expected = timed(lambda: read(dicts), args.repeat)
+            slot_s, got = timed(lambda: read(slotted), args.repeat)
+            if got != expected or [list(row) for row in got] != [list(row) for row in expected]:
+                failures.append(f"{name}: slotted rows differ from dict rows")
+            expected = got = None
+            dict_bytes = held(lambda: read(dicts))[0]
+            slot_bytes = held(lambda: read(slotted))[0]
+            results.append((name, len(read(slotted)), dict_s, slot_s, dict_bytes, slot_bytes))
+
+        listed = peak(lambda: sum(1 for _ in dicts.export_completions(user_id)))
+        streamed = peak(lambda: sum(1 for _ in slotted.iter_completions(user_id)))
+        if sum(1 for _ in slotted.iter_completions(user_id)) != len(slotted.export_completions(user_id)):
+            failures.append("iter_completions and export_completions disagree")
+        slotted.close()
+        dicts.close()
+
+    print(f"{args.scale}: rows for one user, dict(sqlite3.Row) vs slotted rows")
+    print(f"  {'':<26} {'rows':>8} {'dict ms':>9} {'slot ms':>9} {'dict MB':>9} {'slot MB':>9}")
+    for name, count, dict_s, slot_s, dict_bytes, slot_bytes in results:
+        print(f"  {name:<26} {count:8,} {dict_s * 1e3:9.1f} {slot_s * 1e3:9.1f} "
+              f"{dict_bytes / 2 ** 20:9.2f} {slot_bytes / 2 ** 20:9.2f}")
+    print(f"  export peak memory: list of dicts {listed / 2 ** 20:.2f} MB, "
+          f"streamed slotted rows {streamed / 2 ** 10:.0f} KB")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
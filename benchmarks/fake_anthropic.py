@@ -0,0 +1,264 @@
+"""
+Local stand-in for the Anthropic Messages API
+
+Serves POST /v1/messages on localhost with canned but well-formed replies
+for each AIService prompt, configurable latency and injected failures
+(429 with Retry-After, 529 overloaded). It counts requests and peak
+concurrency so scheduler behaviour can be checked without network access.
+Requests with "stream": true are answered as server-sent events, in
+stream_chunk sized text deltas spaced stream_delay apart. Prompt caching is
+simulated: every cache_control breakpoint whose prefix reaches
+min_cache_tokens (1024 by default, the Sonnet minimum; shorter breakpoints are
+ignored as by the real API) stores a hash of the prefix up to it. Later
+requests read the longest stored prefix found at a breakpoint or at one of
+the LOOKBACK_BLOCKS block boundaries before it (so a breakpoint that moves
+forward each conversation turn still hits) and report it as
+cache_read_input_tokens instead of input_tokens.
+
+    with FakeAnthropicServer(latency=0.2, fail_first=[529, 529]) as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.url
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+ERRORS = {
+    429: ("rate_limit_error", "Rate limited"),
+    500: ("api_error", "Internal server error"),
+    529: ("overloaded_error", "Overloaded"),
+}
+
+
+# Block boundaries before each breakpoint the real API also checks for a cached prefix
+LOOKBACK_BLOCKS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _request_text(body: Dict) -> str:
+    parts = []
+    system = body.get("system")
+    if isinstance(system, str):
+        parts.append(system)
+    elif isinstance(system, list):
+        parts.extend(block.get("text", "") for block in system)
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [])
+    return "\n".join(parts)
+
+
+def _blocks(body: Dict) -> List[Dict]:
+    """Request content in prefix order: system blocks, then message blocks"""
+    system = body.get("system")
+    blocks = [{"type": "text", "text": system}] if isinstance(system, str) else list(system or [])
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            blocks.append({"type": "text", "text": content, "role": message.get("role")})
+        else:
+            blocks.extend({**block, "role": message.get("role")} for block in content or [])
+    return blocks
+
+
+def default_reply(body: Dict) -> str:
+    """Plausible replies keyed off the wording of each AIService prompt"""
+    text = _request_text(body)
+    if "Assess each habit" in text:
+        listing = text[text.index("Habits: ") + len("Habits: "):].split("\n", 1)[0]
+        return json.dumps({"assessments": [
+            {"id": item["id"], "difficulty": 2 + i % 4, "difficulty_name": "Medium", "xp_reward": 150,
+             "category": "mindfulness", "target_stat": "willpower", "time_estimate": "15 minutes",
+             "tip": f"Tie '{item['habit']}' to an existing routine."}
+            for i, item in enumerate(json.loads(listing))
+        ]})
+    if "Analyze this habit" in text:
+        return json.dumps({
+            "difficulty": 3, "difficulty_name": "Medium", "xp_reward": 150, "category": "mindfulness",
+            "target_stat": "willpower", "time_estimate": "15 minutes", "tip": "Anchor it to your morning coffee.",
+            "reasoning": {"time_factor": 2, "mental_effort": 3, "physical_effort": 1,
+                          "skill_required": 2, "consistency_need": 4},
+        })
+    if "Create a detailed action plan" in text:
+        steps = [{"title": f"Milestone {i}", "description": f"Work on milestone {i}", "estimated_duration": "1 week",
+                  "xp_reward": 200 + 25 * i, "suggested_habit": None} for i in range(1, 8)]
+        return json.dumps({
+            "title": "Fake Quest", "difficulty": 3, "difficulty_name": "Medium", "total_xp": 2500,
+            "category": "learning", "target_stat": "intelligence", "estimated_weeks": 12, "steps": steps,
+            "suggested_habits": [{"title": "Daily practice", "description": "15 minutes", "frequency": "daily",
+                                  "category": "learning"}],
+        })
+    if "Analyze this document" in text:
+        return json.dumps({"title": "Fake Document", "summary": "A document.", "habits": [], "goals": [],
+                           "quotes": [], "key_concepts": []})
+    return "Keep going, Hunter. Small steps every day compound into mastery."
+
+
+class FakeAnthropicServer:
+    """Threaded HTTP server speaking just enough of the Messages API"""
+
+    def __init__(self, latency: float = 0.0, fail_first: Optional[List[int]] = None,
+                 fail_always: Optional[int] = None, retry_after: Optional[float] = None,
+                 reply: Callable[[Dict], str] = default_reply, min_cache_tokens: int = 1024,
+                 stream_chunk: int = 40, stream_delay: float = 0.0):
+        self.latency = latency
+        self.fail_plan = list(fail_first or [])
+        self.fail_always = fail_always
+        self.retry_after = retry_after
+        self.reply = reply
+        self.min_cache_tokens = min_cache_tokens
+        self.stream_chunk = stream_chunk
+        self.stream_delay = stream_delay
+        self.cache: set = set()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.bodies: List[Dict] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAnthropicServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _next_failure(self) -> Optional[int]:
+        with self._lock:
+            if self.fail_plan:
+                return self.fail_plan.pop(0)
+        return self.fail_always
+
+    def cache_usage(self, body: Dict) -> Dict[str, int]:
+        """Split prompt tokens into uncached, cache-write and cache-read like the real API"""
+        digest = hashlib.sha256()
+        total = cached = written = 0
+        prefixes, breakpoints = [], []
+        for block in _blocks(body):
+            text = block.get("text", "")
+            digest.update(f"{block.get('role')}\x00{text}\x00".encode("utf-8"))
+            total += estimate_tokens(text)
+            prefixes.append((digest.hexdigest(), total))
+            if block.get("cache_control") and total >= self.min_cache_tokens:
+                breakpoints.append((len(prefixes) - 1, *prefixes[-1]))
+        with self._lock:
+            for index, _, _ in breakpoints:
+                for key, tokens in prefixes[max(0, index - LOOKBACK_BLOCKS):index + 1]:
+                    if key in self.cache:
+                        cached = max(cached, tokens)
+            for _, key, tokens in breakpoints:
+                if tokens > cached:
+                    written = tokens - cached
+                self.cache.add(key)
+        return {"input_tokens": total - cached - written, "cache_creation_input_tokens": written,
+                "cache_read_input_tokens": cached}
+
+    def message(self, body: Dict) -> Dict:
+        text = self.reply(body)
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+            "model": body.get("model"), "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {**self.cache_usage(body), "output_tokens": estimate_tokens(text)},
+        }
+
+    def events(self, body: Dict):
+        """The message as Messages API stream events"""
+        message = self.message(body)
+        text = message["content"][0]["text"]
+        usage = message["usage"]
+        yield "message_start", {"type": "message_start", "message": {
+            **message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 1}}}
+        yield "content_block_start", {"type": "content_block_start", "index": 0,
+                                      "content_block": {"type": "text", "text": ""}}
+        for start in range(0, len(text), self.stream_chunk):
+            if self.stream_delay:
+                time.sleep(self.stream_delay)
+            yield "content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": "text_delta", "text": text[start:start + self.stream_chunk]}}
+        yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+        yield "message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": usage["output_tokens"]}}
+        yield "message_stop", {"type": "message_stop"}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body: Dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for event, data in fake.events(body):
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.close_connection = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    fake.bodies.append(body)
+                try:
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    if not self.path.startswith("/v1/messages"):
+                        self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+                        return
+                    failure = fake._next_failure()
+                    if failure:
+                        kind, message = ERRORS.get(failure, ("api_error", "Error"))
+                        headers = {"retry-after": str(fake.retry_after)} if fake.retry_after is not None else {}
+                        self._send(failure, {"type": "error", "error": {"type": kind, "message": message}}, headers)
+                        return
+                    if body.get("stream"):
+                        self._stream(body)
+                    else:
+                        self._send(200, fake.message(body))
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+        return Handler
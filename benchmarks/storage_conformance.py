@@ -0,0 +1,455 @@
+"""
+Storage backend conformance suite
+
+Runs one set of behavioural checks against every StorageBackend
+implementation (SQLite Database on a temporary file, with and without the
+group-commit writer, and MemoryStorage) so they stay interchangeable, then
+reports how long each backend took per check. Exits non-zero if any check
+fails on any backend.
+
+    python -m benchmarks.storage_conformance
+    python -m benchmarks.storage_conformance --backends memory --repeat 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import economy
+import history
+import reminders
+import rows
+import schedule
+from database import Database
+from storage import MemoryStorage, StorageBackend
+
+
+class CheckFailed(AssertionError):
+    pass
+
+
+def expect(condition: bool, message: str):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def new_user(db: StorageBackend) -> int:
+    return db.create_user("Tester", display_name="Shadow", onboarding_complete=1)
+
+
+def check_users(db: StorageBackend):
+    expect(db.get_user() is None, "fresh store has no user")
+    uid = new_user(db)
+    user = db.get_user()
+    expect(user["id"] == uid and user["name"] == "Tester", "created user is returned")
+    expect((user["level"], user["gold"], user["gems"], user["strength"]) == (1, 100, 10, 1), "schema defaults applied")
+    expect(db.update_user(uid, gold=250) and db.get_user()["gold"] == 250, "update_user persists")
+    expect(not db.update_user(uid), "empty update is a no-op")
+    result = db.add_xp(uid, 250)
+    expect(result["leveled_up"] and result["new_level"] == 2 and result["new_xp"] == 150, "add_xp levels up")
+    expect(db.get_user()["total_xp"] == 250, "total_xp accumulates")
+
+
+def check_habits(db: StorageBackend):
+    uid = new_user(db)
+    first = db.create_habit(uid, "Read", category="learning", xp_reward=150)
+    second = db.create_habit(uid, "Run", is_priority=1)
+    habits = db.get_habits(uid)
+    expect([h["id"] for h in habits][0] == second, "priority habits come first")
+    expect(db.get_habit(first)["category"] == "learning", "get_habit returns stored columns")
+    expect(db.get_habit(second)["difficulty"] == 3, "habit defaults applied")
+    revision = db.revision()
+    expect(db.revision() == revision, "revision stable without writes")
+    db.update_habit(first, is_active=0)
+    expect(revision is None or db.revision() != revision, "writes change the revision")
+    expect([h["id"] for h in db.get_habits(uid)] == [second], "inactive habits hidden by default")
+    expect(len(db.get_habits(uid, active_only=False)) == 2, "inactive habits listed on request")
+    expect(db.delete_habit(second) and db.get_habit(second) is None, "delete_habit removes the habit")
+    expect(not db.delete_habit(second), "deleting twice reports nothing deleted")
+    today = date.today()
+    days = [today - timedelta(days=n) for n in (0, 1, 3, 4, 5, 6)]
+    origin, bits = history.encode(history.from_dates(days))
+    db.update_habit(first, streak=9, best_streak=1, history_origin=origin, history_bits=bits)
+    expect(db.recompute_streaks(today) == 1 and db.recompute_streaks(today) == 0, "streaks recomputed once")
+    habit = db.get_habit(first)
+    expect((habit["streak"], habit["best_streak"]) == (2, 4), "streak and best streak from the day bitmap")
+    saturday = today - timedelta(days=today.weekday() - 5 if today.weekday() >= 5 else today.weekday() + 2)
+    scheduled = [saturday - timedelta(days=7 * week + back) for week in range(4) for back in (1, 3, 5)]
+    origin, bits = history.encode(history.from_dates(scheduled))
+    db.update_habit(first, frequency=schedule.on_days([0, 2, 4]), history_origin=origin, history_bits=bits)
+    db.recompute_streaks(saturday)
+    habit = db.get_habit(first)
+    expect((habit["streak"], habit["best_streak"]) == (12, 12), "unscheduled days do not break a streak")
+    origin, bits = history.encode(history.from_dates(day for day in scheduled if day != saturday - timedelta(days=17)))
+    db.update_habit(first, history_origin=origin, history_bits=bits)
+    db.recompute_streaks(saturday)
+    habit = db.get_habit(first)
+    expect((habit["streak"], habit["best_streak"]) == (7, 7), "a missed scheduled day breaks the streak")
+    # Weeks with 2, 1 and 2 completions against a twice-a-week quota; the first week is not judged
+    done = [saturday - timedelta(days=back) for back in (1, 3, 8, 15, 19, 20)]
+    origin, bits = history.encode(history.from_dates(done))
+    db.update_habit(first, frequency=schedule.per_week(2), history_origin=origin, history_bits=bits)
+    db.recompute_streaks(saturday)
+    habit = db.get_habit(first)
+    expect((habit["streak"], habit["best_streak"]) == (2, 4), "per-week quotas break a streak only when missed")
+
+
+def check_completions(db: StorageBackend):
+    uid = new_user(db)
+    hid = db.create_habit(uid, "Meditate", xp_reward=100, target_stat="willpower")
+    result = db.complete_habit(hid, uid)
+    expect(result.get("success") and result["xp_earned"] == 110 and result["gold_earned"] == 10, "completion rewards")
+    expect(db.complete_habit(hid, uid) == {"error": "Already completed today"}, "one completion per day")
+    expect(db.complete_habit(9999, uid) == {"error": "Habit not found"}, "unknown habit reported")
+    habit = db.get_habit(hid)
+    expect((habit["streak"], habit["best_streak"], habit["total_completions"]) == (1, 1, 1), "habit counters")
+    user = db.get_user()
+    expect((user["gold"], user["willpower"], user["current_streak"]) == (110, 2, 1), "user rewards applied")
+    expect(user["last_activity_date"] == date.today().isoformat(), "last activity date recorded")
+    expect(db.is_habit_completed_today(hid) and db.get_today_completions(uid) == [hid], "today's completions")
+    stats = db.get_habit_stats(uid)
+    expect(stats["daily"][0]["count"] == 1 and stats["daily"][0]["xp"] == 110, "daily stats")
+    expect(stats["by_category"] == {"personal": 1}, "category stats")
+    exported = db.export_completions(uid, start=date.today().isoformat())
+    expect([(r["title"], r["xp_earned"]) for r in exported] == [("Meditate", 110)], "export within range")
+    expect(db.export_completions(uid, end="2000-01-01") == [], "export range excludes later days")
+    expect(list(db.iter_completions(uid, start=date.today().isoformat())) == exported, "streamed export matches")
+    expect(json.loads(json.dumps(db.get_user(), default=rows.jsonable)) == dict(db.get_user()), "rows encode as JSON")
+    bitmap = history.of(db.get_habit(hid))
+    expect(history.is_done(bitmap, date.today()) and history.streak(bitmap, date.today()) == 1, "day bitmap marked")
+    db.delete_habit(hid)
+    expect(db.get_today_completions(uid) == [], "completions removed with their habit")
+
+
+def check_goals(db: StorageBackend):
+    uid = new_user(db)
+    steps = [{"title": "One", "xp_reward": 100}, {"title": "Two"}]
+    later = db.create_goal(uid, "Later", steps=steps, due_date="2031-01-01", xp_reward=500)
+    sooner = db.create_goal(uid, "Sooner", due_date="2030-01-01")
+    goals = db.get_goals(uid)
+    expect([g["id"] for g in goals] == [sooner, later], "goals ordered by due date")
+    goal = db.get_goal(later)
+    expect([s["title"] for s in goal["steps"]] == ["One", "Two"], "steps stored in order")
+    expect(goal["steps"][1]["xp_reward"] == 200 and goal["steps"][1]["estimated_duration"] == "1 week", "step defaults")
+    expect(goal["progress"] == {"completed": 0, "total": 2, "percentage": 0}, "initial progress")
+    first = db.complete_goal_step(goal["steps"][0]["id"], uid)
+    expect(first["success"] and not first["goal_completed"], "first step completes")
+    expect(db.complete_goal_step(goal["steps"][0]["id"], uid) == {"error": "Step already completed"}, "no double step")
+    last = db.complete_goal_step(goal["steps"][1]["id"], uid)
+    expect(last["goal_completed"] and last["goal_xp"] == 500, "last step completes the goal")
+    expect([g["id"] for g in db.get_goals(uid)] == [sooner], "completed goals hidden")
+    expect(len(db.get_goals(uid, include_completed=True)) == 2, "completed goals listed on request")
+    expect(db.get_user()["total_xp"] == 800, "step and goal XP granted")
+    expect(db.delete_goal(later) and db.get_goal(later) is None and db.get_goal_steps(later) == [], "delete_goal")
+
+
+def check_shop(db: StorageBackend):
+    uid = new_user(db)
+    items = db.get_shop_items(user_level=5)
+    expect(len(items) == 7, "default shop items seeded")
+    expect([i["level_required"] for i in items] == sorted(i["level_required"] for i in items), "ordered by level")
+    expect(sum(i["meets_level"] for i in items) == 3, "meets_level flags")
+    expect(db.purchase_item(uid, 1)["new_gold"] == 0, "purchase spends gold")
+    expect(db.purchase_item(uid, 1) == {"error": "Not enough gold"}, "insufficient gold rejected")
+    expect(db.purchase_item(uid, 3) == {"error": "Requires level 10"}, "level requirement enforced")
+    expect(db.purchase_item(uid, 999) == {"error": "Item not found"}, "unknown item reported")
+    db.update_user(uid, gold=1000)
+    db.purchase_item(uid, 1)
+    inventory = db.get_inventory(uid)
+    expect(len(inventory) == 1 and inventory[0]["quantity"] == 2, "repeat purchases stack")
+    expect(inventory[0]["name"] == "XP Boost (Minor)", "inventory joins item details")
+    added = db.add_shop_items([{"name": "Focus Tonic", "gold_cost": 50}, {"name": "XP Boost (Minor)"}])
+    tonic = [i for i in db.get_shop_items(user_level=5) if i["name"] == "Focus Tonic"]
+    expect(added == 1 and len(tonic) == 1 and tonic[0]["rarity"] == "common", "bulk items added once with defaults")
+    try:
+        db.add_shop_items([{"name": "Bad", "price": 1}])
+        expect(False, "unknown shop columns rejected")
+    except ValueError:
+        pass
+
+
+def check_quotes(db: StorageBackend):
+    expect(db.get_random_quote()["quote"], "random quote")
+    expect(all(db.get_random_quote(["samurai"])["tradition"] == "samurai" for _ in range(5)), "tradition filter")
+    expect(db.get_random_quote(["unknown"]) is None, "no quote for unknown tradition")
+    quote = {"quote": "Know thyself.", "author": "Socrates", "tradition": "greek"}
+    expect(db.add_quotes([quote, quote]) == 1 and db.add_quotes([quote]) == 0, "bulk quotes deduplicated")
+    expect(db.get_random_quote(["greek"])["author"] == "Socrates", "added quotes served")
+
+
+def check_notes(db: StorageBackend):
+    uid = new_user(db)
+    plain = db.create_note(uid, "Plain", "text")
+    pinned = db.create_note(uid, "Pinned", is_pinned=1)
+    expect([n["id"] for n in db.get_notes(uid)][0] == pinned, "pinned notes first")
+    expect(db.update_note(plain, content="edited"), "update_note")
+    expect(next(n for n in db.get_notes(uid) if n["id"] == plain)["content"] == "edited", "note edit persists")
+    expect(db.delete_note(plain) and [n["id"] for n in db.get_notes(uid)] == [pinned], "delete_note")
+
+
+def check_chat(db: StorageBackend):
+    uid = new_user(db)
+    expect(db.get_latest_chat_thread(uid) is None, "no thread yet")
+    thread = db.create_chat_thread(uid)
+    ids = [db.add_chat_message(thread, "user" if i % 2 == 0 else "assistant", f"m{i}") for i in range(45)]
+    expect(db.get_latest_chat_thread(uid)["id"] == thread, "latest thread")
+    page = db.get_chat_messages(thread, limit=20)
+    expect([m["content"] for m in page] == [f"m{i}" for i in range(25, 45)], "newest page, oldest first")
+    older = db.get_chat_messages(thread, before_id=page[0]["id"], limit=20)
+    expect([m["content"] for m in older] == [f"m{i}" for i in range(5, 25)], "keyset page before cursor")
+    expect(db.has_chat_messages_before(thread, older[0]["id"]), "more history available")
+    expect(not db.has_chat_messages_before(thread, ids[0]), "start of history")
+    expect(len(db.get_chat_messages_since(thread, older[0]["id"])) == 40, "messages since cursor")
+
+
+def check_assessed(db: StorageBackend):
+    uid = new_user(db)
+    db.create_habit(uid, "AI habit", assessed_by="ai", difficulty=4, ai_tip="Do it")
+    db.create_habit(uid, "Legacy AI habit", ai_tip="Anchor it to coffee")
+    db.create_habit(uid, "Fallback habit", ai_tip="Start small and build consistency.")
+    db.create_habit(uid, "Local habit", assessed_by="local", ai_tip="Start small")
+    titles = sorted(h["title"] for h in db.get_assessed_habits())
+    expect(titles == ["AI habit", "Legacy AI habit"], "only AI assessments are training data")
+
+
+def check_economy(db: StorageBackend):
+    db.snapshot_every = 4
+    uid = new_user(db)
+    hid = db.create_habit(uid, "Lift", xp_reward=100, target_stat="strength")
+    db.complete_habit(hid, uid)
+    goal = db.get_goal(db.create_goal(uid, "Goal", steps=[{"title": "Only", "xp_reward": 300}], xp_reward=500))
+    db.complete_goal_step(goal["steps"][0]["id"], uid)
+    db.purchase_item(uid, 1)
+    db.update_user(uid, gems=25, display_name="Renamed")
+    ledger = db.get_ledger(uid)
+    expect([(e["kind"], e["source_type"]) for e in ledger] == [
+        ("opening", "user"), ("grant", "habit_completion"), ("grant", "habit_completion"), ("grant", "goal_step"),
+        ("grant", "goal"), ("spend", "shop_item"), ("adjust", "manual")], "every economy change is a ledger event")
+    expect((ledger[0]["gold"], ledger[2]["strength"], ledger[5]["gold"], ledger[6]["gems"]) == (100, 1, -100, 15),
+           "ledger deltas")
+    expect(ledger[4]["source_id"] == goal["id"] and ledger[3]["source_id"] == goal["steps"][0]["id"], "source references")
+    expect(db.get_latest_snapshot(uid)["ledger_id"] == ledger[3]["id"], "snapshot after snapshot_every events")
+    expect(economy.mismatches(db.get_user(), db.rebuild_user_state(uid)) == [], "replay matches the user row")
+    db._set_user_fields(uid, gold=0, total_xp=0, level=1, current_xp=0)
+    db.materialize_user(uid)
+    user = db.get_user()
+    expect((user["total_xp"], user["level"], user["gold"], user["strength"]) == (910, 4, 10, 2), "materialize repairs the row")
+    flat = db.rebuild_user_state(uid, xp_for_level=lambda level: 100)
+    expect((flat["level"], flat["current_xp"]) == (10, 10), "replay under a new XP curve")
+
+
+def check_second_user(db: StorageBackend):
+    first = new_user(db)
+    db.add_xp(first, 1000)
+    db.update_user(first, gold=500)
+    second = db.create_user("Second", onboarding_complete=1)
+    expect(db.get_user_by_id(second)["name"] == "Second" and db.get_user_by_id(second + 1) is None, "get_user_by_id")
+    db.complete_habit(db.create_habit(second, "Walk", xp_reward=100), second)
+    db.purchase_item(second, 1)
+    user = db.get_user_by_id(second)
+    expect((user["total_xp"], user["level"], user["gold"]) == (110, 2, 10), "economy updates read the user being written")
+    expect(economy.mismatches(user, db.rebuild_user_state(second)) == [], "second user's replay matches their row")
+    expect((db.get_user()["total_xp"], db.get_user()["gold"]) == (1000, 500), "first user untouched")
+    expect(db.get_rank("total_xp", second) == 2, "leaderboard ranks the second user on their own XP")
+    db.snapshot_every = 8  # the second user has 4 events so far
+    for _ in range(10):
+        db.add_xp(first, 1)
+    snapshot = db.get_latest_snapshot(second)
+    db.add_xp(second, 1)
+    expect(db.get_latest_snapshot(second) == snapshot, "other users' events don't trigger a snapshot")
+
+
+def check_schedules(db: StorageBackend):
+    uid = new_user(db)
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    created = f"{today.isoformat()} 08:00:00"
+    daily = db.create_habit(uid, "Daily", created_at=created)
+    on_today = db.create_habit(uid, "Today", frequency=schedule.on_days([today.weekday()]), created_at=created)
+    on_tomorrow = db.create_habit(uid, "Tomorrow", frequency=schedule.on_days([tomorrow.weekday()]), created_at=created)
+    every_third = db.create_habit(uid, "Every third", frequency=schedule.every(3), created_at=created)
+    weekly = db.create_habit(uid, "Weekly", frequency="weekly", created_at=created)
+    due = db.get_due_habit_ids(uid)
+    expect(due == {daily, on_today, every_third, weekly}, "due today by weekday mask, interval and weekly quota")
+    db.complete_habit(weekly, uid)
+    expect(db.get_due_habit_ids(uid) is due, "completions keep the cached set")
+    expect(db.get_completion_counts(uid, today.isoformat(), today.isoformat()) == {weekly: 1}, "completion counts")
+    expect(db.get_due_habit_ids(uid, tomorrow) == {daily, on_tomorrow} | ({weekly} if tomorrow.weekday() == 0 else set()),
+           "weekly quota met until the week ends")
+    db.update_habit(on_tomorrow, frequency="daily")
+    expect(on_tomorrow in db.get_due_habit_ids(uid), "schedule changes refresh the set")
+    db.delete_habit(daily)
+    expect(daily not in db.get_due_habit_ids(uid), "deleted habits drop out")
+    expect(schedule.parse("nonsense") == schedule.parse("daily") and schedule.describe("days:31") == "Weekdays",
+           "frequency parsing")
+
+
+def check_leaderboards(db: StorageBackend):
+    first = new_user(db)
+    second = db.create_user("Rival")
+    db._set_user_fields(second, total_xp=500, level=3)
+    expect((db.get_rank("total_xp", second), db.get_rank("total_xp", first)) == (1, 2), "ranked by total XP")
+    third = db.create_user("Newcomer")
+    expect(db.get_leaderboard_size("total_xp") == 3 and db.get_rank("total_xp", third) == 2, "new users tie at zero")
+    db.add_xp(first, 1000)
+    top = db.get_leaderboard("total_xp", 2)
+    expect([(e["rank"], e["name"], e["score"]) for e in top] == [(1, "Shadow", 1000), (2, "Rival", 500)],
+           "add_xp moves the user up")
+    hid = db.create_habit(first, "Run")
+    db.complete_habit(hid, first)
+    expect(db.get_rank("weekly_completions", first) == 1 and db.get_rank("weekly_completions", second) is None,
+           "weekly completions ranked")
+    expect(db.get_leaderboard("current_streak", 1)[0]["user_id"] == first, "streak board follows completions")
+    db.delete_habit(hid)
+    expect(db.get_rank("weekly_completions", first) is None, "deleted completions leave the weekly board")
+
+
+def check_reminders(db: StorageBackend):
+    events = []
+    db.add_listener(lambda kind, row_id: events.append((kind, row_id)))
+    uid = new_user(db)
+    today = date.today()
+    morning = datetime.combine(today, dtime(8, 0))
+    hid = db.create_habit(uid, "Read", created_at=f"{today.isoformat()} 07:00:00")
+    gid = db.create_goal(uid, "Ship", steps=[{"title": "Only"}], due_date=(today + timedelta(days=1)).isoformat())
+    expect(events == [("habit", hid), ("goal", gid)], "writes reported to listeners")
+    toasts = reminders.ToastSink()
+    engine = reminders.ReminderEngine(db, [toasts], clock=lambda: morning)
+    expect(engine.tick(morning) == [] and len(engine) == 2, "one pending reminder per habit and goal")
+    expect(engine.next_due() == datetime.combine(today, dtime(9, 0)), "goal reminder a day before it is due")
+    fired = engine.tick(morning.replace(hour=10))
+    expect([r["id"] for r in fired] == [gid] and toasts.drain(uid) == fired and toasts.drain(uid) == [],
+           "due reminders delivered once")
+    db.complete_habit(hid, uid)
+    expect(engine.tick(morning.replace(hour=21)) == [], "habits done today are not reminded")
+    expect(engine.next_due() == datetime.combine(today + timedelta(days=1), dtime(9, 0)), "goal reminded again on the day")
+    db.complete_goal_step(db.get_goal(gid)["steps"][0]["id"], uid)
+    expect([r["id"] for r in engine.tick(morning + timedelta(days=1, hours=13))] == [hid],
+           "completed goals cancelled, habits reminded the next day")
+    db.delete_habit(hid)
+    engine.tick(morning + timedelta(days=1, hours=13))
+    expect(len(engine) == 0 and engine.next_due() is None, "deleted habits cancelled")
+
+
+
+def check_rollback_effects(db: StorageBackend):
+    if getattr(db, "writer", None) is None:
+        return  # only group-commit jobs can roll back after queueing effects
+    uid = new_user(db)
+    events = []
+    db.add_listener(lambda kind, row_id: events.append((kind, row_id)))
+    db.get_rank("total_xp", uid)  # load the leaderboards
+
+    def failing(view):
+        view.create_habit(uid, "Never")
+        view.add_xp(uid, 500)
+        raise RuntimeError("job fails after writing")
+    try:
+        db._submit(failing).result()
+        expect(False, "failing job raised")
+    except RuntimeError:
+        pass
+    expect(db.get_habits(uid) == [] and events == [], "rolled-back write fires no listeners")
+    expect(db.get_leaderboard("total_xp", 1)[0]["score"] == 0, "rolled-back XP never reaches the leaderboard")
+    hid = db.create_habit(uid, "Kept")
+    expect(events == [("habit", hid)] and db.get_due_habit_ids(uid) == {hid}, "committed write fires its effects")
+
+
+def check_external_writes(db: StorageBackend):
+    if not isinstance(db, Database):
+        return  # only a database file can be written by another process
+    uid = new_user(db)
+    today = date.today()
+    engine = reminders.ReminderEngine(db, [], clock=lambda: datetime.combine(today, dtime(8, 0)))
+    expect(db.get_due_habit_ids(uid) == frozenset() and db.get_leaderboard("total_xp", 1)[0]["score"] == 0,
+           "caches loaded")
+    engine.tick()
+    other = Database(db.db_path)  # api.py or cli.py in another process
+    try:
+        hid = other.create_habit(uid, "Read", xp_reward=100)
+        other.complete_habit(hid, uid)
+    finally:
+        other.close()
+    expect(db.get_due_habit_ids(uid) == {hid}, "another connection's habit is due today")
+    expect(db.get_leaderboard("total_xp", 1)[0]["score"] == 110, "another connection's XP reaches the leaderboard")
+    expect(engine.tick(datetime.combine(today, dtime(21, 0))) == [], "habits done elsewhere are not reminded")
+    expect(not db.sync_external(), "own reads do not look like outside writes")
+    db.create_habit(uid, "Run")
+    expect(not db.sync_external(), "own writes do not look like outside writes")
+
+
+CHECKS: Dict[str, Callable[[StorageBackend], None]] = {
+    "users": check_users,
+    "habits": check_habits,
+    "completions": check_completions,
+    "goals": check_goals,
+    "shop": check_shop,
+    "quotes": check_quotes,
+    "notes": check_notes,
+    "chat": check_chat,
+    "assessed_habits": check_assessed,
+    "economy": check_economy,
+    "second_user": check_second_user,
+    "rollback_effects": check_rollback_effects,
+    "schedules": check_schedules,
+    "leaderboards": check_leaderboards,
+    "reminders": check_reminders,
+    "external_writes": check_external_writes,
+}
+
+
+def sqlite_factory(tmp: str, name: str, **options) -> Callable[[], StorageBackend]:
+    counter = iter(range(1_000_000))
+    return lambda: Database(os.path.join(tmp, f"{name}_{next(counter)}.db"), **options)
+
+
+def run_backend(name: str, factory: Callable[[], StorageBackend], repeat: int) -> int:
+    failed = 0
+    for check_name, check in CHECKS.items():
+        elapsed = []
+        for _ in range(repeat):
+            db = factory()
+            started = time.perf_counter()
+            try:
+                check(db)
+            except Exception as e:
+                failed += 1
+                print(f"    [FAIL] {name}.{check_name}: {e}")
+                if not isinstance(e, CheckFailed):
+                    traceback.print_exc()
+                break
+            finally:
+                if isinstance(db, Database):
+                    db.close()
+            elapsed.append(time.perf_counter() - started)
+        else:
+            print(f"    [ok] {name}.{check_name:<16} {min(elapsed) * 1e6:>10.0f} µs")
+    return failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="sqlite,sqlite-group,memory",
+                        help="comma-separated: sqlite, sqlite-group (group-commit writer), memory")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per check; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        factories = {"sqlite": sqlite_factory(tmp, "sqlite"),
+                     "sqlite-group": sqlite_factory(tmp, "group", group_commit=True),
+                     "memory": MemoryStorage}
+        for name in args.backends.split(","):
+            print(name)
+            failed += run_backend(name, factories[name], args.repeat)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Synthetic data generator for Goal Quest databases
+
+Builds realistic-looking databases (users, habits, years of completion
+history, goals with steps, notes, quotes) directly through executemany so
+that million-row datasets are generated in seconds.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Dict
+
+import history
+from database import Database
+
+CATEGORY_KEYS = [
+    "fitness", "health", "learning", "career", "finance", "creative", "mindfulness", "productivity",
+    "social", "personal", "spiritual", "home", "environment", "relationships", "life_goals", "skills",
+]
+STAT_KEYS = ["strength", "intelligence", "vitality", "agility", "sense", "willpower"]
+TRADITION_KEYS = ["stoic", "biblical", "eastern", "samurai", "hermetic", "quranic"]
+HABIT_WORDS = ["Meditate", "Run", "Read", "Journal", "Stretch", "Study", "Budget", "Pray", "Cook", "Walk", "Practice", "Write"]
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Shape of a generated dataset; completion rows ≈ users × habits × days × rate"""
+    users: int = 1
+    habits_per_user: int = 10
+    years: float = 1.0
+    completion_rate: float = 0.7
+    goals_per_user: int = 5
+    steps_per_goal: int = 8
+    notes_per_user: int = 20
+    quotes: int = 100
+    seed: int = 42
+
+    @property
+    def days(self) -> int:
+        return max(1, int(self.years * 365))
+
+    @property
+    def expected_completions(self) -> int:
+        return int(self.users * self.habits_per_user * self.days * self.completion_rate)
+
+    def fingerprint(self) -> str:
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()[:10]
+
+
+# Named scales used by the benchmark runners (keyed by habit_completions rows)
+SCALES: Dict[str, SyntheticConfig] = {
+    "1k": SyntheticConfig(users=1, habits_per_user=4, years=1, completion_rate=0.7,
+                          goals_per_user=3, notes_per_user=10, quotes=50),
+    "100k": SyntheticConfig(users=4, habits_per_user=25, years=4, completion_rate=0.685,
+                            goals_per_user=20, notes_per_user=200, quotes=1000),
+    "1m": SyntheticConfig(users=20, habits_per_user=40, years=5, completion_rate=0.685,
+                          goals_per_user=50, notes_per_user=1000, quotes=10000),
+}
+
+_CHUNK = 50_000
+
+
+def _chunked_insert(conn: sqlite3.Connection, sql: str, rows) -> int:
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= _CHUNK:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+def generate(db_path: str, config: SyntheticConfig) -> Dict[str, int]:
+    """Create a fresh database at db_path filled according to config"""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    Database(db_path).conn.close()  # schema + default shop items, quotes, achievements
+
+    rng = random.Random(config.seed)
+    today = date.today()
+    start = today - timedelta(days=config.days)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    counts = {}
+
+    counts["user"] = _chunked_insert(conn, """
+        INSERT INTO user (name, display_name, created_at, level, current_xp, total_xp, gold, gems,
+                          strength, intelligence, vitality, agility, sense, willpower,
+                          current_streak, best_streak, last_activity_date, philosophy_traditions, onboarding_complete)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    """, (
+        (f"User {u}", f"Hunter {u}", start.isoformat(), rng.randint(1, 60), rng.randint(0, 500), rng.randint(0, 500_000),
+         rng.randint(100, 50_000), rng.randint(0, 500), *(rng.randint(1, 300) for _ in STAT_KEYS),
+         rng.randint(0, 60), rng.randint(0, 365), (today - timedelta(days=1)).isoformat(),
+         json.dumps(rng.sample(TRADITION_KEYS, rng.randint(1, 3))))
+        for u in range(1, config.users + 1)
+    ))
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM user ORDER BY id")]
+
+    counts["habits"] = _chunked_insert(conn, """
+        INSERT INTO habits (user_id, title, description, category, difficulty, xp_reward, target_stat,
+                            frequency, is_priority, created_at, ai_tip)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        (uid, f"{rng.choice(HABIT_WORDS)} #{h}", "Synthetic habit", rng.choice(CATEGORY_KEYS), rng.randint(1, 6),
+         rng.choice([50, 75, 100, 150, 200, 300]), rng.choice(STAT_KEYS), rng.choice(["daily", "daily", "weekly"]),
+         int(rng.random() < 0.2), start.isoformat(), "Stay consistent")
+        for uid in user_ids for h in range(config.habits_per_user)
+    ))
+    habit_rows = conn.execute("SELECT id, xp_reward FROM habits ORDER BY id").fetchall()
+
+    # Completion history up to (but excluding) today so completion benchmarks have work to do
+    def completions():
+        for habit_id, xp_reward in habit_rows:
+            streak = 0
+            for offset in range(config.days):
+                if rng.random() >= config.completion_rate:
+                    streak = 0
+                    continue
+                streak += 1
+                bonus = min(int(xp_reward * 0.1 * streak), xp_reward)
+                day = (start + timedelta(days=offset)).isoformat()
+                yield habit_id, f"{day} 08:00:00", day, xp_reward + bonus, bonus
+
+    counts["habit_completions"] = _chunked_insert(conn, """
+        INSERT INTO habit_completions (habit_id, completed_at, completion_date, xp_earned, streak_bonus)
+        VALUES (?, ?, ?, ?, ?)
+    """, completions())
+    conn.execute("""
+        UPDATE habits SET total_completions = (
+            SELECT COUNT(*) FROM habit_completions hc WHERE hc.habit_id = habits.id
+        )
+    """)
+    history.rebuild(conn, db_path)
+
+    counts["goals"] = _chunked_insert(conn, """
+        INSERT INTO goals (user_id, title, description, category, difficulty, xp_reward, target_stat,
+                           due_date, estimated_weeks, is_completed, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        (uid, f"Goal #{g}", "Synthetic goal", rng.choice(CATEGORY_KEYS), rng.randint(1, 6), rng.randint(1000, 10000),
+         rng.choice(STAT_KEYS), (today + timedelta(days=rng.randint(-30, 365))).isoformat(), rng.randint(1, 52),
+         int(rng.random() < 0.3), start.isoformat())
+        for uid in user_ids for g in range(config.goals_per_user)
+    ))
+    goal_ids = [row[0] for row in conn.execute("SELECT id FROM goals ORDER BY id")]
+    counts["goal_steps"] = _chunked_insert(conn, """
+        INSERT INTO goal_steps (goal_id, step_number, title, description, estimated_duration, xp_reward, is_completed)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (
+        (goal_id, s, f"Step {s}", "Synthetic step", "1 week", rng.randint(100, 500), int(rng.random() < 0.4))
+        for goal_id in goal_ids for s in range(1, config.steps_per_goal + 1)
+    ))
+
+    counts["notes"] = _chunked_insert(conn, """
+        INSERT INTO notes (user_id, title, content, is_pinned, tags, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (
+        (uid, f"Note #{n}", "Lorem ipsum " * rng.randint(5, 60), int(rng.random() < 0.1), "[]",
+         (start + timedelta(days=rng.randrange(config.days))).isoformat(),
+         (start + timedelta(days=rng.randrange(config.days))).isoformat())
+        for uid in user_ids for n in range(config.notes_per_user)
+    ))
+
+    counts["wisdom_quotes"] = _chunked_insert(conn, """
+        INSERT INTO wisdom_quotes (quote, author, source, tradition) VALUES (?, ?, ?, ?)
+    """, (
+        (f"Synthetic wisdom number {q}.", f"Sage {q % 97}", "Synthetic", rng.choice(TRADITION_KEYS))
+        for q in range(config.quotes)
+    ))
+
+    conn.commit()
+    conn.close()
+    return counts
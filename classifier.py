@@ -0,0 +1,194 @@
+"""
+🧠 GOAL QUEST - Local Difficulty Classifier
+Answers habit assessments locally when confident, before calling the AI
+
+Two tiers. A compiled keyword matcher (one regex, one pass over the text)
+encodes the hand-written rules and works with no training data; it backs the
+offline fallback. A multinomial naive Bayes model over TF-IDF weighted tokens
+is trained from habits whose assessment came from the AI, and learns further
+as new AI assessments are accepted. Predictions are only used instead of an
+API call when both the difficulty and category posteriors are confident.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game_data import DIFFICULTIES
+
+# Keyword rules, in priority order within each group (first match wins)
+DIFFICULTY_KEYWORDS = {
+    2: ["drink", "water", "make bed", "5 min", "quick"],
+    4: ["workout", "gym", "hour", "run", "study"],
+    5: ["marathon", "master", "expert", "intensive"],
+}
+CATEGORY_KEYWORDS = {
+    "fitness": ["workout", "gym", "run", "exercise", "fitness"],
+    "learning": ["read", "learn", "study", "course"],
+    "mindfulness": ["meditate", "journal", "gratitude", "mindful"],
+    "spiritual": ["pray", "devotion", "scripture", "spiritual"],
+    "finance": ["budget", "save", "invest", "money"],
+    "health": ["sleep", "water", "health", "vitamin"],
+}
+STAT_FOR_CATEGORY = {
+    "fitness": "strength", "health": "vitality", "learning": "intelligence",
+    "career": "intelligence", "finance": "sense", "mindfulness": "willpower",
+    "spiritual": "willpower", "productivity": "agility", "personal": "willpower",
+}
+TIME_FOR_DIFFICULTY = {1: "under 5 minutes", 2: "5-15 minutes", 3: "15-30 minutes",
+                       4: "30-60 minutes", 5: "1-2 hours", 6: "2+ hours"}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _keyword_matcher(groups: Dict) -> Tuple[re.Pattern, Dict[str, object]]:
+    """One alternation over every keyword; group names map back to their label"""
+    alternatives, labels = [], {}
+    for label, keywords in groups.items():
+        for keyword in keywords:
+            name = f"k{len(labels)}"
+            labels[name] = label
+            alternatives.append(f"(?P<{name}>{re.escape(keyword)})")
+    return re.compile("|".join(alternatives)), labels
+
+
+_DIFFICULTY_MATCHER = _keyword_matcher(DIFFICULTY_KEYWORDS)
+_CATEGORY_MATCHER = _keyword_matcher(CATEGORY_KEYWORDS)
+
+
+def _rule_labels(text: str, matcher: Tuple[re.Pattern, Dict[str, object]]) -> set:
+    pattern, labels = matcher
+    return {labels[m.lastgroup] for m in pattern.finditer(text)}
+
+
+def rule_difficulty(text: str) -> int:
+    hits = _rule_labels(text.lower(), _DIFFICULTY_MATCHER)
+    return next((level for level in DIFFICULTY_KEYWORDS if level in hits), 3)
+
+
+def rule_category(text: str) -> str:
+    hits = _rule_labels(text.lower(), _CATEGORY_MATCHER)
+    return next((category for category in CATEGORY_KEYWORDS if category in hits), "personal")
+
+
+def tokenize(text: str) -> List[str]:
+    """Word unigrams and bigrams plus the keyword rules that fire, as features"""
+    text = text.lower()
+    words = _TOKEN.findall(text)
+    features = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    features += [f"#d{level}" for level in _rule_labels(text, _DIFFICULTY_MATCHER)]
+    features += [f"#c{category}" for category in _rule_labels(text, _CATEGORY_MATCHER)]
+    return features
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes with TF-IDF weighted features at prediction time"""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.class_docs: Counter = Counter()
+        self.feature_counts: Dict[object, Counter] = defaultdict(Counter)
+        self.class_totals: Counter = Counter()
+        self.doc_freq: Counter = Counter()
+        self.vocabulary: set = set()
+        self.docs = 0
+
+    def learn(self, features: List[str], label):
+        self.docs += 1
+        self.class_docs[label] += 1
+        counts = Counter(features)
+        self.feature_counts[label].update(counts)
+        self.class_totals[label] += sum(counts.values())
+        self.doc_freq.update(counts.keys())
+        self.vocabulary.update(counts.keys())
+
+    def predict(self, features: List[str]) -> Tuple[object, float]:
+        """Most likely label and its posterior probability"""
+        if not self.docs:
+            return None, 0.0
+        counts = Counter(f for f in features if f in self.vocabulary)
+        vocab = len(self.vocabulary)
+        scores = {}
+        for label, docs in self.class_docs.items():
+            score = math.log(docs / self.docs)
+            denominator = self.class_totals[label] + self.alpha * vocab
+            for feature, tf in counts.items():
+                idf = math.log((1 + self.docs) / (1 + self.doc_freq[feature])) + 1
+                likelihood = (self.feature_counts[label][feature] + self.alpha) / denominator
+                score += tf * idf * math.log(likelihood)
+            scores[label] = score
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        total = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / total
+
+
+class DifficultyClassifier:
+    """Local first tier for habit assessment; thread-safe, shared by all sessions"""
+
+    def __init__(self, min_examples: int = 25, min_confidence: float = 0.85):
+        self.min_examples = min_examples
+        self.min_confidence = min_confidence
+        self.difficulty = NaiveBayes()
+        self.category = NaiveBayes()
+        self.stat = NaiveBayes()
+        self.xp_by_difficulty: Dict[int, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], **options) -> "DifficultyClassifier":
+        classifier = cls(**options)
+        for row in rows:
+            classifier.learn(" ".join(filter(None, [row.get("title"), row.get("description")])), row)
+        return classifier
+
+    @property
+    def examples(self) -> int:
+        return self.difficulty.docs
+
+    def learn(self, text: str, assessment: Dict):
+        """Add one accepted AI assessment (difficulty, category, target_stat, xp_reward)"""
+        if not text.strip() or assessment.get("difficulty") not in DIFFICULTIES:
+            return
+        features = tokenize(text)
+        with self._lock:
+            self.difficulty.learn(features, int(assessment["difficulty"]))
+            self.category.learn(features, assessment.get("category") or "personal")
+            self.stat.learn(features, assessment.get("target_stat") or "willpower")
+            if assessment.get("xp_reward"):
+                self.xp_by_difficulty[int(assessment["difficulty"])].append(int(assessment["xp_reward"]))
+
+    def classify(self, text: str) -> Optional[Dict]:
+        """An assessment dict when the model is trained and confident, otherwise None"""
+        if self.examples < self.min_examples:
+            return None
+        features = tokenize(text)
+        with self._lock:
+            difficulty, p_difficulty = self.difficulty.predict(features)
+            category, p_category = self.category.predict(features)
+            stat, _ = self.stat.predict(features)
+            xp_seen = sorted(self.xp_by_difficulty.get(difficulty, []))
+        if min(p_difficulty, p_category) < self.min_confidence:
+            return None
+        xp = xp_seen[len(xp_seen) // 2] if xp_seen else None
+        return self.assessment(difficulty, category, stat, xp, confidence=min(p_difficulty, p_category))
+
+    @staticmethod
+    def assessment(difficulty: int, category: str, stat: Optional[str] = None, xp: Optional[int] = None,
+                   confidence: Optional[float] = None) -> Dict:
+        diff_info = DIFFICULTIES[difficulty]
+        low, high = diff_info["xp_range"]
+        return {
+            "difficulty": difficulty,
+            "difficulty_name": diff_info["name"],
+            "xp_reward": min(max(xp, low), high) if xp else (low + high) // 2,
+            "category": category,
+            "target_stat": stat or STAT_FOR_CATEGORY.get(category, "willpower"),
+            "time_estimate": TIME_FOR_DIFFICULTY[difficulty],
+            "tip": "Start small and build consistency. You can always increase the challenge later!",
+            "reasoning": {"time_factor": difficulty, "mental_effort": difficulty,
+                          "physical_effort": 2, "skill_required": difficulty, "consistency_need": 4},
+            "confidence": confidence,
+        }
@@ -0,0 +1,299 @@
+"""
+🛠️ GOAL QUEST - Command Line
+Seeding, imports, exports and maintenance for cron jobs and admin scripts
+
+Runs against the same storage layer as the app but never imports Streamlit,
+and imports everything past the argument parser only when a command needs it
+(the AI client and numpy only for the commands that use them), so a run
+starts in a few tens of milliseconds. Record input is a file or "-" for
+stdin, as a JSON array, JSON lines or CSV (by .csv extension or --csv).
+batch runs many commands in one process on one open database.
+
+    python cli.py seed-shop items.json
+    cat quotes.jsonl | python cli.py add-quotes
+    python cli.py import-habits habits.csv --assess
+    python cli.py recompute-streaks --rebuild-history
+    python cli.py export --days 30 > completions.csv
+    python cli.py maintain optimize quick_check
+    python cli.py batch nightly.txt        # one command per line
+"""
+
+import argparse
+import csv
+import json
+import os
+import shlex
+import sys
+from typing import Dict, List, Optional
+
+NUMERIC_FIELDS = {"gold_cost", "gem_cost", "level_required", "difficulty", "xp_reward", "is_priority"}
+EXPORT_COLUMNS = ["completion_date", "completed_at", "title", "category", "xp_earned", "streak_bonus"]
+HABIT_FIELDS = ("title", "description", "frequency", "category", "difficulty", "xp_reward", "target_stat", "is_priority")
+
+
+class CliError(Exception):
+    pass
+
+
+def log(message: str):
+    print(message, file=sys.stderr)
+
+
+def read_records(path: str, as_csv: bool = False) -> List[Dict]:
+    """Records from path ("-" for stdin): a JSON array, JSON lines, or CSV with a header row"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        if as_csv or path.endswith(".csv"):
+            records = [{k: v for k, v in row.items() if v != ""} for row in csv.DictReader(stream)]
+            for record in records:
+                for field in NUMERIC_FIELDS & record.keys():
+                    record[field] = int(record[field])
+            return records
+        text = stream.read()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class Session:
+    """The database a run works on, opened on first use and shared by every command of a batch"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            from storage import open_storage
+            self._store = open_storage(self.db_path)
+        return self._store
+
+    def user_id(self, requested: Optional[int]) -> int:
+        if requested is not None:
+            return requested
+        user = self.store.get_user()
+        if user is None:
+            raise CliError("no user in this database yet (finish onboarding in the app first)")
+        return user["id"]
+
+    def close(self):
+        if self._store is not None and hasattr(self._store, "close"):
+            self._store.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMMANDS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def cmd_seed_shop(session: Session, args) -> int:
+    items = read_records(args.file, args.csv)
+    for item in items:
+        if isinstance(item.get("effects"), dict):
+            item["effects"] = json.dumps(item["effects"])
+    added = session.store.add_shop_items(items)
+    log(f"shop: {added} of {len(items)} items added ({len(items) - added} already listed)")
+    return 0
+
+
+def cmd_add_quotes(session: Session, args) -> int:
+    quotes = read_records(args.file, args.csv)
+    added = session.store.add_quotes(quotes)
+    log(f"quotes: {added} of {len(quotes)} added ({len(quotes) - added} already stored)")
+    return 0
+
+
+def cmd_import_habits(session: Session, args) -> int:
+    store = session.store
+    user_id = session.user_id(args.user)
+    habits = read_records(args.file, args.csv)
+    for habit in habits:
+        unknown = habit.keys() - set(HABIT_FIELDS)
+        if unknown or not str(habit.get("title") or "").strip():
+            raise CliError(f"habit needs a title and only {', '.join(HABIT_FIELDS)}: {habit}")
+    assessments: Dict[int, Dict] = {}
+    if args.assess:
+        # Same batched assessment as the app: local classifier first, one AI request for the rest
+        from ai_service import AIService
+        from classifier import DifficultyClassifier
+        ai = AIService(api_key=os.environ.get("ANTHROPIC_API_KEY", ""), notify=log,
+                       classifier=DifficultyClassifier.from_rows(store.get_assessed_habits()))
+        pending = [i for i, h in enumerate(habits) if "difficulty" not in h]
+        descriptions = [" - ".join(filter(None, [habits[i]["title"].strip(), habits[i].get("description")])) for i in pending]
+        for i, description, analysis in zip(pending, descriptions, ai.assess_habits_batch(descriptions)):
+            ai.learn_assessment(description, analysis)
+            assessments[i] = {"category": analysis["category"], "difficulty": analysis["difficulty"],
+                              "xp_reward": analysis["xp_reward"], "target_stat": analysis["target_stat"],
+                              "ai_tip": analysis.get("tip", ""), "assessed_by": analysis.get("source")}
+    for i, habit in enumerate(habits):
+        fields = {**assessments.get(i, {}), **habit}
+        store.create_habit(user_id, fields.pop("title").strip(), **fields)
+    log(f"habits: {len(habits)} imported for user {user_id} ({len(assessments)} assessed)")
+    return 0
+
+
+def cmd_recompute_streaks(session: Session, args) -> int:
+    store = session.store
+    if args.rebuild_history:
+        if not hasattr(store, "conn"):
+            raise CliError("--rebuild-history needs a SQLite database")
+        import history
+        rebuilt = history.rebuild(store.conn, store.db_path)
+        store.conn.commit()
+        log(f"history: {rebuilt} habit bitmaps rebuilt from completions")
+    log(f"streaks: {store.recompute_streaks()} habits corrected")
+    return 0
+
+
+def cmd_export(session: Session, args) -> int:
+    from datetime import date, timedelta
+    start = args.since or ((date.today() - timedelta(days=args.days)).isoformat() if args.days else None)
+    rows = session.store.iter_completions(session.user_id(args.user), start=start, end=args.until)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    written = 0
+    try:
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:  # streamed from the cursor, never held as a list
+            writer.writerow([row[column] for column in EXPORT_COLUMNS])
+            written += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    log(f"export: {written} completions")
+    return 0
+
+
+def cmd_stats(session: Session, args) -> int:
+    user_id = session.user_id(args.user)
+    user = session.store.get_user_by_id(user_id)
+    if user is None:
+        raise CliError(f"no user {user_id}")
+    print(json.dumps({**user, "habits": len(session.store.get_habits(user_id)),
+                      "completed_today": len(session.store.get_today_completions(user_id))}, indent=2))
+    return 0
+
+
+def cmd_maintain(session: Session, args) -> int:
+    from archive import CompletionArchiver
+    from maintenance import DEFAULT_INTERVALS, MaintenanceScheduler
+    archiver = CompletionArchiver(session.db_path, args.archive_days) if args.archive_days > 0 else None
+    scheduler = MaintenanceScheduler(session.db_path, archiver=archiver, budget=args.budget)
+    failed = 0
+    for job in args.jobs or [j for j in DEFAULT_INTERVALS if scheduler.enabled(j)]:
+        if not scheduler.enabled(job):
+            raise CliError(f"unknown or disabled job {job!r}")
+        result = scheduler.run(job)
+        failed += result["status"] != "ok"
+        print(json.dumps(result, default=str))
+    return 1 if failed else 0
+
+
+def cmd_snapshot(session: Session, args) -> int:
+    from backup import SnapshotManager
+    info = SnapshotManager(session.db_path, keep=args.keep).snapshot("cli")
+    print(json.dumps(info, default=str))
+    return 0
+
+
+def cmd_batch(session: Session, args) -> int:
+    stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    try:
+        lines = [line.strip() for line in stream]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    parser = build_parser()
+    failed = 0
+    for number, line in enumerate(lines, 1):
+        if not line or line.startswith("#"):
+            continue
+        try:
+            command = parser.parse_args(shlex.split(line))
+        except ValueError as e:  # unbalanced quotes
+            log(f"batch: line {number}: {e}")
+            command = None
+        except SystemExit as e:  # argparse has already printed the usage error
+            if not e.code:
+                continue  # --help
+            command = None
+        if command is None:
+            status = 2
+        elif command.handler is cmd_batch:
+            raise CliError(f"line {number}: batches can't nest")
+        else:
+            status = run(session, command)
+        if status:
+            failed += 1
+            log(f"batch: line {number} failed: {line}")
+            if not args.keep_going:
+                return status
+    return 1 if failed else 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENTRY POINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Goal Quest admin commands (no Streamlit needed)")
+    parser.add_argument("--db", default=os.environ.get("GOAL_QUEST_DB", "goal_quest.db"),
+                        help="database file, or memory:// (default: $GOAL_QUEST_DB or goal_quest.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name: str, handler, help: str, records: bool = False, user: bool = False):
+        sub = commands.add_parser(name, help=help)
+        sub.set_defaults(handler=handler)
+        if records:
+            sub.add_argument("file", nargs="?", default="-", help="JSON array, JSON lines or CSV; - for stdin")
+            sub.add_argument("--csv", action="store_true", help="read CSV whatever the file name")
+        if user:
+            sub.add_argument("--user", type=int, help="user id (default: the first user)")
+        return sub
+
+    command("seed-shop", cmd_seed_shop, "add shop items (name, description, item_type, rarity, gold_cost, ...)", records=True)
+    command("add-quotes", cmd_add_quotes, "add wisdom quotes (quote, author, source, tradition)", records=True)
+    sub = command("import-habits", cmd_import_habits, "create habits from records", records=True, user=True)
+    sub.add_argument("--assess", action="store_true", help="fill difficulty, XP and category like the app does")
+    sub = command("recompute-streaks", cmd_recompute_streaks, "reset habit streaks from completion history")
+    sub.add_argument("--rebuild-history", action="store_true", help="rebuild the day bitmaps from completions first")
+    sub = command("export", cmd_export, "write completions as CSV", user=True)
+    sub.add_argument("--since", help="first date (YYYY-MM-DD)")
+    sub.add_argument("--until", help="last date (YYYY-MM-DD)")
+    sub.add_argument("--days", type=int, default=0, help="the last N days (ignored with --since)")
+    sub.add_argument("-o", "--output", default="-", help="file to write (default stdout)")
+    command("stats", cmd_stats, "print a user's row and counts as JSON", user=True)
+    sub = command("maintain", cmd_maintain, "run maintenance jobs now (default: all)")
+    sub.add_argument("jobs", nargs="*", help="optimize, incremental_vacuum, wal_checkpoint, quick_check, archive_completions")
+    sub.add_argument("--budget", type=float, default=30.0, help="seconds per job")
+    sub.add_argument("--archive-days", type=int, default=int(os.environ.get("GOAL_QUEST_ARCHIVE_DAYS", "365")))
+    sub = command("snapshot", cmd_snapshot, "take a snapshot into backups/")
+    sub.add_argument("--keep", type=int, default=int(os.environ.get("GOAL_QUEST_BACKUP_KEEP", "7")))
+    sub = command("batch", cmd_batch, "run one command per line from a file or stdin")
+    sub.add_argument("file", nargs="?", default="-")
+    sub.add_argument("--keep-going", action="store_true", help="run the remaining lines after a failure")
+    return parser
+
+
+def run(session: Session, args) -> int:
+    try:
+        return args.handler(session, args)
+    except (CliError, ValueError, OSError) as e:
+        log(f"{args.command}: {e}")
+        return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    session = Session(args.db)
+    try:
+        return run(session, args)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
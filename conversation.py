@@ -0,0 +1,100 @@
+"""
+💬 GOAL QUEST - Conversation Memory
+Token-bounded coach history with a rolling summary
+
+Recent turns are sent verbatim while they fit the token budget. Older turns
+are folded into a compact running summary, so the input size of a coaching
+turn stays bounded however long the session runs. Tokens are estimated
+locally (about four characters per token) to avoid a counting round-trip.
+"""
+
+import re
+from typing import Callable, Dict, List, Tuple
+
+MESSAGE_OVERHEAD_TOKENS = 4
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict) -> int:
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def first_sentence(text: str, limit: int = 140) -> str:
+    sentence = _SENTENCE_END.split(" ".join(text.split()), maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 1].rstrip() + "…"
+
+
+def extractive_summary(turns: List[Dict]) -> List[str]:
+    """One short line per evicted turn: the gist without a model round-trip"""
+    lines = []
+    for turn in turns:
+        speaker = "User" if turn["role"] == "user" else "Coach"
+        lines.append(f"{speaker}: {first_sentence(turn['content'])}")
+    return lines
+
+
+class ConversationMemory:
+    """Rolling summary plus a token-bounded tail of recent turns"""
+
+    def __init__(self, token_budget: int = 1200, summary_budget: int = 300,
+                 summarize: Callable[[List[Dict]], List[str]] = extractive_summary):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarize = summarize
+        self.summary_lines: List[str] = []
+        self.turns: List[Dict] = []
+
+    @classmethod
+    def from_history(cls, history: List[Dict], **options) -> "ConversationMemory":
+        memory = cls(**options)
+        for turn in history:
+            memory.turns.append({"role": turn.get("role", "user"), "content": turn.get("content", "")})
+        memory._compact()
+        return memory
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def tokens(self) -> int:
+        return sum(message_tokens(turn) for turn in self.turns) + estimate_tokens(self.summary)
+
+    def prepare(self, message: str) -> Tuple[str, List[Dict]]:
+        """Summary and message list for the next request, ending with message exactly once"""
+        turns = list(self.turns)
+        # Callers that already appended the new message to their history must not send it twice
+        if turns and turns[-1]["role"] == "user" and turns[-1]["content"] == message:
+            turns.pop()
+        # The Messages API wants the conversation to open with a user turn
+        while turns and turns[0]["role"] != "user":
+            turns.pop(0)
+        return self.summary, turns + [{"role": "user", "content": message}]
+
+    def record(self, message: str, reply: str):
+        """Append a completed exchange and compact to stay within budget"""
+        if self.turns and self.turns[-1]["role"] == "user" and self.turns[-1]["content"] == message:
+            self.turns.pop()
+        self.turns.append({"role": "user", "content": message})
+        self.turns.append({"role": "assistant", "content": reply})
+        self._compact()
+
+    def clear(self):
+        self.summary_lines = []
+        self.turns = []
+
+    def _compact(self):
+        recent_budget = self.token_budget - self.summary_budget
+        evicted: List[Dict] = []
+        # Evict whole exchanges from the front, always keeping the latest one verbatim
+        while len(self.turns) > 2 and sum(message_tokens(t) for t in self.turns) > recent_budget:
+            evicted.append(self.turns.pop(0))
+            if self.turns and self.turns[0]["role"] == "assistant":
+                evicted.append(self.turns.pop(0))
+        if evicted:
+            self.summary_lines.extend(self.summarize(evicted))
+        while self.summary_lines and estimate_tokens(self.summary) > self.summary_budget:
+            self.summary_lines.pop(0)
@@ -0,0 +1,1002 @@
+"""
+🗄️ GOAL QUEST - Database Layer
+SQLite storage for users, habits, goals, shop, quotes, notes and the economy ledger
+
+Kept free of Streamlit imports so benchmarks and tooling can use it directly.
+Implements storage.StorageBackend; leveling and goal progress come from there.
+"""
+
+import functools
+import os
+import sqlite3
+import time
+from datetime import datetime, date
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import archive
+import economy
+import history
+import leaderboard
+import rows
+import schedule
+from storage import DEFAULTS, QUOTE_COLUMNS, QUOTES, SHOP_COLUMNS, SHOP_ITEMS, StorageBackend, new_rows
+
+# Bump whenever _create_tables gains a table, column, index or migration: databases stamped with
+# an older PRAGMA user_version run it once more, current ones skip it on open
+SCHEMA_VERSION = 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATABASE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def write_method(method):
+    """Run a write method on the group-commit writer when one is attached.
+    
+    The whole method (including its reads) runs on the writer connection, so
+    read-modify-write sequences stay atomic; the caller blocks until durable
+    and until the method's after-commit effects have run.
+    """
+    @functools.wraps(method)
+    def routed(self, *args, **kwargs):
+        self.last_write = time.monotonic()
+        if self.writer is None:
+            return method(self, *args, **kwargs)
+        return self._submit(method, *args, **kwargs).result()
+    routed.write_method = method
+    return routed
+
+
+class Database(StorageBackend):
+    """SQLite database handler"""
+    
+    def __init__(self, db_path: str = "goal_quest.db", group_commit: bool = False):
+        self.db_path = db_path
+        self.conn = None
+        self.writer = None  # group_commit.GroupCommitWriter when writes are batched
+        self.last_write = 0.0  # monotonic time of the last write call, for idle-time maintenance
+        self.generation = 0  # bumped whenever restore/reset replaces the contents
+        self.due_today = schedule.DueToday()
+        self.leaderboards = leaderboard.Leaderboards()
+        self.listeners: List[Callable] = []
+        self._effects: Optional[List] = None  # set while a write job runs on the writer thread
+        self._writer_view: Optional["Database"] = None
+        self._connect()
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._create_tables()
+        if group_commit:
+            from group_commit import GroupCommitWriter
+            # WAL lets this connection keep reading while the writer commits
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.writer = GroupCommitWriter(db_path)
+        self._external_seen = self._external_version()
+    
+    def _bound(self, conn) -> "Database":
+        """This database as seen from the writer thread: same methods, writer connection"""
+        view = self._writer_view
+        if view is None or view.conn is not conn:
+            view = object.__new__(type(self))
+            view.__dict__.update(self.__dict__)
+            view.conn, view.writer, view._writer_view = conn, None, None
+            self._writer_view = view
+        return view
+    
+    def _submit(self, method: Callable, *args, **kwargs) -> "Future":
+        """Queue method on the writer; the future resolves after its COMMIT and its after-commit
+        effects, which are dropped if the job's savepoint or the whole batch rolls back"""
+        # Only group-commit writes get here; cli.py starts without logging and concurrent.futures
+        import logging
+        from concurrent.futures import Future
+        effects: List[Tuple[Callable, tuple]] = []
+        done: Future = Future()
+        
+        def job(conn):
+            view = self._bound(conn)
+            view._effects = effects
+            try:
+                return method(view, *args, **kwargs)
+            finally:
+                view._effects = None
+        
+        def settle(future: "Future"):
+            error = future.exception()
+            if error is not None:
+                done.set_exception(error)
+                return
+            for effect, effect_args in effects:
+                try:
+                    effect(*effect_args)
+                except Exception:
+                    logging.getLogger(__name__).exception("after-commit effect %r failed", effect)
+            done.set_result(future.result())
+        
+        self.writer.submit(job).add_done_callback(settle)
+        return done
+    
+    def _after_commit(self, effect: Callable, *args):
+        """Run effect(*args) (cache invalidation, leaderboards, listeners) once the current write is
+        durable: queued while a group-commit job runs, immediately otherwise (the write has committed)"""
+        if self._effects is not None:
+            self._effects.append((effect, args))
+        else:
+            effect(*args)
+    
+    def defer(self, method: str, *args, **kwargs) -> "Future":
+        """Queue a write method without waiting; the future resolves once it is durable"""
+        from concurrent.futures import Future
+        target = getattr(type(self), method).write_method
+        if self.writer is None:
+            future = Future()
+            future.set_result(target(self, *args, **kwargs))
+            return future
+        return self._submit(target, *args, **kwargs)
+    
+    def revision(self) -> str:
+        """Token that changes whenever the contents may have: a restore, a write on this connection
+        (total_changes) or a commit on any other one (data_version: the group-commit writer,
+        maintenance, other processes)"""
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return f"{self.generation}.{self.conn.total_changes}.{data_version}"
+    
+    def _external_version(self) -> int:
+        """data_version of the connection writes go through, which other connections' commits change"""
+        if self.writer is not None:
+            return self.writer.data_version()
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.conn.close()
+    
+    def replace_contents(self, source: str, archives: Dict[int, str]):
+        """Swap in another database file's contents (and year -> archive file copies) under every
+        open connection; each file changes in one backup step, so readers see old or new, never a mix"""
+        from backup import copy_database
+        archive.detach_all(self.conn)
+        for year, path in archive.archive_files(self.db_path).items():
+            if year not in archives:
+                os.remove(path)
+        for year, path in archives.items():
+            copy_database(path, archive.archive_path(self.db_path, year))
+        copy_database(source, self.db_path)
+        self._create_tables()  # snapshots from older versions get the current schema
+        self.due_today.invalidate()
+        self.leaderboards.invalidate()
+        self.generation += 1
+        self._changed("all")
+    
+    def _connect(self):
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+    
+    def _cursor(self, kind: str) -> sqlite3.Cursor:
+        """A cursor that builds rows.<kind> records (internal queries keep sqlite3.Row from the connection)"""
+        cursor = self.conn.cursor()
+        cursor.row_factory = rows.FACTORIES[kind]
+        return cursor
+    
+    def _create_tables(self):
+        cursor = self.conn.cursor()
+        # Only takes effect on a new file; maintenance converts older databases
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
+        # User table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                display_name TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                level INTEGER DEFAULT 1,
+                current_xp INTEGER DEFAULT 0,
+                total_xp INTEGER DEFAULT 0,
+                gold INTEGER DEFAULT 100,
+                gems INTEGER DEFAULT 10,
+                strength INTEGER DEFAULT 1,
+                intelligence INTEGER DEFAULT 1,
+                vitality INTEGER DEFAULT 1,
+                agility INTEGER DEFAULT 1,
+                sense INTEGER DEFAULT 1,
+                willpower INTEGER DEFAULT 1,
+                current_streak INTEGER DEFAULT 0,
+                best_streak INTEGER DEFAULT 0,
+                last_activity_date DATE,
+                philosophy_traditions TEXT DEFAULT '["stoic"]',
+                onboarding_complete INTEGER DEFAULT 0,
+                dreams_text TEXT
+            )
+        """)
+        
+        # Habits table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS habits (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                category TEXT DEFAULT 'personal',
+                difficulty INTEGER DEFAULT 3,
+                xp_reward INTEGER DEFAULT 100,
+                target_stat TEXT DEFAULT 'willpower',
+                frequency TEXT DEFAULT 'daily',
+                streak INTEGER DEFAULT 0,
+                best_streak INTEGER DEFAULT 0,
+                total_completions INTEGER DEFAULT 0,
+                is_priority INTEGER DEFAULT 0,
+                is_active INTEGER DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                ai_tip TEXT,
+                assessed_by TEXT,
+                history_origin DATE,
+                history_bits BLOB,
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        
+        # Habit completions
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS habit_completions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                habit_id INTEGER NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completion_date DATE NOT NULL,
+                xp_earned INTEGER DEFAULT 0,
+                streak_bonus INTEGER DEFAULT 0,
+                FOREIGN KEY (habit_id) REFERENCES habits(id),
+                UNIQUE(habit_id, completion_date)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_habit_completions_date ON habit_completions(completion_date)")
+        archive.ensure_schema(self.conn)
+        
+        # Goals table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS goals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                category TEXT DEFAULT 'personal',
+                difficulty INTEGER DEFAULT 3,
+                xp_reward INTEGER DEFAULT 2000,
+                target_stat TEXT DEFAULT 'intelligence',
+                due_date DATE,
+                estimated_weeks INTEGER,
+                is_completed INTEGER DEFAULT 0,
+                completed_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        
+        # Goal steps
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS goal_steps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                goal_id INTEGER NOT NULL,
+                step_number INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                estimated_duration TEXT,
+                xp_reward INTEGER DEFAULT 200,
+                is_completed INTEGER DEFAULT 0,
+                completed_at TIMESTAMP,
+                FOREIGN KEY (goal_id) REFERENCES goals(id)
+            )
+        """)
+        
+        # Shop items
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS shop_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                item_type TEXT,
+                rarity TEXT DEFAULT 'common',
+                gold_cost INTEGER DEFAULT 0,
+                gem_cost INTEGER DEFAULT 0,
+                level_required INTEGER DEFAULT 1,
+                effects TEXT,
+                is_available INTEGER DEFAULT 1
+            )
+        """)
+        
+        # User inventory
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_inventory (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                quantity INTEGER DEFAULT 1,
+                purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user(id),
+                FOREIGN KEY (item_id) REFERENCES shop_items(id)
+            )
+        """)
+        
+        # Wisdom quotes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS wisdom_quotes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                quote TEXT NOT NULL,
+                author TEXT,
+                source TEXT,
+                tradition TEXT,
+                is_user_saved INTEGER DEFAULT 0,
+                user_id INTEGER
+            )
+        """)
+        
+        # Notes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                content TEXT,
+                is_pinned INTEGER DEFAULT 0,
+                tags TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        
+        # Coach conversations
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_threads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT DEFAULT 'Coaching session',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                thread_id INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (thread_id) REFERENCES chat_threads(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_thread ON chat_messages(thread_id, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_threads_user ON chat_threads(user_id, updated_at)")
+        
+        # Achievements
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS achievements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                category TEXT,
+                tier TEXT DEFAULT 'bronze',
+                xp_reward INTEGER DEFAULT 100,
+                requirement_type TEXT,
+                requirement_value INTEGER
+            )
+        """)
+        
+        # User achievements
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_achievements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                achievement_id INTEGER NOT NULL,
+                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES user(id),
+                FOREIGN KEY (achievement_id) REFERENCES achievements(id),
+                UNIQUE(user_id, achievement_id)
+            )
+        """)
+        
+        # Economy ledger (append-only) and periodic replay snapshots
+        ledger_columns = economy.LEDGER_COLUMNS
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS economy_ledger (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                kind TEXT NOT NULL,
+                source_type TEXT NOT NULL,
+                source_id INTEGER,
+                {", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in ledger_columns)},
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_economy_ledger_user ON economy_ledger(user_id, id)")
+        snapshot_columns = list(economy.USER_COLUMNS.values())
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS economy_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                ledger_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                {", ".join(f"{c} INTEGER NOT NULL" for c in snapshot_columns)},
+                FOREIGN KEY (user_id) REFERENCES user(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_economy_snapshots_user ON economy_snapshots(user_id, ledger_id)")
+        # Users from before the ledger start from an opening balance equal to their row
+        cursor.execute(f"""
+            INSERT INTO economy_ledger (user_id, kind, source_type, source_id, {", ".join(ledger_columns)})
+            SELECT id, 'opening', 'migration', id, {", ".join(economy.USER_COLUMNS[c] for c in ledger_columns)}
+            FROM user WHERE id NOT IN (SELECT user_id FROM economy_ledger)
+        """)
+        
+        habit_columns = {row["name"] for row in cursor.execute("PRAGMA table_info(habits)")}
+        if "assessed_by" not in habit_columns:
+            cursor.execute("ALTER TABLE habits ADD COLUMN assessed_by TEXT")
+        if "history_bits" not in habit_columns:
+            cursor.execute("ALTER TABLE habits ADD COLUMN history_origin DATE")
+            cursor.execute("ALTER TABLE habits ADD COLUMN history_bits BLOB")
+            history.rebuild(self.conn, self.db_path)
+        
+        self.conn.commit()
+        self._init_default_data()
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def _init_default_data(self):
+        """Initialize default data"""
+        cursor = self.conn.cursor()
+        
+        cursor.execute("SELECT COUNT(*) FROM shop_items")
+        if cursor.fetchone()[0] == 0:
+            cursor.executemany("""
+                INSERT INTO shop_items (name, description, item_type, rarity, gold_cost, gem_cost, level_required, effects)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, SHOP_ITEMS)
+        
+        cursor.execute("SELECT COUNT(*) FROM wisdom_quotes")
+        if cursor.fetchone()[0] == 0:
+            cursor.executemany("""
+                INSERT INTO wisdom_quotes (quote, author, source, tradition)
+                VALUES (?, ?, ?, ?)
+            """, QUOTES)
+        
+        cursor.execute("SELECT COUNT(*) FROM achievements")
+        if cursor.fetchone()[0] == 0:
+            achievements = [
+                ("first_flame", "First Flame", "Complete your first habit", "streaks", "bronze", 100, "count", 1),
+                ("kindling", "Kindling", "Maintain a 7-day streak", "streaks", "bronze", 200, "streak", 7),
+                ("bonfire", "Bonfire", "Maintain a 14-day streak", "streaks", "silver", 400, "streak", 14),
+                ("inferno", "Inferno", "Maintain a 30-day streak", "streaks", "gold", 800, "streak", 30),
+                ("awakened", "Awakened", "Reach Level 5", "levels", "bronze", 150, "level", 5),
+                ("novice_hunter", "Novice Hunter", "Reach Level 10", "levels", "bronze", 300, "level", 10),
+                ("habit_former", "Habit Former", "Create 5 habits", "habits", "bronze", 100, "count", 5),
+                ("goal_setter", "Goal Setter", "Create your first goal", "goals", "bronze", 100, "count", 1),
+            ]
+            cursor.executemany("""
+                INSERT INTO achievements (key, title, description, category, tier, xp_reward, requirement_type, requirement_value)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, achievements)
+        
+        self.conn.commit()
+    
+    # User methods
+    def get_user(self) -> Optional[Dict]:
+        return self._cursor("User").execute("SELECT * FROM user LIMIT 1").fetchone()
+    
+    def get_user_by_id(self, user_id: int) -> Optional[Dict]:
+        return self._cursor("User").execute("SELECT * FROM user WHERE id = ?", (user_id,)).fetchone()
+    
+    def get_users(self) -> List[Dict]:
+        return self._cursor("User").execute("SELECT * FROM user ORDER BY id").fetchall()
+    
+    @write_method
+    def create_user(self, name: str, **kwargs) -> int:
+        cursor = self.conn.cursor()
+        columns = ["name"] + list(kwargs.keys())
+        placeholders = ["?"] * len(columns)
+        values = [name] + list(kwargs.values())
+        cursor.execute(f"INSERT INTO user ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
+        user_id = cursor.lastrowid
+        self._open_account(user_id, kwargs)
+        self.conn.commit()
+        self._after_commit(self.leaderboards.user_added, user_id, {**DEFAULTS["user"], "name": name, **kwargs})
+        return user_id
+    
+    def _set_user_fields(self, user_id: int, **kwargs) -> bool:
+        if not kwargs:
+            return False
+        cursor = self.conn.cursor()
+        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
+        values = list(kwargs.values()) + [user_id]
+        cursor.execute(f"UPDATE user SET {set_clause} WHERE id = ?", values)
+        self.conn.commit()
+        if cursor.rowcount > 0:
+            self._after_commit(self.leaderboards.user_changed, user_id, kwargs)
+        return cursor.rowcount > 0
+    
+    update_user = write_method(StorageBackend.update_user)
+    add_xp = write_method(StorageBackend.add_xp)
+    materialize_user = write_method(StorageBackend.materialize_user)
+    
+    # Economy ledger
+    @write_method
+    def append_ledger(self, user_id: int, kind: str, source_type: str, source_id: Optional[int] = None, **deltas) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            INSERT INTO economy_ledger (user_id, kind, source_type, source_id, {", ".join(economy.LEDGER_COLUMNS)})
+            VALUES (?, ?, ?, ?, {", ".join("?" * len(economy.LEDGER_COLUMNS))})
+        """, (user_id, kind, source_type, source_id, *economy.ledger_values(deltas)))
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def get_ledger(self, user_id: int, after_id: int = 0) -> List[Dict]:
+        cursor = self._cursor("Record")
+        cursor.execute("SELECT * FROM economy_ledger WHERE user_id = ? AND id > ? ORDER BY id", (user_id, after_id))
+        return cursor.fetchall()
+    
+    def get_ledger_rows(self, user_id: int, after_id: int = 0) -> List[Tuple[int, ...]]:
+        cursor = self.conn.cursor()
+        cursor.row_factory = None  # plain tuples feed numpy directly
+        cursor.execute(f"SELECT {', '.join(economy.LEDGER_COLUMNS)} FROM economy_ledger WHERE user_id = ? AND id > ? ORDER BY id",
+                       (user_id, after_id))
+        return cursor.fetchall()
+    
+    def count_ledger(self, user_id: int, after_id: int = 0) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM economy_ledger WHERE user_id = ? AND id > ?", (user_id, after_id))
+        return cursor.fetchone()[0]
+    
+    @write_method
+    def save_snapshot(self, user_id: int, ledger_id: int, state: Dict) -> int:
+        columns = list(economy.USER_COLUMNS.values())
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            INSERT INTO economy_snapshots (user_id, ledger_id, {", ".join(columns)})
+            VALUES (?, ?, {", ".join("?" * len(columns))})
+        """, (user_id, ledger_id, *(state[c] for c in columns)))
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def get_latest_snapshot(self, user_id: int) -> Optional[Dict]:
+        cursor = self._cursor("Record")
+        cursor.execute("SELECT * FROM economy_snapshots WHERE user_id = ? ORDER BY ledger_id DESC LIMIT 1", (user_id,))
+        return cursor.fetchone()
+    
+    # Habit methods
+    @write_method
+    def create_habit(self, user_id: int, title: str, **kwargs) -> int:
+        cursor = self.conn.cursor()
+        columns = ["user_id", "title"] + list(kwargs.keys())
+        placeholders = ["?"] * len(columns)
+        values = [user_id, title] + list(kwargs.values())
+        cursor.execute(f"INSERT INTO habits ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
+        self.conn.commit()
+        self._after_commit(self.due_today.invalidate)
+        self._after_commit(self._changed, "habit", cursor.lastrowid)
+        return cursor.lastrowid
+    
+    def get_habits(self, user_id: int, active_only: bool = True) -> List[Dict]:
+        cursor = self._cursor("Habit")
+        query = "SELECT * FROM habits WHERE user_id = ?"
+        if active_only:
+            query += " AND is_active = 1"
+        query += " ORDER BY is_priority DESC, created_at DESC"
+        cursor.execute(query, (user_id,))
+        return cursor.fetchall()
+    
+    def get_assessed_habits(self) -> List[Dict]:
+        """Habits whose difficulty came from an accepted AI assessment (training data)"""
+        cursor = self._cursor("Habit")
+        # Rows from before assessed_by was recorded count when they carry a non-fallback AI tip
+        cursor.execute("""
+            SELECT title, description, difficulty, category, target_stat, xp_reward FROM habits
+            WHERE assessed_by = 'ai'
+               OR (assessed_by IS NULL AND ai_tip != '' AND ai_tip NOT LIKE 'Start small%')
+        """)
+        return cursor.fetchall()
+    
+    def get_habit(self, habit_id: int) -> Optional[Dict]:
+        return self._cursor("Habit").execute("SELECT * FROM habits WHERE id = ?", (habit_id,)).fetchone()
+    
+    @write_method
+    def update_habit(self, habit_id: int, **kwargs) -> bool:
+        if not kwargs:
+            return False
+        cursor = self.conn.cursor()
+        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
+        values = list(kwargs.values()) + [habit_id]
+        cursor.execute(f"UPDATE habits SET {set_clause} WHERE id = ?", values)
+        self.conn.commit()
+        if schedule.SCHEDULE_FIELDS & kwargs.keys():
+            self._after_commit(self.due_today.invalidate)
+        self._after_commit(self._changed, "habit", habit_id)
+        return cursor.rowcount > 0
+    
+    @write_method
+    def delete_habit(self, habit_id: int) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM habit_completions WHERE habit_id = ?", (habit_id,))
+        cursor.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
+        self.conn.commit()
+        self._after_commit(self.due_today.invalidate)
+        self._after_commit(self.leaderboards.invalidate)  # its completions leave the weekly counts
+        self._after_commit(self._changed, "habit", habit_id)
+        deleted = cursor.rowcount > 0
+        if deleted and archive.watermark(self.conn) is not None:
+            self._after_commit(archive.purge_orphans, self.db_path)  # and so do its archived ones
+        return deleted
+    
+    @write_method
+    def complete_habit(self, habit_id: int, user_id: int) -> Dict:
+        today = date.today().isoformat()
+        cursor = self.conn.cursor()
+        
+        cursor.execute("SELECT id FROM habit_completions WHERE habit_id = ? AND completion_date = ?", (habit_id, today))
+        if cursor.fetchone():
+            return {"error": "Already completed today"}
+        
+        habit = self.get_habit(habit_id)
+        if not habit:
+            return {"error": "Habit not found"}
+        
+        new_streak = habit["streak"] + 1
+        streak_bonus = min(int(habit["xp_reward"] * 0.1 * new_streak), habit["xp_reward"])
+        total_xp = habit["xp_reward"] + streak_bonus
+        
+        cursor.execute("""
+            INSERT INTO habit_completions (habit_id, completion_date, xp_earned, streak_bonus)
+            VALUES (?, ?, ?, ?)
+        """, (habit_id, today, total_xp, streak_bonus))
+        completion_id = cursor.lastrowid
+        
+        best_streak = max(habit["best_streak"], new_streak)
+        history_origin, history_bits = history.encode(history.mark(history.of(habit), date.fromisoformat(today)))
+        self.update_habit(habit_id, streak=new_streak, best_streak=best_streak, total_completions=habit["total_completions"] + 1,
+                          history_origin=history_origin, history_bits=history_bits)
+        
+        xp_result = self.add_xp(user_id, total_xp, "habit_completion", completion_id)
+        gold_earned = int(habit["xp_reward"] * 0.1)
+        
+        user = self.get_user_by_id(user_id)
+        self._set_user_fields(user_id, gold=user["gold"] + gold_earned)
+        
+        # Update user streak
+        user_streak = user["current_streak"] + 1
+        user_best = max(user["best_streak"], user_streak)
+        self._set_user_fields(user_id, current_streak=user_streak, best_streak=user_best, last_activity_date=today)
+        
+        # Update target stat
+        stat = habit.get("target_stat", "willpower")
+        current_stat = user.get(stat, 1)
+        self._set_user_fields(user_id, **{stat: current_stat + 1})
+        self._record_economy(user_id, "grant", "habit_completion", completion_id, gold=gold_earned, **{stat: 1})
+        
+        self.conn.commit()
+        self._after_commit(self.leaderboards.completion_recorded, user_id, date.fromisoformat(today))
+        return {"success": True, "xp_earned": total_xp, "streak_bonus": streak_bonus, "gold_earned": gold_earned, "new_streak": new_streak, **xp_result}
+    
+    def is_habit_completed_today(self, habit_id: int) -> bool:
+        today = date.today().isoformat()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM habit_completions WHERE habit_id = ? AND completion_date = ?", (habit_id, today))
+        return cursor.fetchone() is not None
+    
+    def get_today_completions(self, user_id: int) -> List[int]:
+        today = date.today().isoformat()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT hc.habit_id FROM habit_completions hc
+            JOIN habits h ON hc.habit_id = h.id
+            WHERE h.user_id = ? AND hc.completion_date = ?
+        """, (user_id, today))
+        return [row[0] for row in cursor.fetchall()]
+    
+    def get_completion_counts_by_user(self, start: str, end: str) -> Dict[int, int]:
+        sql, params = archive.per_source(self.conn, self.db_path, start, """
+            SELECT h.user_id, COUNT(*) as count
+            FROM {completions} hc
+            JOIN habits h ON hc.habit_id = h.id
+            WHERE hc.completion_date >= ? AND hc.completion_date <= ? {archived}
+            GROUP BY h.user_id
+        """, (start, end))
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT user_id, SUM(count) FROM ({sql}) GROUP BY user_id", params)
+        return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    def get_completion_counts(self, user_id: int, start: str, end: str) -> Dict[int, int]:
+        sql, params = archive.per_source(self.conn, self.db_path, start, """
+            SELECT hc.habit_id, COUNT(*) as count
+            FROM {completions} hc
+            JOIN habits h ON hc.habit_id = h.id
+            WHERE h.user_id = ? AND hc.completion_date >= ? AND hc.completion_date <= ? {archived}
+            GROUP BY hc.habit_id
+        """, (user_id, start, end))
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT habit_id, SUM(count) FROM ({sql}) GROUP BY habit_id", params)
+        return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    # Goal methods
+    @write_method
+    def create_goal(self, user_id: int, title: str, steps: List[Dict] = None, **kwargs) -> int:
+        cursor = self.conn.cursor()
+        columns = ["user_id", "title"] + list(kwargs.keys())
+        placeholders = ["?"] * len(columns)
+        values = [user_id, title] + list(kwargs.values())
+        cursor.execute(f"INSERT INTO goals ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
+        goal_id = cursor.lastrowid
+        
+        if steps:
+            for i, step in enumerate(steps, 1):
+                cursor.execute("""
+                    INSERT INTO goal_steps (goal_id, step_number, title, description, estimated_duration, xp_reward)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (goal_id, i, step.get("title", f"Step {i}"), step.get("description", ""), step.get("estimated_duration", "1 week"), step.get("xp_reward", 200)))
+        
+        self.conn.commit()
+        self._after_commit(self._changed, "goal", goal_id)
+        return goal_id
+    
+    def get_goals(self, user_id: int, include_completed: bool = False) -> List[Dict]:
+        cursor = self._cursor("Goal")
+        query = "SELECT * FROM goals WHERE user_id = ?"
+        if not include_completed:
+            query += " AND is_completed = 0"
+        query += " ORDER BY due_date ASC, created_at DESC"
+        cursor.execute(query, (user_id,))
+        goals = cursor.fetchall()
+        
+        for goal in goals:
+            goal["steps"] = self.get_goal_steps(goal["id"])
+            goal["progress"] = self.get_goal_progress(goal["id"])
+        return goals
+    
+    def get_goal(self, goal_id: int) -> Optional[Dict]:
+        goal = self._cursor("Goal").execute("SELECT * FROM goals WHERE id = ?", (goal_id,)).fetchone()
+        if not goal:
+            return None
+        goal["steps"] = self.get_goal_steps(goal_id)
+        goal["progress"] = self.get_goal_progress(goal_id)
+        return goal
+    
+    def get_goal_steps(self, goal_id: int) -> List[Dict]:
+        cursor = self._cursor("GoalStep")
+        cursor.execute("SELECT * FROM goal_steps WHERE goal_id = ? ORDER BY step_number", (goal_id,))
+        return cursor.fetchall()
+    
+    @write_method
+    def complete_goal_step(self, step_id: int, user_id: int) -> Dict:
+        cursor = self.conn.cursor()
+        step = self._cursor("GoalStep").execute("SELECT * FROM goal_steps WHERE id = ?", (step_id,)).fetchone()
+        if not step:
+            return {"error": "Step not found"}
+        if step["is_completed"]:
+            return {"error": "Step already completed"}
+        
+        cursor.execute("UPDATE goal_steps SET is_completed = 1, completed_at = ? WHERE id = ?", (datetime.now().isoformat(), step_id))
+        xp_result = self.add_xp(user_id, step["xp_reward"], "goal_step", step_id)
+        
+        progress = self.get_goal_progress(step["goal_id"])
+        goal_completed = progress["percentage"] == 100
+        
+        if goal_completed:
+            goal = self.get_goal(step["goal_id"])
+            cursor.execute("UPDATE goals SET is_completed = 1, completed_at = ? WHERE id = ?", (datetime.now().isoformat(), step["goal_id"]))
+            goal_xp = self.add_xp(user_id, goal["xp_reward"], "goal", step["goal_id"])
+            xp_result["goal_xp"] = goal["xp_reward"]
+        
+        self.conn.commit()
+        if goal_completed:
+            self._after_commit(self._changed, "goal", step["goal_id"])
+        return {"success": True, "step_xp": step["xp_reward"], "goal_completed": goal_completed, **xp_result}
+    
+    @write_method
+    def delete_goal(self, goal_id: int) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM goal_steps WHERE goal_id = ?", (goal_id,))
+        cursor.execute("DELETE FROM goals WHERE id = ?", (goal_id,))
+        self.conn.commit()
+        self._after_commit(self._changed, "goal", goal_id)
+        return cursor.rowcount > 0
+    
+    # Shop methods
+    def get_shop_items(self, user_level: int = 1) -> List[Dict]:
+        cursor = self._cursor("ShopItem")
+        cursor.execute("SELECT * FROM shop_items WHERE is_available = 1 ORDER BY level_required, gold_cost")
+        items = cursor.fetchall()
+        for item in items:
+            item.meets_level = item.level_required <= user_level
+        return items
+    
+    @write_method
+    def purchase_item(self, user_id: int, item_id: int) -> Dict:
+        user = self.get_user_by_id(user_id)
+        cursor = self.conn.cursor()
+        item = self._cursor("ShopItem").execute("SELECT * FROM shop_items WHERE id = ?", (item_id,)).fetchone()
+        if not item:
+            return {"error": "Item not found"}
+        if not user:
+            return {"error": "User not found"}
+        
+        if user["level"] < item["level_required"]:
+            return {"error": f"Requires level {item['level_required']}"}
+        if item["gold_cost"] > 0 and user["gold"] < item["gold_cost"]:
+            return {"error": "Not enough gold"}
+        if item["gem_cost"] > 0 and user["gems"] < item["gem_cost"]:
+            return {"error": "Not enough gems"}
+        
+        new_gold = user["gold"] - item["gold_cost"]
+        new_gems = user["gems"] - item["gem_cost"]
+        self._set_user_fields(user_id, gold=new_gold, gems=new_gems)
+        self._record_economy(user_id, "spend", "shop_item", item_id, gold=-item["gold_cost"], gems=-item["gem_cost"])
+        
+        cursor.execute("SELECT id, quantity FROM user_inventory WHERE user_id = ? AND item_id = ?", (user_id, item_id))
+        existing = cursor.fetchone()
+        if existing:
+            cursor.execute("UPDATE user_inventory SET quantity = quantity + 1 WHERE id = ?", (existing[0],))
+        else:
+            cursor.execute("INSERT INTO user_inventory (user_id, item_id, quantity) VALUES (?, ?, 1)", (user_id, item_id))
+        
+        self.conn.commit()
+        return {"success": True, "item": item, "new_gold": new_gold, "new_gems": new_gems}
+    
+    def get_inventory(self, user_id: int) -> List[Dict]:
+        cursor = self._cursor("Record")
+        cursor.execute("""
+            SELECT ui.*, si.name, si.description, si.item_type, si.rarity, si.effects
+            FROM user_inventory ui
+            JOIN shop_items si ON ui.item_id = si.id
+            WHERE ui.user_id = ?
+        """, (user_id,))
+        return cursor.fetchall()
+    
+    @write_method
+    def add_shop_items(self, items: List[Dict]) -> int:
+        cursor = self.conn.cursor()
+        existing = {row[0] for row in cursor.execute("SELECT name FROM shop_items")}
+        rows = new_rows(items, "shop_items", SHOP_COLUMNS, "name", existing)
+        cursor.executemany(f"INSERT INTO shop_items ({', '.join(SHOP_COLUMNS)}) VALUES ({', '.join('?' * len(SHOP_COLUMNS))})", rows)
+        self.conn.commit()
+        return len(rows)
+    
+    # Quote methods
+    def get_random_quote(self, traditions: List[str] = None) -> Optional[Dict]:
+        cursor = self._cursor("Record")
+        if traditions:
+            placeholders = ", ".join(["?"] * len(traditions))
+            cursor.execute(f"SELECT * FROM wisdom_quotes WHERE tradition IN ({placeholders}) ORDER BY RANDOM() LIMIT 1", traditions)
+        else:
+            cursor.execute("SELECT * FROM wisdom_quotes ORDER BY RANDOM() LIMIT 1")
+        return cursor.fetchone()
+    
+    @write_method
+    def add_quotes(self, quotes: List[Dict]) -> int:
+        cursor = self.conn.cursor()
+        existing = {row[0] for row in cursor.execute("SELECT quote FROM wisdom_quotes")}
+        rows = new_rows(quotes, "wisdom_quotes", QUOTE_COLUMNS, "quote", existing)
+        cursor.executemany(f"INSERT INTO wisdom_quotes ({', '.join(QUOTE_COLUMNS)}) VALUES ({', '.join('?' * len(QUOTE_COLUMNS))})", rows)
+        self.conn.commit()
+        return len(rows)
+    
+    # Notes methods
+    @write_method
+    def create_note(self, user_id: int, title: str, content: str = "", **kwargs) -> int:
+        cursor = self.conn.cursor()
+        columns = ["user_id", "title", "content"] + list(kwargs.keys())
+        placeholders = ["?"] * len(columns)
+        values = [user_id, title, content] + list(kwargs.values())
+        cursor.execute(f"INSERT INTO notes ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def get_notes(self, user_id: int) -> List[Dict]:
+        cursor = self._cursor("Note")
+        cursor.execute("SELECT * FROM notes WHERE user_id = ? ORDER BY is_pinned DESC, updated_at DESC", (user_id,))
+        return cursor.fetchall()
+    
+    @write_method
+    def update_note(self, note_id: int, **kwargs) -> bool:
+        kwargs["updated_at"] = datetime.now().isoformat()
+        cursor = self.conn.cursor()
+        set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
+        cursor.execute(f"UPDATE notes SET {set_clause} WHERE id = ?", list(kwargs.values()) + [note_id])
+        self.conn.commit()
+        return cursor.rowcount > 0
+    
+    @write_method
+    def delete_note(self, note_id: int) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        self.conn.commit()
+        return cursor.rowcount > 0
+    
+    # Coach conversation methods
+    @write_method
+    def create_chat_thread(self, user_id: int, title: str = "Coaching session") -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT INTO chat_threads (user_id, title) VALUES (?, ?)", (user_id, title))
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def get_latest_chat_thread(self, user_id: int) -> Optional[Dict]:
+        cursor = self._cursor("Record")
+        cursor.execute("SELECT * FROM chat_threads WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT 1",
+                       (user_id,))
+        return cursor.fetchone()
+    
+    @write_method
+    def add_chat_message(self, thread_id: int, role: str, content: str) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT INTO chat_messages (thread_id, role, content) VALUES (?, ?, ?)",
+                       (thread_id, role, content))
+        cursor.execute("UPDATE chat_threads SET updated_at = ? WHERE id = ?", (datetime.now().isoformat(), thread_id))
+        self.conn.commit()
+        return cursor.lastrowid
+    
+    def get_chat_messages(self, thread_id: int, before_id: Optional[int] = None, limit: int = 20) -> List[Dict]:
+        """One page of messages older than before_id (the newest page when None), oldest first.
+        
+        Keyset pagination on (thread_id, id): each page is an index range scan,
+        however deep into the history it is.
+        """
+        cursor = self._cursor("Record")
+        cursor.execute("""
+            SELECT * FROM chat_messages WHERE thread_id = ? AND id < ?
+            ORDER BY id DESC LIMIT ?
+        """, (thread_id, before_id if before_id is not None else 2 ** 63 - 1, limit))
+        return cursor.fetchall()[::-1]
+    
+    def get_chat_messages_since(self, thread_id: int, since_id: int) -> List[Dict]:
+        """Messages from since_id onwards, oldest first"""
+        cursor = self._cursor("Record")
+        cursor.execute("SELECT * FROM chat_messages WHERE thread_id = ? AND id >= ? ORDER BY id",
+                       (thread_id, since_id))
+        return cursor.fetchall()
+    
+    def has_chat_messages_before(self, thread_id: int, before_id: int) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM chat_messages WHERE thread_id = ? AND id < ? LIMIT 1", (thread_id, before_id))
+        return cursor.fetchone() is not None
+    
+    # Analytics
+    def get_habit_stats(self, user_id: int, days: int = 30) -> Dict:
+        cursor = self.conn.cursor()
+        since = cursor.execute("SELECT date('now', ?)", (f"-{days} days",)).fetchone()[0]
+        daily_sql, params = archive.per_source(self.conn, self.db_path, since, """
+            SELECT hc.completion_date, COUNT(*) as count, SUM(hc.xp_earned) as xp
+            FROM {completions} hc
+            JOIN habits h ON hc.habit_id = h.id
+            WHERE h.user_id = ? AND hc.completion_date >= ? {archived}
+            GROUP BY hc.completion_date
+        """, (user_id, since))
+        daily = self._cursor("Record").execute(f"""
+            SELECT completion_date, SUM(count) as count, SUM(xp) as xp FROM ({daily_sql})
+            GROUP BY completion_date
+            ORDER BY completion_date
+        """, params).fetchall()
+        
+        category_sql, params = archive.per_source(self.conn, self.db_path, since, """
+            SELECT h.category, COUNT(*) as count
+            FROM {completions} hc
+            JOIN habits h ON hc.habit_id = h.id
+            WHERE h.user_id = ? AND hc.completion_date >= ? {archived}
+            GROUP BY h.category
+        """, (user_id, since))
+        cursor.execute(f"SELECT category, SUM(count) FROM ({category_sql}) GROUP BY category", params)
+        by_category = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        return {"daily": daily, "by_category": by_category}
+    
+    def export_completions(self, user_id: int, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        return list(self.iter_completions(user_id, start, end))
+    
+    def iter_completions(self, user_id: int, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict]:
+        sql, params = archive.per_source(self.conn, self.db_path, start, """
+            SELECT hc.completion_date, hc.completed_at, h.title, h.category, hc.xp_earned, hc.streak_bonus
+            FROM {completions} hc
+            JOIN habits h ON hc.habit_id = h.id
+            WHERE h.user_id = ? AND hc.completion_date >= ? AND hc.completion_date <= ? {archived}
+        """, (user_id, start or "0000-00-00", end or "9999-12-31"))
+        cursor = self._cursor("Completion")
+        cursor.execute(sql + " ORDER BY completion_date, title", params)
+        return iter(cursor)
@@ -0,0 +1,109 @@
+"""
+💰 GOAL QUEST - Economy Ledger Replay
+Rebuild XP, level, gold, gems and stats from the append-only ledger
+
+Every change to a user's economy is an economy_ledger row (grant, spend,
+opening balance or manual adjustment) with a source reference; the user row
+is only a materialized snapshot of the ledger. Replay sums the ledger columns
+with numpy on top of the latest snapshot, and derives level and current XP
+from total XP with a vectorized threshold search, so a rules change (e.g. a
+new XP curve) can be applied by replaying instead of patching rows.
+numpy is imported lazily so that code paths which never replay stay light.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LEDGER_COLUMNS = ("xp", "gold", "gems", "strength", "intelligence", "vitality", "agility", "sense", "willpower")
+STAT_COLUMNS = LEDGER_COLUMNS[3:]
+# User row columns mirrored by each ledger column
+USER_COLUMNS = {"xp": "total_xp", **{c: c for c in LEDGER_COLUMNS[1:]}}
+
+# Replay never walks more than this many events past the latest snapshot
+SNAPSHOT_EVERY = 200
+
+
+def default_xp_for_level(level: int) -> int:
+    return int(100 * (level ** 1.5))
+
+
+def levels_for_totals(totals, xp_for_level: Callable[[int], int] = default_xp_for_level):
+    """(level, current_xp) arrays for an array of total XP values.
+
+    Leveling spends xp_for_level(level) per level starting at level 1, so the
+    level is how many cumulative thresholds fit under the total.
+    """
+    import numpy as np
+    totals = np.asarray(totals, dtype=np.int64)
+    highest = int(totals.max()) if totals.size else 0
+    thresholds = [xp_for_level(1)]
+    while thresholds[-1] <= highest:
+        thresholds.append(thresholds[-1] + xp_for_level(len(thresholds) + 1))
+    cumulative = np.asarray(thresholds, dtype=np.int64)
+    passed = np.searchsorted(cumulative, totals, side="right")
+    spent = np.concatenate(([0], cumulative))[passed]
+    return passed + 1, totals - spent
+
+
+def replay(rows: Sequence[Sequence[int]], snapshot: Optional[Dict] = None,
+           xp_for_level: Callable[[int], int] = default_xp_for_level) -> Dict:
+    """User economy state from a snapshot plus ledger rows (tuples in LEDGER_COLUMNS order)"""
+    import numpy as np
+    base = np.array([(snapshot or {}).get(USER_COLUMNS[c], 0) for c in LEDGER_COLUMNS], dtype=np.int64)
+    if len(rows):
+        base += np.asarray(rows, dtype=np.int64).reshape(-1, len(LEDGER_COLUMNS)).sum(axis=0)
+    state = {USER_COLUMNS[c]: int(v) for c, v in zip(LEDGER_COLUMNS, base)}
+    level, current = levels_for_totals([state["total_xp"]], xp_for_level)
+    state["level"], state["current_xp"] = int(level[0]), int(current[0])
+    return state
+
+
+def replay_users(user_ids: Sequence[int], rows: Sequence[Sequence[int]],
+                 xp_for_level: Callable[[int], int] = default_xp_for_level) -> Dict[int, Dict]:
+    """State for many users at once from (user_id, *LEDGER_COLUMNS) ledger rows, no snapshots"""
+    import numpy as np
+    if not len(rows):
+        return {}
+    matrix = np.asarray(rows, dtype=np.int64)
+    users, index = np.unique(matrix[:, 0], return_inverse=True)
+    sums = np.zeros((len(users), len(LEDGER_COLUMNS)), dtype=np.int64)
+    np.add.at(sums, index, matrix[:, 1:])
+    levels, current = levels_for_totals(sums[:, 0], xp_for_level)
+    wanted = set(user_ids)
+    states = {}
+    for i, user_id in enumerate(users.tolist()):
+        if user_id in wanted:
+            state = {USER_COLUMNS[c]: int(v) for c, v in zip(LEDGER_COLUMNS, sums[i])}
+            state["level"], state["current_xp"] = int(levels[i]), int(current[i])
+            states[user_id] = state
+    return states
+
+
+def opening_balance(user: Dict) -> Dict[str, int]:
+    """Ledger deltas that reproduce a user row from an empty ledger"""
+    return {c: int(user.get(USER_COLUMNS[c]) or 0) for c in LEDGER_COLUMNS}
+
+
+def adjustments(user: Dict, changes: Dict) -> Dict[str, int]:
+    """Ledger deltas for direct edits of economy columns in an update_user call"""
+    deltas = {}
+    for column in LEDGER_COLUMNS:
+        field = USER_COLUMNS[column]
+        if field in changes and changes[field] != user.get(field):
+            deltas[column] = int(changes[field] or 0) - int(user.get(field) or 0)
+    return deltas
+
+
+def ledger_values(deltas: Dict[str, int]) -> Tuple[int, ...]:
+    unknown = set(deltas) - set(LEDGER_COLUMNS)
+    if unknown:
+        raise ValueError(f"not economy columns: {sorted(unknown)}")
+    return tuple(int(deltas.get(c, 0)) for c in LEDGER_COLUMNS)
+
+
+def mismatches(user: Dict, state: Dict) -> List[str]:
+    """Economy columns where a materialized user row disagrees with replayed state"""
+    return [field for field, value in state.items() if user.get(field) != value]
+
+
+def rows_from(events: Iterable[Dict]) -> List[Tuple[int, ...]]:
+    return [tuple(e[c] for c in LEDGER_COLUMNS) for e in events]
@@ -0,0 +1,69 @@
+"""
+🎲 GOAL QUEST - Game Data
+Categories, difficulties, stats, tiers, rarities and wisdom traditions
+
+Shared by the Streamlit UI, the AI service and tooling
+"""
+
+CATEGORIES = {
+    "fitness": {"name": "Fitness", "emoji": "💪", "color": "#EF4444"},
+    "health": {"name": "Health", "emoji": "❤️", "color": "#22C55E"},
+    "learning": {"name": "Learning", "emoji": "🧠", "color": "#3B82F6"},
+    "career": {"name": "Career", "emoji": "💼", "color": "#6366F1"},
+    "finance": {"name": "Finance", "emoji": "💰", "color": "#F59E0B"},
+    "creative": {"name": "Creative", "emoji": "🎨", "color": "#EC4899"},
+    "mindfulness": {"name": "Mindfulness", "emoji": "🧘", "color": "#A855F7"},
+    "productivity": {"name": "Productivity", "emoji": "⚡", "color": "#F97316"},
+    "social": {"name": "Social", "emoji": "👥", "color": "#06B6D4"},
+    "personal": {"name": "Personal", "emoji": "🌟", "color": "#FBBF24"},
+    "spiritual": {"name": "Spiritual", "emoji": "🙏", "color": "#8B5CF6"},
+    "home": {"name": "Home", "emoji": "🏠", "color": "#84CC16"},
+    "environment": {"name": "Environment", "emoji": "🌍", "color": "#10B981"},
+    "relationships": {"name": "Relationships", "emoji": "💑", "color": "#F472B6"},
+    "life_goals": {"name": "Life Goals", "emoji": "🎯", "color": "#D4AF37"},
+    "skills": {"name": "Skills", "emoji": "🔧", "color": "#64748B"},
+}
+
+DIFFICULTIES = {
+    1: {"name": "Trivial", "color": "#9CA3AF", "xp_range": (25, 50), "stars": 1},
+    2: {"name": "Easy", "color": "#22C55E", "xp_range": (50, 100), "stars": 2},
+    3: {"name": "Medium", "color": "#3B82F6", "xp_range": (100, 200), "stars": 3},
+    4: {"name": "Hard", "color": "#F59E0B", "xp_range": (200, 400), "stars": 4},
+    5: {"name": "Expert", "color": "#EF4444", "xp_range": (400, 600), "stars": 5},
+    6: {"name": "Legendary", "color": "#A855F7", "xp_range": (600, 1000), "stars": 6},
+}
+
+STATS = {
+    "strength": {"name": "Strength", "abbr": "STR", "emoji": "⚔️", "color": "#EF4444"},
+    "intelligence": {"name": "Intelligence", "abbr": "INT", "emoji": "🧠", "color": "#3B82F6"},
+    "vitality": {"name": "Vitality", "abbr": "VIT", "emoji": "❤️", "color": "#22C55E"},
+    "agility": {"name": "Agility", "abbr": "AGI", "emoji": "⚡", "color": "#F59E0B"},
+    "sense": {"name": "Sense", "abbr": "SEN", "emoji": "👁️", "color": "#A855F7"},
+    "willpower": {"name": "Willpower", "abbr": "WIL", "emoji": "🔥", "color": "#EC4899"},
+}
+
+TIERS = {
+    1: {"name": "Novice Adventurer", "level_range": (1, 10), "color": "#9CA3AF"},
+    2: {"name": "Skilled Warrior", "level_range": (11, 25), "color": "#22C55E"},
+    3: {"name": "Elite Champion", "level_range": (26, 50), "color": "#3B82F6"},
+    4: {"name": "Master Guardian", "level_range": (51, 75), "color": "#A855F7"},
+    5: {"name": "Legendary Hero", "level_range": (76, 99), "color": "#F59E0B"},
+    6: {"name": "Shadow Monarch", "level_range": (100, 999), "color": "#EF4444"},
+}
+
+RARITIES = {
+    "common": {"name": "Common", "color": "#9CA3AF"},
+    "uncommon": {"name": "Uncommon", "color": "#22C55E"},
+    "rare": {"name": "Rare", "color": "#3B82F6"},
+    "epic": {"name": "Epic", "color": "#A855F7"},
+    "legendary": {"name": "Legendary", "color": "#F59E0B"},
+}
+
+PHILOSOPHY_TRADITIONS = {
+    "stoic": {"name": "Stoicism", "emoji": "🏛️"},
+    "biblical": {"name": "Biblical", "emoji": "✝️"},
+    "eastern": {"name": "Eastern", "emoji": "☯️"},
+    "samurai": {"name": "Samurai", "emoji": "⚔️"},
+    "hermetic": {"name": "Hermetic", "emoji": "🔮"},
+    "quranic": {"name": "Quranic", "emoji": "☪️"},
+}
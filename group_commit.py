@@ -0,0 +1,148 @@
+"""
+📮 GOAL QUEST - Group-Commit Writer
+One writer thread batches writes from every session into shared commits
+
+Write jobs from all sessions are queued and run in order on a dedicated
+connection. Whatever arrives while the previous batch is committing (plus a
+short gathering window) goes into the next transaction, each job inside its
+own savepoint so a failing job rolls back alone. A job's future completes
+only after the COMMIT covering it returns, so callers still observe durable
+writes, but a burst of N clicks costs a handful of fsyncs instead of N.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Job = Tuple[Callable[[sqlite3.Connection], Any], Future]
+
+
+class BatchConnection:
+    """Writer connection as seen by a job: commits are deferred to the batch"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class GroupCommitWriter:
+    """Single writer thread with savepoint-per-job group commits"""
+
+    def __init__(self, db_path: str, window: float = 0.002, max_batch: int = 256,
+                 connect: Optional[Callable[[str], sqlite3.Connection]] = None):
+        self.db_path = db_path
+        self.window = window
+        self.max_batch = max_batch
+        self._connect = connect or self._default_connect
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._closed = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.RLock()  # batches and data_version() take turns on the connection
+        self.stats = {"jobs": 0, "batches": 0, "failed_jobs": 0, "max_batch": 0}
+        self._thread = threading.Thread(target=self._run, name="goal-quest-writer", daemon=True)
+        self._ready = threading.Event()
+        self._thread.start()
+        self._ready.wait()
+
+    @staticmethod
+    def _default_connect(db_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = FULL")  # a resolved future means the write survives a crash
+        return conn
+
+    def submit(self, job: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue job(conn); the future resolves with its result once committed"""
+        if self._closed:
+            raise RuntimeError("writer is closed")
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def data_version(self) -> int:
+        """PRAGMA data_version of the writer connection: it changes only when another connection
+        (another process, maintenance) commits, never for this writer's own batches"""
+        with self._conn_lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Commit everything already queued, then stop the writer thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _gather(self, first: Job) -> Tuple[List[Job], bool]:
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                job = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if job is None:
+                stop = True
+                break
+            batch.append(job)
+        return batch, stop
+
+    def _run(self):
+        conn = self._conn = self._connect(self.db_path)
+        view = BatchConnection(conn)
+        self._ready.set()
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._gather(first)
+            with self._conn_lock:
+                self._commit_batch(conn, view, batch)
+        with self._conn_lock:
+            conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, view: BatchConnection, batch: List[Job]):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job, future in batch:
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = job(view)
+                    conn.execute("RELEASE job")
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    outcomes.append((future, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.exception("group commit of %d jobs failed", len(batch))
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.stats["jobs"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        for future, result, error in outcomes:
+            if error is not None:
+                self.stats["failed_jobs"] += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,197 @@
+"""
+🗓️ GOAL QUEST - Completion History Bitmaps
+One bit per day per habit: streaks, completion rates and calendar heatmaps without SQL
+
+Each habit carries history_origin (the date of bit 0) and history_bits, a
+little-endian BLOB in which bit i is set when the habit was completed on
+origin + i days. A year of history is 46 bytes. The bitmap is decoded into a
+Python int, so windows are a shift and a mask, counts are a popcount and the
+current streak is found from the highest zero bit, all word-at-a-time in C
+rather than a Python loop per day. complete_habit maintains the bitmap in the
+same write as the completion row; rebuild() derives it from the completion
+tables (archives included) for databases that predate it.
+
+Streaks only break on days a habit is scheduled: missed() builds a mask of
+the scheduled days that were not completed (for per-week quotas, the last
+day of each week that fell short), and streak() / longest_run() count the
+completions between those misses. Daily habits skip the mask entirely.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import archive
+import schedule
+
+Bitmap = Tuple[Optional[date], int]  # (origin, bits); origin is None until the first completion
+
+
+def decode(origin: Optional[str], blob: Optional[bytes]) -> Bitmap:
+    if origin is None or not blob:
+        return None, 0
+    return date.fromisoformat(str(origin)[:10]), int.from_bytes(blob, "little")
+
+
+def encode(bitmap: Bitmap) -> Tuple[Optional[str], Optional[bytes]]:
+    """(history_origin, history_bits) column values"""
+    origin, bits = bitmap
+    if origin is None:
+        return None, None
+    return origin.isoformat(), bits.to_bytes((bits.bit_length() + 7) // 8 or 1, "little")
+
+
+def of(habit: Dict) -> Bitmap:
+    return decode(habit.get("history_origin"), habit.get("history_bits"))
+
+
+def mark(bitmap: Bitmap, day: date) -> Bitmap:
+    """bitmap with day set, moving the origin back if day precedes it"""
+    origin, bits = bitmap
+    if origin is None:
+        return day, 1
+    offset = (day - origin).days
+    if offset < 0:
+        return day, (bits << -offset) | 1
+    return origin, bits | (1 << offset)
+
+
+def from_dates(days: Iterable[date]) -> Bitmap:
+    days = sorted(set(days))
+    if not days:
+        return None, 0
+    origin = days[0]
+    bits = 0
+    for day in days:
+        bits |= 1 << (day - origin).days
+    return origin, bits
+
+
+def window(bitmap: Bitmap, end: date, days: int) -> int:
+    """The days ending at end (inclusive) as an int; bit 0 is the oldest day"""
+    origin, bits = bitmap
+    if origin is None or days <= 0:
+        return 0
+    start = (end - origin).days - days + 1
+    if start >= 0:
+        return (bits >> start) & ((1 << days) - 1)
+    # Window begins before the origin: those days are empty
+    return (bits << -start) & ((1 << days) - 1)
+
+
+def count(bitmap: Bitmap, end: date, days: int) -> int:
+    return window(bitmap, end, days).bit_count()
+
+
+def rate(bitmap: Bitmap, end: date, days: int) -> float:
+    return count(bitmap, end, days) / days if days > 0 else 0.0
+
+
+def is_done(bitmap: Bitmap, day: date) -> bool:
+    return bool(window(bitmap, day, 1))
+
+
+def longest_run(bitmap: Bitmap, missed: Optional[int] = None) -> int:
+    """Most completions between two missed scheduled days; every day is scheduled when missed is None"""
+    bits, longest = bitmap[1], 0
+    if missed is None:
+        # Each AND with the bitmap shifted by one shortens every run by a day
+        while bits:
+            bits &= bits >> 1
+            longest += 1
+        return longest
+    while missed:
+        cut = (missed & -missed).bit_length()
+        longest = max(longest, (bits & ((1 << cut) - 1)).bit_count())
+        bits, missed = bits >> cut, missed >> cut
+    return max(longest, bits.bit_count())
+
+
+def streak(bitmap: Bitmap, today: date, missed: Optional[int] = None) -> int:
+    """Completions since the last missed scheduled day before today.
+
+    With missed None every day is scheduled: consecutive completed days ending
+    today, or yesterday while today is still open.
+    """
+    origin, bits = bitmap
+    if origin is None:
+        return 0
+    end = (today - origin).days
+    if end < 0:
+        return 0
+    if missed is not None:
+        bits &= (1 << (end + 1)) - 1
+        return (bits >> missed.bit_length()).bit_count()
+    if not (bits >> end) & 1:
+        end -= 1
+        if end < 0 or not (bits >> end) & 1:
+            return 0
+    # Highest missed day at or before end; everything above it is the streak
+    missed = ~bits & ((1 << (end + 1)) - 1)
+    return end + 1 - missed.bit_length() if missed else end + 1
+
+
+def missed(habit: Dict, bitmap: Bitmap, today: date) -> int:
+    """Scheduled days from the origin up to yesterday on which habit was not completed, as bitmap bits.
+
+    A per-week quota that fell short marks the last day of that week; the
+    origin's own week is not judged, as the habit may have started mid-week.
+    """
+    origin, bits = bitmap
+    days = (today - origin).days if origin else 0
+    if days <= 0:
+        return 0
+    kind, value = schedule.parse(habit["frequency"])
+    if kind == schedule.PER_WEEK:
+        gaps = 0
+        sunday = schedule.week_start(origin) + timedelta(days=13)
+        while sunday < today:
+            offset = (sunday - origin).days
+            if ((bits >> (offset - 6)) & 0b1111111).bit_count() < value:
+                gaps |= 1 << offset
+            sunday += timedelta(days=7)
+        return gaps
+    if kind == schedule.DAYS:
+        period, start = 7, origin.weekday()
+        pattern = sum(1 << i for i in range(7) if value >> (start + i) % 7 & 1)
+    else:
+        period = value
+        created = date.fromisoformat(str(habit["created_at"])[:10])
+        pattern = 1 << (created - origin).days % period
+    repeats = -(-days // period)
+    due = pattern * (((1 << (period * repeats)) - 1) // ((1 << period) - 1))
+    return due & ~bits & ((1 << days) - 1)
+
+
+def streaks(habit: Dict, today: date) -> Tuple[int, int]:
+    """(current, best) streak of habit, counting only the days it is scheduled on"""
+    bitmap = of(habit)
+    if schedule.parse(habit["frequency"]) == (schedule.DAYS, schedule.ALL_DAYS):
+        return streak(bitmap, today), longest_run(bitmap)
+    gaps = missed(habit, bitmap, today)
+    return streak(bitmap, today, gaps), longest_run(bitmap, gaps)
+
+
+def heatmap(bitmap: Bitmap, end: date, weeks: int = 53) -> List[List[int]]:
+    """7 rows (Monday..Sunday) by weeks columns of 0/1, the last column being end's week.
+
+    Days after end are 0.
+    """
+    last_sunday = end + timedelta(days=6 - end.weekday())
+    days = weeks * 7
+    # Oldest day first; every 7th character from a weekday's offset is that weekday's row
+    flags = format(window(bitmap, last_sunday, days), f"0{days}b")[::-1]
+    return [list(map(int, flags[weekday::7])) for weekday in range(7)]
+
+
+def rebuild(conn: sqlite3.Connection, db_path: str) -> int:
+    """Recompute every habit's bitmap from its completions; returns the number of habits updated"""
+    sql, params = archive.per_source(conn, db_path, None, """
+        SELECT hc.habit_id, hc.completion_date FROM {completions} hc WHERE 1 {archived}
+    """)
+    dates: Dict[int, List[date]] = {}
+    for habit_id, day in conn.execute(sql, params):
+        dates.setdefault(habit_id, []).append(date.fromisoformat(day))
+    conn.executemany("UPDATE habits SET history_origin = ?, history_bits = ? WHERE id = ?",
+                     [(*encode(from_dates(days)), habit_id) for habit_id, days in dates.items()])
+    return len(dates)
@@ -0,0 +1,146 @@
+"""
+🧩 GOAL QUEST - Incremental JSON Parser
+Emits values from a streamed JSON document as soon as each one closes
+
+Text is fed in arbitrary chunks (e.g. model output deltas). A small state
+machine tracks nesting, strings and escapes, and every value at or above
+emit_depth is decoded the moment its closing character arrives, so a goal
+plan's steps can be shown one by one. Text before the first brace (such as a
+Markdown code fence) is ignored. If the stream ends early or turns malformed,
+finish() rebuilds the document from the values that did complete.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+Path = Tuple[Any, ...]
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "key", "expect_key")
+
+    def __init__(self, kind: str, path: Path, start: int):
+        self.kind = kind
+        self.path = path
+        self.start = start
+        self.key: Any = 0 if kind == "array" else None
+        self.expect_key = kind == "object"
+
+
+class IncrementalJSONParser:
+    """Feed text chunks, get (path, value) events for completed values"""
+
+    def __init__(self, emit_depth: int = 2):
+        self.emit_depth = emit_depth
+        self.text = ""
+        self.events: List[Tuple[Path, Any]] = []
+        self.document: Any = None
+        self.error: Optional[str] = None
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._token_start: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        return self._started and not self._stack and self.error is None
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """Consume a chunk and return the events it completed"""
+        emitted = len(self.events)
+        self.text += chunk
+        while self._pos < len(self.text) and self.error is None and not (self._started and not self._stack):
+            self._step(self.text[self._pos], self._pos)
+            self._pos += 1
+        return self.events[emitted:]
+
+    def finish(self) -> Any:
+        """The full document, or one rebuilt from the completed values if the stream was cut short"""
+        if self._token_start is not None and self._stack:
+            self._complete_value(self._token_start, len(self.text))
+            self._token_start = None
+        if self.complete:
+            return self.document
+        recovered: dict = {}
+        for path, value in self.events:
+            if len(path) == 1:
+                recovered[path[0]] = value
+            elif len(path) == 2 and isinstance(path[1], int):
+                items = recovered.setdefault(path[0], [])
+                if isinstance(items, list) and len(items) == path[1]:
+                    items.append(value)
+        return recovered
+
+    def _path(self) -> Path:
+        frame = self._stack[-1]
+        return frame.path + (frame.key,)
+
+    def _step(self, char: str, i: int):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                frame = self._stack[-1]
+                if frame.expect_key:
+                    frame.key = json.loads(self.text[self._token_start:i + 1])
+                else:
+                    self._complete_value(self._token_start, i + 1)
+                self._token_start = None
+            return
+
+        if self._token_start is not None:
+            if char not in ",]} \t\r\n":
+                return
+            self._complete_value(self._token_start, i)
+            self._token_start = None
+
+        if not self._started:
+            if char in "{[":
+                self._started = True
+                self._stack.append(_Frame("object" if char == "{" else "array", (), i))
+            return
+
+        frame = self._stack[-1]
+        if char in " \t\r\n":
+            return
+        if char == '"':
+            self._in_string = True
+            self._token_start = i
+        elif char == ":":
+            frame.expect_key = False
+        elif char == ",":
+            frame.expect_key = frame.kind == "object"
+        elif char in "{[":
+            self._stack.append(_Frame("object" if char == "{" else "array", self._path(), i))
+        elif char in "}]":
+            closed = self._stack.pop()
+            if (char == "}") != (closed.kind == "object"):
+                self.error = f"mismatched {char!r} at offset {i}"
+            elif self._stack:
+                self._complete_value(closed.start, i + 1)
+            else:
+                self._decode_document(closed.start, i + 1)
+        else:
+            self._token_start = i
+
+    def _complete_value(self, start: int, end: int):
+        frame = self._stack[-1]
+        path = self._path()
+        if len(path) <= self.emit_depth:
+            try:
+                self.events.append((path, json.loads(self.text[start:end])))
+            except json.JSONDecodeError as e:
+                self.error = f"invalid value at {path}: {e}"
+        if frame.kind == "array":
+            frame.key += 1
+
+    def _decode_document(self, start: int, end: int):
+        try:
+            self.document = json.loads(self.text[start:end])
+        except json.JSONDecodeError as e:
+            self.error = str(e)
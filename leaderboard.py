@@ -0,0 +1,214 @@
+"""
+🏅 GOAL QUEST - Leaderboards
+Cross-user rankings by total XP, level, current streak and weekly completions
+
+Each board is a RankIndex: a sorted list of integer keys split into chunks of
+a few hundred, with the chunks' running sizes kept alongside. Counting the
+keys ahead of a score is two bisects, so "my rank" is O(log n); inserting or
+removing one key touches a single chunk; top-N reads the first chunks. Keys
+pack (score, user id) into one int that sorts highest score first, ties to
+the lower id, so comparisons stay in C.
+
+Leaderboards loads every board from the store on first use and is then kept
+current by the store itself: user column writes and habit completions update
+the affected entries instead of re-sorting all users. The weekly board is
+simply replaced by an empty one when a new Monday comes round.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import schedule
+
+# Board name -> user column it ranks (weekly completions are counted, not stored)
+USER_METRICS = {"total_xp": "total_xp", "level": "level", "current_streak": "current_streak"}
+WEEKLY = "weekly_completions"
+METRICS = (*USER_METRICS, WEEKLY)
+LABELS = {"total_xp": "Total XP", "level": "Level", "current_streak": "Current streak", WEEKLY: "Completions this week"}
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+def pack(score: int, user_id: int) -> int:
+    return (-score << _ID_BITS) | user_id
+
+
+def unpack(key: int) -> Tuple[int, int]:
+    """(user_id, score)"""
+    return key & _ID_MASK, -(key >> _ID_BITS)
+
+
+class RankIndex:
+    """Sorted int keys in chunks; position lookups via bisect over the chunks' cumulative sizes"""
+
+    def __init__(self, keys: Iterable[int] = (), load: int = 512):
+        self.load = load
+        keys = sorted(keys)
+        self._chunks: List[List[int]] = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._maxes: List[int] = [chunk[-1] for chunk in self._chunks]
+        self._ends: Optional[List[int]] = None  # cumulative chunk sizes, rebuilt after a chunk changes length
+
+    def __len__(self) -> int:
+        return self._positions()[-1] if self._chunks else 0
+
+    def _positions(self) -> List[int]:
+        if self._ends is None:
+            self._ends = list(accumulate(len(chunk) for chunk in self._chunks))
+        return self._ends
+
+    def add(self, key: int):
+        if not self._chunks:
+            self._chunks, self._maxes = [[key]], [key]
+        else:
+            i = min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+            chunk = self._chunks[i]
+            insort(chunk, key)
+            self._maxes[i] = chunk[-1]
+            if len(chunk) > 2 * self.load:
+                self._chunks[i:i + 1] = [chunk[:self.load], chunk[self.load:]]
+                self._maxes[i:i + 1] = [chunk[self.load - 1], chunk[-1]]
+        self._ends = None
+
+    def remove(self, key: int) -> bool:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._chunks):
+            return False
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, key)
+        if j == len(chunk) or chunk[j] != key:
+            return False
+        del chunk[j]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i], self._maxes[i]
+        self._ends = None
+        return True
+
+    def count_before(self, key: int) -> int:
+        """Number of keys smaller than key"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._chunks):
+            return len(self)
+        return (self._positions()[i - 1] if i else 0) + bisect_left(self._chunks[i], key)
+
+    def head(self, n: int) -> List[int]:
+        keys: List[int] = []
+        for chunk in self._chunks:
+            if len(keys) >= n:
+                break
+            keys.extend(chunk[:n - len(keys)])
+        return keys
+
+
+class Leaderboards:
+    """Every board for one store, loaded lazily and updated incrementally"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._boards: Dict[str, RankIndex] = {}
+        self._scores: Dict[str, Dict[int, int]] = {}
+        self._names: Dict[int, str] = {}
+        self._week: Optional[date] = None
+
+    # Loading
+    def ensure_loaded(self, users: Callable[[], List[Dict]], weekly_counts: Callable[[str, str], Dict[int, int]],
+                      today: Optional[date] = None):
+        """Build the boards from users() rows and weekly_counts(start, end) -> user id -> completions"""
+        today = today or date.today()
+        with self._lock:
+            if self._loaded:
+                return
+            rows = users()
+            self._names = {row["id"]: row.get("display_name") or row["name"] for row in rows}
+            for metric, column in USER_METRICS.items():
+                self._set_board(metric, {row["id"]: row[column] or 0 for row in rows})
+            self._week = schedule.week_start(today)
+            self._set_board(WEEKLY, weekly_counts(self._week.isoformat(), today.isoformat()))
+            self._loaded = True
+
+    def _set_board(self, metric: str, scores: Dict[int, int]):
+        self._scores[metric] = scores
+        self._boards[metric] = RankIndex(pack(score, user_id) for user_id, score in scores.items())
+
+    def invalidate(self):
+        """Drop everything (e.g. after a restore); the next query reloads"""
+        with self._lock:
+            self._loaded = False
+
+    # Incremental updates from the store
+    def user_added(self, user_id: int, columns: Dict):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._names[user_id] = columns.get("display_name") or columns["name"]
+            for metric, column in USER_METRICS.items():
+                self._set_score(metric, user_id, columns.get(column) or 0)
+
+    def user_changed(self, user_id: int, columns: Dict):
+        """Apply written user columns; anything unranked is ignored"""
+        with self._lock:
+            if not self._loaded or user_id not in self._names:
+                return
+            if "name" in columns or "display_name" in columns:
+                self._names[user_id] = columns.get("display_name") or columns.get("name") or self._names[user_id]
+            for metric, column in USER_METRICS.items():
+                if column in columns:
+                    self._set_score(metric, user_id, columns[column] or 0)
+
+    def completion_recorded(self, user_id: int, day: date):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._roll_week(day)
+            if schedule.week_start(day) == self._week:
+                self._set_score(WEEKLY, user_id, self._scores[WEEKLY].get(user_id, 0) + 1)
+
+    def _roll_week(self, today: date):
+        # A new week starts every user at zero: swap in an empty board instead of rewriting scores
+        if schedule.week_start(today) > self._week:
+            self._week = schedule.week_start(today)
+            self._set_board(WEEKLY, {})
+
+    def _set_score(self, metric: str, user_id: int, score: int):
+        scores, board = self._scores[metric], self._boards[metric]
+        old = scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            board.remove(pack(old, user_id))
+        scores[user_id] = score
+        board.add(pack(score, user_id))
+
+    # Queries (callers load first)
+    def rank(self, metric: str, user_id: int, today: Optional[date] = None) -> Optional[int]:
+        """1-based rank, or None if the user isn't on the board"""
+        with self._lock:
+            if metric == WEEKLY:
+                self._roll_week(today or date.today())
+            score = self._scores[metric].get(user_id)
+            if score is None:
+                return None
+            # Users tied on score share the rank of the first of them
+            return self._boards[metric].count_before(pack(score, 0)) + 1
+
+    def size(self, metric: str) -> int:
+        with self._lock:
+            return len(self._boards[metric])
+
+    def top(self, metric: str, n: int = 10, today: Optional[date] = None) -> List[Dict]:
+        with self._lock:
+            if metric == WEEKLY:
+                self._roll_week(today or date.today())
+            board = self._boards[metric]
+            entries = []
+            for key in board.head(n):
+                user_id, score = unpack(key)
+                rank = board.count_before(pack(score, 0)) + 1
+                entries.append({"rank": rank, "user_id": user_id, "name": self._names.get(user_id, "?"), "score": score})
+            return entries
@@ -0,0 +1,218 @@
+"""
+🧹 GOAL QUEST - Database Maintenance
+Idle-time ANALYZE/optimize, incremental vacuum, WAL checkpoints and integrity checks
+
+A daemon thread wakes up periodically and, once the app has been idle for a
+while, runs whichever jobs are due on its own connection. Every job is
+time-boxed with a progress handler (SQLite aborts the statement when the
+budget runs out, leaving the database unchanged) and logs its duration and
+the space it reclaimed. Recent results are kept for the Settings page.
+
+Converting a database created before incremental auto-vacuum takes one full
+VACUUM, which no idle-time budget can fit on a real-sized file; scheduled
+runs report it as pending and only manual runs (Settings, cli.py maintain)
+convert, under their own conversion_budget.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from archive import CompletionArchiver
+from backup import SnapshotManager
+
+logger = logging.getLogger(__name__)
+
+# job name -> seconds between runs; archiving frees pages for the vacuum, and the checkpoint
+# follows the vacuum so freed pages leave the WAL too
+DEFAULT_INTERVALS = {
+    "snapshot": 24 * 60 * 60,
+    "archive_completions": 24 * 60 * 60,
+    "optimize": 60 * 60,
+    "incremental_vacuum": 60 * 60,
+    "wal_checkpoint": 5 * 60,
+    "quick_check": 24 * 60 * 60,
+}
+
+
+class JobTimeout(Exception):
+    pass
+
+
+class MaintenanceScheduler:
+    """Runs due maintenance jobs against db_path whenever the app is idle"""
+
+    def __init__(self, db_path: str, last_activity: Callable[[], float] = lambda: 0.0,
+                 idle_after: float = 30.0, budget: float = 0.5, poll: float = 15.0,
+                 intervals: Optional[Dict[str, float]] = None, vacuum_pages: int = 256,
+                 archiver: Optional[CompletionArchiver] = None, snapshots: Optional[SnapshotManager] = None,
+                 conversion_budget: float = 600.0):
+        self.db_path = db_path
+        self.last_activity = last_activity
+        self.idle_after = idle_after
+        self.budget = budget
+        self.poll = poll
+        self.intervals = dict(DEFAULT_INTERVALS if intervals is None else intervals)
+        self.vacuum_pages = vacuum_pages
+        self.conversion_budget = conversion_budget
+        self.archiver = archiver
+        self.snapshots = snapshots
+        self.history: deque = deque(maxlen=50)
+        self._last_run: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._jobs = {
+            "snapshot": self._snapshot,
+            "archive_completions": self._archive_completions,
+            "wal_checkpoint": self._wal_checkpoint,
+            "optimize": self._optimize,
+            "incremental_vacuum": self._incremental_vacuum,
+            "quick_check": self._quick_check,
+        }
+
+    # Scheduling
+    def start(self) -> "MaintenanceScheduler":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="goal-quest-maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._stop.wait(self.poll):
+            if time.monotonic() - self.last_activity() >= self.idle_after:
+                self.run_due()
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        return [name for name, interval in self.intervals.items()
+                if self.enabled(name) and now - self._last_run.get(name, float("-inf")) >= interval]
+
+    def enabled(self, name: str) -> bool:
+        optional = {"archive_completions": self.archiver, "snapshot": self.snapshots}
+        return name in self._jobs and (name not in optional or optional[name] is not None)
+
+    def run_due(self) -> List[Dict]:
+        results = []
+        for name in self.due():
+            # Stop between jobs as soon as the app is busy again
+            if results and time.monotonic() - self.last_activity() < self.idle_after:
+                break
+            results.append(self.run(name, manual=False))
+        return results
+
+    def run(self, name: str, budget: Optional[float] = None, manual: bool = True) -> Dict:
+        """Run one job now, regardless of idleness; returns (and logs) its result.
+
+        A manual incremental_vacuum on a database that still needs converting
+        runs the conversion instead, under conversion_budget.
+        """
+        job = self._jobs[name]
+        if name == "incremental_vacuum" and manual and self.needs_conversion():
+            job, budget = self._convert_auto_vacuum, self.conversion_budget
+        budget = self.budget if budget is None else budget
+        conn = sqlite3.connect(self.db_path, timeout=budget, isolation_level=None)
+        deadline = time.monotonic() + budget
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        size_before = self._disk_size()
+        started = time.perf_counter()
+        result = {"job": name, "status": "ok", "started_at": time.time()}
+        try:
+            result.update(job(conn, deadline) or {})
+        except JobTimeout:
+            result["status"] = "timeout"
+        except sqlite3.OperationalError as e:
+            result["status"] = "timeout" if "interrupt" in str(e) else "error"
+            result["detail"] = str(e)
+        finally:
+            conn.close()
+        result["seconds"] = time.perf_counter() - started
+        result["bytes_reclaimed"] = size_before - self._disk_size()
+        self._last_run[name] = time.monotonic()
+        self.history.appendleft(result)
+
+        log = logger.warning if result["status"] not in ("ok", "pending") else logger.info
+        log("maintenance %s: %s in %.1f ms, %d bytes reclaimed%s", name, result["status"], result["seconds"] * 1000,
+            result["bytes_reclaimed"], f" ({result['detail']})" if "detail" in result else "")
+        return result
+
+    def needs_conversion(self) -> bool:
+        """Whether the database predates incremental auto-vacuum (see _convert_auto_vacuum)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return self._pragma(conn, "auto_vacuum")[0] != 2
+        finally:
+            conn.close()
+
+    def _disk_size(self) -> int:
+        return sum(os.path.getsize(path) for path in (self.db_path, self.db_path + "-wal") if os.path.exists(path))
+
+    # Jobs
+    @staticmethod
+    def _pragma(conn: sqlite3.Connection, statement: str):
+        return conn.execute(f"PRAGMA {statement}").fetchone()
+
+    def _snapshot(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        # Not bound by the budget: the copy never blocks writers (see backup.py)
+        info = self.snapshots.snapshot("scheduled")
+        return {"detail": f"{info['name']} ({info['bytes'] // 1024} KB)"}
+
+    def _archive_completions(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        result = self.archiver.run(conn, deadline)
+        detail = f"{result['archived']} completions archived"
+        if not result["caught_up"]:
+            detail += ", more next run"
+        return {"archived": result["archived"], "detail": detail}
+
+    def _wal_checkpoint(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        if self._pragma(conn, "journal_mode")[0] != "wal":
+            return {"detail": "not in WAL mode"}
+        busy, wal_pages, checkpointed = self._pragma(conn, "wal_checkpoint(TRUNCATE)")
+        # busy means a reader kept part of the WAL alive; the next run finishes it
+        return {"wal_pages": wal_pages, "checkpointed": checkpointed, "status": "busy" if busy else "ok"}
+
+    def _optimize(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        # Bounded sampling keeps ANALYZE cheap on large tables
+        self._pragma(conn, "analysis_limit = 400")
+        first = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None
+        if first:
+            conn.execute("ANALYZE")
+        else:
+            self._pragma(conn, "optimize")
+        return {"detail": "ANALYZE" if first else "PRAGMA optimize"}
+
+    def _incremental_vacuum(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        free_before = self._pragma(conn, "freelist_count")[0]
+        if self._pragma(conn, "auto_vacuum")[0] != 2:
+            return {"status": "pending", "free_pages": free_before,
+                    "detail": "conversion to incremental pending: run it from Settings or cli.py maintain"}
+        free = free_before
+        while free:
+            if time.monotonic() > deadline:
+                raise JobTimeout()
+            # Frees one page per step, so the statement has to be drained
+            conn.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})").fetchall()
+            free = self._pragma(conn, "freelist_count")[0]
+        return {"free_pages": free_before, "pages_freed": free_before - free}
+
+    def _convert_auto_vacuum(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        # Databases created before incremental mode need one full VACUUM to switch
+        free_before = self._pragma(conn, "freelist_count")[0]
+        self._pragma(conn, "auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return {"free_pages": free_before, "pages_freed": free_before, "detail": "converted to incremental"}
+
+    def _quick_check(self, conn: sqlite3.Connection, deadline: float) -> Dict:
+        problems = [row[0] for row in conn.execute("PRAGMA quick_check(20)")]
+        if problems == ["ok"]:
+            return {}
+        logger.error("quick_check found problems in %s: %s", self.db_path, problems)
+        return {"status": "corrupt", "detail": "; ".join(problems)}
@@ -0,0 +1,167 @@
+"""
+🛠️ GOAL QUEST - Query Profiler
+Per-rerun SQL tracing and Database method timing for developers
+
+Statements are captured with sqlite3's set_trace_callback and every public
+Database method is wrapped with a timer. Streamlit runs each session's script
+in its own thread, so the profile for the rerun in progress is thread-local.
+A statement's duration is measured from its trace event to the next trace
+event or the end of the enclosing Database call, so it includes row fetching.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN \(\?(?:,\s*\?)*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce an expanded statement to its shape so repeats with different params group together"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class StatementRecord:
+    sql: str
+    shape: str
+    caller: str
+    started: float
+    duration: Optional[float] = None
+
+
+@dataclass
+class RerunProfile:
+    """Everything one script rerun executed against the database"""
+    label: str
+    started: float = field(default_factory=time.perf_counter)
+    statements: List[StatementRecord] = field(default_factory=list)
+    methods: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+    stack: List[str] = field(default_factory=list)
+    open_statement: Optional[StatementRecord] = None
+    dropped: int = 0
+    elapsed: float = 0.0
+
+    def close_statement(self, now: float):
+        if self.open_statement is not None:
+            self.open_statement.duration = now - self.open_statement.started
+            self.open_statement = None
+
+    def summary(self, slowest: int = 5, n_plus_one_threshold: int = 5) -> Dict:
+        by_shape: Dict[str, List[StatementRecord]] = defaultdict(list)
+        for record in self.statements:
+            by_shape[record.shape].append(record)
+
+        n_plus_one = []
+        for shape, records in by_shape.items():
+            distinct = {r.sql for r in records}
+            # Same statement with different parameters, over and over: classic N+1
+            if len(records) >= n_plus_one_threshold and len(distinct) > 1:
+                callers = sorted({r.caller for r in records})
+                n_plus_one.append({"statement": shape, "count": len(records), "callers": callers,
+                                   "total_ms": sum(r.duration or 0 for r in records) * 1000})
+        n_plus_one.sort(key=lambda item: item["count"], reverse=True)
+
+        timed = sorted(self.statements, key=lambda r: r.duration or 0, reverse=True)[:slowest]
+        return {
+            "label": self.label,
+            "rerun_ms": self.elapsed * 1000,
+            "query_count": len(self.statements) + self.dropped,
+            "sql_ms": sum(r.duration or 0 for r in self.statements) * 1000,
+            "slowest": [{"statement": r.sql, "caller": r.caller, "ms": (r.duration or 0) * 1000} for r in timed],
+            "n_plus_one": n_plus_one,
+            "methods": {name: {"calls": calls, "ms": total * 1000}
+                        for name, (calls, total) in sorted(self.methods.items(), key=lambda kv: -kv[1][1])},
+        }
+
+
+class QueryProfiler:
+    """Attaches to a Database and aggregates what each rerun executes"""
+
+    MAX_STATEMENTS = 10_000
+
+    def __init__(self, log_path: Optional[str] = None, max_bytes: int = 1_000_000, backups: int = 3):
+        self._local = threading.local()
+        self.logger = logging.getLogger("goal_quest.profiler")
+        if log_path:
+            for stale in list(self.logger.handlers):
+                self.logger.removeHandler(stale)
+                stale.close()
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+
+    def attach(self, db):
+        """Trace db's connection and wrap its public methods with timers"""
+        db.conn.set_trace_callback(self._on_statement)
+        for name, _ in inspect.getmembers(type(db), inspect.isfunction):
+            if name.startswith("_") or isinstance(inspect.getattr_static(type(db), name), staticmethod):
+                continue
+            setattr(db, name, self._timed(name, getattr(db, name)))
+        return self
+
+    def _timed(self, name: str, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            profile = getattr(self._local, "profile", None)
+            if profile is None:
+                return method(*args, **kwargs)
+            profile.stack.append(name)
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                now = time.perf_counter()
+                profile.close_statement(now)
+                profile.stack.pop()
+                stats = profile.methods[name]
+                stats[0] += 1
+                stats[1] += now - started
+        return timed
+
+    def _on_statement(self, statement: str):
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            return
+        now = time.perf_counter()
+        profile.close_statement(now)
+        if len(profile.statements) >= self.MAX_STATEMENTS:
+            profile.dropped += 1
+            return
+        caller = profile.stack[0] if profile.stack else "<direct>"
+        record = StatementRecord(statement, normalize_sql(statement), caller, now)
+        profile.statements.append(record)
+        profile.open_statement = record
+
+    def start_rerun(self, label: str):
+        self._local.profile = RerunProfile(label)
+
+    def finish_rerun(self) -> Optional[Dict]:
+        """Close the current thread's profile, log it and return its summary"""
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            return None
+        self._local.profile = None
+        now = time.perf_counter()
+        profile.close_statement(now)
+        profile.elapsed = now - profile.started
+        summary = profile.summary()
+        if self.logger.handlers:
+            self.logger.info(json.dumps(summary))
+        return summary
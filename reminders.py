@@ -0,0 +1,307 @@
+"""
+⏰ GOAL QUEST - Reminders
+Habit and goal deadline reminders from a min-heap of next fire times
+
+Every active habit and open goal has at most one pending reminder: habits at
+the reminder time on their next scheduled day that isn't already done, goals
+a day before and on their due date. Pending reminders live in a heap keyed by
+fire time, so a tick only looks at the top of the heap and pops what is due;
+nothing is polled. The store reports changed habits and goals through its
+listeners; those keys are re-planned on the next tick, and replaced or
+cancelled entries stay in the heap as tombstones until popped (or until a
+compaction when they outnumber live ones). Writes by other processes
+(api.py, cli.py) reach no listener, so each tick also asks the store whether
+another connection has committed and, if so, re-plans everything.
+
+Due reminders go to every sink: ToastSink queues them for the app to show,
+FileSink appends JSON lines, WebhookSink POSTs them to a URL (a local relay
+for email or chat in practice).
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import threading
+import urllib.request
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import schedule
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, int]  # ("habit" | "goal", row id)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PLANNING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def next_habit_reminder(habit: Dict, now: datetime, at: dtime, done_today: bool) -> Optional[datetime]:
+    """When to next remind about habit: at on its next scheduled day still open after now"""
+    if not habit.get("is_active", 1):
+        return None
+    kind, value = schedule.parse(habit["frequency"])
+    horizon = value if kind == schedule.EVERY else 7
+    for offset in range(horizon + 1):
+        day = now.date() + timedelta(days=offset)
+        when = datetime.combine(day, at)
+        if when <= now or (offset == 0 and done_today):
+            continue
+        # Weekly quotas are checked again when the reminder fires
+        if schedule.is_due(habit, day):
+            return when
+    return None
+
+
+def next_goal_reminder(goal: Dict, now: datetime, at: dtime, lead_days: int = 1) -> Optional[Tuple[datetime, str]]:
+    """(when, message) of the next deadline reminder for an open goal with a due date"""
+    if goal.get("is_completed") or not goal.get("due_date"):
+        return None
+    due = date.fromisoformat(str(goal["due_date"])[:10])
+    notices = [(due, "is due today")]
+    if lead_days > 0:
+        notices.insert(0, (due - timedelta(days=lead_days), f"is due in {lead_days} day{'s' if lead_days != 1 else ''}"))
+    for day, message in notices:
+        when = datetime.combine(day, at)
+        if when > now:
+            return when, message
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SINKS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ToastSink:
+    """Holds reminders per user until the app drains them into st.toast"""
+
+    def __init__(self, per_user: int = 20):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Deque[Dict]] = {}
+        self.per_user = per_user
+
+    def deliver(self, reminder: Dict):
+        with self._lock:
+            self._pending.setdefault(reminder["user_id"], deque(maxlen=self.per_user)).append(reminder)
+
+    def drain(self, user_id: int) -> List[Dict]:
+        with self._lock:
+            pending = self._pending.pop(user_id, None)
+        return list(pending or ())
+
+
+class FileSink:
+    """Appends each reminder as a JSON line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def deliver(self, reminder: Dict):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(reminder, default=str) + "\n")
+
+
+class WebhookSink:
+    """POSTs each reminder as JSON; failures are logged, never raised into the tick"""
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, reminder: Dict):
+        request = urllib.request.Request(self.url, data=json.dumps(reminder, default=str).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:
+            logger.warning("reminder webhook %s failed: %s", self.url, e)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENGINE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ReminderEngine:
+    """Pending reminders for every user of store, delivered to sinks as they come due"""
+
+    def __init__(self, store, sinks: List, habit_time: dtime = dtime(20, 0), goal_time: dtime = dtime(9, 0),
+                 goal_lead_days: int = 1, poll: float = 30.0, clock: Callable[[], datetime] = datetime.now):
+        self.store = store
+        self.sinks = sinks
+        self.habit_time = habit_time
+        self.goal_time = goal_time
+        self.goal_lead_days = goal_lead_days
+        self.poll = poll
+        self.clock = clock
+        self.delivered: Deque[Dict] = deque(maxlen=50)
+        self._lock = threading.RLock()
+        self._heap: List[Tuple[float, int, Key]] = []
+        self._live: Dict[Key, Tuple[float, int, Dict]] = {}  # key -> (fire timestamp, seq, reminder)
+        self._seq = itertools.count()
+        self._dirty: set = set()
+        self._reload = True
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        store.add_listener(self.notify)
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # Change notifications from the store
+    def notify(self, kind: str, row_id: Optional[int] = None):
+        with self._lock:
+            if kind in ("habit", "goal"):
+                self._dirty.add((kind, row_id))
+            else:
+                self._reload = True
+
+    # Heap
+    def schedule(self, key: Key, when: datetime, reminder: Dict):
+        with self._lock:
+            seq = next(self._seq)
+            fire_at = when.timestamp()
+            self._live[key] = (fire_at, seq, {**reminder, "fire_at": when.isoformat(timespec="minutes")})
+            heapq.heappush(self._heap, (fire_at, seq, key))
+            self._compact()
+
+    def cancel(self, key: Key):
+        with self._lock:
+            if self._live.pop(key, None) is not None:
+                self._compact()
+
+    def _compact(self):
+        # Tombstones (replaced or cancelled entries) are skipped when popped; rebuild once they dominate
+        if len(self._heap) > 1024 and len(self._heap) > 2 * len(self._live):
+            self._heap = [(fire_at, seq, key) for key, (fire_at, seq, _) in self._live.items()]
+            heapq.heapify(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        with self._lock:
+            while self._heap and self._is_stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            return datetime.fromtimestamp(self._heap[0][0]) if self._heap else None
+
+    def _is_stale(self, entry: Tuple[float, int, Key]) -> bool:
+        live = self._live.get(entry[2])
+        return live is None or live[1] != entry[1]
+
+    # Planning from the store
+    def _plan_habit(self, habit: Dict, now: datetime, done_today: bool):
+        key = ("habit", habit["id"])
+        when = next_habit_reminder(habit, now, self.habit_time, done_today)
+        if when is None:
+            self.cancel(key)
+            return
+        self.schedule(key, when, {"kind": "habit", "id": habit["id"], "user_id": habit["user_id"],
+                                  "frequency": habit["frequency"], "created_at": habit["created_at"],
+                                  "title": habit["title"], "message": f"⚡ Don't forget: {habit['title']}"})
+
+    def _plan_goal(self, goal: Dict, now: datetime):
+        key = ("goal", goal["id"])
+        planned = next_goal_reminder(goal, now, self.goal_time, self.goal_lead_days)
+        if planned is None:
+            self.cancel(key)
+            return
+        when, message = planned
+        self.schedule(key, when, {"kind": "goal", "id": goal["id"], "user_id": goal["user_id"],
+                                  "due_date": goal["due_date"], "title": goal["title"],
+                                  "message": f"🎯 {goal['title']} {message}"})
+
+    def load(self, now: Optional[datetime] = None):
+        """Plan every habit and goal from scratch"""
+        now = now or self.clock()
+        with self._lock:
+            self._heap, self._live, self._dirty, self._reload = [], {}, set(), False
+            for user in self.store.get_users():
+                done = set(self.store.get_today_completions(user["id"]))
+                for habit in self.store.get_habits(user["id"]):
+                    self._plan_habit(habit, now, habit["id"] in done)
+                for goal in self.store.get_goals(user["id"]):
+                    self._plan_goal(goal, now)
+
+    def refresh(self, now: Optional[datetime] = None):
+        """Re-plan the habits and goals reported changed since the last refresh, or everything
+        when another process has written to the store"""
+        now = now or self.clock()
+        with self._lock:
+            self.store.sync_external()
+            if self._reload:
+                self.load(now)
+                return
+            dirty, self._dirty = self._dirty, set()
+            for kind, row_id in dirty:
+                if kind == "habit":
+                    habit = self.store.get_habit(row_id)
+                    if habit is None:
+                        self.cancel((kind, row_id))
+                    else:
+                        self._plan_habit(habit, now, self.store.is_habit_completed_today(row_id))
+                else:
+                    goal = self.store.get_goal(row_id)
+                    if goal is None:
+                        self.cancel((kind, row_id))
+                    else:
+                        self._plan_goal(goal, now)
+
+    def tick(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Deliver every reminder due by now and plan each one's next occurrence"""
+        now = now or self.clock()
+        with self._lock:
+            self.refresh(now)
+            fired = []
+            limit = now.timestamp()
+            while self._heap and self._heap[0][0] <= limit:
+                entry = heapq.heappop(self._heap)
+                if self._is_stale(entry):
+                    continue
+                key = entry[2]
+                _, _, reminder = self._live.pop(key)
+                if self._should_fire(reminder, now):
+                    fired.append(reminder)
+                # Plan the next occurrence from the stored row fields, just after this one
+                after = max(now, datetime.fromtimestamp(entry[0])) + timedelta(seconds=1)
+                if reminder["kind"] == "habit":
+                    self._plan_habit({**reminder, "is_active": 1}, after, False)
+                else:
+                    self._plan_goal({**reminder, "is_completed": 0}, after)
+        for reminder in fired:
+            self._deliver(reminder)
+        return fired
+
+    def _should_fire(self, reminder: Dict, now: datetime) -> bool:
+        if reminder["kind"] != "habit" or schedule.parse(reminder["frequency"])[0] != schedule.PER_WEEK:
+            return True
+        # Weekly quotas depend on this week's completions, so they are checked at fire time
+        return reminder["id"] in self.store.get_due_habit_ids(reminder["user_id"], now.date())
+
+    def _deliver(self, reminder: Dict):
+        self.delivered.appendleft(reminder)
+        for sink in self.sinks:
+            try:
+                sink.deliver(reminder)
+            except Exception:
+                logger.exception("reminder sink %s failed", type(sink).__name__)
+
+    # Background thread
+    def start(self) -> "ReminderEngine":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="goal-quest-reminders", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._stop.wait(self.poll):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("reminder tick failed")
@@ -0,0 +1,125 @@
+"""
+🧾 GOAL QUEST - Row Types
+Compact __slots__ records for database rows, built directly by sqlite3
+
+Database used to turn every sqlite3.Row into a dict: a hash table per row
+plus its key array, allocated, filled and thrown away on each rerun. Rows are
+now instances of small slotted classes (User, Habit, Completion, Goal,
+GoalStep, Note, ShopItem, or a generic Record): one attribute slot per column
+and no per-instance dict. A class is generated once per kind and column list
+(so schema migrations are picked up), and its constructor is compiled to a
+single tuple unpacking, so building a row is cheaper than building a dict.
+
+Rows implement the read-only Mapping protocol plus item assignment to their
+own columns, so row["title"], row.get(), dict(row), {**row}, "x" in row and
+comparisons with dicts all work as before; attribute access (row.title) is
+the fast path. json cannot encode them directly; pass default=rows.jsonable.
+"""
+
+import keyword
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+KINDS = ("User", "Habit", "Completion", "Goal", "GoalStep", "Note", "ShopItem", "Record")
+
+# Fields some read methods add after the query (initially unset, and skipped until assigned)
+EXTRAS = {"Goal": ("steps", "progress"), "ShopItem": ("meets_level",)}
+
+
+class Row(Mapping):
+    """Base of every generated row class"""
+    __slots__ = ()
+    _columns: Tuple[str, ...] = ()
+    _extras: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self._columns and key not in self._extras:
+            raise KeyError(f"{type(self).__name__} has no column {key!r}")
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._columns
+        for name in self._extras:
+            if hasattr(self, name):
+                yield name
+
+    def __len__(self) -> int:
+        return len(self._columns) + sum(hasattr(self, name) for name in self._extras)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._columns or (key in self._extras and hasattr(self, key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if isinstance(key, str) and key in self else default
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+    def __reduce__(self):
+        return _restore, (type(self).__name__, self._columns, dict(self))
+
+
+_lock = threading.Lock()
+_types: Dict[Tuple[str, Tuple[str, ...]], Tuple[type, Callable]] = {}
+
+
+def row_type(kind: str, columns: Tuple[str, ...]) -> Tuple[type, Callable[[tuple], Row]]:
+    """(class, make) for kind rows with these columns; make(values) builds one from a result tuple"""
+    key = (kind, columns)
+    cached = _types.get(key)
+    if cached is not None:
+        return cached
+    if any(not c.isidentifier() or keyword.iskeyword(c) or c.startswith("_") for c in columns) \
+            or len(set(columns)) != len(columns):
+        raise ValueError(f"columns can't be row attributes: {columns}")
+    extras = tuple(name for name in EXTRAS.get(kind, ()) if name not in columns)
+    cls = type(kind, (Row,), {"__slots__": columns + extras, "_columns": columns, "_extras": extras,
+                              "__module__": __name__})
+    # One tuple-unpacking assignment instead of a loop of setattr calls
+    namespace: Dict[str, Any] = {}
+    targets = "".join(f"row.{c}, " for c in columns)
+    exec(f"def make(values, new=object.__new__, cls=cls):\n    row = new(cls)\n    {targets}= values\n    return row\n",
+         {"cls": cls}, namespace)
+    with _lock:
+        return _types.setdefault(key, (cls, namespace["make"]))
+
+
+def factory(kind: str) -> Callable[[sqlite3.Cursor, tuple], Row]:
+    """A cursor row_factory building kind rows (class looked up once per statement, not per row)"""
+    last = [(None, None)]  # (description, make) of the latest statement, swapped as one tuple for threads
+
+    def build(cursor: sqlite3.Cursor, values: tuple) -> Row:
+        description, make = last[0]
+        if cursor.description is not description:
+            description = cursor.description
+            make = row_type(kind, tuple(d[0] for d in description))[1]
+            last[0] = description, make
+        return make(values)
+    return build
+
+
+FACTORIES = {kind: factory(kind) for kind in KINDS}
+
+
+def _restore(kind: str, columns: Tuple[str, ...], values: Dict) -> Row:
+    cls, make = row_type(kind, columns)
+    row = make(tuple(values[c] for c in columns))
+    for name in cls._extras:
+        if name in values:
+            setattr(row, name, values[name])
+    return row
+
+
+def jsonable(value: Any) -> Any:
+    """json.dumps default= hook for rows"""
+    if isinstance(value, Row):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
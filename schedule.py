@@ -0,0 +1,128 @@
+"""
+📅 GOAL QUEST - Habit Schedules
+Weekday masks, every-N-days and X-times-per-week schedules, and the due-today set
+
+A schedule is stored compactly in habits.frequency and parsed into a
+(kind, value) pair:
+
+    "daily"       every day
+    "days:<mask>" on the weekdays whose bit is set (bit 0 = Monday)
+    "every:<n>"   every n days, counted from the day the habit was created
+    "weekly:<x>"  until completed x times in the current Monday-Sunday week
+    "weekly"      legacy spelling of "weekly:1"
+
+Unknown values fall back to daily, so a bad row never hides a habit. Which
+habits are due can only change when a day starts or a habit's schedule
+changes: per-week quotas count completions *before* today, so completing a
+habit never removes it from today's board. DueToday keeps each user's set for
+the current day and is dropped on rollover or when a schedule-relevant
+column is written.
+"""
+
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+DAYS, EVERY, PER_WEEK = "days", "every", "weekly"
+ALL_DAYS = 0b1111111
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Habit columns that decide whether a habit is due; writing any of them drops cached sets
+SCHEDULE_FIELDS = frozenset({"frequency", "is_active", "created_at", "user_id"})
+
+
+def parse(frequency: Optional[str]) -> Tuple[str, int]:
+    """(kind, value) for a stored frequency; anything unrecognised is daily"""
+    kind, _, value = (frequency or "daily").partition(":")
+    if kind == PER_WEEK and not value:
+        return PER_WEEK, 1
+    if kind in (DAYS, EVERY, PER_WEEK) and value.isdigit() and int(value) > 0:
+        if kind == DAYS:
+            return DAYS, int(value) & ALL_DAYS or ALL_DAYS
+        return kind, int(value)
+    return DAYS, ALL_DAYS
+
+
+def on_days(weekdays: Iterable[int]) -> str:
+    """Frequency for the given weekdays (0 = Monday)"""
+    mask = 0
+    for day in weekdays:
+        mask |= 1 << day
+    return "daily" if mask in (0, ALL_DAYS) else f"{DAYS}:{mask}"
+
+
+def every(days: int) -> str:
+    return "daily" if days <= 1 else f"{EVERY}:{days}"
+
+
+def per_week(times: int) -> str:
+    return "daily" if times >= 7 else f"{PER_WEEK}:{max(times, 1)}"
+
+
+def describe(frequency: Optional[str]) -> str:
+    kind, value = parse(frequency)
+    if kind == DAYS:
+        if value == ALL_DAYS:
+            return "Daily"
+        if value == 0b0011111:
+            return "Weekdays"
+        if value == 0b1100000:
+            return "Weekends"
+        return ", ".join(name for i, name in enumerate(WEEKDAY_NAMES) if value >> i & 1)
+    if kind == EVERY:
+        return f"Every {value} days"
+    return "Weekly" if value == 1 else f"{value}× per week"
+
+
+def week_start(today: date) -> date:
+    return today - timedelta(days=today.weekday())
+
+
+def needs_week_counts(habits: Iterable[Dict]) -> bool:
+    return any(parse(h["frequency"])[0] == PER_WEEK for h in habits)
+
+
+def is_due(habit: Dict, today: date, done_this_week: int = 0) -> bool:
+    """Whether habit is due on today, given its completions this week before today"""
+    kind, value = parse(habit["frequency"])
+    if kind == DAYS:
+        return bool(value >> today.weekday() & 1)
+    if kind == EVERY:
+        created = date.fromisoformat(str(habit["created_at"])[:10])
+        return (today - created).days % value == 0
+    return done_this_week < value
+
+
+def due_ids(habits: Iterable[Dict], today: date, week_counts: Optional[Dict[int, int]] = None) -> FrozenSet[int]:
+    """Ids of the habits due on today; week_counts maps habit id -> completions this week before today"""
+    week_counts = week_counts or {}
+    return frozenset(h["id"] for h in habits if is_due(h, today, week_counts.get(h["id"], 0)))
+
+
+class DueToday:
+    """Per-user due-today sets for the current day, shared by every session of one store"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day: Optional[date] = None
+        self._sets: Dict[int, FrozenSet[int]] = {}
+        self._version = 0
+
+    def lookup(self, user_id: int, today: date, compute: Callable[[], FrozenSet[int]]) -> FrozenSet[int]:
+        """The cached set for user_id on today, computing (and caching) it on a miss"""
+        with self._lock:
+            if self._day != today:
+                self._day, self._sets = today, {}
+            ids, version = self._sets.get(user_id), self._version
+        if ids is None:
+            ids = compute()
+            with self._lock:
+                # A schedule written while computing makes this result stale
+                if self._version == version and self._day == today:
+                    self._sets[user_id] = ids
+        return ids
+
+    def invalidate(self):
+        with self._lock:
+            self._sets = {}
+            self._version += 1
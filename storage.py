@@ -0,0 +1,848 @@
+"""
+🧱 GOAL QUEST - Storage Interface
+Backend-neutral contract for users, habits, completions, goals, shop, quotes and notes
+
+Database (SQLite) and MemoryStorage (plain dicts, no SQL) both implement
+StorageBackend; the UI only relies on these methods and on rows being
+mappings (plain dicts here, slotted rows.Row records from Database). Rules
+that need no storage access (leveling, goal progress, economy ledger
+bookkeeping, due-today schedules) live on the base class so every backend
+shares them. benchmarks/storage_conformance.py runs the same behavioural
+checks against each backend.
+"""
+
+import random
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import economy
+import history
+import leaderboard
+import schedule
+
+MEMORY_LOCATION = "memory://"
+
+# Columns accepted by add_shop_items / add_quotes (bulk seeding from the CLI)
+SHOP_COLUMNS = ("name", "description", "item_type", "rarity", "gold_cost", "gem_cost", "level_required", "effects")
+QUOTE_COLUMNS = ("quote", "author", "source", "tradition")
+
+
+class StorageBackend(ABC):
+    """Everything the app reads and writes, independent of how it is stored"""
+
+    # User methods
+    @abstractmethod
+    def get_user(self) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: int) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def get_users(self) -> List[Dict]:
+        """Every user row, oldest first (team instances share one store)"""
+
+    @abstractmethod
+    def create_user(self, name: str, **kwargs) -> int: ...
+
+    @abstractmethod
+    def _set_user_fields(self, user_id: int, **kwargs) -> bool:
+        """Write user columns without touching the ledger (economy code records its own events)"""
+
+    def update_user(self, user_id: int, **kwargs) -> bool:
+        """Update user columns; direct edits of economy columns are recorded as adjustments"""
+        if not kwargs:
+            return False
+        deltas = economy.adjustments(self.get_user_by_id(user_id) or {}, kwargs)
+        updated = self._set_user_fields(user_id, **kwargs)
+        if updated and deltas:
+            self._record_economy(user_id, "adjust", "manual", None, **deltas)
+        return updated
+
+    def add_xp(self, user_id: int, xp: int, source_type: str = "manual", source_id: Optional[int] = None) -> Dict:
+        user = self.get_user_by_id(user_id)
+        if not user:
+            return {"error": "User not found"}
+
+        new_xp = user["current_xp"] + xp
+        new_total = user["total_xp"] + xp
+        new_level = user["level"]
+        leveled_up = False
+
+        xp_needed = self.xp_for_level(new_level)
+        while new_xp >= xp_needed:
+            new_xp -= xp_needed
+            new_level += 1
+            leveled_up = True
+            xp_needed = self.xp_for_level(new_level)
+
+        self._set_user_fields(user_id, current_xp=new_xp, total_xp=new_total, level=new_level)
+        self._record_economy(user_id, "grant", source_type, source_id, xp=xp)
+        return {"xp_gained": xp, "new_xp": new_xp, "new_level": new_level, "leveled_up": leveled_up, "xp_to_next": xp_needed}
+
+    @staticmethod
+    def xp_for_level(level: int) -> int:
+        return int(100 * (level ** 1.5))
+
+    # Economy ledger: the user row is a materialized view of these events
+    snapshot_every = economy.SNAPSHOT_EVERY
+
+    @abstractmethod
+    def append_ledger(self, user_id: int, kind: str, source_type: str, source_id: Optional[int] = None, **deltas) -> int: ...
+
+    @abstractmethod
+    def get_ledger(self, user_id: int, after_id: int = 0) -> List[Dict]: ...
+
+    @abstractmethod
+    def get_ledger_rows(self, user_id: int, after_id: int = 0) -> List[Tuple[int, ...]]:
+        """Ledger deltas after after_id as tuples in economy.LEDGER_COLUMNS order, oldest first"""
+
+    @abstractmethod
+    def count_ledger(self, user_id: int, after_id: int = 0) -> int:
+        """Number of this user's ledger events after after_id"""
+
+    @abstractmethod
+    def save_snapshot(self, user_id: int, ledger_id: int, state: Dict) -> int: ...
+
+    @abstractmethod
+    def get_latest_snapshot(self, user_id: int) -> Optional[Dict]: ...
+
+    def _open_account(self, user_id: int, columns: Dict):
+        """Opening-balance event so replay from an empty ledger reproduces the new user row"""
+        self._record_economy(user_id, "opening", "user", user_id,
+                             **economy.opening_balance({**DEFAULTS["user"], **columns}))
+
+    def _record_economy(self, user_id: int, kind: str, source_type: str, source_id: Optional[int] = None, **deltas) -> int:
+        ledger_id = self.append_ledger(user_id, kind, source_type, source_id, **deltas)
+        snapshot = self.get_latest_snapshot(user_id)
+        # Ledger ids are global, so count this user's own events since their snapshot
+        if self.count_ledger(user_id, snapshot["ledger_id"] if snapshot else 0) >= self.snapshot_every:
+            rows = self.get_ledger_rows(user_id, snapshot["ledger_id"] if snapshot else 0)
+            self.save_snapshot(user_id, ledger_id, economy.replay(rows, snapshot, self.xp_for_level))
+        return ledger_id
+
+    def rebuild_user_state(self, user_id: int, xp_for_level=None) -> Dict:
+        """Economy columns replayed from the latest snapshot and the ledger after it.
+
+        Snapshots store raw totals, so a different xp_for_level curve can be
+        replayed without discarding them.
+        """
+        snapshot = self.get_latest_snapshot(user_id)
+        rows = self.get_ledger_rows(user_id, snapshot["ledger_id"] if snapshot else 0)
+        return economy.replay(rows, snapshot, xp_for_level or self.xp_for_level)
+
+    def materialize_user(self, user_id: int, xp_for_level=None) -> Dict:
+        """Overwrite the user row's economy columns with the replayed state"""
+        state = self.rebuild_user_state(user_id, xp_for_level)
+        self._set_user_fields(user_id, **state)
+        return state
+
+    # Habit methods
+    @abstractmethod
+    def create_habit(self, user_id: int, title: str, **kwargs) -> int: ...
+
+    @abstractmethod
+    def get_habits(self, user_id: int, active_only: bool = True) -> List[Dict]: ...
+
+    @abstractmethod
+    def get_assessed_habits(self) -> List[Dict]: ...
+
+    @abstractmethod
+    def get_habit(self, habit_id: int) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def update_habit(self, habit_id: int, **kwargs) -> bool: ...
+
+    @abstractmethod
+    def delete_habit(self, habit_id: int) -> bool: ...
+
+    # Completion methods
+    @abstractmethod
+    def complete_habit(self, habit_id: int, user_id: int) -> Dict: ...
+
+    @abstractmethod
+    def is_habit_completed_today(self, habit_id: int) -> bool: ...
+
+    @abstractmethod
+    def get_today_completions(self, user_id: int) -> List[int]: ...
+
+    @abstractmethod
+    def get_completion_counts(self, user_id: int, start: str, end: str) -> Dict[int, int]:
+        """habit id -> completions dated in [start, end] (ISO dates, inclusive)"""
+
+    @abstractmethod
+    def get_completion_counts_by_user(self, start: str, end: str) -> Dict[int, int]:
+        """user id -> completions dated in [start, end] (ISO dates, inclusive)"""
+
+    # Other writers: a backend whose file other processes can write (api.py, cli.py) returns a token from
+    # _external_version() that changes when they commit, and keeps the last one seen as self._external_seen
+    def _external_version(self) -> Optional[int]:
+        return None
+
+    def sync_external(self) -> bool:
+        """Drop cached due-today sets and leaderboards (and tell listeners to reload everything) if
+        another connection has committed since the last check; returns whether it had"""
+        version = self._external_version()
+        if version is None or version == self._external_seen:
+            return False
+        self._external_seen = version
+        self.due_today.invalidate()
+        self.leaderboards.invalidate()
+        self._changed("all")
+        return True
+
+    # Leaderboards: backends hold a leaderboard.Leaderboards as self.leaderboards and report
+    # user column writes, new users and completions to it (invalidating it when counts can shrink)
+    def _loaded_leaderboards(self) -> leaderboard.Leaderboards:
+        self.sync_external()
+        self.leaderboards.ensure_loaded(self.get_users, self.get_completion_counts_by_user)
+        return self.leaderboards
+
+    def get_leaderboard(self, metric: str, n: int = 10) -> List[Dict]:
+        """Top n users on a leaderboard.METRICS board as dicts with rank, user_id, name and score"""
+        return self._loaded_leaderboards().top(metric, n)
+
+    def get_rank(self, metric: str, user_id: int) -> Optional[int]:
+        """1-based rank of user_id (tied users share a rank), or None if not ranked"""
+        return self._loaded_leaderboards().rank(metric, user_id)
+
+    def get_leaderboard_size(self, metric: str) -> int:
+        return self._loaded_leaderboards().size(metric)
+
+    def revision(self) -> Optional[str]:
+        """Token that changes whenever the stored contents do, or None if the backend can't tell"""
+        return None
+
+    # Change listeners: backends hold a list as self.listeners and call _changed(kind, id) after
+    # writing a habit or goal (kind "habit" / "goal"), or _changed("all") when everything is replaced
+    def add_listener(self, callback: Callable[[str, Optional[int]], None]):
+        self.listeners.append(callback)
+
+    def _changed(self, kind: str, row_id: Optional[int] = None):
+        for callback in self.listeners:
+            callback(kind, row_id)
+
+    # Schedules: backends hold a schedule.DueToday as self.due_today and invalidate it
+    # whenever a habit is created, deleted or has a schedule.SCHEDULE_FIELDS column written
+    def get_due_habit_ids(self, user_id: int, today: Optional[date] = None) -> FrozenSet[int]:
+        """Ids of the user's active habits that are due today, computed once per day"""
+        today = today or date.today()
+        self.sync_external()
+        return self.due_today.lookup(user_id, today, lambda: self._compute_due(user_id, today))
+
+    def recompute_streaks(self, today: Optional[date] = None) -> int:
+        """Reset every habit's streak and best streak from its day bitmap and schedule; returns how many habits changed"""
+        today = today or date.today()
+        changed = 0
+        for user in self.get_users():
+            for habit in self.get_habits(user["id"], active_only=False):
+                streak, best = history.streaks(habit, today)
+                if (habit["streak"], habit["best_streak"]) != (streak, best):
+                    self.update_habit(habit["id"], streak=streak, best_streak=best)
+                    changed += 1
+        return changed
+
+    def _compute_due(self, user_id: int, today: date) -> FrozenSet[int]:
+        habits = self.get_habits(user_id)
+        counts = {}
+        monday = schedule.week_start(today)
+        if today > monday and schedule.needs_week_counts(habits):
+            counts = self.get_completion_counts(user_id, monday.isoformat(), (today - timedelta(days=1)).isoformat())
+        return schedule.due_ids(habits, today, counts)
+
+    # Goal methods
+    @abstractmethod
+    def create_goal(self, user_id: int, title: str, steps: List[Dict] = None, **kwargs) -> int: ...
+
+    @abstractmethod
+    def get_goals(self, user_id: int, include_completed: bool = False) -> List[Dict]: ...
+
+    @abstractmethod
+    def get_goal(self, goal_id: int) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def get_goal_steps(self, goal_id: int) -> List[Dict]: ...
+
+    def get_goal_progress(self, goal_id: int) -> Dict:
+        steps = self.get_goal_steps(goal_id)
+        if not steps:
+            return {"completed": 0, "total": 0, "percentage": 0}
+        completed = sum(1 for s in steps if s["is_completed"])
+        return {"completed": completed, "total": len(steps), "percentage": int((completed / len(steps)) * 100)}
+
+    @abstractmethod
+    def complete_goal_step(self, step_id: int, user_id: int) -> Dict: ...
+
+    @abstractmethod
+    def delete_goal(self, goal_id: int) -> bool: ...
+
+    # Shop methods
+    @abstractmethod
+    def get_shop_items(self, user_level: int = 1) -> List[Dict]: ...
+
+    @abstractmethod
+    def purchase_item(self, user_id: int, item_id: int) -> Dict: ...
+
+    @abstractmethod
+    def get_inventory(self, user_id: int) -> List[Dict]: ...
+
+    @abstractmethod
+    def add_shop_items(self, items: List[Dict]) -> int:
+        """Insert SHOP_COLUMNS dicts (name required), skipping names already in the shop; returns how many were added"""
+
+    # Quote methods
+    @abstractmethod
+    def get_random_quote(self, traditions: List[str] = None) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def add_quotes(self, quotes: List[Dict]) -> int:
+        """Insert QUOTE_COLUMNS dicts (quote required), skipping quote texts already stored; returns how many were added"""
+
+    # Notes methods
+    @abstractmethod
+    def create_note(self, user_id: int, title: str, content: str = "", **kwargs) -> int: ...
+
+    @abstractmethod
+    def get_notes(self, user_id: int) -> List[Dict]: ...
+
+    @abstractmethod
+    def update_note(self, note_id: int, **kwargs) -> bool: ...
+
+    @abstractmethod
+    def delete_note(self, note_id: int) -> bool: ...
+
+    # Coach conversation methods
+    @abstractmethod
+    def create_chat_thread(self, user_id: int, title: str = "Coaching session") -> int: ...
+
+    @abstractmethod
+    def get_latest_chat_thread(self, user_id: int) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def add_chat_message(self, thread_id: int, role: str, content: str) -> int: ...
+
+    @abstractmethod
+    def get_chat_messages(self, thread_id: int, before_id: Optional[int] = None, limit: int = 20) -> List[Dict]: ...
+
+    @abstractmethod
+    def get_chat_messages_since(self, thread_id: int, since_id: int) -> List[Dict]: ...
+
+    @abstractmethod
+    def has_chat_messages_before(self, thread_id: int, before_id: int) -> bool: ...
+
+    # Analytics
+    @abstractmethod
+    def get_habit_stats(self, user_id: int, days: int = 30) -> Dict: ...
+
+    @abstractmethod
+    def export_completions(self, user_id: int, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """Completions in [start, end] (ISO dates, inclusive) with habit title and category, oldest first"""
+
+    def iter_completions(self, user_id: int, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict]:
+        """export_completions one row at a time, for callers that stream (backends may avoid the list)"""
+        return iter(self.export_completions(user_id, start, end))
+
+
+def open_storage(location: str, **options) -> StorageBackend:
+    """MemoryStorage for "memory://", otherwise a SQLite Database at that path (options go to Database)"""
+    if location == MEMORY_LOCATION:
+        return MemoryStorage()
+    from database import Database
+    return Database(location, **options)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# IN-MEMORY BACKEND
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Column defaults mirroring the SQLite schema
+DEFAULTS = {
+    "user": {"display_name": None, "level": 1, "current_xp": 0, "total_xp": 0, "gold": 100, "gems": 10,
+             "strength": 1, "intelligence": 1, "vitality": 1, "agility": 1, "sense": 1, "willpower": 1,
+             "current_streak": 0, "best_streak": 0, "last_activity_date": None,
+             "philosophy_traditions": '["stoic"]', "onboarding_complete": 0, "dreams_text": None},
+    "habits": {"description": None, "category": "personal", "difficulty": 3, "xp_reward": 100,
+               "target_stat": "willpower", "frequency": "daily", "streak": 0, "best_streak": 0,
+               "total_completions": 0, "is_priority": 0, "is_active": 1, "ai_tip": None, "assessed_by": None,
+               "history_origin": None, "history_bits": None},
+    "goals": {"description": None, "category": "personal", "difficulty": 3, "xp_reward": 2000,
+              "target_stat": "intelligence", "due_date": None, "estimated_weeks": None, "is_completed": 0,
+              "completed_at": None},
+    "notes": {"content": "", "is_pinned": 0, "tags": None},
+    "shop_items": {"description": None, "item_type": None, "rarity": "common", "gold_cost": 0, "gem_cost": 0,
+                   "level_required": 1, "effects": None},
+    "wisdom_quotes": {"author": None, "source": None, "tradition": None},
+}
+
+
+def new_rows(rows: List[Dict], table: str, columns: Tuple[str, ...], key: str, existing: set) -> List[Tuple]:
+    """rows as tuples in columns order with defaults filled, dropping those whose key is in existing (or repeated)"""
+    result = []
+    for row in rows:
+        unknown = row.keys() - set(columns)
+        if unknown or not row.get(key):
+            raise ValueError(f"{table} row needs {key!r} and only {', '.join(columns)}: {row}")
+        if row[key] in existing:
+            continue
+        existing.add(row[key])
+        row = {**DEFAULTS[table], **row}
+        result.append(tuple(row[column] for column in columns))
+    return result
+
+SHOP_ITEMS = [
+    ("XP Boost (Minor)", "Gain 25% more XP for 1 hour", "consumable", "common", 100, 0, 1, '{"xp_multiplier": 1.25, "duration_hours": 1}'),
+    ("XP Boost (Major)", "Gain 50% more XP for 2 hours", "consumable", "uncommon", 250, 0, 5, '{"xp_multiplier": 1.5, "duration_hours": 2}'),
+    ("Streak Shield", "Protect your streak for one missed day", "consumable", "rare", 500, 0, 10, '{"streak_protection": 1}'),
+    ("Motivation Elixir", "Double XP for next habit completion", "consumable", "uncommon", 150, 0, 5, '{"next_habit_multiplier": 2}'),
+    ("XP Boost (Legendary)", "Double XP for 24 hours", "consumable", "legendary", 0, 50, 25, '{"xp_multiplier": 2, "duration_hours": 24}'),
+    ("Strength Elixir", "+5 temporary Strength for 24h", "boost", "rare", 300, 0, 15, '{"stat": "strength", "boost": 5}'),
+    ("Wisdom Scroll", "+5 temporary Intelligence for 24h", "boost", "rare", 300, 0, 15, '{"stat": "intelligence", "boost": 5}'),
+]
+
+QUOTES = [
+    ("The impediment to action advances action. What stands in the way becomes the way.", "Marcus Aurelius", "Meditations", "stoic"),
+    ("We suffer more in imagination than in reality.", "Seneca", "Letters", "stoic"),
+    ("No man is free who is not master of himself.", "Epictetus", "Discourses", "stoic"),
+    ("I can do all things through Christ who strengthens me.", "Philippians 4:13", "Bible", "biblical"),
+    ("Trust in the Lord with all your heart.", "Proverbs 3:5", "Bible", "biblical"),
+    ("The journey of a thousand miles begins with a single step.", "Lao Tzu", "Tao Te Ching", "eastern"),
+    ("The mind is everything. What you think you become.", "Buddha", "Dhammapada", "eastern"),
+    ("Today is victory over yourself of yesterday.", "Miyamoto Musashi", "Book of Five Rings", "samurai"),
+    ("Think lightly of yourself and deeply of the world.", "Miyamoto Musashi", "Book of Five Rings", "samurai"),
+]
+
+
+def _timestamp() -> str:
+    """CURRENT_TIMESTAMP format (UTC, second precision)"""
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _Table:
+    """Rows keyed by an autoincrement id"""
+
+    def __init__(self):
+        self.rows: Dict[int, Dict] = {}
+        self.last_id = 0
+
+    def insert(self, row: Dict) -> int:
+        self.last_id += 1
+        self.rows[self.last_id] = {"id": self.last_id, **row}
+        return self.last_id
+
+    def where(self, **match) -> List[Dict]:
+        return [row for row in self.rows.values() if all(row.get(k) == v for k, v in match.items())]
+
+
+class MemoryStorage(StorageBackend):
+    """Pure-Python backend for tests and benchmarks; state lives only as long as the object"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.due_today = schedule.DueToday()
+        self.leaderboards = leaderboard.Leaderboards()
+        self.listeners: List[Callable] = []
+        self.tables = {name: _Table() for name in (
+            "user", "habits", "habit_completions", "goals", "goal_steps", "shop_items", "user_inventory",
+            "wisdom_quotes", "notes", "chat_threads", "chat_messages", "economy_ledger", "economy_snapshots",
+        )}
+        for name, description, item_type, rarity, gold, gems, level, effects in SHOP_ITEMS:
+            self.tables["shop_items"].insert({
+                "name": name, "description": description, "item_type": item_type, "rarity": rarity,
+                "gold_cost": gold, "gem_cost": gems, "level_required": level, "effects": effects, "is_available": 1,
+            })
+        for quote, author, source, tradition in QUOTES:
+            self.tables["wisdom_quotes"].insert({"quote": quote, "author": author, "source": source,
+                                                 "tradition": tradition, "is_user_saved": 0, "user_id": None})
+
+    def _insert(self, table: str, **values) -> int:
+        row = {**DEFAULTS.get(table, {}), "created_at": _timestamp(), **values}
+        return self.tables[table].insert(row)
+
+    def _update(self, table: str, row_id: int, values: Dict) -> bool:
+        row = self.tables[table].rows.get(row_id)
+        if row is None:
+            return False
+        row.update(values)
+        return True
+
+    @staticmethod
+    def _copy(row: Optional[Dict]) -> Optional[Dict]:
+        return dict(row) if row is not None else None
+
+    # User methods
+    def get_user(self) -> Optional[Dict]:
+        rows = self.tables["user"].rows
+        return self._copy(rows[min(rows)]) if rows else None
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict]:
+        return self._copy(self.tables["user"].rows.get(user_id))
+
+    def get_users(self) -> List[Dict]:
+        return [dict(row) for _, row in sorted(self.tables["user"].rows.items())]
+
+    def create_user(self, name: str, **kwargs) -> int:
+        with self._lock:
+            user_id = self._insert("user", name=name, **kwargs)
+            self._open_account(user_id, kwargs)
+            self.leaderboards.user_added(user_id, self.tables["user"].rows[user_id])
+            return user_id
+
+    def _set_user_fields(self, user_id: int, **kwargs) -> bool:
+        if not kwargs:
+            return False
+        with self._lock:
+            updated = self._update("user", user_id, kwargs)
+            if updated:
+                self.leaderboards.user_changed(user_id, kwargs)
+            return updated
+
+    def update_user(self, user_id: int, **kwargs) -> bool:
+        with self._lock:
+            return super().update_user(user_id, **kwargs)
+
+    def add_xp(self, user_id: int, xp: int, source_type: str = "manual", source_id: Optional[int] = None) -> Dict:
+        with self._lock:
+            return super().add_xp(user_id, xp, source_type, source_id)
+
+    # Economy ledger
+    def append_ledger(self, user_id: int, kind: str, source_type: str, source_id: Optional[int] = None, **deltas) -> int:
+        values = dict(zip(economy.LEDGER_COLUMNS, economy.ledger_values(deltas)))
+        with self._lock:
+            return self._insert("economy_ledger", user_id=user_id, kind=kind, source_type=source_type,
+                                source_id=source_id, **values)
+
+    def get_ledger(self, user_id: int, after_id: int = 0) -> List[Dict]:
+        return [dict(e) for e in self.tables["economy_ledger"].where(user_id=user_id) if e["id"] > after_id]
+
+    def get_ledger_rows(self, user_id: int, after_id: int = 0) -> List[Tuple[int, ...]]:
+        return economy.rows_from(e for e in self.tables["economy_ledger"].where(user_id=user_id) if e["id"] > after_id)
+
+    def count_ledger(self, user_id: int, after_id: int = 0) -> int:
+        return sum(e["id"] > after_id for e in self.tables["economy_ledger"].where(user_id=user_id))
+
+    def save_snapshot(self, user_id: int, ledger_id: int, state: Dict) -> int:
+        values = {column: state[column] for column in economy.USER_COLUMNS.values()}
+        with self._lock:
+            return self._insert("economy_snapshots", user_id=user_id, ledger_id=ledger_id, **values)
+
+    def get_latest_snapshot(self, user_id: int) -> Optional[Dict]:
+        snapshots = self.tables["economy_snapshots"].where(user_id=user_id)
+        return self._copy(max(snapshots, key=lambda s: s["ledger_id"])) if snapshots else None
+
+    # Habit methods
+    def create_habit(self, user_id: int, title: str, **kwargs) -> int:
+        with self._lock:
+            self.due_today.invalidate()
+            habit_id = self._insert("habits", user_id=user_id, title=title, **kwargs)
+        self._changed("habit", habit_id)
+        return habit_id
+
+    def get_habits(self, user_id: int, active_only: bool = True) -> List[Dict]:
+        habits = self.tables["habits"].where(user_id=user_id)
+        if active_only:
+            habits = [h for h in habits if h["is_active"] == 1]
+        habits.sort(key=lambda h: h["created_at"], reverse=True)
+        habits.sort(key=lambda h: h["is_priority"], reverse=True)
+        return [dict(h) for h in habits]
+
+    def get_assessed_habits(self) -> List[Dict]:
+        keys = ("title", "description", "difficulty", "category", "target_stat", "xp_reward")
+        return [{k: h[k] for k in keys} for h in self.tables["habits"].rows.values()
+                if h["assessed_by"] == "ai" or (h["assessed_by"] is None and h["ai_tip"]
+                                                and not h["ai_tip"].startswith("Start small"))]
+
+    def get_habit(self, habit_id: int) -> Optional[Dict]:
+        return self._copy(self.tables["habits"].rows.get(habit_id))
+
+    def update_habit(self, habit_id: int, **kwargs) -> bool:
+        if not kwargs:
+            return False
+        with self._lock:
+            if schedule.SCHEDULE_FIELDS & kwargs.keys():
+                self.due_today.invalidate()
+            updated = self._update("habits", habit_id, kwargs)
+        self._changed("habit", habit_id)
+        return updated
+
+    def delete_habit(self, habit_id: int) -> bool:
+        with self._lock:
+            self.due_today.invalidate()
+            self.leaderboards.invalidate()  # its completions leave the weekly counts
+            completions = self.tables["habit_completions"]
+            for row in completions.where(habit_id=habit_id):
+                del completions.rows[row["id"]]
+            deleted = self.tables["habits"].rows.pop(habit_id, None) is not None
+        self._changed("habit", habit_id)
+        return deleted
+
+    # Completion methods
+    def complete_habit(self, habit_id: int, user_id: int) -> Dict:
+        today = date.today().isoformat()
+        with self._lock:
+            if self.tables["habit_completions"].where(habit_id=habit_id, completion_date=today):
+                return {"error": "Already completed today"}
+
+            habit = self.get_habit(habit_id)
+            if not habit:
+                return {"error": "Habit not found"}
+
+            new_streak = habit["streak"] + 1
+            streak_bonus = min(int(habit["xp_reward"] * 0.1 * new_streak), habit["xp_reward"])
+            total_xp = habit["xp_reward"] + streak_bonus
+
+            completion_id = self.tables["habit_completions"].insert({
+                "habit_id": habit_id, "completed_at": _timestamp(), "completion_date": today,
+                "xp_earned": total_xp, "streak_bonus": streak_bonus,
+            })
+
+            best_streak = max(habit["best_streak"], new_streak)
+            history_origin, history_bits = history.encode(history.mark(history.of(habit), date.fromisoformat(today)))
+            self.update_habit(habit_id, streak=new_streak, best_streak=best_streak, total_completions=habit["total_completions"] + 1,
+                              history_origin=history_origin, history_bits=history_bits)
+
+            xp_result = self.add_xp(user_id, total_xp, "habit_completion", completion_id)
+            gold_earned = int(habit["xp_reward"] * 0.1)
+
+            user = self.get_user_by_id(user_id)
+            user_streak = user["current_streak"] + 1
+            user_best = max(user["best_streak"], user_streak)
+            stat = habit.get("target_stat", "willpower")
+            self._set_user_fields(user_id, gold=user["gold"] + gold_earned, current_streak=user_streak,
+                                  best_streak=user_best, last_activity_date=today, **{stat: user.get(stat, 1) + 1})
+            self._record_economy(user_id, "grant", "habit_completion", completion_id, gold=gold_earned, **{stat: 1})
+            self.leaderboards.completion_recorded(user_id, date.fromisoformat(today))
+            return {"success": True, "xp_earned": total_xp, "streak_bonus": streak_bonus, "gold_earned": gold_earned, "new_streak": new_streak, **xp_result}
+
+    def is_habit_completed_today(self, habit_id: int) -> bool:
+        return bool(self.tables["habit_completions"].where(habit_id=habit_id, completion_date=date.today().isoformat()))
+
+    def get_today_completions(self, user_id: int) -> List[int]:
+        today = date.today().isoformat()
+        habits = self.tables["habits"].rows
+        return [c["habit_id"] for c in self.tables["habit_completions"].where(completion_date=today)
+                if c["habit_id"] in habits and habits[c["habit_id"]]["user_id"] == user_id]
+
+    def get_completion_counts_by_user(self, start: str, end: str) -> Dict[int, int]:
+        habits = self.tables["habits"].rows
+        counts: Dict[int, int] = {}
+        for c in self.tables["habit_completions"].rows.values():
+            habit = habits.get(c["habit_id"])
+            if habit and start <= c["completion_date"] <= end:
+                counts[habit["user_id"]] = counts.get(habit["user_id"], 0) + 1
+        return counts
+
+    def get_completion_counts(self, user_id: int, start: str, end: str) -> Dict[int, int]:
+        habits = self.tables["habits"].rows
+        counts: Dict[int, int] = {}
+        for c in self.tables["habit_completions"].rows.values():
+            habit = habits.get(c["habit_id"])
+            if habit and habit["user_id"] == user_id and start <= c["completion_date"] <= end:
+                counts[c["habit_id"]] = counts.get(c["habit_id"], 0) + 1
+        return counts
+
+    # Goal methods
+    def create_goal(self, user_id: int, title: str, steps: List[Dict] = None, **kwargs) -> int:
+        with self._lock:
+            goal_id = self._insert("goals", user_id=user_id, title=title, **kwargs)
+            for i, step in enumerate(steps or [], 1):
+                self.tables["goal_steps"].insert({
+                    "goal_id": goal_id, "step_number": i, "title": step.get("title", f"Step {i}"),
+                    "description": step.get("description", ""),
+                    "estimated_duration": step.get("estimated_duration", "1 week"),
+                    "xp_reward": step.get("xp_reward", 200), "is_completed": 0, "completed_at": None,
+                })
+        self._changed("goal", goal_id)
+        return goal_id
+
+    def _with_steps(self, goal: Dict) -> Dict:
+        goal = dict(goal)
+        goal["steps"] = self.get_goal_steps(goal["id"])
+        goal["progress"] = self.get_goal_progress(goal["id"])
+        return goal
+
+    def get_goals(self, user_id: int, include_completed: bool = False) -> List[Dict]:
+        goals = self.tables["goals"].where(user_id=user_id)
+        if not include_completed:
+            goals = [g for g in goals if g["is_completed"] == 0]
+        # SQLite sorts NULL due dates first
+        goals.sort(key=lambda g: g["created_at"], reverse=True)
+        goals.sort(key=lambda g: (g["due_date"] is not None, g["due_date"] or ""))
+        return [self._with_steps(g) for g in goals]
+
+    def get_goal(self, goal_id: int) -> Optional[Dict]:
+        goal = self.tables["goals"].rows.get(goal_id)
+        return self._with_steps(goal) if goal else None
+
+    def get_goal_steps(self, goal_id: int) -> List[Dict]:
+        return [dict(s) for s in sorted(self.tables["goal_steps"].where(goal_id=goal_id), key=lambda s: s["step_number"])]
+
+    def complete_goal_step(self, step_id: int, user_id: int) -> Dict:
+        with self._lock:
+            step = self._copy(self.tables["goal_steps"].rows.get(step_id))
+            if not step:
+                return {"error": "Step not found"}
+            if step["is_completed"]:
+                return {"error": "Step already completed"}
+
+            self._update("goal_steps", step_id, {"is_completed": 1, "completed_at": datetime.now().isoformat()})
+            xp_result = self.add_xp(user_id, step["xp_reward"], "goal_step", step_id)
+
+            progress = self.get_goal_progress(step["goal_id"])
+            goal_completed = progress["percentage"] == 100
+
+            if goal_completed:
+                goal = self.get_goal(step["goal_id"])
+                self._update("goals", step["goal_id"], {"is_completed": 1, "completed_at": datetime.now().isoformat()})
+                self.add_xp(user_id, goal["xp_reward"], "goal", step["goal_id"])
+                xp_result["goal_xp"] = goal["xp_reward"]
+
+        if goal_completed:
+            self._changed("goal", step["goal_id"])
+        return {"success": True, "step_xp": step["xp_reward"], "goal_completed": goal_completed, **xp_result}
+
+    def delete_goal(self, goal_id: int) -> bool:
+        with self._lock:
+            steps = self.tables["goal_steps"]
+            for step in steps.where(goal_id=goal_id):
+                del steps.rows[step["id"]]
+            deleted = self.tables["goals"].rows.pop(goal_id, None) is not None
+        self._changed("goal", goal_id)
+        return deleted
+
+    # Shop methods
+    def get_shop_items(self, user_level: int = 1) -> List[Dict]:
+        items = sorted(self.tables["shop_items"].where(is_available=1), key=lambda i: (i["level_required"], i["gold_cost"]))
+        return [dict(item, meets_level=item["level_required"] <= user_level) for item in items]
+
+    def purchase_item(self, user_id: int, item_id: int) -> Dict:
+        with self._lock:
+            user = self.get_user_by_id(user_id)
+            item = self._copy(self.tables["shop_items"].rows.get(item_id))
+            if not item:
+                return {"error": "Item not found"}
+            if not user:
+                return {"error": "User not found"}
+
+            if user["level"] < item["level_required"]:
+                return {"error": f"Requires level {item['level_required']}"}
+            if item["gold_cost"] > 0 and user["gold"] < item["gold_cost"]:
+                return {"error": "Not enough gold"}
+            if item["gem_cost"] > 0 and user["gems"] < item["gem_cost"]:
+                return {"error": "Not enough gems"}
+
+            new_gold = user["gold"] - item["gold_cost"]
+            new_gems = user["gems"] - item["gem_cost"]
+            self._set_user_fields(user_id, gold=new_gold, gems=new_gems)
+            self._record_economy(user_id, "spend", "shop_item", item_id, gold=-item["gold_cost"], gems=-item["gem_cost"])
+
+            existing = self.tables["user_inventory"].where(user_id=user_id, item_id=item_id)
+            if existing:
+                existing[0]["quantity"] += 1
+            else:
+                self.tables["user_inventory"].insert({"user_id": user_id, "item_id": item_id, "quantity": 1,
+                                                      "purchased_at": _timestamp()})
+            return {"success": True, "item": item, "new_gold": new_gold, "new_gems": new_gems}
+
+    def get_inventory(self, user_id: int) -> List[Dict]:
+        items = self.tables["shop_items"].rows
+        keys = ("name", "description", "item_type", "rarity", "effects")
+        return [dict(entry, **{k: items[entry["item_id"]][k] for k in keys})
+                for entry in self.tables["user_inventory"].where(user_id=user_id)]
+
+    def add_shop_items(self, items: List[Dict]) -> int:
+        with self._lock:
+            table = self.tables["shop_items"]
+            rows = new_rows(items, "shop_items", SHOP_COLUMNS, "name", {i["name"] for i in table.rows.values()})
+            for row in rows:
+                table.insert({**dict(zip(SHOP_COLUMNS, row)), "is_available": 1})
+            return len(rows)
+
+    # Quote methods
+    def get_random_quote(self, traditions: List[str] = None) -> Optional[Dict]:
+        quotes = list(self.tables["wisdom_quotes"].rows.values())
+        if traditions:
+            quotes = [q for q in quotes if q["tradition"] in traditions]
+        return dict(random.choice(quotes)) if quotes else None
+
+    def add_quotes(self, quotes: List[Dict]) -> int:
+        with self._lock:
+            table = self.tables["wisdom_quotes"]
+            rows = new_rows(quotes, "wisdom_quotes", QUOTE_COLUMNS, "quote", {q["quote"] for q in table.rows.values()})
+            for row in rows:
+                table.insert({**dict(zip(QUOTE_COLUMNS, row)), "is_user_saved": 0, "user_id": None})
+            return len(rows)
+
+    # Notes methods
+    def create_note(self, user_id: int, title: str, content: str = "", **kwargs) -> int:
+        with self._lock:
+            return self._insert("notes", user_id=user_id, title=title, content=content,
+                                updated_at=_timestamp(), **kwargs)
+
+    def get_notes(self, user_id: int) -> List[Dict]:
+        notes = self.tables["notes"].where(user_id=user_id)
+        notes.sort(key=lambda n: n["updated_at"], reverse=True)
+        notes.sort(key=lambda n: n["is_pinned"], reverse=True)
+        return [dict(n) for n in notes]
+
+    def update_note(self, note_id: int, **kwargs) -> bool:
+        kwargs["updated_at"] = datetime.now().isoformat()
+        with self._lock:
+            return self._update("notes", note_id, kwargs)
+
+    def delete_note(self, note_id: int) -> bool:
+        with self._lock:
+            return self.tables["notes"].rows.pop(note_id, None) is not None
+
+    # Coach conversation methods
+    def create_chat_thread(self, user_id: int, title: str = "Coaching session") -> int:
+        with self._lock:
+            return self._insert("chat_threads", user_id=user_id, title=title, updated_at=_timestamp())
+
+    def get_latest_chat_thread(self, user_id: int) -> Optional[Dict]:
+        threads = self.tables["chat_threads"].where(user_id=user_id)
+        return self._copy(max(threads, key=lambda t: (t["updated_at"], t["id"]), default=None))
+
+    def add_chat_message(self, thread_id: int, role: str, content: str) -> int:
+        with self._lock:
+            message_id = self._insert("chat_messages", thread_id=thread_id, role=role, content=content)
+            self._update("chat_threads", thread_id, {"updated_at": datetime.now().isoformat()})
+            return message_id
+
+    def get_chat_messages(self, thread_id: int, before_id: Optional[int] = None, limit: int = 20) -> List[Dict]:
+        messages = [m for m in self.tables["chat_messages"].where(thread_id=thread_id)
+                    if before_id is None or m["id"] < before_id]
+        return [dict(m) for m in messages[-limit:]] if limit > 0 else []
+
+    def get_chat_messages_since(self, thread_id: int, since_id: int) -> List[Dict]:
+        return [dict(m) for m in self.tables["chat_messages"].where(thread_id=thread_id) if m["id"] >= since_id]
+
+    def has_chat_messages_before(self, thread_id: int, before_id: int) -> bool:
+        return any(m["id"] < before_id for m in self.tables["chat_messages"].where(thread_id=thread_id))
+
+    # Analytics
+    def get_habit_stats(self, user_id: int, days: int = 30) -> Dict:
+        since = (datetime.utcnow().date() - timedelta(days=days)).isoformat()
+        habits = self.tables["habits"].rows
+        daily: Dict[str, Dict] = {}
+        by_category: Dict[str, int] = {}
+        for c in self.tables["habit_completions"].rows.values():
+            habit = habits.get(c["habit_id"])
+            if not habit or habit["user_id"] != user_id or c["completion_date"] < since:
+                continue
+            day = daily.setdefault(c["completion_date"], {"completion_date": c["completion_date"], "count": 0, "xp": 0})
+            day["count"] += 1
+            day["xp"] += c["xp_earned"]
+            by_category[habit["category"]] = by_category.get(habit["category"], 0) + 1
+        return {"daily": [daily[d] for d in sorted(daily)], "by_category": by_category}
+
+    def export_completions(self, user_id: int, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        habits = self.tables["habits"].rows
+        rows = []
+        for c in self.tables["habit_completions"].rows.values():
+            habit = habits.get(c["habit_id"])
+            if habit and habit["user_id"] == user_id and (start or "") <= c["completion_date"] <= (end or "9999-12-31"):
+                rows.append({"completion_date": c["completion_date"], "completed_at": c["completed_at"],
+                             "title": habit["title"], "category": habit["category"],
+                             "xp_earned": c["xp_earned"], "streak_bonus": c["streak_bonus"]})
+        return sorted(rows, key=lambda r: (r["completion_date"], r["title"]))
@@ -0,0 +1,166 @@
+"""
+📈 GOAL QUEST - AI Call Telemetry
+Latency, token usage, failures and cost for every AIService request
+
+One row per AIService call is stored in the local ai_calls table. Summaries
+are computed over a rolling window so we can see which features dominate
+latency and spend, and tune max_tokens per call.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# USD per million tokens: (input, output, cache write, cache read)
+MODEL_PRICING = {
+    "claude-sonnet-4-20250514": (3.00, 15.00, 3.75, 0.30),
+}
+DEFAULT_PRICING = (3.00, 15.00, 3.75, 0.30)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [250, 500, 1000, 2000, 4000, 8000, 16000, 32000]
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int,
+                  cache_write_tokens: int = 0, cache_read_tokens: int = 0) -> float:
+    price_in, price_out, price_write, price_read = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    return (input_tokens * price_in + output_tokens * price_out
+            + cache_write_tokens * price_write + cache_read_tokens * price_read) / 1_000_000
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class AITelemetry:
+    """SQLite-backed recorder for AIService calls"""
+
+    RETENTION_DAYS = 30
+    PRUNE_EVERY = 500
+
+    def __init__(self, db_path: str = "goal_quest.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                method TEXT NOT NULL,
+                model TEXT,
+                status TEXT NOT NULL,
+                latency_ms REAL DEFAULT 0,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                cache_write_tokens INTEGER DEFAULT 0,
+                cache_read_tokens INTEGER DEFAULT 0,
+                max_tokens INTEGER,
+                stop_reason TEXT,
+                fallback INTEGER DEFAULT 0,
+                error TEXT,
+                attempts INTEGER DEFAULT 1
+            )
+        """)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(ai_calls)")}
+        if "attempts" not in columns:
+            self.conn.execute("ALTER TABLE ai_calls ADD COLUMN attempts INTEGER DEFAULT 1")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_calls_created ON ai_calls(created_at)")
+        self.conn.commit()
+
+    def record(self, method: str, model: Optional[str], status: str, latency_ms: float = 0.0,
+               response=None, max_tokens: Optional[int] = None, fallback: bool = False,
+               error: Optional[str] = None, attempts: int = 0):
+        """Store one call; token counts come from response.usage when there is a response"""
+        usage = getattr(response, "usage", None)
+        row = (
+            time.time(), method, model, status, latency_ms,
+            getattr(usage, "input_tokens", 0) or 0,
+            getattr(usage, "output_tokens", 0) or 0,
+            getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            getattr(usage, "cache_read_input_tokens", 0) or 0,
+            max_tokens, getattr(response, "stop_reason", None), int(fallback),
+            error[:500] if error else None, attempts,
+        )
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO ai_calls (created_at, method, model, status, latency_ms, input_tokens, output_tokens,
+                                      cache_write_tokens, cache_read_tokens, max_tokens, stop_reason, fallback, error,
+                                      attempts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, row)
+            self._inserts += 1
+            if self._inserts % self.PRUNE_EVERY == 0:
+                self.conn.execute("DELETE FROM ai_calls WHERE created_at < ?",
+                                  (time.time() - self.RETENTION_DAYS * 86400,))
+            self.conn.commit()
+
+    def _rows(self, window_hours: float, method: Optional[str] = None) -> List[sqlite3.Row]:
+        query = "SELECT * FROM ai_calls WHERE created_at >= ?"
+        params: list = [time.time() - window_hours * 3600]
+        if method:
+            query += " AND method = ?"
+            params.append(method)
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def summary(self, window_hours: float = 24) -> List[Dict]:
+        """Per (method, model) aggregates over the last window_hours"""
+        groups: Dict[tuple, List[sqlite3.Row]] = {}
+        for row in self._rows(window_hours):
+            groups.setdefault((row["method"], row["model"]), []).append(row)
+
+        summaries = []
+        for (method, model), rows in sorted(groups.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            # Offline fallbacks never reach the API, so they carry no latency or tokens
+            upstream = [r for r in rows if r["status"] != "offline"]
+            sent = [r for r in upstream if r["status"] != "coalesced"]
+            latencies = sorted(r["latency_ms"] for r in upstream)
+            tokens_in = sum(r["input_tokens"] for r in rows)
+            tokens_out = sum(r["output_tokens"] for r in rows)
+            cache_write = sum(r["cache_write_tokens"] for r in rows)
+            cache_read = sum(r["cache_read_tokens"] for r in rows)
+            summaries.append({
+                "method": method,
+                "model": model,
+                "calls": len(rows),
+                "p50_ms": percentile(latencies, 50),
+                "p90_ms": percentile(latencies, 90),
+                "p99_ms": percentile(latencies, 99),
+                "input_tokens": tokens_in,
+                "output_tokens": tokens_out,
+                "cache_write_tokens": cache_write,
+                "cache_read_tokens": cache_read,
+                "max_output_tokens": max((r["output_tokens"] for r in sent), default=0),
+                "max_tokens_limit": max((r["max_tokens"] or 0 for r in rows), default=0),
+                "truncated": sum(1 for r in rows if r["stop_reason"] == "max_tokens"),
+                "errors": sum(1 for r in rows if r["status"] == "error"),
+                "retries": sum(max(0, (r["attempts"] or 0) - 1) for r in sent),
+                "coalesced": sum(1 for r in rows if r["status"] == "coalesced"),
+                "parse_failures": sum(1 for r in rows if r["status"] == "parse_error"),
+                "fallback_rate": sum(r["fallback"] for r in rows) / len(rows),
+                "est_cost_usd": estimate_cost(model, tokens_in, tokens_out, cache_write, cache_read),
+            })
+        return summaries
+
+    def latency_histogram(self, window_hours: float = 24, method: Optional[str] = None) -> Dict[str, int]:
+        """Call counts per latency bucket, labelled by bucket upper bound"""
+        labels = [f"≤{b / 1000:g}s" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1] / 1000:g}s"]
+        counts = dict.fromkeys(labels, 0)
+        for row in self._rows(window_hours, method):
+            if row["status"] == "offline":
+                continue
+            for bound, label in zip(LATENCY_BUCKETS_MS, labels):
+                if row["latency_ms"] <= bound:
+                    counts[label] += 1
+                    break
+            else:
+                counts[labels[-1]] += 1
+        return counts